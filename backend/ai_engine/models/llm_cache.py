@@ -0,0 +1,290 @@
+"""
+Two-tier LLM response cache: an in-memory LRU in front of a SQLite file.
+
+Entries are keyed by a hash of the model, temperature, max_tokens and the
+normalized message list, so a retried, reconnected or replayed turn with the
+same compiled prompt is answered without another OpenAI round trip.
+
+Modes (LLM_CACHE_MODE):
+- on:     serve fresh entries, store new responses (the default)
+- off:    no caching at all
+- record: always call OpenAI and store every response, whatever the
+          temperature, without expiry, so the run can be replayed
+- replay: answer only from the cache and never call OpenAI; a miss fails
+          the call (deterministic offline tests and benchmarks)
+
+In "on" mode calls above LLM_CACHE_MAX_TEMPERATURE (by default anything
+non-zero) are "creative" and bypass the cache.
+"""
+
+# ============================================================================
+# IMPORTS
+# ============================================================================
+import os
+import json
+import time
+import asyncio
+import hashlib
+import logging
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+# ============================================================================
+# CONSTANTS
+# ============================================================================
+logger = logging.getLogger(__name__)
+
+MODE_ON = "on"
+MODE_OFF = "off"
+MODE_RECORD = "record"
+MODE_REPLAY = "replay"
+CACHE_MODES = (MODE_ON, MODE_OFF, MODE_RECORD, MODE_REPLAY)
+
+DEFAULT_MODE = os.getenv("LLM_CACHE_MODE", MODE_ON).lower()
+# The cache file lives in the backend directory whatever the working directory;
+# a relative LLM_CACHE_PATH is taken relative to it too
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DEFAULT_PATH = os.path.join(BACKEND_DIR, os.getenv("LLM_CACHE_PATH", "llm_cache.db"))
+DEFAULT_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", "86400"))
+DEFAULT_MEMORY_ENTRIES = int(os.getenv("LLM_CACHE_MEMORY_ENTRIES", "256"))
+DEFAULT_DISK_ENTRIES = int(os.getenv("LLM_CACHE_DISK_ENTRIES", "10000"))
+DEFAULT_MAX_TEMPERATURE = float(os.getenv("LLM_CACHE_MAX_TEMPERATURE", "0"))
+
+# ============================================================================
+# KEYS
+# ============================================================================
+def _normalize_content(content: Any) -> Any:
+    """Line endings and trailing whitespace do not change the answer; drop them."""
+    if not isinstance(content, str):
+        return content
+    lines = content.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    return "\n".join(line.rstrip() for line in lines).strip()
+
+def make_cache_key(
+    model: str,
+    temperature: float,
+    max_tokens: int,
+    messages: List[Dict[str, Any]],
+    response_format: Optional[Dict[str, Any]] = None
+) -> str:
+    """Stable hash of everything that determines a completion."""
+    normalized = [
+        {"role": message.get("role"), "content": _normalize_content(message.get("content"))}
+        for message in messages
+    ]
+    request = {"model": model, "temperature": float(temperature), "max_tokens": max_tokens, "messages": normalized}
+    if response_format is not None:
+        request["response_format"] = response_format
+    payload = json.dumps(
+        request,
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+# ============================================================================
+# CACHE CLASS
+# ============================================================================
+class LLMResponseCache:
+    """Memory LRU + SQLite response cache with TTLs, bounded sizes and hit/miss metrics."""
+
+    def __init__(
+        self,
+        mode: str = DEFAULT_MODE,
+        path: str = DEFAULT_PATH,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        memory_entries: int = DEFAULT_MEMORY_ENTRIES,
+        disk_entries: int = DEFAULT_DISK_ENTRIES,
+        max_temperature: float = DEFAULT_MAX_TEMPERATURE,
+    ):
+        if mode not in CACHE_MODES:
+            logger.warning(f"Unknown LLM_CACHE_MODE '{mode}', caching disabled")
+            mode = MODE_OFF
+        self.mode = mode
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.memory_entries = memory_entries
+        self.disk_entries = disk_entries
+        self.max_temperature = max_temperature
+
+        # key -> (response, expires_at or None)
+        self._memory: "OrderedDict[str, Tuple[str, Optional[float]]]" = OrderedDict()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self.metrics: Dict[str, int] = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "bypassed": 0,
+            "stores": 0,
+            "memory_evictions": 0,  # LRU entries dropped from memory (still on disk)
+            "disk_evictions": 0,    # rows dropped from SQLite over disk_entries
+        }
+
+    # ------------------------------------------------------------------------
+    # Policy
+    # ------------------------------------------------------------------------
+    @property
+    def enabled(self) -> bool:
+        return self.mode != MODE_OFF
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == MODE_REPLAY
+
+    def should_cache(self, temperature: float) -> bool:
+        """False for calls that must not be cached (cache off, or creative in 'on' mode)."""
+        if self.mode == MODE_OFF:
+            return False
+        if self.mode == MODE_ON and temperature > self.max_temperature:
+            self.metrics["bypassed"] += 1
+            return False
+        return True
+
+    # ------------------------------------------------------------------------
+    # Lookup / store
+    # ------------------------------------------------------------------------
+    async def get(self, key: str) -> Optional[str]:
+        """Cached response for key, or None. Replay mode ignores expiry."""
+        now = time.time()
+        entry = self._memory.get(key)
+        if entry is not None:
+            response, expires_at = entry
+            if self.replaying or expires_at is None or expires_at > now:
+                self._memory.move_to_end(key)
+                self.metrics["memory_hits"] += 1
+                return response
+            del self._memory[key]
+
+        row = await asyncio.to_thread(self._disk_get, key, now)
+        if row is not None:
+            response, expires_at = row
+            self._remember(key, response, expires_at)
+            self.metrics["disk_hits"] += 1
+            return response
+
+        self.metrics["misses"] += 1
+        return None
+
+    async def set(self, key: str, model: str, response: str) -> None:
+        """Store a response in both tiers (record mode stores without expiry)."""
+        if not response or self.replaying:
+            return
+        now = time.time()
+        expires_at = None if self.mode == MODE_RECORD else now + self.ttl_seconds
+        self._remember(key, response, expires_at)
+        await asyncio.to_thread(self._disk_set, key, model, response, now, expires_at)
+        self.metrics["stores"] += 1
+
+    def _remember(self, key: str, response: str, expires_at: Optional[float]) -> None:
+        """Put an entry in the memory LRU, evicting the least recently used."""
+        self._memory[key] = (response, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+            self.metrics["memory_evictions"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Mode, tier sizes and hit/miss counters."""
+        lookups = self.metrics["memory_hits"] + self.metrics["disk_hits"] + self.metrics["misses"]
+        hits = self.metrics["memory_hits"] + self.metrics["disk_hits"]
+        return {
+            "mode": self.mode,
+            "memory_size": len(self._memory),
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            **self.metrics,
+        }
+
+    # ------------------------------------------------------------------------
+    # SQLite tier (runs in a worker thread)
+    # ------------------------------------------------------------------------
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS llm_cache (
+                    key TEXT PRIMARY KEY,
+                    model TEXT,
+                    response TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    expires_at REAL,
+                    last_hit REAL NOT NULL
+                )
+                """
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS ix_llm_cache_last_hit ON llm_cache (last_hit)")
+            self._conn.commit()
+        return self._conn
+
+    def _disk_get(self, key: str, now: float) -> Optional[Tuple[str, Optional[float]]]:
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute(
+                "SELECT response, expires_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if not self.replaying and row[1] is not None and row[1] <= now:
+                conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                conn.commit()
+                return None
+            conn.execute("UPDATE llm_cache SET last_hit = ? WHERE key = ?", (now, key))
+            conn.commit()
+            return row[0], row[1]
+
+    def _disk_set(self, key: str, model: str, response: str, now: float, expires_at: Optional[float]) -> None:
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                """
+                INSERT INTO llm_cache (key, model, response, created_at, expires_at, last_hit)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET
+                    response = excluded.response,
+                    created_at = excluded.created_at,
+                    expires_at = excluded.expires_at,
+                    last_hit = excluded.last_hit
+                """,
+                (key, model, response, now, expires_at, now),
+            )
+            # Expired rows first, then the least recently hit beyond the size bound
+            conn.execute("DELETE FROM llm_cache WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,))
+            overflow = conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0] - self.disk_entries
+            if overflow > 0:
+                conn.execute(
+                    "DELETE FROM llm_cache WHERE key IN (SELECT key FROM llm_cache ORDER BY last_hit LIMIT ?)",
+                    (overflow,),
+                )
+                self.metrics["disk_evictions"] += overflow
+            conn.commit()
+
+    def close(self) -> None:
+        """Close the SQLite connection."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+# ============================================================================
+# SHARED CACHE
+# ============================================================================
+_shared_cache: Optional[LLMResponseCache] = None
+
+def get_llm_cache() -> LLMResponseCache:
+    """The process-wide response cache (created on first use)."""
+    global _shared_cache
+    if _shared_cache is None:
+        _shared_cache = LLMResponseCache()
+    return _shared_cache
+
+def close_llm_cache() -> None:
+    """Close the shared cache's SQLite connection."""
+    global _shared_cache
+    if _shared_cache is not None:
+        _shared_cache.close()
+    _shared_cache = None
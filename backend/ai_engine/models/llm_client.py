@@ -1,15 +1,42 @@
 """
 OpenAI LLM client wrapper with configuration and error handling.
+
+All LLMClient instances share one AsyncOpenAI client, and so one pooled
+keep-alive HTTP connection pool, per process. Calls never block the event
+loop, are capped by a process-wide concurrency limit, time out per call, and
+retry transient failures with exponential backoff and full jitter.
+stream_openai yields the completion as text deltas for token streaming.
+Both paths sit behind the shared response cache (see llm_cache.py).
+
+Callers may pass a JSON schema for the reply. Depending on
+OPENAI_RESPONSE_FORMAT it is sent as a strict json_schema structured output,
+as plain JSON mode (json_object), or not at all (text). The default is
+json_schema for model families that support it and json_object otherwise.
+If the provider rejects the format, the client falls back one step and
+remembers that.
 """
 
 # ============================================================================
 # IMPORTS
 # ============================================================================
 import os
+import asyncio
 import logging
-from typing import Dict, Any, Optional
-from openai import OpenAI
+import random
+from typing import Dict, Any, AsyncIterator, Optional
+
+import httpx
+from openai import (
+    AsyncOpenAI,
+    APIConnectionError,
+    APIStatusError,
+    APITimeoutError,
+    BadRequestError,
+)
 from openai.types.chat import ChatCompletion
+
+from .llm_cache import get_llm_cache, close_llm_cache, make_cache_key
+from .tokenizer import count_tokens
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -25,72 +52,339 @@ DEFAULT_MODEL = "gpt-3.5-turbo"  # Most cost-effective model
 DEFAULT_TEMPERATURE = 0.7
 DEFAULT_MAX_TOKENS = 500  # Reduced for small tasks
 DEFAULT_RETRY_ATTEMPTS = 3
+DEFAULT_TIMEOUT_SECONDS = 60.0  # per call, including reading the response
+DEFAULT_CONNECT_TIMEOUT_SECONDS = 10.0
+
+# Backoff: sleep uniform(0, min(cap, base * 2 ** attempt)) between attempts
+DEFAULT_BACKOFF_BASE_SECONDS = 0.5
+DEFAULT_BACKOFF_CAP_SECONDS = 8.0
+
+# Process-wide limits shared by every LLMClient
+MAX_CONCURRENT_CALLS = int(os.getenv("OPENAI_MAX_CONCURRENCY", "16"))
+MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", str(MAX_CONCURRENT_CALLS)))
+KEEPALIVE_EXPIRY_SECONDS = float(os.getenv("OPENAI_KEEPALIVE_EXPIRY", "30"))
+
+# HTTP statuses worth retrying: timeout, conflict, rate limit, server errors
+RETRYABLE_STATUS_CODES = {408, 409, 429}
+
+# How a response schema is sent, strictest first
+RESPONSE_FORMAT_JSON_SCHEMA = "json_schema"
+RESPONSE_FORMAT_JSON_OBJECT = "json_object"
+RESPONSE_FORMAT_TEXT = "text"
+RESPONSE_FORMATS = (RESPONSE_FORMAT_JSON_SCHEMA, RESPONSE_FORMAT_JSON_OBJECT, RESPONSE_FORMAT_TEXT)
+RESPONSE_SCHEMA_NAME = "assistant_reply"
+
+# Model families that accept json_schema structured outputs
+STRUCTURED_OUTPUT_MODEL_PREFIXES = ("gpt-4o", "gpt-4.1", "gpt-5", "o1", "o3", "o4")
+
+# ============================================================================
+# SHARED CLIENT
+# ============================================================================
+_shared_client: Optional[AsyncOpenAI] = None
+_call_slots: Optional[asyncio.Semaphore] = None
+
+def _get_shared_client(api_key: str) -> AsyncOpenAI:
+    """The process-wide AsyncOpenAI client (created on first use)."""
+    global _shared_client
+    if _shared_client is None:
+        http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=MAX_CONNECTIONS,
+                max_keepalive_connections=MAX_CONNECTIONS,
+                keepalive_expiry=KEEPALIVE_EXPIRY_SECONDS,
+            ),
+        )
+        _shared_client = AsyncOpenAI(
+            api_key=api_key,
+            base_url=os.getenv("OPENAI_BASE_URL") or None,
+            http_client=http_client,
+            max_retries=0,  # retries are handled by LLMClient's backoff loop
+        )
+    return _shared_client
+
+def _get_call_slots() -> asyncio.Semaphore:
+    """Process-wide limit on LLM calls in flight."""
+    global _call_slots
+    if _call_slots is None:
+        _call_slots = asyncio.Semaphore(MAX_CONCURRENT_CALLS)
+    return _call_slots
+
+async def close_llm_client() -> None:
+    """Close the shared connection pool and response cache (called on application shutdown)."""
+    global _shared_client, _call_slots
+    if _shared_client is not None:
+        await _shared_client.close()
+    _shared_client = None
+    _call_slots = None
+    close_llm_cache()
+
+def _default_response_format(model: str) -> str:
+    """json_schema where the model supports structured outputs, JSON mode otherwise."""
+    if model.startswith(STRUCTURED_OUTPUT_MODEL_PREFIXES):
+        return RESPONSE_FORMAT_JSON_SCHEMA
+    return RESPONSE_FORMAT_JSON_OBJECT
+
+def _is_retryable(error: Exception) -> bool:
+    """Transient failures (network, timeouts, 408/409/429/5xx) are retried; others are not."""
+    if isinstance(error, (APITimeoutError, APIConnectionError)):
+        return True
+    if isinstance(error, APIStatusError):
+        return error.status_code in RETRYABLE_STATUS_CODES or error.status_code >= 500
+    return False
 
 # ============================================================================
 # LLM CLIENT CLASS
 # ============================================================================
 class LLMClient:
     """OpenAI API client with configuration and error handling."""
-    
+
     def __init__(self):
         """Initialize the LLM client."""
         self.api_key = os.getenv("OPENAI_API_KEY")
         if not self.api_key:
             raise ValueError("OPENAI_API_KEY environment variable is required")
-        
+
         self.model = os.getenv("OPENAI_MODEL", DEFAULT_MODEL)
         self.temperature = float(os.getenv("OPENAI_TEMPERATURE", DEFAULT_TEMPERATURE))
         self.max_tokens = int(os.getenv("OPENAI_MAX_TOKENS", DEFAULT_MAX_TOKENS))
         self.retry_attempts = int(os.getenv("OPENAI_RETRY_ATTEMPTS", DEFAULT_RETRY_ATTEMPTS))
-        
-        self.client = OpenAI(api_key=self.api_key)
-        
+        self.timeout = float(os.getenv("OPENAI_TIMEOUT", DEFAULT_TIMEOUT_SECONDS))
+        self.backoff_base = float(os.getenv("OPENAI_BACKOFF_BASE", DEFAULT_BACKOFF_BASE_SECONDS))
+        self.backoff_cap = float(os.getenv("OPENAI_BACKOFF_CAP", DEFAULT_BACKOFF_CAP_SECONDS))
+        self.streaming = os.getenv("OPENAI_STREAM", "true").lower() == "true"
+        self.response_format = os.getenv("OPENAI_RESPONSE_FORMAT", "").lower() or _default_response_format(self.model)
+        if self.response_format not in RESPONSE_FORMATS:
+            logger.warning(f"Unknown OPENAI_RESPONSE_FORMAT '{self.response_format}', using {RESPONSE_FORMAT_TEXT}")
+            self.response_format = RESPONSE_FORMAT_TEXT
+
+        self.client = _get_shared_client(self.api_key)
+
     async def call_openai(
-        self, 
-        messages: list, 
+        self,
+        messages: list,
         temperature: Optional[float] = None,
         max_tokens: Optional[int] = None,
-        retry_attempts: Optional[int] = None
+        retry_attempts: Optional[int] = None,
+        timeout: Optional[float] = None,
+        response_schema: Optional[Dict[str, Any]] = None
     ) -> Optional[str]:
         """
         Make a call to OpenAI API with retry logic.
-        
+
         Args:
             messages: List of message dictionaries
             temperature: Override default temperature
             max_tokens: Override default max tokens
             retry_attempts: Override default retry attempts
-            
+            timeout: Override default per-call timeout (seconds)
+            response_schema: JSON schema the reply must follow (see OPENAI_RESPONSE_FORMAT)
+
         Returns:
             Response content or None if failed
         """
         temp = temperature if temperature is not None else self.temperature
         tokens = max_tokens if max_tokens is not None else self.max_tokens
         retries = retry_attempts if retry_attempts is not None else self.retry_attempts
-        
-        for attempt in range(retries):
+        call_timeout = httpx.Timeout(
+            timeout if timeout is not None else self.timeout,
+            connect=DEFAULT_CONNECT_TIMEOUT_SECONDS,
+        )
+
+        cache = get_llm_cache()
+        cache_key = None
+        if cache.should_cache(temp):
+            cache_key = make_cache_key(self.model, temp, tokens, messages, self._response_format(response_schema))
+            cached = await cache.get(cache_key)
+            if cached is not None:
+                return cached
+            if cache.replaying:
+                logger.error(f"LLM cache replay miss for key {cache_key}; not calling OpenAI")
+                return None
+
+        content = await self._request_completion(messages, temp, tokens, retries, call_timeout, response_schema)
+        if content and cache_key:
+            await cache.set(cache_key, self.model, content)
+        return content
+
+    async def _request_completion(
+        self,
+        messages: list,
+        temp: float,
+        tokens: int,
+        retries: int,
+        call_timeout: httpx.Timeout,
+        response_schema: Optional[Dict[str, Any]] = None
+    ) -> Optional[str]:
+        """
+        The OpenAI request itself, with the backoff retry loop. A retry after
+        a response_format downgrade is immediate and does not use an attempt.
+        """
+        attempt = 0
+        while attempt < retries:
             try:
-                response: ChatCompletion = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=messages,
-                    temperature=temp,
-                    max_tokens=tokens
-                )
-                
+                # Only the request itself holds a slot; backoff sleeps release it
+                async with _get_call_slots():
+                    response: ChatCompletion = await self.client.chat.completions.create(
+                        model=self.model,
+                        messages=messages,
+                        temperature=temp,
+                        max_tokens=tokens,
+                        timeout=call_timeout,
+                        **self._format_kwargs(response_schema)
+                    )
+
                 if response.choices and response.choices[0].message:
                     return response.choices[0].message.content
                 else:
                     logger.warning(f"Empty response from OpenAI on attempt {attempt + 1}")
-                    
+
             except Exception as e:
                 logger.error(f"OpenAI API call failed on attempt {attempt + 1}: {e}")
+                if response_schema is not None and self._downgrade_response_format(e):
+                    continue
+                if not _is_retryable(e):
+                    return None
                 if attempt == retries - 1:
                     logger.error("All retry attempts failed")
                     return None
-                    
+
+            if attempt < retries - 1:
+                await asyncio.sleep(self._backoff_delay(attempt))
+            attempt += 1
+
         return None
-    
+
+    async def stream_openai(
+        self,
+        messages: list,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        retry_attempts: Optional[int] = None,
+        timeout: Optional[float] = None,
+        response_schema: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream a completion, yielding text deltas as they arrive.
+
+        Failures before the first delta are retried like call_openai; once
+        text has been yielded the stream cannot be replayed, so a later
+        failure is raised to the caller. Yields nothing if every attempt fails.
+        A cached response is yielded as a single delta. response_schema is
+        handled as in call_openai.
+        """
+        temp = temperature if temperature is not None else self.temperature
+        tokens = max_tokens if max_tokens is not None else self.max_tokens
+        retries = retry_attempts if retry_attempts is not None else self.retry_attempts
+        call_timeout = httpx.Timeout(
+            timeout if timeout is not None else self.timeout,
+            connect=DEFAULT_CONNECT_TIMEOUT_SECONDS,
+        )
+
+        cache = get_llm_cache()
+        cache_key = None
+        if cache.should_cache(temp):
+            cache_key = make_cache_key(self.model, temp, tokens, messages, self._response_format(response_schema))
+            cached = await cache.get(cache_key)
+            if cached is not None:
+                yield cached
+                return
+            if cache.replaying:
+                logger.error(f"LLM cache replay miss for key {cache_key}; not calling OpenAI")
+                return
+
+        parts = []
+        async for delta in self._request_stream(messages, temp, tokens, retries, call_timeout, response_schema):
+            parts.append(delta)
+            yield delta
+        if parts and cache_key:
+            await cache.set(cache_key, self.model, "".join(parts))
+
+    async def _request_stream(
+        self,
+        messages: list,
+        temp: float,
+        tokens: int,
+        retries: int,
+        call_timeout: httpx.Timeout,
+        response_schema: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[str]:
+        """
+        The streaming OpenAI request itself, retried until the first delta.
+        A response_format downgrade retries as in _request_completion.
+        """
+        attempt = 0
+        while attempt < retries:
+            yielded = False
+            try:
+                async with _get_call_slots():
+                    stream = await self.client.chat.completions.create(
+                        model=self.model,
+                        messages=messages,
+                        temperature=temp,
+                        max_tokens=tokens,
+                        timeout=call_timeout,
+                        stream=True,
+                        **self._format_kwargs(response_schema)
+                    )
+                    try:
+                        async for chunk in stream:
+                            delta = chunk.choices[0].delta.content if chunk.choices else None
+                            if delta:
+                                yielded = True
+                                yield delta
+                    finally:
+                        await stream.response.aclose()
+                if yielded:
+                    return
+                logger.warning(f"Empty streamed response from OpenAI on attempt {attempt + 1}")
+
+            except Exception as e:
+                if yielded:
+                    raise
+                logger.error(f"OpenAI streaming call failed on attempt {attempt + 1}: {e}")
+                if response_schema is not None and self._downgrade_response_format(e):
+                    continue
+                if not _is_retryable(e) or attempt == retries - 1:
+                    return
+
+            if attempt < retries - 1:
+                await asyncio.sleep(self._backoff_delay(attempt))
+            attempt += 1
+
+    def _response_format(self, response_schema: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """The response_format parameter for response_schema in the current mode (None: send none)."""
+        if response_schema is None or self.response_format == RESPONSE_FORMAT_TEXT:
+            return None
+        if self.response_format == RESPONSE_FORMAT_JSON_OBJECT:
+            return {"type": RESPONSE_FORMAT_JSON_OBJECT}
+        return {
+            "type": RESPONSE_FORMAT_JSON_SCHEMA,
+            "json_schema": {"name": RESPONSE_SCHEMA_NAME, "strict": True, "schema": response_schema},
+        }
+
+    def _format_kwargs(self, response_schema: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Extra create() arguments constraining the reply."""
+        response_format = self._response_format(response_schema)
+        return {"response_format": response_format} if response_format else {}
+
+    def _downgrade_response_format(self, error: Exception) -> bool:
+        """
+        After a 400 rejecting response_format, fall back to the next looser
+        format for this and later calls. Returns whether to retry right away.
+        """
+        if not isinstance(error, BadRequestError) or "response_format" not in str(error):
+            return False
+        position = RESPONSE_FORMATS.index(self.response_format)
+        if position == len(RESPONSE_FORMATS) - 1:
+            return False
+        self.response_format = RESPONSE_FORMATS[position + 1]
+        logger.warning(f"Model {self.model} rejected the response format; falling back to {self.response_format}")
+        return True
+
+    def _backoff_delay(self, attempt: int) -> float:
+        """Full-jitter exponential backoff before retry number attempt + 1."""
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * (2 ** attempt)))
+
     def get_token_count(self, text: str) -> int:
-        """Estimate token count for text (rough approximation)."""
-        # Simple approximation: 1 token ≈ 4 characters
-        return len(text) // 4 
\ No newline at end of file
+        """Token count for text (see tokenizer.py)."""
+        return count_tokens(text)
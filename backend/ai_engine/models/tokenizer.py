@@ -0,0 +1,117 @@
+"""
+Local token counting for prompt budgets.
+
+Counts use tiktoken's BPE for the configured OpenAI model when it is
+installed and its encoding can be loaded (tiktoken downloads the BPE file on
+first use and caches it under TIKTOKEN_CACHE_DIR). Otherwise counts fall back
+to an estimate over the same word / number / punctuation pieces the OpenAI
+pre-tokenizer splits on, which tracks real counts far more closely than
+len(text) // 4 on task lists, dates and JSON.
+"""
+
+# ============================================================================
+# IMPORTS
+# ============================================================================
+import os
+import re
+import logging
+from functools import lru_cache
+from typing import Any, List, Optional
+
+# ============================================================================
+# CONSTANTS
+# ============================================================================
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL = "gpt-3.5-turbo"
+FALLBACK_ENCODING = "cl100k_base"
+
+# Pieces the OpenAI pre-tokenizer never merges across
+_PIECES = re.compile(r"'(?:[sdmt]|ll|ve|re)| ?[^\W\d_]+| ?\d+| ?(?:[^\s\w]|_)+|\s+", re.IGNORECASE)
+
+# ============================================================================
+# ENCODING
+# ============================================================================
+_encoding: Any = None
+_encoding_loaded = False
+
+def _get_encoding() -> Optional[Any]:
+    """tiktoken encoding for OPENAI_MODEL, or None if tiktoken is unavailable."""
+    global _encoding, _encoding_loaded
+    if _encoding_loaded:
+        return _encoding
+    _encoding_loaded = True
+    try:
+        import tiktoken
+    except ImportError:
+        logger.info("tiktoken not installed; estimating token counts")
+        return None
+    model = os.getenv("OPENAI_MODEL", DEFAULT_MODEL)
+    try:
+        try:
+            _encoding = tiktoken.encoding_for_model(model)
+        except KeyError:
+            _encoding = tiktoken.get_encoding(FALLBACK_ENCODING)
+        logger.info(f"Counting tokens with tiktoken '{_encoding.name}' for {model}")
+    except Exception as e:
+        logger.warning(f"Could not load tiktoken encoding for {model} ({e}); estimating token counts")
+        _encoding = None
+    return _encoding
+
+def _estimate_piece(piece: str) -> int:
+    """Approximate BPE tokens in one pre-tokenizer piece."""
+    word = piece.lstrip(" ")
+    if not word or piece.isspace():
+        return 1
+    if word.isdigit():
+        return -(-len(word) // 3)  # numbers split into groups of up to 3 digits
+    if word.isalpha():
+        return 1 + len(word) // 8  # common words are one token, long ones split
+    return len(word)  # punctuation runs rarely merge
+
+# ============================================================================
+# PUBLIC API
+# ============================================================================
+def tokenizer_name() -> str:
+    """Name of the encoding in use ("estimate" without tiktoken); loads it on first call."""
+    encoding = _get_encoding()
+    return encoding.name if encoding is not None else "estimate"
+
+@lru_cache(maxsize=4096)
+def count_tokens(text: str) -> int:
+    """Number of tokens text encodes to (an estimate without tiktoken)."""
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return sum(_estimate_piece(piece) for piece in _PIECES.findall(text))
+
+def truncate_to_tokens(text: str, max_tokens: int, keep_tail: bool = False) -> str:
+    """
+    text cut to at most max_tokens tokens. Keeps the beginning, or the end
+    if keep_tail; text that already fits is returned unchanged.
+    """
+    if not text or max_tokens <= 0:
+        return ""
+    if count_tokens(text) <= max_tokens:
+        return text
+
+    encoding = _get_encoding()
+    if encoding is not None:
+        tokens = encoding.encode(text, disallowed_special=())
+        kept = tokens[-max_tokens:] if keep_tail else tokens[:max_tokens]
+        return encoding.decode(kept)
+
+    pieces: List[str] = _PIECES.findall(text)
+    if keep_tail:
+        pieces.reverse()
+    kept_pieces, used = [], 0
+    for piece in pieces:
+        used += _estimate_piece(piece)
+        if used > max_tokens:
+            break
+        kept_pieces.append(piece)
+    if keep_tail:
+        kept_pieces.reverse()
+    return "".join(kept_pieces)
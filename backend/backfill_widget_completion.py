@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+"""
+One-off backfill of the widget_completion ledger from daily_widgets.activity_data.
+
+Run once after `alembic upgrade head` on a database with existing history.
+Safe to re-run: every ledger row is recomputed from its daily widget.
+"""
+import asyncio
+from db.session import AsyncSessionLocal
+from db.engine import close_engine
+from services.widget_completion_service import WidgetCompletionService
+
+async def backfill_widget_completion():
+    """Rebuild widget_completion from every live daily widget."""
+    print("🔧 Backfilling widget_completion from daily_widgets...")
+    
+    async with AsyncSessionLocal() as session:
+        # Commits batch by batch
+        processed = await WidgetCompletionService(session).backfill()
+    
+    print(f"✅ Backfilled completion for {processed} daily widgets")
+    await close_engine()
+
+if __name__ == "__main__":
+    asyncio.run(backfill_widget_completion())
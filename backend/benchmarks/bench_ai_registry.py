@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+user-018: one read-only AI config and service registry for every connection.
+
+Measures what a /ws connection sets up before its first message:
+- before: what each connection's own AIOrchestrator built. The config files
+  are parsed three times (validation engine, prompt preprocessing, static
+  content), and there are fresh services and a private
+  ContextConnectionManager holding the connection's context.
+- after:  get_ai_orchestrator() and the connection's context in the shared
+  context store
+
+Connections are kept open so the memory they hold can be measured
+(tracemalloc, in a pass of its own after the timed one).
+
+    python benchmarks/bench_ai_registry.py [--connections 200]
+"""
+
+# ============================================================================
+# IMPORTS
+# ============================================================================
+import common  # noqa: F401  (must come first: sets DATABASE_URL)
+
+import gc
+import time
+import uuid
+import argparse
+import tracemalloc
+
+from ai_engine.models.llm_client import LLMClient
+from orchestrators.ai_orchestrator import AIOrchestrator
+from services.ai_prompt_preprocessing import AIPromptPreprocessing
+from services.ai_registry import AIRegistry, get_ai_orchestrator, init_ai_registry, load_ai_config
+from services.context_connection_manager import ContextConnectionManager, context_store
+from services.context_service import ContextService
+from services.validation_engine import ValidationEngine
+from utils.static_content_utils import StaticContentUtils
+
+# ============================================================================
+# CONNECTION SETUP
+# ============================================================================
+def before_connection():
+    """A private orchestrator over freshly parsed config, and its own context store."""
+    config = load_ai_config()  # the validation engine's parse
+    prompt_preprocessing = AIPromptPreprocessing(load_ai_config())
+    prompt_preprocessing.static_content_utils = StaticContentUtils(load_ai_config())
+    orchestrator = AIOrchestrator(AIRegistry(
+        config=config,
+        llm_client=LLMClient(),
+        validation_engine=ValidationEngine(config),
+        context_service=ContextService(config),
+        context_connection_manager=ContextConnectionManager(),
+        prompt_preprocessing=prompt_preprocessing,
+    ))
+    orchestrator.context_connection_manager.get_context(str(uuid.uuid4()))
+    return orchestrator
+
+def after_connection():
+    """The shared orchestrator and a context in the shared store."""
+    orchestrator = get_ai_orchestrator()
+    context_store.get_context(str(uuid.uuid4()))
+    return orchestrator
+
+def measure(setup, connections: int):
+    """Setup latency, then (in a second pass, as tracing slows parsing down) memory held per connection."""
+    setup()  # warm-up: imports, and the shared registry for the after case
+    held, setup_ms = [], []
+    for _ in range(connections):
+        started = time.perf_counter()
+        held.append(setup())
+        setup_ms.append((time.perf_counter() - started) * 1000)
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    held.extend(setup() for _ in range(connections))
+    gc.collect()
+    held_bytes = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    return setup_ms, held_bytes / connections
+
+# ============================================================================
+# MAIN
+# ============================================================================
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--connections", type=int, default=200)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    init_ai_registry()
+    init_ms = (time.perf_counter() - started) * 1000
+
+    rows = []
+    for label, setup in (("before (orchestrator per connection)", before_connection),
+                         ("after (shared registry)", after_connection)):
+        setup_ms, bytes_per_connection = measure(setup, args.connections)
+        rows.append((label, common.summarize(setup_ms), f"{bytes_per_connection / 1024:.1f} KiB"))
+
+    print(f"{args.connections} connections held open; registry init at startup: {init_ms:.0f}ms\n")
+    common.print_table(("connection setup", "latency", "memory per connection"), rows)
+
+if __name__ == "__main__":
+    common.run(main)
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+user-005: one batch priority request for a dashboard instead of one per widget.
+
+PlanToday used to ask for the priority of each mission separately. Measured
+for the same widgets and date:
+- before: one widget lookup and one 60-day daily widget range query per
+  widget, counted in Python (the per-widget algorithm this change replaced),
+  and one GET /{widget_id}/priority request per widget (that endpoint now
+  runs the batch code for one id, so this isolates the request overhead)
+- after:  WidgetPriorityService.get_priorities_for_date, and one
+  GET /priorities?ids=... request
+
+The service results are checked to match before timing.
+
+    python benchmarks/bench_batch_priorities.py [--widgets 40] [--days 90] [--repeat 20]
+"""
+
+# ============================================================================
+# IMPORTS
+# ============================================================================
+import common  # noqa: F401  (must come first: sets DATABASE_URL)
+
+import time
+import argparse
+from datetime import timedelta
+
+import httpx
+from sqlalchemy import select, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.engine import engine, read_engine
+from main import app, API_PREFIX_DASHBOARD_WIDGETS
+from models.daily_widget import DailyWidget
+from models.dashboard_widget_details import DashboardWidgetDetails
+from services.widget_priority_service import (
+    WINDOW_DAYS, PRIORITY_MEDIUM, WidgetPriorityService, _priority_from_counts,
+)
+
+# ============================================================================
+# BEFORE
+# ============================================================================
+def is_completed(activity_data) -> bool:
+    if not isinstance(activity_data, dict):
+        return False
+    if activity_data.get("status") == "completed":
+        return True
+    return any(
+        isinstance(activity_data.get(key), dict) and activity_data[key].get("status") == "completed"
+        for key in ("todo_activity", "tracker_activity", "alarm_activity", "websearch_activity")
+    )
+
+async def priority_per_widget(db, widget_id, target_date):
+    """The replaced get_priority_for_date: its own two queries for one widget."""
+    widget = (await db.execute(
+        select(DashboardWidgetDetails).where(DashboardWidgetDetails.id == widget_id)
+    )).scalars().first()
+    if widget is None:
+        return {"priority": PRIORITY_MEDIUM, "reason": "Widget not found."}
+    rows = (await db.execute(
+        select(DailyWidget).where(
+            and_(
+                DailyWidget.widget_id == widget_id,
+                DailyWidget.date >= target_date - timedelta(days=max(WINDOW_DAYS)),
+                DailyWidget.date <= target_date,
+                DailyWidget.delete_flag == False,
+            )
+        ).order_by(DailyWidget.date.asc())
+    )).scalars().all()
+    counts = {
+        window: sum(
+            1 for row in rows
+            if target_date - timedelta(days=window) <= row.date and is_completed(row.activity_data)
+        )
+        for window in WINDOW_DAYS
+    }
+    return _priority_from_counts(counts, widget.frequency_details)
+
+# ============================================================================
+# MAIN
+# ============================================================================
+async def timed(repeat: int, call):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await call()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--widgets", type=int, default=40)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    await common.create_schema(engine)
+    widget_ids = await common.seed(engine, args.widgets, args.days)
+    target = common.TODAY
+
+    async def before_service():
+        async with AsyncSession(read_engine) as db:
+            return {wid: await priority_per_widget(db, wid, target) for wid in widget_ids}
+
+    async def after_service():
+        async with AsyncSession(read_engine) as db:
+            return await WidgetPriorityService(db).get_priorities_for_date(widget_ids, target)
+
+    before, after = await before_service(), await after_service()
+    mismatched = [wid for wid in widget_ids if before[wid] != after[wid]]
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def before_http():
+            for wid in widget_ids:
+                (await client.get(f"{API_PREFIX_DASHBOARD_WIDGETS}/{wid}/priority", params={"date": target.isoformat()})).raise_for_status()
+
+        async def after_http():
+            (await client.get(
+                f"{API_PREFIX_DASHBOARD_WIDGETS}/priorities",
+                params={"date": target.isoformat(), "ids": ",".join(widget_ids)},
+            )).raise_for_status()
+
+        rows = [
+            ("before: per-widget queries", common.summarize(await timed(args.repeat, before_service))),
+            ("after: get_priorities_for_date", common.summarize(await timed(args.repeat, after_service))),
+            (f"before: {len(widget_ids)} x GET /{{id}}/priority", common.summarize(await timed(args.repeat, before_http))),
+            ("after: 1 x GET /priorities", common.summarize(await timed(args.repeat, after_http))),
+        ]
+
+    print(f"{args.widgets} widgets x {args.days} days, priorities for {target}")
+    print(f"results matching: {len(widget_ids) - len(mismatched)}/{len(widget_ids)}\n")
+    common.print_table(("path", "latency per dashboard"), rows)
+
+    await read_engine.dispose()
+    await engine.dispose()
+
+if __name__ == "__main__":
+    common.run(main)
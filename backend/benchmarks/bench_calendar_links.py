@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+user-004: calendar links as indexed generated columns.
+
+A yearly calendar render asks for the daily widgets of the widgets linked to
+one calendar over a date range. Measured on the same data:
+- before: the link filtered with json_extract(widget_config, '$.selected_yearly_calendar'),
+  parsed for every joined row (the filter this change replaced)
+- after:  the filter on the generated selected_yearly_calendar column, as
+  DailyWidgetService.get_widgets_for_calendar_period builds it
+
+Reported: query latency of both statements, the service call, and the
+EXPLAIN QUERY PLAN of each statement.
+
+    python benchmarks/bench_calendar_links.py [--widgets 4000] [--calendars 200] [--days 60] [--repeat 30]
+"""
+
+# ============================================================================
+# IMPORTS
+# ============================================================================
+import common  # noqa: F401  (must come first: sets DATABASE_URL)
+
+import io
+import time
+import argparse
+import contextlib
+from datetime import timedelta
+
+from sqlalchemy import select, and_, func, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.engine import engine, read_engine
+from models.daily_widget import DailyWidget
+from models.dashboard_widget_details import DashboardWidgetDetails
+from services.daily_widget_service import DailyWidgetService
+
+# ============================================================================
+# STATEMENTS
+# ============================================================================
+def period_query(link_filter, start, end):
+    return select(DailyWidget, DashboardWidgetDetails).join(
+        DashboardWidgetDetails, DailyWidget.widget_id == DashboardWidgetDetails.id
+    ).where(
+        and_(
+            DailyWidget.date >= start,
+            DailyWidget.date <= end,
+            DailyWidget.is_active == True,
+            DailyWidget.delete_flag == False,
+            DashboardWidgetDetails.delete_flag == False,
+            link_filter,
+        )
+    ).order_by(DailyWidget.date.asc(), DailyWidget.priority.desc())
+
+def before_filter(calendar_id):
+    return func.json_extract(DashboardWidgetDetails.widget_config, "$.selected_yearly_calendar") == calendar_id
+
+def after_filter(calendar_id):
+    return DashboardWidgetDetails.selected_yearly_calendar == calendar_id
+
+async def time_statement(stmt, repeat: int):
+    samples, rows = [], 0
+    for _ in range(repeat):
+        async with AsyncSession(read_engine) as db:
+            started = time.perf_counter()
+            rows = len((await db.execute(stmt)).all())
+            samples.append((time.perf_counter() - started) * 1000)
+    return samples, rows
+
+async def query_plan(stmt) -> str:
+    compiled = stmt.compile(engine, compile_kwargs={"literal_binds": True})
+    async with read_engine.connect() as conn:
+        plan = (await conn.execute(text(f"EXPLAIN QUERY PLAN {compiled}"))).all()
+    return "\n".join(f"  {row[-1]}" for row in plan)
+
+# ============================================================================
+# MAIN
+# ============================================================================
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--widgets", type=int, default=4000)
+    parser.add_argument("--calendars", type=int, default=200)
+    parser.add_argument("--days", type=int, default=60)
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args()
+
+    await common.create_schema(engine)
+    await common.seed(engine, args.widgets, args.days, calendars=args.calendars)
+    async with engine.begin() as conn:
+        await conn.execute(text("ANALYZE"))
+
+    calendar_id = "calendar-1"
+    start, end = common.TODAY - timedelta(days=364), common.TODAY
+    statements = {
+        "before (json_extract filter)": period_query(before_filter(calendar_id), start, end),
+        "after (generated link column)": period_query(after_filter(calendar_id), start, end),
+    }
+
+    rows = []
+    for label, stmt in statements.items():
+        samples, count = await time_statement(stmt, args.repeat)
+        rows.append((label, common.summarize(samples), count))
+
+    service_ms = []
+    for _ in range(args.repeat):
+        async with AsyncSession(read_engine) as db:
+            started = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                await DailyWidgetService(db).get_widgets_for_calendar_period(calendar_id, start, end, "yearly")
+            service_ms.append((time.perf_counter() - started) * 1000)
+    rows.append(("after, get_widgets_for_calendar_period", common.summarize(service_ms), ""))
+
+    print(
+        f"{args.widgets} widgets over {args.calendars} calendars x {args.days} days, "
+        f"yearly range of {calendar_id}\n"
+    )
+    common.print_table(("query", "latency", "rows"), rows)
+    for label, stmt in statements.items():
+        print(f"\n{label}:\n{await query_plan(stmt)}")
+
+    await read_engine.dispose()
+    await engine.dispose()
+
+if __name__ == "__main__":
+    common.run(main)
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+user-011: async LLM calls on one shared pooled AsyncOpenAI client.
+
+A fake OpenAI server answers chat completions after a fixed latency. Chats
+call the LLM concurrently while a probe, standing in for /health, wakes up
+every 50ms and records how late it was (event loop lag). Measured:
+- before: call_openai as it was, the synchronous OpenAI client (one per
+  LLMClient) called from the event loop
+- after:  LLMClient.call_openai (shared AsyncOpenAI client, capped at
+  OPENAI_MAX_CONCURRENCY calls in flight)
+
+Reported: probe lag, time from sending to answer of each chat, and the time
+until every chat is answered.
+
+    python benchmarks/bench_llm_client.py [--chats 50] [--latency 1.0]
+"""
+
+# ============================================================================
+# IMPORTS
+# ============================================================================
+import common  # noqa: F401  (must come first: sets DATABASE_URL)
+
+import os
+import json
+import time
+import asyncio
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from openai import OpenAI
+
+# ============================================================================
+# FAKE OPENAI SERVER
+# ============================================================================
+def start_fake_openai(latency: float) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            time.sleep(latency)
+            body = json.dumps({
+                "id": "chatcmpl-bench", "object": "chat.completion", "created": int(time.time()),
+                "model": "gpt-3.5-turbo",
+                "choices": [{
+                    "index": 0, "finish_reason": "stop",
+                    "message": {"role": "assistant", "content": '{"intent": "greeting", "ai_response": "Hi"}'},
+                }],
+            }).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+# ============================================================================
+# BEFORE
+# ============================================================================
+class BlockingLLMClient:
+    """The replaced call_openai: a synchronous client called inside a coroutine."""
+
+    def __init__(self):
+        self.client = OpenAI(api_key=os.environ["OPENAI_API_KEY"], base_url=os.environ["OPENAI_BASE_URL"])
+
+    async def call_openai(self, messages: list):
+        response = self.client.chat.completions.create(model="gpt-3.5-turbo", messages=messages)
+        return response.choices[0].message.content
+
+# ============================================================================
+# WORKLOAD
+# ============================================================================
+async def workload(make_client, chats: int):
+    probe_lag_ms, chat_ms = [], []
+    done = asyncio.Event()
+
+    async def probe():
+        while not done.is_set():
+            started = time.perf_counter()
+            await asyncio.sleep(0.05)
+            probe_lag_ms.append((time.perf_counter() - started - 0.05) * 1000)
+
+    async def chat(i: int):
+        reply = await make_client().call_openai([{"role": "user", "content": f"hello {i}"}])
+        assert reply
+        chat_ms.append((time.perf_counter() - started) * 1000)  # all chats are sent at once
+
+    probe_task = asyncio.create_task(probe())
+    await asyncio.sleep(0.2)
+    started = time.perf_counter()
+    await asyncio.gather(*(chat(i) for i in range(chats)))
+    total_s = time.perf_counter() - started
+    done.set()
+    await probe_task
+    return probe_lag_ms, chat_ms, total_s
+
+# ============================================================================
+# MAIN
+# ============================================================================
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chats", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=1.0)
+    args = parser.parse_args()
+
+    server = start_fake_openai(args.latency)
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    from ai_engine.models.llm_client import LLMClient, MAX_CONCURRENT_CALLS, close_llm_client
+
+    rows = []
+    for label, make_client in (
+        ("before (sync OpenAI client)", BlockingLLMClient),
+        ("after (shared AsyncOpenAI)", LLMClient),
+    ):
+        probe_lag_ms, chat_ms, total_s = await workload(make_client, args.chats)
+        rows.append((label, common.summarize(probe_lag_ms), common.summarize(chat_ms), f"{total_s:.1f}s"))
+
+    print(
+        f"{args.chats} concurrent chats, fake OpenAI latency {args.latency:.1f}s, "
+        f"OPENAI_MAX_CONCURRENCY={MAX_CONCURRENT_CALLS}, probe every 50ms\n"
+    )
+    common.print_table(("client", "probe lag", "chat answered after", "all chats"), rows)
+
+    await close_llm_client()
+    server.shutdown()
+
+if __name__ == "__main__":
+    common.run(main)
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+user-006: priority history from completion bitmaps with prefix sums.
+
+A priority history chart needs the priority of every widget on every day of
+a range. Measured on the same data:
+- before: the per-widget-day algorithm (a widget lookup and a 60-day daily
+  widget range query for each widget and day), timed on a random sample of
+  widget-days and extrapolated to the whole range
+- after:  WidgetPriorityService.get_priority_history for every widget and
+  day of the range
+
+The sampled widget-days are checked against the history.
+
+    python benchmarks/bench_priority_history.py [--widgets 1000] [--range-days 730] [--sample 200]
+"""
+
+# ============================================================================
+# IMPORTS
+# ============================================================================
+import common  # noqa: F401  (must come first: sets DATABASE_URL)
+
+import time
+import random
+import argparse
+from datetime import timedelta
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from bench_batch_priorities import priority_per_widget
+from db.engine import engine, read_engine
+from services.widget_priority_service import WINDOW_DAYS, WidgetPriorityService
+
+# ============================================================================
+# MAIN
+# ============================================================================
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--widgets", type=int, default=1000)
+    parser.add_argument("--range-days", type=int, default=730)
+    parser.add_argument("--sample", type=int, default=200)
+    args = parser.parse_args()
+
+    await common.create_schema(engine)
+    widget_ids = await common.seed(engine, args.widgets, args.range_days + max(WINDOW_DAYS))
+    end = common.TODAY
+    start = end - timedelta(days=args.range_days - 1)
+    widget_days = args.widgets * args.range_days
+
+    started = time.perf_counter()
+    async with AsyncSession(read_engine) as db:
+        history = await WidgetPriorityService(db).get_priority_history(widget_ids, start, end)
+    after_s = time.perf_counter() - started
+
+    rng = random.Random(11)
+    sample = [(rng.choice(widget_ids), rng.randrange(args.range_days)) for _ in range(args.sample)]
+    before_ms, matching = [], 0
+    async with AsyncSession(read_engine) as db:
+        for widget_id, offset in sample:
+            started = time.perf_counter()
+            result = await priority_per_widget(db, widget_id, start + timedelta(days=offset))
+            before_ms.append((time.perf_counter() - started) * 1000)
+            day = history[widget_id][offset]
+            matching += result == {"priority": day["priority"], "reason": day["reason"]}
+    before_s = sum(before_ms) / len(before_ms) * widget_days / 1000
+
+    print(f"{args.widgets} widgets x {args.range_days} days = {widget_days} widget-days")
+    print(f"sampled widget-days matching: {matching}/{len(sample)}\n")
+    common.print_table(("path", "whole range", "per widget-day"), [
+        ("before: per widget-day queries (extrapolated)", f"{before_s:.1f}s", common.summarize(before_ms)),
+        ("after: get_priority_history", f"{after_s:.2f}s", f"{after_s * 1e6 / widget_days:.2f}us"),
+    ])
+
+    await read_engine.dispose()
+    await engine.dispose()
+
+if __name__ == "__main__":
+    common.run(main)
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+user-001: SQLite in WAL mode with a reader pool and one writer connection.
+
+Readers scan a week of daily widgets in a loop while a writer updates one
+daily widget and commits every few milliseconds, as the dashboard does
+while a calendar renders. Measured on two copies of the same data:
+- before: one StaticPool connection shared by every session, default
+  rollback journal (the engine this change replaced)
+- after:  db.engine as configured (WAL, query_only reader pool, single writer)
+
+Reported: writer commit latency, reads completed, and failed operations.
+
+    python benchmarks/bench_sqlite_wal.py [--widgets 1000] [--days 60] [--readers 8] [--seconds 3]
+"""
+
+# ============================================================================
+# IMPORTS
+# ============================================================================
+import common  # noqa: F401  (must come first: sets DATABASE_URL)
+
+import os
+import time
+import asyncio
+import argparse
+from datetime import timedelta
+
+from sqlalchemy import select, update, and_
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from db.engine import engine, read_engine
+from models.daily_widget import DailyWidget
+from models.dashboard_widget_details import DashboardWidgetDetails
+
+# ============================================================================
+# WORKLOAD
+# ============================================================================
+WEEK_QUERY = select(DailyWidget.id, DailyWidget.activity_data, DashboardWidgetDetails.title).join(
+    DashboardWidgetDetails, DashboardWidgetDetails.id == DailyWidget.widget_id
+).where(
+    and_(
+        DailyWidget.date >= common.TODAY - timedelta(days=6),
+        DailyWidget.is_active == True,
+        DailyWidget.delete_flag == False,
+    )
+)
+
+async def workload(writer_engine, reader_engine, widget_ids, readers: int, seconds: float):
+    deadline = time.perf_counter() + seconds
+    write_ms, reads, errors = [], [0], [0]
+
+    async def reader():
+        while time.perf_counter() < deadline:
+            try:
+                async with AsyncSession(reader_engine) as db:
+                    (await db.execute(WEEK_QUERY)).all()
+                reads[0] += 1
+            except Exception:
+                errors[0] += 1
+            await asyncio.sleep(0)
+
+    async def writer():
+        i = 0
+        while time.perf_counter() < deadline:
+            widget_id = widget_ids[i % len(widget_ids)]
+            started = time.perf_counter()
+            try:
+                async with AsyncSession(writer_engine) as db:
+                    await db.execute(
+                        update(DailyWidget)
+                        .where(and_(DailyWidget.widget_id == widget_id, DailyWidget.date == common.TODAY))
+                        .values(activity_data={"status": "completed", "write": i})
+                    )
+                    await db.commit()
+                write_ms.append((time.perf_counter() - started) * 1000)
+            except Exception:
+                errors[0] += 1
+            i += 1
+            await asyncio.sleep(0.005)
+
+    await asyncio.gather(writer(), *(reader() for _ in range(readers)))
+    return write_ms, reads[0], errors[0]
+
+# ============================================================================
+# MAIN
+# ============================================================================
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--widgets", type=int, default=1000)
+    parser.add_argument("--days", type=int, default=60)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    args = parser.parse_args()
+
+    before_engine = create_async_engine(
+        f"sqlite+aiosqlite:///{os.path.join(common.WORK_DIR, 'before.db')}",
+        poolclass=StaticPool,
+        connect_args={"check_same_thread": False},
+    )
+    setups = {
+        "before (StaticPool, rollback journal)": (before_engine, before_engine),
+        "after (WAL, reader pool + writer)": (engine, read_engine),
+    }
+
+    rows = []
+    for label, (writer_engine, reader_engine) in setups.items():
+        await common.create_schema(writer_engine)
+        widget_ids = await common.seed(writer_engine, args.widgets, args.days)
+        write_ms, reads, errors = await workload(writer_engine, reader_engine, widget_ids, args.readers, args.seconds)
+        rows.append((label, common.summarize(write_ms), f"{reads / args.seconds:.1f}/s", errors))
+
+    print(f"{args.widgets} widgets x {args.days} days, {args.readers} readers, {args.seconds:.0f}s each\n")
+    common.print_table(("engine", "writer commit", "week reads", "errors"), rows)
+
+    await before_engine.dispose()
+    await read_engine.dispose()
+    await engine.dispose()
+
+if __name__ == "__main__":
+    common.run(main)
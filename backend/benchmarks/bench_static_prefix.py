@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+user-014: the static prompt prefix compiled once per process.
+
+Every turn the orchestrator sends the prompt as system messages followed by
+the per-turn user message. Measured over the same turns:
+- before: the static part (system prompt, intent table, examples) rebuilt
+  every turn and sent inside the user message, ahead of the dynamic blocks
+- after:  compile_prompt_string for the dynamic blocks only; the static
+  prefix is the cached StaticPromptPrefix, sent as its own system message
+
+Reported: per-turn compile time, per-turn user message size, and the tokens
+in the leading messages that were byte-identical on every turn. That counts
+whole messages only; a provider whose prompt cache matches token prefixes
+across message boundaries could also reuse the static head of the old user
+message.
+
+    python benchmarks/bench_static_prefix.py [--turns 300] [--widgets 20]
+"""
+
+# ============================================================================
+# IMPORTS
+# ============================================================================
+import common  # noqa: F401  (must come first: sets DATABASE_URL)
+
+import time
+import argparse
+import statistics
+
+from ai_engine.models.tokenizer import count_tokens
+from db.engine import engine, read_engine
+from services.ai_prompt_preprocessing import AIPromptPreprocessing
+from services.conversation_context import ConversationContext
+
+# ============================================================================
+# TURNS
+# ============================================================================
+SYSTEM_MESSAGE = "You are a conversational task management AI."  # stands in for the orchestrator's fixed first message
+
+def make_context(turn: int) -> ConversationContext:
+    context = ConversationContext(f"bench-{turn}", f"session-{turn}")
+    context.user_id = common.USER_ID
+    context.user_chats = [{"role": "user", "msg": f"Add a task to read for 20 minutes every day ({turn})"}]
+    return context
+
+async def before_turn(preprocessing: AIPromptPreprocessing, turn: int):
+    """Static part rebuilt and sent in the user message, ahead of the dynamic blocks."""
+    static = preprocessing.compile_static_prefix().text
+    message = f"{static}\n\n{await preprocessing.compile_prompt_string(make_context(turn))}"
+    return [SYSTEM_MESSAGE], message
+
+async def after_turn(preprocessing: AIPromptPreprocessing, turn: int):
+    """The cached static prefix as a system message; the user message has the dynamic blocks."""
+    message = await preprocessing.compile_prompt_string(make_context(turn))
+    return [SYSTEM_MESSAGE, preprocessing.static_prefix.text], message
+
+# ============================================================================
+# MAIN
+# ============================================================================
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=300)
+    parser.add_argument("--widgets", type=int, default=20)
+    args = parser.parse_args()
+
+    await common.create_schema(engine)
+    await common.seed(engine, args.widgets, 7)
+    preprocessing = AIPromptPreprocessing()
+    preprocessing.static_prefix  # warmed at startup by the app lifespan
+
+    rows = []
+    for label, turn_fn in (
+        ("before (static part per turn)", before_turn),
+        ("after (cached static prefix)", after_turn),
+    ):
+        await turn_fn(preprocessing, -1)  # warm up caches and the read pool
+        compile_ms, message_chars, message_tokens, leading = [], [], [], None
+        for turn in range(args.turns):
+            started = time.perf_counter()
+            system_messages, message = await turn_fn(preprocessing, turn)
+            compile_ms.append((time.perf_counter() - started) * 1000)
+            message_chars.append(len(message))
+            message_tokens.append(count_tokens(message))
+            if leading is None:
+                leading = system_messages
+            # Leading messages equal to this turn's, up to the first that differs
+            stable = next((i for i, (a, b) in enumerate(zip(leading, system_messages)) if a != b), len(leading))
+            leading = leading[:stable]
+        rows.append((
+            label,
+            f"{statistics.median(compile_ms) * 1000:.0f}us",
+            f"{statistics.median(message_chars):.0f} chars / {statistics.median(message_tokens):.0f} tokens",
+            sum(count_tokens(text) for text in leading),
+        ))
+
+    prefix = preprocessing.static_prefix.text
+    print(f"{args.turns} turns, {args.widgets} widgets, one-message conversation")
+    print(f"static prefix: {len(prefix)} chars / {count_tokens(prefix)} tokens\n")
+    common.print_table(("prompt", "compile median", "user message median", "identical leading tokens"), rows)
+
+    await read_engine.dispose()
+    await engine.dispose()
+
+if __name__ == "__main__":
+    common.run(main)
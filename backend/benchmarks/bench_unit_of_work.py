@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+user-019: a unit of work per chat turn instead of a connection-lifetime session.
+
+Concurrent chats each make one tool lookup and then sit through the user's
+think-time; halfway through it the dashboard writes one daily widget.
+Measured on SQLite with the single writer connection:
+- before: each chat keeps one session open from its first lookup until it
+  disconnects (the orchestrator's old db_session)
+- after:  each chat runs the lookup in a UnitOfWork step session
+
+Reported: writer checkouts, connections held through think-time, chats that
+failed (pool timeout), and the latency of the dashboard write.
+
+    DATABASE_POOL_TIMEOUT=5 python benchmarks/bench_unit_of_work.py [--chats 100] [--think 12]
+"""
+
+# ============================================================================
+# IMPORTS
+# ============================================================================
+import common  # noqa: F401  (must come first: sets DATABASE_URL)
+
+import os
+import time
+import asyncio
+import argparse
+
+os.environ.setdefault("DATABASE_POOL_TIMEOUT", "5")  # before db.engine is built
+
+from sqlalchemy import select, update, and_  # noqa: E402
+
+from db.engine import engine, read_engine, POOL_TIMEOUT_SECONDS  # noqa: E402
+from db.session import AsyncSessionLocal  # noqa: E402
+from db.unit_of_work import UnitOfWork, pool_metrics  # noqa: E402
+from models.daily_widget import DailyWidget  # noqa: E402
+from models.dashboard_widget_details import DashboardWidgetDetails  # noqa: E402
+
+# ============================================================================
+# WORKLOAD
+# ============================================================================
+def lookup(title: str):
+    return select(DashboardWidgetDetails.id).where(
+        and_(DashboardWidgetDetails.user_id == common.USER_ID, DashboardWidgetDetails.title == title)
+    ).limit(1)
+
+async def before_chat(i: int, think: float):
+    """The connection-lifetime session: opened by the first lookup, closed on disconnect."""
+    db = AsyncSessionLocal()
+    try:
+        (await db.execute(lookup(f"Task {i}"))).scalar()
+        await asyncio.sleep(think)
+    finally:
+        await db.close()
+
+async def after_chat(i: int, think: float):
+    """The lookup in a step session of the turn's unit of work."""
+    async with UnitOfWork(f"chat-{i}") as uow:
+        async with uow.session() as db:
+            (await db.execute(lookup(f"Task {i}"))).scalar()
+        await asyncio.sleep(think)
+
+async def dashboard_write(widget_id: str) -> float:
+    started = time.perf_counter()
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            update(DailyWidget)
+            .where(and_(DailyWidget.widget_id == widget_id, DailyWidget.date == common.TODAY))
+            .values(activity_data={"status": "completed"})
+        )
+        await db.commit()
+    return (time.perf_counter() - started) * 1000
+
+async def workload(chat, chats: int, think: float, widget_id: str):
+    writer = pool_metrics["writer"]
+    checkouts = writer["checkouts"]
+    tasks = [asyncio.create_task(chat(i, think)) for i in range(chats)]
+    await asyncio.sleep(think / 2)
+    held = writer["checked_out"]
+    started = time.perf_counter()
+    try:
+        write = f"{await dashboard_write(widget_id):.0f}ms"
+    except Exception as e:
+        write = f"failed after {(time.perf_counter() - started) * 1000:.0f}ms ({type(e).__name__})"
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    failed = sum(isinstance(result, Exception) for result in results)
+    return writer["checkouts"] - checkouts, held, failed, write
+
+# ============================================================================
+# MAIN
+# ============================================================================
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chats", type=int, default=100)
+    parser.add_argument("--think", type=float, default=12.0)
+    args = parser.parse_args()
+
+    await common.create_schema(engine)
+    widget_ids = await common.seed(engine, args.chats, 1)
+
+    rows = []
+    for label, chat in (("before (connection-lifetime session)", before_chat), ("after (unit of work)", after_chat)):
+        checkouts, held, failed, write = await workload(chat, args.chats, args.think, widget_ids[0])
+        rows.append((label, checkouts, held, f"{failed}/{args.chats}", write))
+
+    print(
+        f"{args.chats} concurrent chats, one lookup each, {args.think:.0f}s think-time, "
+        f"writer pool of 1, DATABASE_POOL_TIMEOUT={POOL_TIMEOUT_SECONDS}\n"
+    )
+    common.print_table(
+        ("chat sessions", "writer checkouts", "held in think-time", "chats failed", "dashboard write"), rows
+    )
+
+    await read_engine.dispose()
+    await engine.dispose()
+
+if __name__ == "__main__":
+    common.run(main)
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+user-025: websocket subprotocols with context deltas.
+
+Replays the same conversation and encodes the frames of every turn
+(thinking steps, streamed ai_response deltas, the "response" thinking step
+and the response frame) with WireCodec for each protocol:
+- json:    the original protocol (no subprotocol), full context every time
+- json.v1: brainboard.json.v1, JSON text frames with context deltas
+- msgpack: brainboard.msgpack.v1, binary frames with context deltas
+
+Deflate is simulated as permessage-deflate with context takeover and a 32 KB
+window (uvicorn's default): one raw-deflate stream per connection, each frame
+sync-flushed and its 4-byte tail dropped. The rolling summary is not run, so
+the history grows until CONTEXT_MAX_CHATS.
+
+Reported: bytes of the last turn and of the whole session, raw and deflated.
+
+    python benchmarks/bench_ws_protocol.py [--turns 5,50,200]
+"""
+
+# ============================================================================
+# IMPORTS
+# ============================================================================
+import common  # noqa: F401  (must come first: sets DATABASE_URL)
+
+import zlib
+import random
+import argparse
+
+from services.ai_registry import get_ai_config
+from services.context_service import ContextService
+from services.conversation_context import ConversationContext
+from services.ws_protocol import SUBPROTOCOL_JSON, SUBPROTOCOL_MSGPACK, WireCodec
+
+# ============================================================================
+# CONVERSATION
+# ============================================================================
+PROTOCOLS = (("json", None), ("json.v1", SUBPROTOCOL_JSON), ("msgpack", SUBPROTOCOL_MSGPACK))
+THINKING_STEPS = (
+    ("getting_context", "Getting conversation context..."),
+    ("updating_conversation", "Updating conversation history..."),
+    ("processing_input", "Processing your message..."),
+    ("running_ai", "Generating AI response..."),
+    ("validating_response", "Validating AI response..."),
+    ("updating_context", "Updating conversation context..."),
+)
+WORDS = "task habit run read water plan week day goal focus track done later morning evening minutes".split()
+TIMESTAMP = "2026-01-01T00:00:00.000000"
+
+def sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+def turn_frames(context: ConversationContext, context_service: ContextService, rng: random.Random, turn: int):
+    """Advance the conversation by one turn; the messages the client is sent for it."""
+    context.user_chats.append({"role": "user", "msg": sentence(rng, rng.randint(6, 20))})
+    frames = [{"type": "thinking", "step": step, "details": details, "timestamp": TIMESTAMP}
+              for step, details in THINKING_STEPS]
+    reply = sentence(rng, rng.randint(20, 60))
+    frames += [
+        {"type": "delta", "field": "ai_response", "content": reply[i:i + 24], "timestamp": TIMESTAMP}
+        for i in range(0, len(reply), 24)
+    ]
+    context.user_chats.append({"role": "assistant", "msg": reply})
+    context.current_intent = "adding" if turn % 3 else "discussing"
+    context.collected_variables = {**context.collected_variables, f"variable_{turn % 6}": sentence(rng, 3)}
+    context.last_updated = f"2026-01-01T00:00:{turn % 60:02d}"
+    response = {
+        "success": True,
+        "ai_response": {"intent": context.current_intent, "ai_response": reply},
+        "context": context_service.get_context_summary(context),
+    }
+    frames.append({"type": "thinking", "step": "response", "details": response, "timestamp": TIMESTAMP})
+    frames.append({"type": "response", "content": response, "timestamp": TIMESTAMP})
+    return frames
+
+def deflate(compressor, data) -> int:
+    """Size of one permessage-deflate frame payload (context takeover)."""
+    payload = data.encode("utf-8") if isinstance(data, str) else data
+    return len(compressor.compress(payload) + compressor.flush(zlib.Z_SYNC_FLUSH)) - 4
+
+def session(subprotocol, turns: int, context_service: ContextService):
+    codec = WireCodec(subprotocol)
+    compressor = zlib.compressobj(wbits=-15)
+    context, rng = ConversationContext("bench", "session"), random.Random(3)
+    totals, last = [0, 0], [0, 0]
+    for turn in range(turns):
+        last = [0, 0]
+        for message in turn_frames(context, context_service, rng, turn):
+            data = codec.encode(message)
+            raw = len(data.encode("utf-8") if isinstance(data, str) else data)
+            last[0] += raw
+            last[1] += deflate(compressor, data)
+        totals = [totals[0] + last[0], totals[1] + last[1]]
+    return last, totals
+
+# ============================================================================
+# MAIN
+# ============================================================================
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", default="5,50,200")
+    args = parser.parse_args()
+
+    context_service = ContextService(get_ai_config())
+    rows = []
+    for name, subprotocol in PROTOCOLS:
+        for turns in (int(value) for value in args.turns.split(",")):
+            last, totals = session(subprotocol, turns, context_service)
+            rows.append((name, turns, f"{last[0]:,} / {last[1]:,}", f"{totals[0]:,} / {totals[1]:,}"))
+
+    print("bytes sent per protocol (raw / deflate)\n")
+    common.print_table(("protocol", "turns", "last turn", "session"), rows)
+
+if __name__ == "__main__":
+    common.run(main)
@@ -0,0 +1,144 @@
+"""
+Shared setup of the benchmark scripts.
+
+Importing this module points the backend at a throwaway SQLite file (unless
+DATABASE_URL is already set) and puts the backend directory on sys.path, so
+it must be imported before any backend module. Run the scripts from the
+backend directory: python benchmarks/<script>.py
+"""
+
+# ============================================================================
+# IMPORTS
+# ============================================================================
+import os
+import sys
+import random
+import asyncio
+import tempfile
+import statistics
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+WORK_DIR = tempfile.mkdtemp(prefix="brainboard-bench-")
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{os.path.join(WORK_DIR, 'brainboard.db')}")
+os.environ.setdefault("OPENAI_API_KEY", "bench-key")  # LLMClient refuses to start without one
+os.environ.setdefault("LLM_CACHE_MODE", "off")
+
+from sqlalchemy import insert  # noqa: E402
+
+import models  # noqa: E402,F401  (registers all tables on Base.metadata)
+from models.base import Base  # noqa: E402
+from models.daily_widget import DailyWidget  # noqa: E402
+from models.dashboard_widget_details import DashboardWidgetDetails  # noqa: E402
+from models.widget_completion import WidgetCompletion  # noqa: E402
+
+# ============================================================================
+# CONSTANTS
+# ============================================================================
+USER_ID = "user_001"
+TODAY = date.today()
+
+FREQUENCIES = (
+    {"frequencyPeriod": "DAILY", "frequency": 1},
+    {"frequencyPeriod": "WEEKLY", "frequency": 3},
+    {"frequencyPeriod": "MONTHLY", "frequency": 4},
+    {"frequencyPeriod": "WEEKLY", "frequency": 1, "isDailyHabit": True},
+)
+CATEGORIES = ("Health", "Job", "Productivity", "Information")
+
+# ============================================================================
+# DATABASE
+# ============================================================================
+async def create_schema(engine) -> None:
+    """Every table of the current models on engine's database."""
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+async def seed(
+    engine,
+    widgets: int,
+    days: int,
+    completion_rate: float = 0.5,
+    calendars: int = 3,
+    seed_value: int = 7,
+    user_id: str = USER_ID,
+) -> List[str]:
+    """
+    widgets todo widgets of user_id with a daily widget, and a widget_completion
+    row, for each of the last days days. Widgets are linked round-robin to
+    calendars calendars (calendar-0, calendar-1, ...). Returns the widget ids.
+    """
+    rng = random.Random(seed_value)
+    now = datetime.utcnow()
+    widget_ids: List[str] = []
+    pending = {DashboardWidgetDetails.__table__: [], DailyWidget.__table__: [], WidgetCompletion.__table__: []}
+
+    async def flush(conn, force: bool = False) -> None:
+        # Parents first, so the foreign keys hold; batches keep memory flat for long histories
+        if force or len(pending[DailyWidget.__table__]) >= 5000:
+            for table, rows in pending.items():
+                if rows:
+                    await conn.execute(insert(table), rows)
+                    rows.clear()
+
+    async with engine.begin() as conn:
+        for i in range(widgets):
+            widget_id = f"widget-{i:05d}"
+            calendar = f"calendar-{i % calendars}"
+            widget_ids.append(widget_id)
+            pending[DashboardWidgetDetails.__table__].append({
+                "id": widget_id, "user_id": user_id, "widget_type": "todo-task", "frequency": "daily",
+                "frequency_details": FREQUENCIES[i % len(FREQUENCIES)], "importance": 0.5,
+                "title": f"Task {i}", "category": CATEGORIES[i % len(CATEGORIES)],
+                "widget_config": {
+                    "selected_calendar": calendar,
+                    "selected_yearly_calendar": calendar,
+                    "selected_habit_calendar": calendar,
+                },
+                "is_permanent": False, "created_at": now, "updated_at": now, "delete_flag": False,
+            })
+            for offset in range(days):
+                day = TODAY - timedelta(days=offset)
+                completed = rng.random() < completion_rate
+                pending[DailyWidget.__table__].append({
+                    "id": f"{widget_id}-{offset}", "widget_id": widget_id, "priority": "HIGH", "date": day,
+                    "is_active": True, "activity_data": {"status": "completed" if completed else "pending"},
+                    "created_at": now, "updated_at": now, "delete_flag": False,
+                })
+                pending[WidgetCompletion.__table__].append(
+                    {"widget_id": widget_id, "date": day, "completed": completed, "updated_at": now}
+                )
+            await flush(conn)
+        await flush(conn, force=True)
+    return widget_ids
+
+# ============================================================================
+# REPORTING
+# ============================================================================
+def percentile(samples: Sequence[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+def summarize(samples_ms: Sequence[float]) -> str:
+    """median / p95 / max of millisecond samples."""
+    if not samples_ms:
+        return "no samples"
+    return (
+        f"median {statistics.median(samples_ms):.2f}ms, p95 {percentile(samples_ms, 0.95):.2f}ms, "
+        f"max {max(samples_ms):.2f}ms (n={len(samples_ms)})"
+    )
+
+def print_table(headers: Sequence[str], rows: Iterable[Sequence[Any]]) -> None:
+    rows = [[str(cell) for cell in row] for row in rows]
+    widths = [max(len(str(header)), *(len(row[i]) for row in rows)) for i, header in enumerate(headers)]
+    print("  ".join(str(header).ljust(width) for header, width in zip(headers, widths)))
+    for row in rows:
+        print("  ".join(cell.ljust(width) for cell, width in zip(row, widths)))
+
+def run(main) -> None:
+    """asyncio.run(main()) and the work directory it used."""
+    asyncio.run(main())
+    print(f"\n(work files in {WORK_DIR})")
@@ -17,7 +17,72 @@ class Settings:
     
     # Database
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite+aiosqlite:///./brainboard.db")
-    
+    DATABASE_ECHO: bool = os.getenv("DATABASE_ECHO", "False").lower() == "true"
+
+    # Pooled server database profile (postgresql+asyncpg)
+    DATABASE_POOL_SIZE: int = int(os.getenv("DATABASE_POOL_SIZE", "10"))
+    DATABASE_MAX_OVERFLOW: int = int(os.getenv("DATABASE_MAX_OVERFLOW", "20"))
+    DATABASE_POOL_TIMEOUT: int = int(os.getenv("DATABASE_POOL_TIMEOUT", "30"))
+    DATABASE_POOL_RECYCLE: int = int(os.getenv("DATABASE_POOL_RECYCLE", "1800"))
+    DATABASE_POOL_PRE_PING: bool = os.getenv("DATABASE_POOL_PRE_PING", "True").lower() == "true"
+    DATABASE_STATEMENT_CACHE_SIZE: int = int(os.getenv("DATABASE_STATEMENT_CACHE_SIZE", "100"))
+
+    # Unit-of-work sessions (db/unit_of_work.py); turn leak detection on while developing
+    DATABASE_LEAK_DETECTION: bool = os.getenv("DATABASE_LEAK_DETECTION", "False").lower() == "true"
+    DATABASE_LEAK_HOLD_SECONDS: float = float(os.getenv("DATABASE_LEAK_HOLD_SECONDS", "5"))  # longer = reported
+
+    # SQLite engine profile (WAL, reader pool + single writer)
+    SQLITE_READER_POOL_SIZE: int = int(os.getenv("SQLITE_READER_POOL_SIZE", "4"))
+    SQLITE_BUSY_TIMEOUT_MS: int = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+    SQLITE_CACHE_SIZE: int = int(os.getenv("SQLITE_CACHE_SIZE", "-16000"))  # negative = KiB
+    SQLITE_MMAP_SIZE: int = int(os.getenv("SQLITE_MMAP_SIZE", "134217728"))  # 128 MiB
+    SQLITE_SYNCHRONOUS: str = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+    SQLITE_TEMP_STORE: str = os.getenv("SQLITE_TEMP_STORE", "MEMORY")
+
+    # Daily plan materializer (pre-creates tomorrow's DailyWidget rows)
+    DAILY_PLAN_MATERIALIZER_ENABLED: bool = os.getenv("DAILY_PLAN_MATERIALIZER_ENABLED", "True").lower() == "true"
+    DAILY_PLAN_TIMEZONE: str = os.getenv("DAILY_PLAN_TIMEZONE", "")  # IANA name; empty = server local time
+    DAILY_PLAN_LEAD_MINUTES: int = int(os.getenv("DAILY_PLAN_LEAD_MINUTES", "15"))  # run this long before midnight
+    DAILY_PLAN_CATCHUP_DAYS: int = int(os.getenv("DAILY_PLAN_CATCHUP_DAYS", "7"))  # max missed days filled on startup
+
+    # HTTP caching for dashboard reads (ETag + Cache-Control)
+    PAST_RANGE_CACHE_MAX_AGE: int = int(os.getenv("PAST_RANGE_CACHE_MAX_AGE", "86400"))  # seconds
+
+    # Widget priority history (/api/v1/dashboard-widgets/priorities/history)
+    PRIORITY_HISTORY_MAX_DAYS: int = int(os.getenv("PRIORITY_HISTORY_MAX_DAYS", "90"))  # longest date range per request
+
+    # Dashboard push channel (/api/v1/dashboard/ws)
+    DASHBOARD_EVENT_QUEUE_SIZE: int = int(os.getenv("DASHBOARD_EVENT_QUEUE_SIZE", "256"))  # per subscriber; overflow = resync
+
+    # AI reference data read model (services/ai_reference_data.py)
+    AI_REFERENCE_ACTIVITY_DAYS: int = int(os.getenv("AI_REFERENCE_ACTIVITY_DAYS", "30"))  # daily widgets kept in memory
+
+    # AI prompt token budgets (per dynamic prompt section)
+    PROMPT_REFERENCE_TOKEN_BUDGET: int = int(os.getenv("PROMPT_REFERENCE_TOKEN_BUDGET", "2000"))
+    PROMPT_VARIABLES_TOKEN_BUDGET: int = int(os.getenv("PROMPT_VARIABLES_TOKEN_BUDGET", "600"))
+    PROMPT_FETCH_DATA_TOKEN_BUDGET: int = int(os.getenv("PROMPT_FETCH_DATA_TOKEN_BUDGET", "1500"))  # data fetched for variables
+    PROMPT_HISTORY_TOKEN_BUDGET: int = int(os.getenv("PROMPT_HISTORY_TOKEN_BUDGET", "1500"))  # summary + recent turns
+    PROMPT_SUMMARY_TOKEN_BUDGET: int = int(os.getenv("PROMPT_SUMMARY_TOKEN_BUDGET", "300"))  # share of the history budget
+
+    # Conversation window (recent turns verbatim, older turns folded into a summary)
+    CONVERSATION_VERBATIM_TURNS: int = int(os.getenv("CONVERSATION_VERBATIM_TURNS", "4"))  # user + AI message pairs
+    CONVERSATION_SUMMARY_ENABLED: bool = os.getenv("CONVERSATION_SUMMARY_ENABLED", "True").lower() == "true"
+
+    # Conversation context store (services/context_connection_manager.py)
+    CONTEXT_MAX_CHATS: int = int(os.getenv("CONTEXT_MAX_CHATS", "100"))  # messages kept per conversation
+    CONTEXT_IDLE_TTL_SECONDS: int = int(os.getenv("CONTEXT_IDLE_TTL_SECONDS", "1800"))  # untouched this long = evicted
+    CONTEXT_STORE_MAX_BYTES: int = int(os.getenv("CONTEXT_STORE_MAX_BYTES", str(64 * 1024 * 1024)))  # LRU beyond this
+    CONTEXT_REAPER_INTERVAL_SECONDS: int = int(os.getenv("CONTEXT_REAPER_INTERVAL_SECONDS", "60"))
+
+    # AI websocket outbound queue (services/ws_send_queue.py)
+    AI_WS_SEND_QUEUE_SIZE: int = int(os.getenv("AI_WS_SEND_QUEUE_SIZE", "256"))  # frames per connection; beyond = disconnect
+    AI_WS_SEND_TIMEOUT_SECONDS: float = float(os.getenv("AI_WS_SEND_TIMEOUT_SECONDS", "10"))  # one send blocked this long = disconnect
+    AI_WS_PER_MESSAGE_DEFLATE: bool = os.getenv("AI_WS_PER_MESSAGE_DEFLATE", "True").lower() == "true"  # accept permessage-deflate (uvicorn)
+
+    # AI chat turns (services/chat_turns.py)
+    AI_TURN_POLICY: str = os.getenv("AI_TURN_POLICY", "merge").lower()  # merge: a new message cancels the turn in flight; queue: it waits
+    AI_TURN_QUEUE_SIZE: int = int(os.getenv("AI_TURN_QUEUE_SIZE", "8"))  # messages waiting per connection (queue policy)
+
     # CORS
     CORS_ORIGINS: list = ["*"]
     CORS_CREDENTIALS: bool = True
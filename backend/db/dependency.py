@@ -8,7 +8,7 @@ Database dependency injection.
 from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from db.session import AsyncSessionLocal
+from db.session import AsyncSessionLocal, AsyncReadSessionLocal
 
 # ============================================================================
 # DEPENDENCY FUNCTIONS
@@ -16,7 +16,7 @@ from db.session import AsyncSessionLocal
 async def get_db_session_dependency() -> AsyncSession:
     """
     Get database session dependency.
-    
+
     This ensures each request gets a fresh session and proper cleanup.
     The session is automatically closed when the request completes.
     """
@@ -29,4 +29,18 @@ async def get_db_session_dependency() -> AsyncSession:
             raise
         finally:
             # Always close the session
-            await session.close() 
\ No newline at end of file
+            await session.close()
+
+async def get_db_read_session_dependency() -> AsyncSession:
+    """
+    Get read-only database session dependency.
+
+    Served from the reader pool so read endpoints never wait on the
+    single writer connection. Use only for endpoints that do not write.
+    """
+    async with AsyncReadSessionLocal() as session:
+        try:
+            yield session
+        finally:
+            # Always close the session (ends the read transaction)
+            await session.close()
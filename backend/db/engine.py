@@ -1,34 +1,123 @@
 """
 Database engine configuration.
+
+The engine is built from ``settings.DATABASE_URL``:
+
+- SQLite runs in WAL mode with two engines over the same file: a single
+  serialized writer connection (``engine``) and a pool of query-only reader
+  connections (``read_engine``). WAL lets readers proceed while the writer
+  commits, so a slow calendar scan no longer blocks dashboard writes.
+- PostgreSQL (``postgresql+asyncpg://``) uses one pooled engine for both
+  reads and writes, so several uvicorn workers can share one database.
 """
 
 # ============================================================================
 # IMPORTS
 # ============================================================================
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import AsyncAdaptedQueuePool, StaticPool
+
+from config import settings
 
 # ============================================================================
 # CONSTANTS
 # ============================================================================
-# Database URL for SQLite
-DATABASE_URL = "sqlite+aiosqlite:///./brainboard.db"
+# Database URL (sqlite+aiosqlite or postgresql+asyncpg)
+DATABASE_URL = settings.DATABASE_URL
+DATABASE_BACKEND = make_url(DATABASE_URL).get_backend_name()
+IS_SQLITE = DATABASE_BACKEND == "sqlite"
+IS_POSTGRES = DATABASE_BACKEND == "postgresql"
 
 # Engine settings
-ENGINE_ECHO = False  # Set to True for SQL query logging
+ENGINE_ECHO = settings.DATABASE_ECHO  # Set DATABASE_ECHO=true for SQL query logging
 
 # SQLite specific settings
 SQLITE_CHECK_SAME_THREAD = False
+SQLITE_IN_MEMORY = IS_SQLITE and make_url(DATABASE_URL).database in (None, "", ":memory:")
+
+# Only one writer connection exists; writers queue on the pool instead of
+# fighting over the database lock.
+WRITER_POOL_SIZE = 1
+POOL_TIMEOUT_SECONDS = settings.DATABASE_POOL_TIMEOUT
+
+# ============================================================================
+# PRAGMAS
+# ============================================================================
+def _apply_sqlite_pragmas(dbapi_connection, query_only: bool) -> None:
+    """Apply the tunable PRAGMAs to a freshly opened SQLite connection."""
+    cursor = dbapi_connection.cursor()
+    try:
+        if not query_only and not SQLITE_IN_MEMORY:
+            # journal_mode is persistent in the file; the writer sets it once.
+            cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+        cursor.execute(f"PRAGMA cache_size={int(settings.SQLITE_CACHE_SIZE)}")
+        cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+        cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA temp_store={settings.SQLITE_TEMP_STORE}")
+        if query_only:
+            cursor.execute("PRAGMA query_only=ON")
+    finally:
+        cursor.close()
 
 # ============================================================================
 # ENGINE CONFIGURATION
 # ============================================================================
-engine: AsyncEngine = create_async_engine(
-    DATABASE_URL,
-    echo=ENGINE_ECHO,
-    poolclass=StaticPool,
-    connect_args={"check_same_thread": SQLITE_CHECK_SAME_THREAD}
-)
+def _create_sqlite_engine(pool_size: int) -> AsyncEngine:
+    """Create a pooled aiosqlite engine."""
+    return create_async_engine(
+        DATABASE_URL,
+        echo=ENGINE_ECHO,
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=pool_size,
+        max_overflow=0,
+        pool_timeout=POOL_TIMEOUT_SECONDS,
+        connect_args={"check_same_thread": SQLITE_CHECK_SAME_THREAD}
+    )
+
+def _create_pooled_engine() -> AsyncEngine:
+    """Create a pooled engine for a server database (asyncpg)."""
+    connect_args = {}
+    if IS_POSTGRES:
+        connect_args["statement_cache_size"] = settings.DATABASE_STATEMENT_CACHE_SIZE
+    return create_async_engine(
+        DATABASE_URL,
+        echo=ENGINE_ECHO,
+        pool_size=settings.DATABASE_POOL_SIZE,
+        max_overflow=settings.DATABASE_MAX_OVERFLOW,
+        pool_timeout=POOL_TIMEOUT_SECONDS,
+        pool_recycle=settings.DATABASE_POOL_RECYCLE,
+        pool_pre_ping=settings.DATABASE_POOL_PRE_PING,
+        connect_args=connect_args
+    )
+
+if SQLITE_IN_MEMORY:
+    # An in-memory database only exists on its one connection
+    engine: AsyncEngine = create_async_engine(
+        DATABASE_URL,
+        echo=ENGINE_ECHO,
+        poolclass=StaticPool,
+        connect_args={"check_same_thread": SQLITE_CHECK_SAME_THREAD}
+    )
+    read_engine: AsyncEngine = engine
+elif IS_SQLITE:
+    engine: AsyncEngine = _create_sqlite_engine(WRITER_POOL_SIZE)
+    read_engine: AsyncEngine = _create_sqlite_engine(settings.SQLITE_READER_POOL_SIZE)
+else:
+    engine: AsyncEngine = _create_pooled_engine()
+    read_engine: AsyncEngine = engine
+
+if IS_SQLITE:
+    @event.listens_for(engine.sync_engine, "connect")
+    def _on_writer_connect(dbapi_connection, connection_record):
+        _apply_sqlite_pragmas(dbapi_connection, query_only=False)
+
+    if read_engine is not engine:
+        @event.listens_for(read_engine.sync_engine, "connect")
+        def _on_reader_connect(dbapi_connection, connection_record):
+            _apply_sqlite_pragmas(dbapi_connection, query_only=True)
 
 # ============================================================================
 # ENGINE FUNCTIONS
@@ -37,6 +126,12 @@ async def get_engine() -> AsyncEngine:
     """Get the database engine."""
     return engine
 
+async def get_read_engine() -> AsyncEngine:
+    """Get the read-only database engine."""
+    return read_engine
+
 async def close_engine():
-    """Close the database engine."""
-    await engine.dispose() 
\ No newline at end of file
+    """Close the database engines."""
+    if read_engine is not engine:
+        await read_engine.dispose()
+    await engine.dispose()
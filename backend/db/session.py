@@ -7,7 +7,7 @@ Database session management.
 # ============================================================================
 from sqlalchemy.ext.asyncio import async_sessionmaker, AsyncSession
 
-from db.engine import engine
+from db.engine import engine, read_engine
 
 # ============================================================================
 # CONSTANTS
@@ -24,10 +24,23 @@ AsyncSessionLocal = async_sessionmaker(
     expire_on_commit=SESSION_EXPIRE_ON_COMMIT
 )
 
+# Read-only sessions on the reader pool. Never commit through these.
+AsyncReadSessionLocal = async_sessionmaker(
+    read_engine,
+    class_=AsyncSession,
+    expire_on_commit=SESSION_EXPIRE_ON_COMMIT,
+    autoflush=False
+)
+
 # ============================================================================
 # SESSION FUNCTIONS
 # ============================================================================
 async def get_session() -> AsyncSession:
     """Get a database session."""
     async with AsyncSessionLocal() as session:
-        yield session 
\ No newline at end of file
+        yield session
+
+async def get_read_session() -> AsyncSession:
+    """Get a read-only database session."""
+    async with AsyncReadSessionLocal() as session:
+        yield session
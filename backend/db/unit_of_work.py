@@ -0,0 +1,227 @@
+"""
+Unit-of-work database sessions.
+
+A UnitOfWork spans one piece of application work, such as a chat turn, without
+holding a database connection for its whole length. Each step that needs the
+database (prompt compilation, tool execution) opens a short-lived session
+with ``async with uow.session(): ...``. The session checks out a pooled
+connection, commits (write sessions) or rolls back, and returns the
+connection as soon as the step ends. Nothing is held across LLM calls or the
+user's think-time, so the single SQLite writer connection stays free for
+dashboard writes.
+
+Pool checkouts, hold times and the time steps waited for a connection are
+counted on every engine. With DATABASE_LEAK_DETECTION on, each checkout
+also records where it was made. Connections held longer than
+DATABASE_LEAK_HOLD_SECONDS, sessions still open when their unit of work
+ends, and units of work that are never closed are reported with that stack.
+"""
+
+# ============================================================================
+# IMPORTS
+# ============================================================================
+import time
+import weakref
+import logging
+import sysconfig
+import traceback
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+
+import greenlet
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from config import settings
+from db.engine import engine, read_engine
+from db.session import AsyncSessionLocal, AsyncReadSessionLocal
+
+# ============================================================================
+# CONSTANTS
+# ============================================================================
+logger = logging.getLogger(__name__)
+
+LEAK_DETECTION = settings.DATABASE_LEAK_DETECTION
+LEAK_HOLD_SECONDS = settings.DATABASE_LEAK_HOLD_SECONDS
+
+# Application frames kept for "opened at" stacks
+STACK_LIMIT = 8
+
+# Library frames left out of those stacks
+_LIBRARY_PATHS = tuple({sysconfig.get_paths()["stdlib"], sysconfig.get_paths()["purelib"], sysconfig.get_paths()["platlib"]})
+
+# connection_record.info keys
+_CHECKOUT_AT_KEY = "uow_checkout_at"
+_CHECKOUT_STACK_KEY = "uow_checkout_stack"
+
+def _caller_stack() -> str:
+    """
+    The application frames the current database access was made from,
+    innermost last. Pool events run in SQLAlchemy's worker greenlet, so the
+    stack is taken from the coroutine that is waiting on it.
+    """
+    current = greenlet.getcurrent()
+    frame = current.parent.gr_frame if current.parent is not None else None
+    frames = [
+        entry for entry in traceback.extract_stack(frame)
+        if not entry.filename.startswith(_LIBRARY_PATHS) and entry.filename != __file__
+    ]
+    return "".join(traceback.format_list(frames[-STACK_LIMIT:]))
+
+# ============================================================================
+# POOL INSTRUMENTATION
+# ============================================================================
+pool_metrics: Dict[str, Dict[str, Any]] = {}
+
+def _instrument_pool(async_engine: AsyncEngine, name: str) -> None:
+    """Count checkouts and hold times on async_engine's pool."""
+    metrics = pool_metrics[name] = {
+        "checkouts": 0,
+        "checked_out": 0,
+        "max_checked_out": 0,
+        "hold_ms": 0.0,
+        "max_hold_ms": 0.0,
+        "long_holds": 0,
+    }
+
+    @event.listens_for(async_engine.sync_engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        metrics["checkouts"] += 1
+        metrics["checked_out"] += 1
+        metrics["max_checked_out"] = max(metrics["max_checked_out"], metrics["checked_out"])
+        connection_record.info[_CHECKOUT_AT_KEY] = time.perf_counter()
+        if LEAK_DETECTION:
+            connection_record.info[_CHECKOUT_STACK_KEY] = _caller_stack()
+
+    @event.listens_for(async_engine.sync_engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        checked_out_at = connection_record.info.pop(_CHECKOUT_AT_KEY, None)
+        stack = connection_record.info.pop(_CHECKOUT_STACK_KEY, None)
+        if checked_out_at is None:
+            return  # never checked out through this listener (e.g. invalidated on connect)
+        metrics["checked_out"] -= 1
+        held_ms = (time.perf_counter() - checked_out_at) * 1000
+        metrics["hold_ms"] += held_ms
+        metrics["max_hold_ms"] = max(metrics["max_hold_ms"], held_ms)
+        if held_ms > LEAK_HOLD_SECONDS * 1000:
+            metrics["long_holds"] += 1
+            if LEAK_DETECTION:
+                logger.warning(f"{name} connection held for {held_ms / 1000:.1f}s, checked out at:\n{stack}")
+
+_instrument_pool(engine, "writer")
+if read_engine is not engine:
+    _instrument_pool(read_engine, "reader")
+
+# ============================================================================
+# UNIT OF WORK
+# ============================================================================
+uow_metrics: Dict[str, Any] = {
+    "units": 0,
+    "open_units": 0,
+    "sessions": 0,
+    "wait_ms": 0.0,
+    "max_wait_ms": 0.0,
+    "leaked_sessions": 0,
+    "unclosed_units": 0,
+}
+
+def _report_unclosed(name: str, stack: Optional[str]) -> None:
+    """Finalizer of a UnitOfWork that was garbage collected without close()."""
+    uow_metrics["unclosed_units"] += 1
+    uow_metrics["open_units"] -= 1
+    logger.error(f"Unit of work '{name}' was never closed" + (f"; created at:\n{stack}" if stack else ""))
+
+class UnitOfWork:
+    """Short-lived pooled sessions for the steps of one piece of work."""
+
+    def __init__(self, name: str = "unit_of_work"):
+        self.name = name
+        self._open: Dict[int, Tuple[AsyncSession, Optional[str]]] = {}  # id(session) -> (session, opened-at stack)
+        self.sessions = 0
+        self.wait_ms = 0.0
+        self.closed = False
+        uow_metrics["units"] += 1
+        uow_metrics["open_units"] += 1
+        self._finalizer = weakref.finalize(self, _report_unclosed, name, _caller_stack() if LEAK_DETECTION else None)
+
+    @asynccontextmanager
+    async def session(self, read_only: bool = False) -> AsyncIterator[AsyncSession]:
+        """
+        A session for one step, holding a pooled connection only until the
+        step ends. Write sessions commit on success; any error rolls back.
+        Read-only sessions come from the reader pool and never commit.
+        """
+        if self.closed:
+            raise RuntimeError(f"Unit of work '{self.name}' is closed")
+        db = (AsyncReadSessionLocal if read_only else AsyncSessionLocal)()
+        key = id(db)
+        self._open[key] = (db, _caller_stack() if LEAK_DETECTION else None)
+        try:
+            # Check the connection out now so the pool wait is measured here
+            started = time.perf_counter()
+            await db.connection()
+            waited_ms = (time.perf_counter() - started) * 1000
+            self.sessions += 1
+            self.wait_ms += waited_ms
+            uow_metrics["sessions"] += 1
+            uow_metrics["wait_ms"] += waited_ms
+            uow_metrics["max_wait_ms"] = max(uow_metrics["max_wait_ms"], waited_ms)
+
+            yield db
+            if not read_only and db.in_transaction():
+                await db.commit()
+        except BaseException:
+            await db.rollback()
+            raise
+        finally:
+            await db.close()
+            self._open.pop(key, None)
+
+    async def close(self) -> None:
+        """End the unit of work. Sessions still open here are leaks: reported, then closed."""
+        if self.closed:
+            return
+        self.closed = True
+        self._finalizer.detach()
+        uow_metrics["open_units"] -= 1
+        for db, stack in list(self._open.values()):
+            uow_metrics["leaked_sessions"] += 1
+            logger.error(
+                f"Unit of work '{self.name}' ended with a session still open"
+                + (f", opened at:\n{stack}" if stack else " (set DATABASE_LEAK_DETECTION=true to see where)")
+            )
+            await db.close()
+        self._open.clear()
+
+    async def __aenter__(self) -> "UnitOfWork":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+# ============================================================================
+# STATS
+# ============================================================================
+def unit_of_work_stats() -> Dict[str, Any]:
+    """Pool checkout counters per engine and unit-of-work session counters."""
+    pools = {}
+    for name, metrics in pool_metrics.items():
+        checkins = metrics["checkouts"] - metrics["checked_out"]
+        pools[name] = {
+            **metrics,
+            "hold_ms": round(metrics["hold_ms"], 2),
+            "avg_hold_ms": round(metrics["hold_ms"] / checkins, 2) if checkins else 0.0,
+            "max_hold_ms": round(metrics["max_hold_ms"], 2),
+        }
+    sessions = uow_metrics["sessions"]
+    return {
+        "pools": pools,
+        "units_of_work": {
+            **uow_metrics,
+            "wait_ms": round(uow_metrics["wait_ms"], 2),
+            "avg_wait_ms": round(uow_metrics["wait_ms"] / sessions, 3) if sessions else 0.0,
+            "max_wait_ms": round(uow_metrics["max_wait_ms"], 2),
+        },
+        "leak_detection": LEAK_DETECTION,
+        "leak_hold_seconds": LEAK_HOLD_SECONDS,
+    }
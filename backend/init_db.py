@@ -9,6 +9,9 @@ from models.dashboard_widget_details import DashboardWidgetDetails
 from models.daily_widget import DailyWidget
 from models.daily_widgets_ai_output import DailyWidgetsAIOutput
 from models.websearch_summary_ai_output import WebSearchSummaryAIOutput
+from models.widget_completion import WidgetCompletion
+from models.data_version import DataVersion
+from models.daily_plan_materialization import DailyPlanMaterialization
 from db.engine import DATABASE_URL
 
 async def init_database():
@@ -32,6 +35,9 @@ async def init_database():
     print(f"   - {DailyWidget.__tablename__} (consolidated daily activities)")
     print(f"   - {DailyWidgetsAIOutput.__tablename__} (AI outputs)")
     print(f"   - {WebSearchSummaryAIOutput.__tablename__} (web search summaries)")
+    print(f"   - {WidgetCompletion.__tablename__} (per-day completion ledger)")
+    print(f"   - {DataVersion.__tablename__} (change counters for HTTP caching)")
+    print(f"   - {DailyPlanMaterialization.__tablename__} (days the daily plan was materialized)")
     print()
     print("🎉 Benefits of new schema:")
     print("   - Only 2 main tables instead of 10+")
@@ -6,6 +6,10 @@ Main FastAPI application entry point.
 # ============================================================================
 # IMPORTS
 # ============================================================================
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
@@ -15,23 +19,57 @@ from routes import dashboard_widgets, dashboard
 from routes import tracker as tracker_routes
 from routes import weather as weather_routes
 from routes import ai as ai_routes
+from db.engine import close_engine
+from ai_engine.models.llm_client import close_llm_client
+from ai_engine.models.tokenizer import tokenizer_name
+from services.ai_prompt_preprocessing import get_static_prompt_prefix
+from services.ai_registry import init_ai_registry
+from services.context_connection_manager import context_store
+from services.conversation_window import conversation_window
+from services.daily_plan_scheduler import DailyPlanScheduler
 
 # ============================================================================
 # CONSTANTS & SETTINGS
 # ============================================================================
+logger = logging.getLogger(__name__)
+
 # API settings
 API_PREFIX_DASHBOARD_WIDGETS = f"{settings.API_PREFIX}/dashboard-widgets"
 API_PREFIX_DASHBOARD = f"{settings.API_PREFIX}/dashboard"
 API_TAG_DASHBOARD_WIDGETS = "dashboard-widgets"
 API_TAG_DASHBOARD = "dashboard"
 
+# ============================================================================
+# LIFESPAN
+# ============================================================================
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start background jobs on startup; stop them and release the database and LLM pool on shutdown."""
+    try:
+        init_ai_registry()  # parse the AI config and build the shared AI services once
+    except Exception as e:
+        logger.error(f"AI registry not initialized ({e}); retrying on first AI connection")
+    get_static_prompt_prefix()  # compile the static prompt prefix once, before the first chat turn
+    await asyncio.to_thread(tokenizer_name)  # load the tokenizer (may fetch its BPE file) off the first turn
+    await context_store.start_reaper()  # evict idle conversation contexts
+    daily_plan_scheduler = DailyPlanScheduler()
+    if settings.DAILY_PLAN_MATERIALIZER_ENABLED:
+        await daily_plan_scheduler.start()
+    yield
+    await daily_plan_scheduler.stop()
+    await context_store.stop_reaper()
+    await conversation_window.close()
+    await close_llm_client()
+    await close_engine()
+
 # ============================================================================
 # FASTAPI APP
 # ============================================================================
 app = FastAPI(
     title=settings.APP_TITLE,
     description=settings.APP_DESCRIPTION,
-    version=settings.APP_VERSION
+    version=settings.APP_VERSION,
+    lifespan=lifespan
 )
 
 # ============================================================================
@@ -84,6 +122,12 @@ class DailyWidgetAdmin(ModelView, model=DailyWidget):
 
 class DashboardWidgetDetailsAdmin(ModelView, model=DashboardWidgetDetails):
     column_list = [DashboardWidgetDetails.id, DashboardWidgetDetails.title, DashboardWidgetDetails.widget_type]
+    # Generated from widget_config; the database rejects writes to them
+    form_excluded_columns = [
+        DashboardWidgetDetails.selected_calendar,
+        DashboardWidgetDetails.selected_yearly_calendar,
+        DashboardWidgetDetails.selected_habit_calendar,
+    ]
     name = "Widget Detail"
     name_plural = "Widget Details"
     icon = "fa-solid fa-circle-info"
@@ -128,4 +172,5 @@ async def root():
 # ============================================================================
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host=settings.HOST, port=settings.PORT)
\ No newline at end of file
+    # `uvicorn main:app` deflates too; --ws-per-message-deflate false turns it off
+    uvicorn.run(app, host=settings.HOST, port=settings.PORT, ws_per_message_deflate=settings.AI_WS_PER_MESSAGE_DEFLATE)
\ No newline at end of file
@@ -0,0 +1,69 @@
+"""
+Alembic environment.
+
+Runs migrations against settings.DATABASE_URL using the async driver
+(aiosqlite or asyncpg). SQLite uses batch mode so constraints can be added.
+"""
+
+# ============================================================================
+# IMPORTS
+# ============================================================================
+import asyncio
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import pool
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from config import settings
+from models.base import Base
+import models  # noqa: F401  (registers all tables on Base.metadata)
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+DATABASE_URL = config.get_main_option("sqlalchemy.url") or settings.DATABASE_URL
+IS_SQLITE = DATABASE_URL.startswith("sqlite")
+
+# ============================================================================
+# MIGRATION RUNNERS
+# ============================================================================
+def run_migrations_offline() -> None:
+    """Emit migration SQL without connecting to the database."""
+    context.configure(
+        url=DATABASE_URL,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        render_as_batch=IS_SQLITE,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+def do_run_migrations(connection: Connection) -> None:
+    """Run migrations on a live connection."""
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        render_as_batch=IS_SQLITE,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+async def run_migrations_online() -> None:
+    """Run migrations using the async engine."""
+    connectable = create_async_engine(DATABASE_URL, poolclass=pool.NullPool)
+    async with connectable.connect() as connection:
+        await connection.run_sync(do_run_migrations)
+    await connectable.dispose()
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    asyncio.run(run_migrations_online())
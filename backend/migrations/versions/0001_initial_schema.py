@@ -0,0 +1,103 @@
+"""Initial schema
+
+Creates the four FastAPI tables as they existed before migrations were
+introduced. Databases already created by init_db.py are left untouched, so
+`alembic upgrade head` works on both fresh and existing installs.
+
+Revision ID: 0001_initial_schema
+Revises:
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "0001_initial_schema"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+JSON_TYPE = sa.JSON().with_variant(postgresql.JSONB(), "postgresql")
+
+
+def _audit_columns():
+    return [
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("created_by", sa.String(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_by", sa.String(), nullable=True),
+        sa.Column("delete_flag", sa.Boolean(), nullable=True),
+    ]
+
+
+def upgrade() -> None:
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if "dashboard_widget_details" not in existing:
+        op.create_table(
+            "dashboard_widget_details",
+            sa.Column("user_id", sa.String(), nullable=False),
+            sa.Column("widget_type", sa.String(), nullable=False),
+            sa.Column("frequency", sa.String(), nullable=False),
+            sa.Column("frequency_details", JSON_TYPE, nullable=True),
+            sa.Column("importance", sa.Float(), nullable=False),
+            sa.Column("title", sa.String(), nullable=False),
+            sa.Column("description", sa.Text(), nullable=True),
+            sa.Column("category", sa.String(), nullable=True),
+            sa.Column("is_permanent", sa.Boolean(), nullable=True),
+            sa.Column("widget_config", JSON_TYPE, nullable=False),
+            *_audit_columns(),
+        )
+
+    if "daily_widgets" not in existing:
+        op.create_table(
+            "daily_widgets",
+            sa.Column("widget_id", sa.String(), nullable=False),
+            sa.Column("priority", sa.String(), nullable=False),
+            sa.Column("reasoning", sa.Text(), nullable=True),
+            sa.Column("date", sa.Date(), nullable=False),
+            sa.Column("is_active", sa.Boolean(), nullable=True),
+            sa.Column("activity_data", JSON_TYPE, nullable=False),
+            *_audit_columns(),
+        )
+
+    if "daily_widgets_ai_output" not in existing:
+        op.create_table(
+            "daily_widgets_ai_output",
+            sa.Column("widget_id", sa.String(), sa.ForeignKey("dashboard_widget_details.id"), nullable=False),
+            sa.Column("priority", sa.String(), nullable=False),
+            sa.Column("reasoning", sa.Text(), nullable=True),
+            sa.Column("result_json", sa.JSON(), nullable=True),
+            sa.Column("date", sa.Date(), nullable=False),
+            sa.Column("ai_model_used", sa.String(), nullable=True),
+            sa.Column("ai_prompt_used", sa.Text(), nullable=True),
+            sa.Column("ai_response_time", sa.String(), nullable=True),
+            sa.Column("confidence_score", sa.String(), nullable=True),
+            sa.Column("generation_type", sa.String(), nullable=False),
+            *_audit_columns(),
+        )
+
+    if "websearch_summary_ai_output" not in existing:
+        op.create_table(
+            "websearch_summary_ai_output",
+            sa.Column("widget_id", sa.String(), sa.ForeignKey("dashboard_widget_details.id"), nullable=False),
+            sa.Column("query", sa.String(), nullable=False),
+            sa.Column("result_json", sa.JSON(), nullable=True),
+            sa.Column("ai_model_used", sa.String(), nullable=True),
+            sa.Column("ai_prompt_used", sa.Text(), nullable=True),
+            sa.Column("ai_response_time", sa.String(), nullable=True),
+            sa.Column("search_results_count", sa.String(), nullable=True),
+            sa.Column("summary_length", sa.String(), nullable=True),
+            sa.Column("sources_used", sa.JSON(), nullable=True),
+            sa.Column("generation_type", sa.String(), nullable=False),
+            *_audit_columns(),
+        )
+
+
+def downgrade() -> None:
+    op.drop_table("websearch_summary_ai_output")
+    op.drop_table("daily_widgets_ai_output")
+    op.drop_table("daily_widgets")
+    op.drop_table("dashboard_widget_details")
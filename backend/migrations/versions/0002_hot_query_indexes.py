@@ -0,0 +1,78 @@
+"""Indexes for hot query paths
+
+Adds the composite/partial indexes used by DailyWidgetService,
+AIDatabaseService and ai_tool_preprocessing, and a unique (widget_id, date)
+constraint on daily_widgets. Duplicate (widget_id, date) rows are collapsed
+first, keeping the live, most recently updated row.
+
+Revision ID: 0002_hot_query_indexes
+Revises: 0001_initial_schema
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0002_hot_query_indexes"
+down_revision = "0001_initial_schema"
+branch_labels = None
+depends_on = None
+
+UNIQUE_DAILY_WIDGET = "uq_daily_widgets_widget_id_date"
+
+# (name, table, columns) - all partial on live rows
+PARTIAL_INDEXES = [
+    ("ix_daily_widgets_date_is_active", "daily_widgets", ["date", "is_active"]),
+    ("ix_dashboard_widget_details_user_id_widget_type", "dashboard_widget_details", ["user_id", "widget_type"]),
+    ("ix_dashboard_widget_details_user_id_title", "dashboard_widget_details", ["user_id", "title"]),
+    ("ix_dashboard_widget_details_user_id_category", "dashboard_widget_details", ["user_id", "category"]),
+]
+
+
+def _existing_index_names(inspector, table: str) -> set:
+    names = {ix["name"] for ix in inspector.get_indexes(table)}
+    names |= {uc["name"] for uc in inspector.get_unique_constraints(table) if uc.get("name")}
+    return names
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+
+    existing = _existing_index_names(inspector, "daily_widgets")
+    unique_columns = [uc["column_names"] for uc in inspector.get_unique_constraints("daily_widgets")]
+    if UNIQUE_DAILY_WIDGET not in existing and ["widget_id", "date"] not in unique_columns:
+        op.execute(
+            """
+            DELETE FROM daily_widgets WHERE id IN (
+                SELECT id FROM (
+                    SELECT id, ROW_NUMBER() OVER (
+                        PARTITION BY widget_id, date
+                        ORDER BY delete_flag ASC, updated_at DESC
+                    ) AS rn
+                    FROM daily_widgets
+                ) ranked
+                WHERE rn > 1
+            )
+            """
+        )
+        with op.batch_alter_table("daily_widgets") as batch_op:
+            batch_op.create_unique_constraint(UNIQUE_DAILY_WIDGET, ["widget_id", "date"])
+
+    for name, table, columns in PARTIAL_INDEXES:
+        if name in _existing_index_names(sa.inspect(bind), table):
+            continue
+        op.create_index(
+            name,
+            table,
+            columns,
+            sqlite_where=sa.text("delete_flag = 0"),
+            postgresql_where=sa.text("delete_flag = false"),
+        )
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(PARTIAL_INDEXES):
+        op.drop_index(name, table_name=table)
+    with op.batch_alter_table("daily_widgets") as batch_op:
+        batch_op.drop_constraint(UNIQUE_DAILY_WIDGET, type_="unique")
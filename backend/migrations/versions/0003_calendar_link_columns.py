@@ -0,0 +1,69 @@
+"""Generated calendar-link columns
+
+Promotes widget_config.selected_calendar, selected_yearly_calendar and
+selected_habit_calendar to generated columns on dashboard_widget_details and
+indexes them (live rows only), so calendar renders seek by link instead of
+parsing widget_config for every joined row.
+
+Generated columns are computed by the database for existing rows as well, so
+no separate backfill pass is needed: SQLite adds them as VIRTUAL columns
+(computed on read, materialised in the index), PostgreSQL adds them STORED
+(the table is rewritten once while the column is added).
+
+Revision ID: 0003_calendar_link_columns
+Revises: 0002_hot_query_indexes
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0003_calendar_link_columns"
+down_revision = "0002_hot_query_indexes"
+branch_labels = None
+depends_on = None
+
+TABLE = "dashboard_widget_details"
+LINK_COLUMNS = ["selected_calendar", "selected_yearly_calendar", "selected_habit_calendar"]
+
+
+def _link_expression(dialect: str, key: str) -> sa.TextClause:
+    if dialect == "postgresql":
+        return sa.text(f"(widget_config ->> '{key}')")
+    return sa.text(f"json_extract(widget_config, '$.{key}')")
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    dialect = bind.dialect.name
+    inspector = sa.inspect(bind)
+    existing_columns = {col["name"] for col in inspector.get_columns(TABLE)}
+    existing_indexes = {ix["name"] for ix in inspector.get_indexes(TABLE)}
+
+    for key in LINK_COLUMNS:
+        if key not in existing_columns:
+            # Plain ADD COLUMN (not batch): SQLite can add VIRTUAL generated
+            # columns in place, but not STORED ones.
+            op.add_column(
+                TABLE,
+                sa.Column(
+                    key,
+                    sa.String(),
+                    sa.Computed(_link_expression(dialect, key), persisted=(dialect == "postgresql")),
+                ),
+            )
+        name = f"ix_{TABLE}_{key}"
+        if name not in existing_indexes:
+            op.create_index(
+                name,
+                TABLE,
+                [key],
+                sqlite_where=sa.text("delete_flag = 0"),
+                postgresql_where=sa.text("delete_flag = false"),
+            )
+
+
+def downgrade() -> None:
+    for key in reversed(LINK_COLUMNS):
+        op.drop_index(f"ix_{TABLE}_{key}", table_name=TABLE)
+        op.drop_column(TABLE, key)
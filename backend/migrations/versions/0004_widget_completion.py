@@ -0,0 +1,36 @@
+"""Widget completion ledger
+
+Creates widget_completion, one (widget_id, date) row per day holding the
+completion derived from daily_widgets.activity_data. Existing history is
+filled by `python backfill_widget_completion.py` after upgrading.
+
+Revision ID: 0004_widget_completion
+Revises: 0003_calendar_link_columns
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0004_widget_completion"
+down_revision = "0003_calendar_link_columns"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if "widget_completion" in sa.inspect(op.get_bind()).get_table_names():
+        return
+    op.create_table(
+        "widget_completion",
+        sa.Column("widget_id", sa.String(), primary_key=True),
+        sa.Column("date", sa.Date(), primary_key=True),
+        sa.Column("completed", sa.Boolean(), nullable=False),
+        sa.Column("progress", sa.Float(), nullable=True),
+        sa.Column("value", sa.Float(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("widget_completion")
@@ -0,0 +1,33 @@
+"""Data versions for HTTP caching
+
+Creates data_versions, the per-user change counters behind the ETags on
+dashboard and calendar reads. Rows start missing (version 0) and are bumped
+by the services on each write.
+
+Revision ID: 0005_data_versions
+Revises: 0004_widget_completion
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0005_data_versions"
+down_revision = "0004_widget_completion"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if "data_versions" in sa.inspect(op.get_bind()).get_table_names():
+        return
+    op.create_table(
+        "data_versions",
+        sa.Column("user_id", sa.String(), primary_key=True),
+        sa.Column("scope", sa.String(), primary_key=True),
+        sa.Column("version", sa.Integer(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("data_versions")
@@ -0,0 +1,59 @@
+"""Daily plan materializations
+
+Creates daily_plan_materializations, one row per day the background
+materializer has run for. The scheduler resumes from its latest date.
+A marker an earlier build kept in data_versions (user "__system__", scope
+"daily_plan_materialized", date ordinal as version) is moved here.
+
+Revision ID: 0006_daily_plan_materializations
+Revises: 0005_data_versions
+Create Date: 2026-10-16
+"""
+from datetime import date, datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0006_daily_plan_materializations"
+down_revision = "0005_data_versions"
+branch_labels = None
+depends_on = None
+
+LEGACY_MARKER = {"user_id": "__system__", "scope": "daily_plan_materialized"}
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if "daily_plan_materializations" not in sa.inspect(bind).get_table_names():
+        op.create_table(
+            "daily_plan_materializations",
+            sa.Column("date", sa.Date(), primary_key=True),
+            sa.Column("rows_created", sa.Integer(), nullable=False),
+            sa.Column("materialized_at", sa.DateTime(), nullable=False),
+        )
+
+    marker = bind.execute(
+        sa.text("SELECT version FROM data_versions WHERE user_id = :user_id AND scope = :scope"),
+        LEGACY_MARKER,
+    ).scalar()
+    if marker:
+        table = sa.table(
+            "daily_plan_materializations",
+            sa.column("date", sa.Date()),
+            sa.column("rows_created", sa.Integer()),
+            sa.column("materialized_at", sa.DateTime()),
+        )
+        op.bulk_insert(table, [{
+            "date": date.fromordinal(marker),
+            "rows_created": 0,
+            "materialized_at": datetime.utcnow(),
+        }])
+    bind.execute(
+        sa.text("DELETE FROM data_versions WHERE user_id = :user_id AND scope = :scope"),
+        LEGACY_MARKER,
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("daily_plan_materializations")
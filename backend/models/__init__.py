@@ -5,10 +5,16 @@ from .dashboard_widget_details import DashboardWidgetDetails
 from .daily_widget import DailyWidget
 from .websearch_summary_ai_output import WebSearchSummaryAIOutput
 from .daily_widgets_ai_output import DailyWidgetsAIOutput
+from .widget_completion import WidgetCompletion
+from .data_version import DataVersion
+from .daily_plan_materialization import DailyPlanMaterialization
 
 __all__ = [
     "DashboardWidgetDetails",
     "DailyWidget",
     "WebSearchSummaryAIOutput",
-    "DailyWidgetsAIOutput"
+    "DailyWidgetsAIOutput",
+    "WidgetCompletion",
+    "DataVersion",
+    "DailyPlanMaterialization"
 ] 
\ No newline at end of file
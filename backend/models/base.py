@@ -1,13 +1,22 @@
 """
 Base model with common fields for all models.
 """
-from sqlalchemy import Column, String, DateTime, Boolean
+from sqlalchemy import Column, String, DateTime, Boolean, JSON, text
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime
 import uuid
 
 Base = declarative_base()
 
+# JSON column type: plain JSON on SQLite, JSONB on PostgreSQL
+JSONType = JSON().with_variant(JSONB(), "postgresql")
+
+# Partial index predicates for live (not soft-deleted) rows. They must match
+# how each dialect renders `delete_flag == False` for the planner to use them.
+NOT_DELETED_SQLITE = text("delete_flag = 0")
+NOT_DELETED_POSTGRES = text("delete_flag = false")
+
 class BaseModel(Base):
     """Base model with common audit fields."""
     __abstract__ = True
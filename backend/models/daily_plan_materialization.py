@@ -0,0 +1,24 @@
+"""
+Daily plan materialization model - One row per day the daily plan was materialized.
+"""
+
+# ============================================================================
+# IMPORTS
+# ============================================================================
+from sqlalchemy import Column, Date, DateTime, Integer
+from datetime import datetime
+
+from .base import Base
+
+# ============================================================================
+# MODEL
+# ============================================================================
+class DailyPlanMaterialization(Base):
+    """Daily Plan Materialization - written by the materializer for every day it
+    runs, including days that needed no rows, so the scheduler knows where to
+    resume without inferring it from daily_widgets."""
+    __tablename__ = "daily_plan_materializations"
+
+    date = Column(Date, primary_key=True)
+    rows_created = Column(Integer, nullable=False, default=0)  # by the latest run for this day
+    materialized_at = Column(DateTime, nullable=False, default=datetime.utcnow)
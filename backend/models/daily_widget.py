@@ -1,12 +1,23 @@
 """
 Daily Widget model - Daily widget instances.
 """
-from sqlalchemy import Column, String, DateTime, Boolean, JSON, Text, Date
-from .base import BaseModel
+from sqlalchemy import Column, String, DateTime, Boolean, Text, Date, Index, UniqueConstraint
+from .base import BaseModel, JSONType, NOT_DELETED_SQLITE, NOT_DELETED_POSTGRES
 
 class DailyWidget(BaseModel):
     """Daily Widget - AI-generated daily widget selections"""
     __tablename__ = "daily_widgets"
+    __table_args__ = (
+        # One row per widget per day; also serves widget_id + date range lookups
+        UniqueConstraint("widget_id", "date", name="uq_daily_widgets_widget_id_date"),
+        # Today's list and calendar ranges: date + is_active on live rows
+        Index(
+            "ix_daily_widgets_date_is_active",
+            "date", "is_active",
+            sqlite_where=NOT_DELETED_SQLITE,
+            postgresql_where=NOT_DELETED_POSTGRES,
+        ),
+    )
     
     widget_id = Column(String, nullable=False)  # Foreign key to dashboard_widget_details
     priority = Column(String, nullable=False)  # 'HIGH', 'LOW'
@@ -15,7 +26,7 @@ class DailyWidget(BaseModel):
     is_active = Column(Boolean, default=True)  # Indicates if the widget is active
     
     # Consolidated activity fields (JSON)
-    activity_data = Column(JSON, nullable=False)  # Contains all activity-specific data
+    activity_data = Column(JSONType, nullable=False)  # Contains all activity-specific data
     
     def get_alarm_activity(self):
         """Get alarm activity data from activity_data"""
@@ -1,17 +1,50 @@
 """
 Dashboard Widget Details model - User input table for widget configurations.
 """
-from sqlalchemy import Column, String, Boolean, Float, JSON, Text
-from .base import BaseModel
+from sqlalchemy import Column, String, Boolean, Float, Text, Index, Computed
+from .base import BaseModel, JSONType, NOT_DELETED_SQLITE, NOT_DELETED_POSTGRES
 
 class DashboardWidgetDetails(BaseModel):
     """Dashboard Widget Details - User input table for widget configurations"""
     __tablename__ = "dashboard_widget_details"
+    __table_args__ = (
+        # All widgets / widgets by type for a user (live rows only)
+        Index(
+            "ix_dashboard_widget_details_user_id_widget_type",
+            "user_id", "widget_type",
+            sqlite_where=NOT_DELETED_SQLITE,
+            postgresql_where=NOT_DELETED_POSTGRES,
+        ),
+        # AI tools resolve widgets by title
+        Index(
+            "ix_dashboard_widget_details_user_id_title",
+            "user_id", "title",
+            sqlite_where=NOT_DELETED_SQLITE,
+            postgresql_where=NOT_DELETED_POSTGRES,
+        ),
+        # Category analysis and activity log filters
+        Index(
+            "ix_dashboard_widget_details_user_id_category",
+            "user_id", "category",
+            sqlite_where=NOT_DELETED_SQLITE,
+            postgresql_where=NOT_DELETED_POSTGRES,
+        ),
+        # Calendar links (generated from widget_config) for calendar renders
+        *[
+            Index(
+                f"ix_dashboard_widget_details_{link}",
+                link,
+                sqlite_where=NOT_DELETED_SQLITE,
+                postgresql_where=NOT_DELETED_POSTGRES,
+            )
+            for link in ("selected_calendar", "selected_yearly_calendar", "selected_habit_calendar")
+        ],
+    )
     
     user_id = Column(String, nullable=False)
     widget_type = Column(String, nullable=False)  # 'alarm', 'todo', 'single_item_tracker', 'websearch'
     frequency = Column(String, nullable=False)  # 'daily', 'weekly', 'monthly'
-    frequency_details = Column(JSON, nullable=True)  # Contains all frequency specific configuration
+    frequency_details = Column(JSONType, nullable=True)  # Contains all frequency specific configuration
     importance = Column(Float, nullable=False)  # 0.0 to 1.0 scale
     title = Column(String, nullable=False)
     description = Column(Text, nullable=True)
@@ -19,7 +52,13 @@ class DashboardWidgetDetails(BaseModel):
     is_permanent = Column(Boolean, default=False)  # If True, widget is automatically included in daily plans
     
     # Consolidated details fields (JSON)
-    widget_config = Column(JSON, nullable=False)  # Contains all widget-specific configuration
+    widget_config = Column(JSONType, nullable=False)  # Contains all widget-specific configuration
+    
+    # Calendar links promoted out of widget_config (generated, read-only).
+    # VIRTUAL on SQLite, STORED on PostgreSQL; never assign these directly.
+    selected_calendar = Column(String, Computed(widget_config["selected_calendar"].as_string()))
+    selected_yearly_calendar = Column(String, Computed(widget_config["selected_yearly_calendar"].as_string()))
+    selected_habit_calendar = Column(String, Computed(widget_config["selected_habit_calendar"].as_string()))
     
     def get_alarm_config(self):
         """Get alarm-specific configuration from widget_config"""
@@ -0,0 +1,25 @@
+"""
+Data version model - Per-user change counters used for HTTP ETags.
+"""
+
+# ============================================================================
+# IMPORTS
+# ============================================================================
+from sqlalchemy import Column, String, Integer
+
+from .base import Base
+
+# ============================================================================
+# MODEL
+# ============================================================================
+class DataVersion(Base):
+    """Data Version - bumped in the same transaction as every dashboard write.
+
+    scope is "widgets" for widget definitions, or an ISO date ("2026-06-01")
+    for that day's daily widgets and activity.
+    """
+    __tablename__ = "data_versions"
+
+    user_id = Column(String, primary_key=True)
+    scope = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
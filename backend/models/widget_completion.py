@@ -0,0 +1,26 @@
+"""
+Widget completion model - Per-day completion ledger derived from daily widget activity.
+"""
+
+# ============================================================================
+# IMPORTS
+# ============================================================================
+from sqlalchemy import Column, String, Date, DateTime, Boolean, Float
+from datetime import datetime
+
+from .base import Base
+
+# ============================================================================
+# MODEL
+# ============================================================================
+class WidgetCompletion(Base):
+    """Widget Completion - one narrow row per widget per day, kept in sync with
+    DailyWidget.activity_data so aggregations read columns instead of JSON."""
+    __tablename__ = "widget_completion"
+
+    widget_id = Column(String, primary_key=True)  # dashboard_widget_details.id
+    date = Column(Date, primary_key=True)
+    completed = Column(Boolean, nullable=False, default=False)
+    progress = Column(Float, nullable=True)  # todo progress (0-100) when reported
+    value = Column(Float, nullable=True)  # numeric tracker value when reported
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
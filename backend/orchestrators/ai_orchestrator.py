@@ -2,59 +2,37 @@
 AI Orchestrator - Refactored to use separate services for context, database, and validation
 """
 
-import json
 import logging
+from contextlib import aclosing
 from typing import Dict, Any, List, Optional, Callable
 from datetime import datetime, date
-from sqlalchemy.ext.asyncio import AsyncSession
 import pprint
 
-from ai_engine.models.llm_client import LLMClient
-from services.ai_prompt_preprocessing import AIPromptPreprocessing
-from services.context_connection_manager import ContextConnectionManager
-from services.context_service import ContextService
-from services.validation_engine import ValidationEngine
-from services.config_loader import AIConfigLoader
-from db.session import AsyncSessionLocal
+from config import settings
+from services.ai_registry import AIRegistry, get_ai_registry
+from services.conversation_window import conversation_window
+from services.tool_prefetch import ToolPrefetch
+from db.unit_of_work import UnitOfWork
+from utils.streaming_json import IncrementalJSONParser
 
 logger = logging.getLogger(__name__)
 
+# Top-level field of the AI's JSON answer that is streamed to the user as it is generated
+STREAMED_RESPONSE_FIELD = "ai_response"
+
 class AIOrchestrator:
     """Refactored AI orchestrator that coordinates between separate services."""
     
-    def __init__(self):
-        """Initialize the AI orchestrator."""
-        self.llm_client = LLMClient()
-        
-        # Initialize database session
-        self.db_session = None  # Will be initialized when needed
-        
-        # Initialize services with the same database session
-        self.context_connection_manager = ContextConnectionManager()
-        self.context_service = ContextService()
-        
-        # Initialize validation engine with config loader
-        self.validation_engine = ValidationEngine()
+    def __init__(self, registry: Optional[AIRegistry] = None):
+        """Initialize the AI orchestrator over the process-wide shared services."""
+        registry = registry or get_ai_registry()
+        self.llm_client = registry.llm_client
         
-        
-        self.ai_prompt_preprocessing = AIPromptPreprocessing()
-    
-    async def _get_db_session(self) -> AsyncSession:
-        """Get a database session, creating one if needed."""
-        if self.db_session is None:
-            self.db_session = AsyncSessionLocal()
-            logger.info("Created new database session")
-        return self.db_session
-    
-    async def _close_db_session(self):
-        """Close the database session if it exists."""
-        if self.db_session is not None:
-            try:
-                await self.db_session.close()
-                self.db_session = None
-                logger.info("Closed database session")
-            except Exception as e:
-                logger.error(f"Error closing database session: {e}")
+        # Services are stateless (or keyed by connection) and shared by every connection
+        self.context_connection_manager = registry.context_connection_manager
+        self.context_service = registry.context_service
+        self.validation_engine = registry.validation_engine
+        self.ai_prompt_preprocessing = registry.prompt_preprocessing
     
     async def process_user_message(
         self,
@@ -64,12 +42,21 @@ class AIOrchestrator:
         conversation_history: List[Dict[str, str]] = None,
         websocket_callback: Optional[Callable] = None,
         connection_id: str = "default",
-        existing_context: Any = None
+        existing_context: Any = None,
+        delta_callback: Optional[Callable] = None
     ) -> None:  # No return value - orchestrator handles everything
         """
         Main orchestrator flow - coordinates all services to process user message.
         All responses and context updates are handled internally via WebSocket.
+        If delta_callback is given, the ai_response text is passed to it chunk by
+        chunk while the LLM is still generating.
+        Database access runs in the turn's unit of work: each step that needs
+        it gets a pooled session for just that step. The task an editing
+        reply names is looked up while the reply is still streaming (see
+        tool_prefetch), and the title is dropped if no such task exists.
         """
+        uow = UnitOfWork("chat_turn")
+        prefetch: Optional[ToolPrefetch] = None
         try:
             # Get context from context connection manager or use existing context
             await self._ping_thinking_step(websocket_callback, "getting_context", "Getting conversation context...")
@@ -77,7 +64,7 @@ class AIOrchestrator:
                 context = existing_context
                 logger.info(f"Using existing context with {len(getattr(context, 'user_chats', []))} messages")
             else:
-                context = await self.context_connection_manager.get_context(connection_id)
+                context = self.context_connection_manager.get_context(connection_id)
                 logger.info(f"Retrieved context from manager with {len(getattr(context, 'user_chats', []))} messages")
             
             # Store additional context information if provided
@@ -96,20 +83,26 @@ class AIOrchestrator:
             # Store the updated context back to the connection manager
             self.context_connection_manager.store_context(connection_id, context)
             
-            # Get processed input using context + db session
+            # Get processed input using context + the turn's unit of work
             await self._ping_thinking_step(websocket_callback, "processing_input", "Processing your message...")
             if not self.ai_prompt_preprocessing:
-                raise Exception("AI prompt preprocessing service not available - database session required")
-            db_session = await self._get_db_session()
-            processed_input = await self.ai_prompt_preprocessing.compile_prompt_string(context, db_session)
+                raise Exception("AI prompt preprocessing service not available")
+            processed_input = await self.ai_prompt_preprocessing.compile_prompt_string(context, uow)
             
             # Run AI engine to get response
             await self._ping_thinking_step(websocket_callback, "running_ai", "Generating AI response...")
-            ai_response = await self._run_ai_engine(processed_input)
+            prefetch = ToolPrefetch(
+                uow,
+                getattr(context, 'user_id', None) or settings.DEFAULT_USER_ID,
+                self.validation_engine.task_title_fields,
+            )
+            ai_response = await self._run_ai_engine(processed_input, delta_callback, prefetch)
             
             # Validate the AI response
             await self._ping_thinking_step(websocket_callback, "validating_response", "Validating AI response...")
             valid_response = await self._validate_ai_response(ai_response)
+            # A task title must name one of the user's tasks; uses the lookup started while streaming
+            valid_response = await prefetch.resolve(valid_response)
             
             # Second context update: Update context with AI response and variables
             await self._ping_thinking_step(websocket_callback, "updating_context", "Updating conversation context...")
@@ -120,6 +113,8 @@ class AIOrchestrator:
             
             # Store the final updated context back to the connection manager
             self.context_connection_manager.store_context(connection_id, context)
+            # Fold turns that left the verbatim window into the summary, off the reply path
+            conversation_window.schedule_refresh(context)
             
             # Send final response via WebSocket
             response_data = {
@@ -136,25 +131,67 @@ class AIOrchestrator:
             logger.error(f"Error in orchestrator flow: {e}")
             await self._ping_error(websocket_callback, {"error": str(e)})
         finally:
-            # Don't close the database session here - keep it open for the connection
-            # It will be closed when cleanup_conversation is called
-            pass
+            # Nothing is held between turns; sessions a step left open are reported as leaks
+            if prefetch is not None:
+                await prefetch.cancel()
+            await uow.close()
     
     async def _validate_ai_response(self, ai_response: Any) -> Dict[str, Any]:
         """Validate AI response using the validation engine."""
         return await self.validation_engine.validate_ai_response(ai_response)
 
-    async def _run_ai_engine(self, processed_input: str) -> Dict[str, Any]:
+    async def _run_ai_engine(
+        self,
+        processed_input: str,
+        delta_callback: Optional[Callable] = None,
+        prefetch: Optional[ToolPrefetch] = None
+    ) -> Dict[str, Any]:
         """Run AI engine using processed input."""
+        # Everything before the user message is identical on every turn, so the
+        # provider can serve it from its prompt cache
         messages = [
             {"role": "system", "content": "You are a conversational task management AI that interprets user conversations and outputs structured JSON in a fixed schema. You help users create, edit, and analyze their tasks and habits. Always respond with valid JSON following the exact field specifications provided."},
+            {"role": "system", "content": self.ai_prompt_preprocessing.static_prefix.text},
             {"role": "user", "content": processed_input}
         ]
         
-        response = await self.llm_client.call_openai(messages)
-        print(f"🟢🟢🟢🟢 AI RESPONSE: {response}")
+        if delta_callback and self.llm_client.streaming:
+            response = await self._stream_ai_engine(messages, delta_callback, prefetch)
+        else:
+            response = await self.llm_client.call_openai(messages, response_schema=self.validation_engine.response_schema)
+        logger.debug(f"AI response: {response}")
         return response or {}
     
+    async def _stream_ai_engine(
+        self,
+        messages: List[Dict[str, str]],
+        delta_callback: Callable,
+        prefetch: Optional[ToolPrefetch] = None
+    ) -> Optional[str]:
+        """
+        Stream the completion, forwarding the ai_response text as it is decoded
+        and each completed top-level field to prefetch.
+        Returns the full completion text, which is validated like a non-streamed one.
+        """
+        parser = IncrementalJSONParser()
+        parts = []
+        # Closed on exit (cancellation included), so the stream gives back its
+        # concurrency slot and HTTP response now rather than when it is collected
+        stream = self.llm_client.stream_openai(messages, response_schema=self.validation_engine.response_schema)
+        async with aclosing(stream):
+            async for chunk in stream:
+                parts.append(chunk)
+                for field, text in parser.feed(chunk):
+                    if field == STREAMED_RESPONSE_FIELD:
+                        try:
+                            await delta_callback(text)
+                        except Exception as e:
+                            logger.error(f"Error pinging response delta: {e}")
+                if prefetch is not None:
+                    for field, value in parser.pop_completed():
+                        prefetch.observe(field, value)
+        return "".join(parts) or None
+
     async def _ping_response(self, websocket_callback: Optional[Callable], response_data: Dict[str, Any]):
         """Ping response via WebSocket."""
         if websocket_callback:
@@ -186,7 +223,7 @@ class AIOrchestrator:
             "orchestrator_type": "refactored",
             "ai_prompt_preprocessing": "Initialized" if self.ai_prompt_preprocessing else "Not available",
             "llm_client": "Initialized" if self.llm_client else "Not available",
-            "db_session": "Available" if self.db_session is not None else "Not available",
+            "db_sessions": "Per step of each turn (unit of work)",
             "services": {
                 "context_connection_manager": "Initialized",
                 "context_service": "Initialized", 
@@ -199,26 +236,6 @@ class AIOrchestrator:
         try:
             # Clean up connection in the context connection manager
             self.context_connection_manager.disconnect_connection(connection_id)
-            
-            # Clean up database session if it exists
-            if self.db_session is not None:
-                try:
-                    # Use the async close method
-                    import asyncio
-                    try:
-                        loop = asyncio.get_event_loop()
-                        if loop.is_running():
-                            # If we're in an async context, schedule the close
-                            asyncio.create_task(self._close_db_session())
-                        else:
-                            # If we're not in an async context, just close directly
-                            loop.run_until_complete(self._close_db_session())
-                    except RuntimeError:
-                        # No event loop, just close directly
-                        pass
-                except Exception as e:
-                    logger.error(f"Error closing database session: {e}")
-            
             logger.info(f"Cleaned up conversation for connection: {connection_id}")
         except Exception as e:
-            logger.error(f"Error cleaning up conversation for {connection_id}: {e}") 
\ No newline at end of file
+            logger.error(f"Error cleaning up conversation for {connection_id}: {e}")
@@ -12,7 +12,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query, status
 from typing import Optional
 from datetime import date
 
-from orchestrators.ai_orchestrator import AIOrchestrator
+from services.ai_registry import get_ai_registry, get_ai_orchestrator
 from schemas.ai import (
     DailyPlanResponse, WebSummaryResponse, ActivityGenerationResponse,
     AIErrorResponse
@@ -51,14 +51,13 @@ async def ai_health_check():
     - Checks database connectivity
     - Returns health status
     """
-    orchestrator = None
     try:
-        orchestrator = AIOrchestrator()
-        health_result = await orchestrator.get_configuration_summary()
+        health_result = get_ai_orchestrator().get_configuration_summary()
         
         return {
             "status": "healthy",
             "ai_orchestrator": health_result,
+            "ai_registry": get_ai_registry().summary(),
             "message": "AI services are operational"
         }
         
@@ -94,11 +93,10 @@ async def websocket_ai(websocket: WebSocket):
     Connect to: ws://localhost:8989/api/v1/ai/ws
     """
     connection_id = str(uuid.uuid4())
-    orchestrator = None
     
     try:
-        # Create orchestrator with its own database session
-        orchestrator = AIOrchestrator()
+        # One orchestrator over the process-wide registry serves every connection
+        orchestrator = get_ai_orchestrator()
         
         # Delegate session handling to manager
         await ai_websocket_manager.handle_session(websocket, connection_id, orchestrator)
@@ -111,11 +109,70 @@ async def websocket_ai(websocket: WebSocket):
         # Clean up resources
         ai_websocket_manager.disconnect(connection_id)
 
+@router.get("/cache/stats")
+async def llm_cache_stats():
+    """Hit/miss counters and sizes of the LLM response cache."""
+    from ai_engine.models.llm_cache import get_llm_cache
+    return {
+        **get_llm_cache().stats(),
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+@router.get("/reference-data/stats")
+async def reference_data_stats():
+    """Hit/miss counters and contents of the per-user AI reference data read model."""
+    from services.ai_reference_data import ai_reference_data
+    return {
+        **ai_reference_data.stats(),
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+@router.get("/contexts/stats")
+async def context_store_stats():
+    """Count, approximate bytes and evictions of the conversation context store."""
+    from services.context_connection_manager import context_store
+    return {
+        **context_store.stats(),
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+@router.get("/validation/stats")
+async def validation_stats():
+    """Parse outcomes, rejected fields and validation time of AI responses."""
+    from services.ai_registry import get_ai_registry
+    return {
+        **get_ai_registry().validation_engine.stats(),
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+@router.get("/prefetch/stats")
+async def prefetch_stats():
+    """Task lookups started during generation, used, cancelled and titles rejected."""
+    from services.tool_prefetch import prefetch_stats as tool_prefetch_stats
+    return {
+        **tool_prefetch_stats(),
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+@router.get("/db/stats")
+async def db_session_stats():
+    """Pool checkouts, hold times and unit-of-work session waits and leaks."""
+    from db.unit_of_work import unit_of_work_stats
+    return {
+        **unit_of_work_stats(),
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
 @router.get("/websocket/health")
 async def websocket_health():
     """Health check endpoint for AI WebSocket service."""
+    from services.chat_turns import turn_stats
+    from services.ws_protocol import protocol_stats
     return {
         "status": "healthy",
         "active_connections": len(ai_websocket_manager.active_connections),
+        "send_queues": ai_websocket_manager.send_stats(),
+        "turns": turn_stats(),
+        "protocols": protocol_stats(),
         "timestamp": datetime.utcnow().isoformat()
     } 
\ No newline at end of file
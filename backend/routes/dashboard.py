@@ -5,23 +5,30 @@ Dashboard routes for dashboard management.
 # ============================================================================
 # IMPORTS
 # ============================================================================
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response, WebSocket, WebSocketDisconnect
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Dict, Any, Optional, List
-from datetime import date
+from datetime import date, datetime
+import asyncio
+import json
+import logging
 
-from db.dependency import get_db_session_dependency
+from db.dependency import get_db_session_dependency, get_db_read_session_dependency
 from services.daily_widget_service import DailyWidgetService
+from services.data_version_service import DataVersionService
+from services.dashboard_events import dashboard_event_bus
 from schemas.dashboard import (
     TodayWidgetListResponse,
     AddWidgetToTodayResponse,
     RemoveWidgetFromTodayResponse
 )
 from utils.errors import raise_not_found, raise_database_error
+from utils.http_cache import make_etag, not_modified_or_tag, cache_control_for_range
 
 # ============================================================================
 # CONSTANTS
 # ============================================================================
+logger = logging.getLogger(__name__)
 router = APIRouter()
 
 # Default user for development
@@ -40,14 +47,23 @@ def get_default_user_id() -> str:
 @router.get("/getTodayWidgetList", response_model=List[TodayWidgetListResponse])
 async def get_today_widget_list(
     target_date: str,
-    db: AsyncSession = Depends(get_db_session_dependency)
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db_read_session_dependency)
 ):
     """
     Get today's widget list from table DailyWidget.
     
     This endpoint only reads data and doesn't require transaction management.
+    Answers If-None-Match with 304 while the day's data version is unchanged.
     """
     try:
+        day = date.fromisoformat(target_date[:10])
+        versions = await DataVersionService(db).get_versions(DEFAULT_USER_ID, day, day)
+        etag = make_etag("getTodayWidgetList", DEFAULT_USER_ID, day, versions)
+        not_modified = not_modified_or_tag(request, response, etag, cache_control_for_range(day))
+        if not_modified:
+            return not_modified
         
         service = DailyWidgetService(db)
         return await service.get_today_widget_list(target_date)
@@ -138,15 +154,21 @@ async def update_activity_by_widget_id_and_date(
     try:
         service = DailyWidgetService(db)
         result = await service.update_activity_by_widget_id_and_date(widget_id, target_date, activity_data)
+        
+        # Commit the transaction at the route level
+        await db.commit()
+        
         return result
     except Exception as e:
+        # Rollback on any exception
+        await db.rollback()
         raise raise_database_error(f"Failed to update activity by widget_id and date: {str(e)}")
     
 
 @router.get("/daily-widgets/{daily_widget_id}/getTodayWidget")
 async def get_activity_data(
     daily_widget_id: str,
-    db: AsyncSession = Depends(get_db_session_dependency)
+    db: AsyncSession = Depends(get_db_read_session_dependency)
 ):
     """Get activity data for a daily widget."""
     try:
@@ -159,7 +181,7 @@ async def get_activity_data(
 async def get_activity_data(
     widget_id: str,
     target_date: str,
-    db: AsyncSession = Depends(get_db_session_dependency)
+    db: AsyncSession = Depends(get_db_read_session_dependency)
 ):
     """Get activity data for a daily widget."""
     try:
@@ -167,3 +189,61 @@ async def get_activity_data(
         return await service.get_today_widget_by_widget_id(widget_id, target_date)
     except Exception as e:
         raise raise_database_error(f"Failed to get activity data: {str(e)}")
+
+# ============================================================================
+# PUSH CHANNEL
+# ============================================================================
+@router.websocket("/ws")
+async def dashboard_events_websocket(websocket: WebSocket):
+    """
+    Push dashboard change events to the client instead of it polling.
+    Connect to: ws://localhost:8989/api/v1/dashboard/ws
+
+    Each committed write sends one compact JSON event, e.g.
+    {"type": "activity_updated", "daily_widget_id": ..., "widget_id": ...,
+     "changed_keys": [...], "date": "2026-10-16", "version": 7}.
+    Other types: daily_widget_added, daily_widget_removed,
+    daily_plan_materialized, widget_created, widget_updated, widget_deleted,
+    and resync (events were dropped; refetch everything). Messages sent by
+    the client are ignored.
+    """
+    await websocket.accept()
+    # Subscribed before the connection frame so no event is missed; the sender
+    # starts after it, so the connection frame is always the first one out
+    queue = dashboard_event_bus.subscribe(DEFAULT_USER_ID)
+
+    async def forward_events():
+        while True:
+            payload = await queue.get()
+            await websocket.send_text(json.dumps(payload))
+
+    async def read_until_disconnect():
+        # Reading is how a disconnect is noticed; client messages are ignored
+        while True:
+            await websocket.receive_text()
+
+    tasks: List[asyncio.Task] = []
+    try:
+        await websocket.send_text(json.dumps({
+            "type": "connection",
+            "status": "connected",
+            "timestamp": datetime.utcnow().isoformat()
+        }))
+        tasks = [asyncio.create_task(forward_events()), asyncio.create_task(read_until_disconnect())]
+        # Whichever side ends first ends the connection: a failed send closes the socket
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            task.result()
+    except WebSocketDisconnect:
+        logger.info("Dashboard WebSocket disconnected")
+    except Exception as e:
+        logger.error(f"Dashboard WebSocket error: {e}")
+        try:
+            await websocket.close(code=1011)
+        except Exception:
+            pass
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        dashboard_event_bus.unsubscribe(DEFAULT_USER_ID, queue)
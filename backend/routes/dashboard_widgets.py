@@ -1,18 +1,22 @@
 """
 Dashboard Widgets Routes - Consolidated routes for all widget types.
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Dict, Any
-from datetime import date
+from datetime import datetime
 
-from db.dependency import get_db_session_dependency
+from db.dependency import get_db_session_dependency, get_db_read_session_dependency
+from config import settings
 from services.service_factory import ServiceFactory
+from services.data_version_service import DataVersionService
+from utils.http_cache import make_etag, not_modified_or_tag
 from schemas.dashboard_widget import (
     DashboardWidgetCreate,
     DashboardWidgetUpdate,
     DashboardWidgetResponse,
     WidgetPriorityResponse,
+    WidgetPriorityDayResponse,
 )
 
 router = APIRouter(tags=["dashboard-widgets"])
@@ -49,10 +53,18 @@ async def create_widget(
 
 @router.get("/allwidgets", response_model=List[DashboardWidgetResponse])
 async def get_user_widgets(
-    db: AsyncSession = Depends(get_db_session_dependency)
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db_read_session_dependency)
 ):
-    """Get all widgets for a specific user."""
+    """Get all widgets for a specific user (304 while the widgets version is unchanged)."""
     try:
+        user_id = settings.DEFAULT_USER_ID
+        versions = await DataVersionService(db).get_versions(user_id)
+        not_modified = not_modified_or_tag(request, response, make_etag("allwidgets", user_id, versions))
+        if not_modified:
+            return not_modified
+        
         service_factory = ServiceFactory(db)
         service = service_factory.dashboard_widget_service
         
@@ -68,13 +80,12 @@ async def get_user_widgets(
 @router.get("/{widget_id}/priority", response_model=WidgetPriorityResponse)
 async def get_widget_priority_for_date(
     widget_id: str,
-    date: str = Query(..., description="Target date (YYYY-MM-DD)"),
-    db: AsyncSession = Depends(get_db_session_dependency),
+    target: str = Query(..., alias="date", description="Target date (YYYY-MM-DD)"),
+    db: AsyncSession = Depends(get_db_read_session_dependency),
 ):
     """Get priority and reason for a dashboard widget on a given date (past performance)."""
     try:
-        from datetime import datetime
-        target_date = datetime.strptime(date, "%Y-%m-%d").date()
+        target_date = datetime.strptime(target, "%Y-%m-%d").date()
         service_factory = ServiceFactory(db)
         service = service_factory.widget_priority_service
         result = await service.get_priority_for_date(widget_id, target_date)
@@ -91,10 +102,77 @@ async def get_widget_priority_for_date(
         )
 
 
+@router.get("/priorities", response_model=Dict[str, WidgetPriorityResponse])
+async def get_widget_priorities_for_date(
+    target: str = Query(..., alias="date", description="Target date (YYYY-MM-DD)"),
+    ids: List[str] = Query(..., description="Widget IDs (comma-separated or repeated)"),
+    db: AsyncSession = Depends(get_db_read_session_dependency),
+):
+    """Get priority and reason for many dashboard widgets on a given date in one call."""
+    try:
+        target_date = datetime.strptime(target, "%Y-%m-%d").date()
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid date format. Use YYYY-MM-DD.",
+        )
+    try:
+        widget_ids = [wid.strip() for value in ids for wid in value.split(",") if wid.strip()]
+        service_factory = ServiceFactory(db)
+        service = service_factory.widget_priority_service
+        results = await service.get_priorities_for_date(widget_ids, target_date)
+        return {widget_id: WidgetPriorityResponse(**result) for widget_id, result in results.items()}
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to get widget priorities: {str(e)}",
+        )
+
+
+@router.get("/priorities/history", response_model=Dict[str, List[WidgetPriorityDayResponse]])
+async def get_widget_priority_history(
+    start_date: str = Query(..., description="First date (YYYY-MM-DD)"),
+    end_date: str = Query(..., description="Last date (YYYY-MM-DD)"),
+    ids: List[str] = Query(..., description="Widget IDs (comma-separated or repeated)"),
+    db: AsyncSession = Depends(get_db_read_session_dependency),
+):
+    """Get priority and reason for many dashboard widgets on every date in a range (at most PRIORITY_HISTORY_MAX_DAYS days)."""
+    try:
+        start = datetime.strptime(start_date, "%Y-%m-%d").date()
+        end = datetime.strptime(end_date, "%Y-%m-%d").date()
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid date format. Use YYYY-MM-DD.",
+        )
+    if (end - start).days + 1 > settings.PRIORITY_HISTORY_MAX_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Date range too long. Request at most {settings.PRIORITY_HISTORY_MAX_DAYS} days.",
+        )
+    try:
+        widget_ids = [wid.strip() for value in ids for wid in value.split(",") if wid.strip()]
+        service_factory = ServiceFactory(db)
+        service = service_factory.widget_priority_service
+        history = await service.get_priority_history(widget_ids, start, end)
+        return {
+            widget_id: [
+                WidgetPriorityDayResponse(date=day["date"].isoformat(), priority=day["priority"], reason=day["reason"])
+                for day in days
+            ]
+            for widget_id, days in history.items()
+        }
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to get widget priority history: {str(e)}",
+        )
+
+
 @router.get("/{widget_id}", response_model=DashboardWidgetResponse)
 async def get_widget(
     widget_id: str,
-    db: AsyncSession = Depends(get_db_session_dependency)
+    db: AsyncSession = Depends(get_db_read_session_dependency)
 ):
     """Get a specific widget by ID."""
     try:
@@ -179,7 +257,7 @@ async def delete_widget(
 @router.get("/alloftype/{widget_type}", response_model=List[DashboardWidgetResponse])
 async def get_widgets_by_type(
     widget_type: str,
-    db: AsyncSession = Depends(get_db_session_dependency)
+    db: AsyncSession = Depends(get_db_read_session_dependency)
 ):
     """Get all widgets of a specific type for a user."""
     try:
@@ -5,14 +5,17 @@ Tracker routes for calendar-linked activity queries.
 # =============================================================================
 # IMPORTS
 # =============================================================================
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Dict, Any
 from datetime import date
 
-from db.dependency import get_db_session_dependency
+from db.dependency import get_db_read_session_dependency
+from config import settings
 from services.daily_widget_service import DailyWidgetService
+from services.data_version_service import DataVersionService
 from utils.errors import raise_database_error
+from utils.http_cache import make_etag, not_modified_or_tag, cache_control_for_range
 
 # =============================================================================
 # ROUTER
@@ -22,17 +25,30 @@ router = APIRouter()
 
 @router.get("/getWidgetActivityForCalendar")
 async def get_widget_activity_for_calendar(
+    request: Request,
+    response: Response,
     calendar_id: str = Query(..., description="Calendar widget_id to filter on (matches widget_config.selected_calendar)"),
     start_date: date = Query(..., description="Start date (YYYY-MM-DD) inclusive"),
     end_date: date = Query(..., description="End date (YYYY-MM-DD) inclusive"),
     calendar_type: str = Query(..., description="Calendar type (monthly or yearly)"),
-    db: AsyncSession = Depends(get_db_session_dependency)
+    db: AsyncSession = Depends(get_db_read_session_dependency)
 ) -> List[Dict[str, Any]]:
     """Get daily widgets joined with dashboard widgets for a given calendar over a period.
 
     Filters where DashboardWidgetDetails.widget_config.selected_calendar == calendar_id.
+    Answers If-None-Match with 304 while no day in the range has changed; ranges
+    entirely in the past are cacheable for PAST_RANGE_CACHE_MAX_AGE.
     """
     try:
+        user_id = settings.DEFAULT_USER_ID
+        versions = await DataVersionService(db).get_versions(user_id, start_date, end_date)
+        etag = make_etag(
+            "getWidgetActivityForCalendar", user_id, calendar_id, calendar_type, start_date, end_date, versions
+        )
+        not_modified = not_modified_or_tag(request, response, etag, cache_control_for_range(end_date))
+        if not_modified:
+            return not_modified
+
         service = DailyWidgetService(db)
         return await service.get_widgets_for_calendar_period(calendar_id, start_date, end_date, calendar_type)
     except Exception as e:
@@ -42,6 +42,11 @@ class WidgetPriorityResponse(BaseModel):
     reason: str = Field(..., description="Short explanation for the priority")
 
 
+class WidgetPriorityDayResponse(WidgetPriorityResponse):
+    """Priority and reason for a widget on one day of a priority history range."""
+    date: str  # ISO format
+
+
 class DashboardWidgetResponse(DashboardWidgetBase):
     """Schema for dashboard widget response."""
     id: str
@@ -1,16 +1,20 @@
 """
 AI Database Service
 Handles all database operations for AI prompt preprocessing.
+
+Reads are answered from the shared per-user read model (ai_reference_data)
+wherever it holds the data; only activity older than its window goes to the
+database. The service holds no session of its own: every query runs on a
+short-lived read-only session (a step of the caller's UnitOfWork when one is
+passed), so fetches can run concurrently.
 """
 
 import logging
 from typing import Dict, Any, List, Optional
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, func
-from datetime import date, datetime, timedelta
+from datetime import date, timedelta
 
-from models.dashboard_widget_details import DashboardWidgetDetails
-from models.daily_widget import DailyWidget
+from db.unit_of_work import UnitOfWork
+from services.ai_reference_data import ai_reference_data
 
 logger = logging.getLogger(__name__)
 DEFAULT_USER_ID = "user_001"
@@ -19,14 +23,8 @@ class AIDatabaseService:
     """Service for handling database operations for AI prompt preprocessing."""
     
     def __init__(self):
-        #only one instance of the database session is needed for all the services
-        self.db_session = None
-        from db.session import AsyncSessionLocal
-        if self.db_session is None: 
-            self.db_session = AsyncSessionLocal()
-        else:
-            self.db_session = self.db_session
-        self._current_user_id: Optional[str] = None
+        # Chat turns carry no user id yet; the same default as fetch_user_reference_data
+        self._current_user_id: Optional[str] = DEFAULT_USER_ID
     
     def set_user_id(self, user_id: str) -> None:
         """Set the current user ID for database operations."""
@@ -36,66 +34,31 @@ class AIDatabaseService:
         """Get the current user ID."""
         return self._current_user_id
     
-    async def fetch_all_task_list(self, payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+    async def fetch_all_task_list(self, payload: Dict[str, Any], uow: Optional[UnitOfWork] = None) -> List[Dict[str, Any]]:
         """Fetch all tasks for the user."""
         try:
             if not self._current_user_id:
                 logger.warning("No user ID set for database operation")
                 return []
             
-            stmt = select(DashboardWidgetDetails).where(
-                and_(
-                    DashboardWidgetDetails.user_id == self._current_user_id,
-                    DashboardWidgetDetails.delete_flag == False
-                )
-            )
-            result = await self.db_session.execute(stmt)
-            widgets = result.scalars().all()
-            
-            return [
-                {
-                    "id": widget.id,
-                    "title": widget.title,
-                    "category": widget.category,
-                    "widget_type": widget.widget_type
-                }
-                for widget in widgets
-            ]
+            return await ai_reference_data.all_task_list(self._current_user_id, uow)
         except Exception as e:
             logger.error(f"Failed to fetch all task list: {e}")
             return []
     
-    async def fetch_today_list(self, payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+    async def fetch_today_list(self, payload: Dict[str, Any], uow: Optional[UnitOfWork] = None) -> List[Dict[str, Any]]:
         """Fetch today's tasks."""
         try:
             if not self._current_user_id:
                 logger.warning("No user ID set for database operation")
                 return []
             
-            today = date.today()
-            
-            stmt = select(DailyWidget).join(DashboardWidgetDetails).where(
-                and_(
-                    DashboardWidgetDetails.user_id == self._current_user_id,
-                    DailyWidget.date == today
-                )
-            )
-            result = await self.db_session.execute(stmt)
-            daily_widgets = result.scalars().all()
-            
-            return [
-                {
-                    "widget_title": dw.widget.title if dw.widget else "Unknown",
-                    "date": dw.date.isoformat(),
-                    "activity_data": dw.activity_data
-                }
-                for dw in daily_widgets
-            ]
+            return await ai_reference_data.today_list(self._current_user_id, uow)
         except Exception as e:
             logger.error(f"Failed to fetch today list: {e}")
             return []
     
-    async def fetch_activity_log(self, payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+    async def fetch_activity_log(self, payload: Dict[str, Any], uow: Optional[UnitOfWork] = None) -> List[Dict[str, Any]]:
         """Fetch activity log based on payload parameters."""
         try:
             if not self._current_user_id:
@@ -106,42 +69,33 @@ class AIDatabaseService:
             category_list = payload.get('category_list', [])
             
             # Calculate date range
-            end_date = date.today()
             if date_period == 'week':
-                start_date = end_date - timedelta(days=7)
+                days = 7
             elif date_period == 'month':
-                start_date = end_date - timedelta(days=30)
+                days = 30
             else:
-                start_date = end_date - timedelta(days=365)
-            
-            # Build query
-            conditions = [
-                DashboardWidgetDetails.user_id == self._current_user_id,
-                DailyWidget.date >= start_date,
-                DailyWidget.date <= end_date
-            ]
-            
-            if category_list:
-                conditions.append(DashboardWidgetDetails.category.in_(category_list))
-            
-            stmt = select(DailyWidget).join(DashboardWidgetDetails).where(and_(*conditions))
-            result = await self.db_session.execute(stmt)
-            daily_widgets = result.scalars().all()
+                days = 365
+            if ai_reference_data.covers_days(days):
+                return await ai_reference_data.activity_log(self._current_user_id, days, category_list, uow)
             
+            # Older than the read model's window: query it directly
+            end_date = date.today()
+            rows = await ai_reference_data.query_activity(self._current_user_id, end_date - timedelta(days=days), end_date, uow)
             return [
                 {
-                    "date": dw.date.isoformat(),
-                    "widget_title": dw.widget.title if dw.widget else "Unknown",
-                    "category": dw.widget.category if dw.widget else "Unknown",
-                    "activity_data": dw.activity_data
+                    "date": row["date"],
+                    "widget_title": row["widget_title"],
+                    "category": row["category"],
+                    "activity_data": row["activity_data"]
                 }
-                for dw in daily_widgets
+                for row in rows
+                if not category_list or row["category"] in category_list
             ]
         except Exception as e:
             logger.error(f"Failed to fetch activity log: {e}")
             return []
     
-    async def fetch_task_details(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+    async def fetch_task_details(self, payload: Dict[str, Any], uow: Optional[UnitOfWork] = None) -> Dict[str, Any]:
         """Fetch detailed information about a specific task."""
         try:
             if not self._current_user_id:
@@ -153,30 +107,12 @@ class AIDatabaseService:
             if not task_title:
                 return {}
             
-            stmt = select(DashboardWidgetDetails).where(
-                and_(
-                    DashboardWidgetDetails.user_id == self._current_user_id,
-                    DashboardWidgetDetails.title == task_title,
-                    DashboardWidgetDetails.delete_flag == False
-                )
-            )
-            result = await self.db_session.execute(stmt)
-            widget = result.scalar_one_or_none()
-            
-            if widget:
-                return {
-                    "id": widget.id,
-                    "title": widget.title,
-                    "category": widget.category,
-                    "widget_type": widget.widget_type,
-                    "widget_config": widget.widget_config
-                }
-            return {}
+            return await ai_reference_data.task_details(self._current_user_id, task_title, uow)
         except Exception as e:
             logger.error(f"Failed to fetch task details: {e}")
             return {}
     
-    async def fetch_task_activity(self, payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+    async def fetch_task_activity(self, payload: Dict[str, Any], uow: Optional[UnitOfWork] = None) -> List[Dict[str, Any]]:
         """Fetch activity data for a specific task."""
         try:
             if not self._current_user_id:
@@ -190,37 +126,19 @@ class AIDatabaseService:
                 return []
             
             # Calculate date range
-            end_date = date.today()
             if date_period == 'today':
-                start_date = end_date
+                days = 0
             elif date_period == 'week':
-                start_date = end_date - timedelta(days=7)
+                days = 7
             else:
-                start_date = end_date - timedelta(days=30)
-            
-            stmt = select(DailyWidget).join(DashboardWidgetDetails).where(
-                and_(
-                    DashboardWidgetDetails.user_id == self._current_user_id,
-                    DashboardWidgetDetails.title == task_title,
-                    DailyWidget.date >= start_date,
-                    DailyWidget.date <= end_date
-                )
-            )
-            result = await self.db_session.execute(stmt)
-            daily_widgets = result.scalars().all()
+                days = 30
             
-            return [
-                {
-                    "date": dw.date.isoformat(),
-                    "activity_data": dw.activity_data
-                }
-                for dw in daily_widgets
-            ]
+            return await ai_reference_data.task_activity(self._current_user_id, task_title, days, uow)
         except Exception as e:
             logger.error(f"Failed to fetch task activity: {e}")
             return []
     
-    async def fetch_user_reference_data(self, user_id: str = None) -> Dict[str, Any]:
+    async def fetch_user_reference_data(self, user_id: str = None, uow: Optional[UnitOfWork] = None) -> Dict[str, Any]:
         """Fetch user-specific reference data from database."""
         try:
             # Use provided user_id or fall back to current user ID
@@ -230,55 +148,31 @@ class AIDatabaseService:
                 logger.warning("No user ID available for database operation")
                 return {}
             
-            # Get all user task names
-            stmt = select(DashboardWidgetDetails.title).where(
-                and_(
-                    DashboardWidgetDetails.user_id == target_user_id,
-                    DashboardWidgetDetails.delete_flag == False,
-                    DashboardWidgetDetails.widget_type.notin_(['weatherWidget', 'calendar', 'yearCalendar', 'allSchedules', 'simpleClock', 'notes', 'pillarsGraph', 'aiChat', 'habitTracker'])
-                )
-            )
-            result = await self.db_session.execute(stmt)
-            task_names = [row[0] for row in result.fetchall()]
-            
-            # Get user categories
-            stmt = select(DashboardWidgetDetails.category).where(
-                and_(
-                    DashboardWidgetDetails.user_id == target_user_id,
-                    DashboardWidgetDetails.delete_flag == False
-                )
-            )
-            result = await self.db_session.execute(stmt)
-            user_categories = list(set([row[0] for row in result.fetchall() if row[0]]))
-            
+            # All user task names
             return {
-                "user_tasks": task_names
+                "user_tasks": await ai_reference_data.task_titles(target_user_id, uow)
             }
             
         except Exception as e:
             logger.error(f"Failed to fetch user reference data: {e}")
             return {}
     
-    async def fetch_data_by_key(self, fetch_key: str, fetch_payload: Dict[str, Any]) -> Any:
+    async def fetch_data_by_key(self, fetch_key: str, fetch_payload: Dict[str, Any], uow: Optional[UnitOfWork] = None) -> Any:
         """Fetch data from database based on fetch key and payload."""
         try:
             if fetch_key == "all_task_list":
-                return await self.fetch_all_task_list(fetch_payload)
+                return await self.fetch_all_task_list(fetch_payload, uow)
             elif fetch_key == "today_list":
-                return await self.fetch_today_list(fetch_payload)
+                return await self.fetch_today_list(fetch_payload, uow)
             elif fetch_key == "activity_log":
-                return await self.fetch_activity_log(fetch_payload)
+                return await self.fetch_activity_log(fetch_payload, uow)
             elif fetch_key == "task_details":
-                return await self.fetch_task_details(fetch_payload)
+                return await self.fetch_task_details(fetch_payload, uow)
             elif fetch_key == "task_activity":
-                return await self.fetch_task_activity(fetch_payload)
+                return await self.fetch_task_activity(fetch_payload, uow)
             else:
                 logger.warning(f"Unknown fetch key: {fetch_key}")
                 return None
         except Exception as e:
             logger.error(f"Failed to fetch data by key {fetch_key}: {e}")
-            return None
-    
-    async def get_session(self) -> AsyncSession:
-        """Get the current database session."""
-        return self.db_session 
\ No newline at end of file
+            return None 
\ No newline at end of file
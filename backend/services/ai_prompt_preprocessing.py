@@ -1,15 +1,28 @@
 """
 AI Prompt Preprocessing Service
 Collects data from multiple sources and compiles it into comprehensive AI prompts.
+
+The static part of the prompt (system prompt, intent table, examples) never
+changes between turns. It is compiled once per process into an immutable
+StaticPromptPrefix that the orchestrator sends as a stable leading message, so
+provider-side prompt caching can reuse it; per turn only the dynamic blocks
+(reference data, variables and their fetched data, intent, conversation)
+are assembled.
 """
 
+import time
+import asyncio
+import hashlib
 import logging
 import pprint
-import yaml
-from typing import Dict, Any
-from pathlib import Path
-from sqlalchemy.ext.asyncio import AsyncSession
+from dataclasses import dataclass
+from typing import Dict, Any, Optional, Tuple
 
+from config import settings
+from db.unit_of_work import UnitOfWork
+from ai_engine.models.tokenizer import truncate_to_tokens
+from services.ai_registry import AIConfig, get_ai_config
+from services.conversation_window import conversation_window
 from utils.variable_utils import VariableUtils
 from utils.data_fetch_utils import DataFetchUtils
 from utils.static_content_utils import StaticContentUtils
@@ -19,66 +32,76 @@ from utils.conversation_utils import ConversationUtils
 
 logger = logging.getLogger(__name__)
 
+@dataclass(frozen=True)
+class StaticPromptPrefix:
+    """The per-process constant head of every prompt."""
+    text: str
+    digest: str  # sha256 of text; changes only when the prompt files or config change
+
+_static_prefix: Optional[StaticPromptPrefix] = None
+
+def get_static_prompt_prefix() -> StaticPromptPrefix:
+    """The static prompt prefix, compiled on first use (warmed at startup)."""
+    global _static_prefix
+    if _static_prefix is None:
+        _static_prefix = AIPromptPreprocessing().compile_static_prefix()
+        logger.info(f"Compiled static prompt prefix ({len(_static_prefix.text)} chars, {_static_prefix.digest[:12]})")
+    return _static_prefix
+
 class AIPromptPreprocessing:
     """Service for collecting and compiling AI prompt data from multiple sources."""
     
-    def __init__(self):
-        self.variable_config_path = "variable_config.yaml"
-        self.variable_config = self._load_variable_config()
+    def __init__(self, config: Optional[AIConfig] = None):
+        # Config files are parsed once per process (see ai_registry)
+        config = config or get_ai_config()
+        self.variable_config = config.variable_config
         
         # Initialize utility classes with defensive programming
         try:
             self.variable_utils = VariableUtils(self.variable_config)
             self.data_fetch_utils = DataFetchUtils()
-            self.static_content_utils = StaticContentUtils(self.variable_config_path)
+            self.static_content_utils = StaticContentUtils(config)
             self.intent_config_utils = IntentConfigUtils(self.variable_config)
-            self.context_utils = ContextUtils(self.variable_config)
+            self.context_utils = ContextUtils(self.variable_config, config.intent_variables)
             self.conversation_utils = ConversationUtils()
         except Exception as e:
             logger.error(f"Failed to initialize utility classes: {e}")
             # Create fallback instances with empty configs
             self.variable_utils = VariableUtils({})
             self.data_fetch_utils = DataFetchUtils()
-            self.static_content_utils = StaticContentUtils("variable_config.yaml")
+            self.static_content_utils = StaticContentUtils(config)
             self.intent_config_utils = IntentConfigUtils({})
             self.context_utils = ContextUtils({})
             self.conversation_utils = ConversationUtils()
     
-    def _load_variable_config(self) -> Dict[str, Any]:
-        """Load variable configuration from YAML file."""
-        try:
-            # Ensure variable_config_path is a string
-            if not isinstance(self.variable_config_path, str):
-                logger.error(f"Invalid variable_config_path type: {type(self.variable_config_path)}, expected string")
-                return {}
-            
-            # Construct path more robustly
-            current_file = Path(__file__)
-            backend_dir = current_file.parent.parent
-            config_file = backend_dir / self.variable_config_path
-            
-            logger.info(f"Loading config from: {config_file}")
-            
-            if not config_file.exists():
-                logger.error(f"Config file not found: {config_file}")
-                return {}
-                
-            with open(config_file, 'r') as f:
-                config = yaml.safe_load(f)
-                logger.info(f"Successfully loaded config with {len(config) if config else 0} top-level keys")
-                return config or {}
-        except Exception as e:
-            logger.error(f"Failed to load variable config: {e}")
-            logger.error(f"variable_config_path: {self.variable_config_path}, type: {type(self.variable_config_path)}")
-            return {}
-    
-    async def compile_prompt_string(self, context: Any, db_session: AsyncSession) -> str:
+    def compile_static_prefix(self) -> StaticPromptPrefix:
+        """Build the static prompt prefix: system prompt, intent table and examples."""
+        prompt_parts = []
+        system_prompt = self.static_content_utils.get_system_prompt()
+        if system_prompt:
+            prompt_parts.append(system_prompt)
+        prompt_parts.append(self.intent_config_utils.format_intent_config(
+            self.intent_config_utils.get_intent_configuration()
+        ))
+        examples_prompt = self.static_content_utils.get_examples_prompt()
+        if examples_prompt:
+            prompt_parts.append(examples_prompt)
+        text = "\n\n".join(prompt_parts)
+        return StaticPromptPrefix(text=text, digest=hashlib.sha256(text.encode("utf-8")).hexdigest())
+
+    @property
+    def static_prefix(self) -> StaticPromptPrefix:
+        """The process-wide static prompt prefix."""
+        return get_static_prompt_prefix()
+
+    async def compile_prompt_string(self, context: Any, uow: Optional[UnitOfWork] = None) -> str:
         """
-        Compile the collected data into a single input prompt string.
+        Compile the per-turn (dynamic) prompt blocks into a single string.
+        The static prefix is not included; send static_prefix.text before it.
         
         Args:
             context: Context object containing session data
-            db_session: Database session object
+            uow: The turn's unit of work, for steps that need a database session
             
         Returns:
             Formatted prompt string ready for AI
@@ -92,41 +115,41 @@ class AIPromptPreprocessing:
                 logger.info(f"user_chats length: {len(context.user_chats) if context.user_chats else 0}")
                 logger.info(f"user_chats content: {context.user_chats}")
             
-            prompt_data = await self.compile_ai_prompt(context=context, db_session=db_session)
+            prompt_data = await self.compile_ai_prompt(context=context, uow=uow)
 
             # New prompt structure as requested - only include sections with data
+            # (system prompt, intent table and examples live in the static prefix)
             prompt_parts = []
-            
-            # System prompt is always included
-            if prompt_data.get('system_prompt'):
-                prompt_parts.append(prompt_data.get('system_prompt'))
-            
-            # Intent configuration - only add if no intent is detected in context
-            intent_config = prompt_data.get('intent_config', {})
             current_intent = getattr(context, 'current_intent', 'unknown')
-            # if intent_config and (not current_intent or current_intent == 'unknown'):
-            prompt_parts.append(f"{self.intent_config_utils.format_intent_config(intent_config)}")
-            
-            # System prompt is always included
-            if prompt_data.get('examples_prompt'):
-                prompt_parts.append(prompt_data.get('examples_prompt'))
             
+            # Every section is held to its token budget (see config.py)
             # Reference data
             reference_data = prompt_data.get('reference_data', {})
             if reference_data:
-                prompt_parts.append(f"{self.static_content_utils.format_reference_data(reference_data)}")
+                formatted_reference = self.static_content_utils.format_reference_data(reference_data)
+                prompt_parts.append(truncate_to_tokens(formatted_reference, settings.PROMPT_REFERENCE_TOKEN_BUDGET))
             
-            # Collected variables
+            # Collected and missing variables
+            variable_parts = []
             collected_vars = prompt_data.get('collected_variables', {})
             if collected_vars:
                 formatted_collected = self.variable_utils.format_collected_variables(collected_vars)
                 if formatted_collected:
-                    prompt_parts.append(f"{formatted_collected}")
+                    variable_parts.append(f"{formatted_collected}")
                     
-            # Missing variables
             missing_vars = prompt_data.get('missing_variables', {})
             if missing_vars:
-                prompt_parts.append(f"{self.variable_utils.format_missing_variables(missing_vars)}")
+                variable_parts.append(f"{self.variable_utils.format_missing_variables(missing_vars)}")
+            if variable_parts:
+                prompt_parts.append(truncate_to_tokens("\n\n".join(variable_parts), settings.PROMPT_VARIABLES_TOKEN_BUDGET))
+            
+            # Data fetched for the missing and collected variables
+            formatted_fetched = self.data_fetch_utils.format_fetched_data(
+                prompt_data.get('intent_specific_data', {}),
+                prompt_data.get('variable_specific_data', {}),
+            )
+            if formatted_fetched:
+                prompt_parts.append(truncate_to_tokens(formatted_fetched, settings.PROMPT_FETCH_DATA_TOKEN_BUDGET))
             
             # Intent text
             intent_text = current_intent if current_intent and current_intent != 'unknown' else None
@@ -147,10 +170,12 @@ class AIPromptPreprocessing:
             else:
                 prompt_parts.append(f"Intent has not been detected yet. Try to infer from conversation.")
             
-            # Conversation history - always included since user_chats will never be empty
+            # Conversation history - always included since user_chats will never be empty.
+            # Older turns beyond the history budget are represented by the rolling summary
             conversation_history = prompt_data.get('conversation_history', [])
             if conversation_history:
-                formatted_history = self.conversation_utils.format_conversation_history(conversation_history)
+                summary, recent_history = conversation_window.select(context, conversation_history)
+                formatted_history = self.conversation_utils.format_conversation_history(recent_history, summary)
                 prompt_parts.append(f"{formatted_history}")
                 
                 # Add instruction to check conversation history for repetitive responses
@@ -169,15 +194,23 @@ class AIPromptPreprocessing:
             if hasattr(context, 'user_chats'):
                 logger.error(f"user_chats type: {type(context.user_chats)}")
                 logger.error(f"user_chats content: {context.user_chats}")
-            return prompt_data.get('system_prompt', 'Error compiling prompt')
+            return 'Error compiling prompt'
     
-    async def compile_ai_prompt(self, context: Any, db_session: AsyncSession) -> Dict[str, Any]:
+    @staticmethod
+    async def _timed(awaitable) -> Tuple[Any, float]:
+        """Result of awaitable and how long it took (ms)."""
+        started = time.perf_counter()
+        result = await awaitable
+        return result, (time.perf_counter() - started) * 1000
+    
+    async def compile_ai_prompt(self, context: Any, uow: Optional[UnitOfWork] = None) -> Dict[str, Any]:
         """
         Main function to compile AI prompt from multiple data sources.
         
         Args:
             context: Context object containing session data
-            db_session: Database session object
+            uow: The turn's unit of work; reference data and the fetch plan are
+                read in its read-only sessions
             
         Returns:
             Dictionary with all prompt data blocks
@@ -190,18 +223,31 @@ class AIPromptPreprocessing:
             if conversation_history:
                 logger.info(f"First message: {conversation_history[0] if len(conversation_history) > 0 else 'None'}")
             
+            # Reference data and the deduplicated fetch plan run concurrently
+            started = time.perf_counter()
+            reference_data, fetch_data = await asyncio.gather(
+                self._timed(self.static_content_utils.get_reference_data(context, uow)),
+                self.data_fetch_utils.get_fetch_data(context, self.variable_config, uow),
+            )
+            reference_data, reference_ms = reference_data
+            fetch_trace = [{"fetch_key": "reference_data", "ms": round(reference_ms, 2)}] + fetch_data["fetch_trace"]
+            
             prompt_data = {
-                "system_prompt": self.static_content_utils.get_system_prompt(),
-                "intent_config": self.intent_config_utils.get_intent_configuration(),
-                "examples_prompt": self.static_content_utils.get_examples_prompt(),
                 "conversation_history": conversation_history,
-                "reference_data": await self.static_content_utils.get_reference_data(context),
+                "reference_data": reference_data,
                 "collected_variables": self.variable_utils.get_collected_variables(context),
                 "missing_variables": self.variable_utils.get_missing_variables(context),
-                "intent_specific_data": await self.data_fetch_utils.get_intent_specific_data(context, self.variable_config),
-                "variable_specific_data": await self.data_fetch_utils.get_variable_specific_data(context, self.variable_config)
+                "intent_specific_data": fetch_data["intent_specific_data"],
+                "variable_specific_data": fetch_data["variable_specific_data"],
+                "fetch_trace": fetch_trace
             }
-            logger.info("Successfully compiled AI prompt data")
+            logger.info(
+                f"Successfully compiled AI prompt data in {(time.perf_counter() - started) * 1000:.1f}ms: "
+                + ", ".join(
+                    f"{entry['fetch_key']}{'(' + ','.join(entry['variables']) + ')' if entry.get('variables') else ''}={entry['ms']}ms"
+                    for entry in fetch_trace
+                )
+            )
             return prompt_data
             
         except Exception as e:
@@ -212,6 +258,5 @@ class AIPromptPreprocessing:
                 logger.error(f"user_chats type: {type(context.user_chats)}")
                 logger.error(f"user_chats content: {context.user_chats}")
             return {
-                "error": f"Failed to compile prompt: {str(e)}",
-                "system_prompt": self.static_content_utils.get_system_prompt()
+                "error": f"Failed to compile prompt: {str(e)}"
             } 
\ No newline at end of file
@@ -0,0 +1,332 @@
+"""
+AI Reference Data - Per-user in-memory read model of what chat prompts read.
+
+Every chat turn needs the user's task titles, and the AI's fetch keys
+(all_task_list, today_list, activity_log, task_details, task_activity) read
+the same widgets and recent daily widgets again and again. This read model
+holds them per user, shared by every connection:
+- widgets:  live widget definitions (+ task titles and categories derived from them)
+- activity: daily widgets of the last AI_REFERENCE_ACTIVITY_DAYS days, up to today
+
+Each part is loaded lazily on first use and kept until a write invalidates
+it. DataVersionService stages the scopes it bumps ("widgets" or an ISO date)
+on the writing session; once that session commits, the matching parts are
+dropped, so a chat turn needs no DB queries until the user changes something.
+A load that overlaps a committed write is served but not kept. Loads made for
+a chat turn pass the turn's UnitOfWork and run as one of its read-only steps.
+"""
+
+# ============================================================================
+# IMPORTS
+# ============================================================================
+import time
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import select, and_, event
+from sqlalchemy.orm import Session
+
+from config import settings
+from db.session import AsyncReadSessionLocal
+from db.unit_of_work import UnitOfWork
+from models.dashboard_widget_details import DashboardWidgetDetails
+from models.daily_widget import DailyWidget
+
+# ============================================================================
+# CONSTANTS
+# ============================================================================
+logger = logging.getLogger(__name__)
+
+WIDGETS_SCOPE = "widgets"
+
+# Session.info key holding (user_id, scopes) pairs waiting for commit
+PENDING_INVALIDATIONS_KEY = "ai_reference_invalidations"
+
+# Dashboard widgets that are not tasks the user can talk about
+NON_TASK_WIDGET_TYPES = (
+    'weatherWidget', 'calendar', 'yearCalendar', 'allSchedules', 'simpleClock',
+    'notes', 'pillarsGraph', 'aiChat', 'habitTracker',
+)
+
+# ============================================================================
+# READ MODEL
+# ============================================================================
+def _read_session(uow: Optional[UnitOfWork]):
+    """A read-only step of uow, or a standalone reader session without one."""
+    return uow.session(read_only=True) if uow is not None else AsyncReadSessionLocal()
+
+@dataclass
+class _UserReferenceData:
+    """One user's cached parts (None = not loaded)."""
+    generation: int = 0  # bumped by every invalidation; a load started earlier is not kept
+    widgets: Optional[List[Dict[str, Any]]] = None
+    task_titles: Optional[List[str]] = None
+    categories: Optional[List[str]] = None
+    activity: Optional[List[Dict[str, Any]]] = None
+    activity_day: Optional[date] = None  # the "today" the activity rows end at
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+class AIReferenceDataCache:
+    """Lazily loaded, write-invalidated reference data per user. Returned lists are shared: read only."""
+
+    def __init__(self, activity_days: int = settings.AI_REFERENCE_ACTIVITY_DAYS):
+        self.activity_days = activity_days
+        self._users: Dict[str, _UserReferenceData] = {}
+        self.metrics: Dict[str, Any] = {
+            "hits": 0,
+            "misses": 0,
+            "loads_discarded": 0,
+            "invalidations": 0,
+            "load_ms": 0.0,
+        }
+
+    def _entry(self, user_id: str) -> _UserReferenceData:
+        entry = self._users.get(user_id)
+        if entry is None:
+            entry = self._users[user_id] = _UserReferenceData()
+        return entry
+
+    # ------------------------------------------------------------------------
+    # Widgets part
+    # ------------------------------------------------------------------------
+    async def _widgets(self, user_id: str, uow: Optional[UnitOfWork] = None) -> _UserReferenceData:
+        """Entry with the widgets part loaded."""
+        entry = self._entry(user_id)
+        if entry.widgets is not None:
+            self.metrics["hits"] += 1
+            return entry
+        async with entry.lock:
+            if entry.widgets is not None:
+                self.metrics["hits"] += 1
+                return entry
+            self.metrics["misses"] += 1
+            generation = entry.generation
+            started = time.perf_counter()
+            async with _read_session(uow) as db:
+                stmt = select(
+                    DashboardWidgetDetails.id,
+                    DashboardWidgetDetails.title,
+                    DashboardWidgetDetails.category,
+                    DashboardWidgetDetails.widget_type,
+                    DashboardWidgetDetails.widget_config,
+                ).where(
+                    and_(
+                        DashboardWidgetDetails.user_id == user_id,
+                        DashboardWidgetDetails.delete_flag == False
+                    )
+                )
+                rows = (await db.execute(stmt)).all()
+            self.metrics["load_ms"] += (time.perf_counter() - started) * 1000
+
+            widgets = [
+                {
+                    "id": row.id,
+                    "title": row.title,
+                    "category": row.category,
+                    "widget_type": row.widget_type,
+                    "widget_config": row.widget_config,
+                }
+                for row in rows
+            ]
+            loaded = _UserReferenceData(
+                widgets=widgets,
+                task_titles=[w["title"] for w in widgets if w["widget_type"] not in NON_TASK_WIDGET_TYPES],
+                categories=sorted({w["category"] for w in widgets if w["category"]}),
+            )
+            if entry.generation != generation:
+                self.metrics["loads_discarded"] += 1
+                return loaded
+            entry.widgets, entry.task_titles, entry.categories = loaded.widgets, loaded.task_titles, loaded.categories
+            return entry
+
+    async def task_titles(self, user_id: str, uow: Optional[UnitOfWork] = None) -> List[str]:
+        """Titles of the user's live task widgets."""
+        return (await self._widgets(user_id, uow)).task_titles
+
+    async def categories(self, user_id: str, uow: Optional[UnitOfWork] = None) -> List[str]:
+        """Distinct categories of the user's live widgets."""
+        return (await self._widgets(user_id, uow)).categories
+
+    async def all_task_list(self, user_id: str, uow: Optional[UnitOfWork] = None) -> List[Dict[str, Any]]:
+        """Every live widget: id, title, category, widget_type."""
+        widgets = (await self._widgets(user_id, uow)).widgets
+        return [
+            {"id": w["id"], "title": w["title"], "category": w["category"], "widget_type": w["widget_type"]}
+            for w in widgets
+        ]
+
+    async def task_details(self, user_id: str, task_title: str, uow: Optional[UnitOfWork] = None) -> Dict[str, Any]:
+        """The live widget titled task_title, with its config ({} if none)."""
+        for widget in (await self._widgets(user_id, uow)).widgets:
+            if widget["title"] == task_title:
+                return dict(widget)
+        return {}
+
+    # ------------------------------------------------------------------------
+    # Activity part
+    # ------------------------------------------------------------------------
+    async def _activity(self, user_id: str, uow: Optional[UnitOfWork] = None) -> List[Dict[str, Any]]:
+        """Daily widget rows of the activity window ending today."""
+        entry = self._entry(user_id)
+        today = date.today()
+        if entry.activity is not None and entry.activity_day == today:
+            self.metrics["hits"] += 1
+            return entry.activity
+        async with entry.lock:
+            if entry.activity is not None and entry.activity_day == today:
+                self.metrics["hits"] += 1
+                return entry.activity
+            self.metrics["misses"] += 1
+            generation = entry.generation
+            started = time.perf_counter()
+            activity = await self.query_activity(user_id, today - timedelta(days=self.activity_days), today, uow)
+            self.metrics["load_ms"] += (time.perf_counter() - started) * 1000
+            if entry.generation != generation:
+                self.metrics["loads_discarded"] += 1
+                return activity
+            entry.activity, entry.activity_day = activity, today
+            return activity
+
+    async def query_activity(
+        self, user_id: str, start_date: date, end_date: date, uow: Optional[UnitOfWork] = None
+    ) -> List[Dict[str, Any]]:
+        """Live daily widgets of user_id in [start_date, end_date] with their widget's title and category (uncached)."""
+        async with _read_session(uow) as db:
+            stmt = select(
+                DailyWidget.date,
+                DailyWidget.widget_id,
+                DailyWidget.activity_data,
+                DashboardWidgetDetails.title,
+                DashboardWidgetDetails.category,
+            ).select_from(DailyWidget).join(
+                DashboardWidgetDetails, DashboardWidgetDetails.id == DailyWidget.widget_id
+            ).where(
+                and_(
+                    DashboardWidgetDetails.user_id == user_id,
+                    DailyWidget.delete_flag == False,
+                    DailyWidget.date >= start_date,
+                    DailyWidget.date <= end_date
+                )
+            )
+            rows = (await db.execute(stmt)).all()
+        return [
+            {
+                "date": row.date.isoformat(),
+                "widget_id": row.widget_id,
+                "widget_title": row.title,
+                "category": row.category,
+                "activity_data": row.activity_data,
+            }
+            for row in rows
+        ]
+
+    def covers_days(self, days: int) -> bool:
+        """Whether an activity query over the last days days can be answered from memory."""
+        return days <= self.activity_days
+
+    async def activity_log(
+        self, user_id: str, days: int, category_list: Optional[List[str]] = None, uow: Optional[UnitOfWork] = None
+    ) -> List[Dict[str, Any]]:
+        """Activity of the last days days (within the window), optionally for some categories."""
+        start = (date.today() - timedelta(days=days)).isoformat()
+        return [
+            {
+                "date": row["date"],
+                "widget_title": row["widget_title"],
+                "category": row["category"],
+                "activity_data": row["activity_data"],
+            }
+            for row in await self._activity(user_id, uow)
+            if row["date"] >= start and (not category_list or row["category"] in category_list)
+        ]
+
+    async def today_list(self, user_id: str, uow: Optional[UnitOfWork] = None) -> List[Dict[str, Any]]:
+        """Today's daily widgets: title, date and activity."""
+        today = date.today().isoformat()
+        return [
+            {"widget_title": row["widget_title"], "date": row["date"], "activity_data": row["activity_data"]}
+            for row in await self._activity(user_id, uow)
+            if row["date"] == today
+        ]
+
+    async def task_activity(
+        self, user_id: str, task_title: str, days: int, uow: Optional[UnitOfWork] = None
+    ) -> List[Dict[str, Any]]:
+        """Activity of one task over the last days days (within the window)."""
+        start = (date.today() - timedelta(days=days)).isoformat()
+        return [
+            {"date": row["date"], "activity_data": row["activity_data"]}
+            for row in await self._activity(user_id, uow)
+            if row["widget_title"] == task_title and row["date"] >= start
+        ]
+
+    # ------------------------------------------------------------------------
+    # Invalidation / stats
+    # ------------------------------------------------------------------------
+    def invalidate(self, user_id: str, scopes: Iterable[str]) -> None:
+        """Drop the parts that depend on the bumped scopes."""
+        entry = self._users.get(user_id)
+        if entry is None:
+            return
+        scopes = set(scopes)
+        if not scopes:
+            return
+        entry.generation += 1
+        self.metrics["invalidations"] += 1
+        if WIDGETS_SCOPE in scopes:
+            # Activity rows carry widget titles and categories too
+            entry.widgets = entry.task_titles = entry.categories = None
+            entry.activity = None
+            return
+        if entry.activity is not None and entry.activity_day is not None:
+            window_start = (entry.activity_day - timedelta(days=self.activity_days)).isoformat()
+            window_end = entry.activity_day.isoformat()
+            if any(window_start <= scope <= window_end for scope in scopes):
+                entry.activity = None
+
+    def clear(self) -> None:
+        """Forget every user's data."""
+        for entry in self._users.values():
+            entry.generation += 1
+        self._users.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters, load time and what is currently held."""
+        lookups = self.metrics["hits"] + self.metrics["misses"]
+        return {
+            "users": len(self._users),
+            "widgets_loaded": sum(1 for e in self._users.values() if e.widgets is not None),
+            "activity_loaded": sum(1 for e in self._users.values() if e.activity is not None),
+            "activity_days": self.activity_days,
+            "hit_rate": round(self.metrics["hits"] / lookups, 4) if lookups else 0.0,
+            **self.metrics,
+            "load_ms": round(self.metrics["load_ms"], 2),
+        }
+
+# Global read model shared by every connection
+ai_reference_data = AIReferenceDataCache()
+
+# ============================================================================
+# TRANSACTION HOOKS
+# ============================================================================
+def stage_invalidation(db, user_id: str, scopes: Iterable[str]) -> None:
+    """Queue scopes of user_id for invalidation when db commits."""
+    pending: List = db.info.setdefault(PENDING_INVALIDATIONS_KEY, [])
+    pending.append((user_id, list(scopes)))
+
+@event.listens_for(Session, "after_commit")
+def _apply_pending_invalidations(session: Session) -> None:
+    """Invalidate what the transaction that just committed changed."""
+    for user_id, scopes in session.info.pop(PENDING_INVALIDATIONS_KEY, ()):
+        try:
+            ai_reference_data.invalidate(user_id, scopes)
+        except Exception as e:
+            logger.error(f"Failed to invalidate AI reference data for {user_id}: {e}")
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_invalidations(session: Session) -> None:
+    """Rolled-back writes changed nothing."""
+    session.info.pop(PENDING_INVALIDATIONS_KEY, None)
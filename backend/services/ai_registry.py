@@ -0,0 +1,176 @@
+"""
+AI Registry - Process-wide, read-only AI configuration and shared services.
+
+variable_config.yaml, system_prompt.txt and examples_prompt.txt are read and
+parsed once per process, together with the intent -> variables index every
+turn looks up. The stateless services built on them (LLM client, validation
+engine, context service, prompt preprocessing) and the connection context
+store are created once as well and shared by every websocket connection,
+whose own state is just its conversation context.
+
+init_ai_registry() builds everything during application startup;
+get_ai_registry() returns it (building it on first use outside the app).
+"""
+
+# ============================================================================
+# IMPORTS
+# ============================================================================
+import time
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional
+
+import yaml
+
+# ============================================================================
+# CONSTANTS
+# ============================================================================
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = Path(__file__).parent.parent
+VARIABLE_CONFIG_FILE = BACKEND_DIR / "variable_config.yaml"
+SYSTEM_PROMPT_FILE = BACKEND_DIR / "system_prompt.txt"
+EXAMPLES_PROMPT_FILE = BACKEND_DIR / "examples_prompt.txt"
+
+DEFAULT_PROMPT = "You are an AI assistant that helps with task management and productivity."
+
+# ============================================================================
+# CONFIG
+# ============================================================================
+@dataclass(frozen=True)
+class AIConfig:
+    """Parsed AI configuration; mappings are read-only views."""
+    variable_config: Mapping[str, Any]
+    system_prompt: str
+    examples_prompt: str
+    intent_variables: Mapping[str, Mapping[str, Mapping[str, Any]]]  # intent -> {var_name: var_config}
+
+    def variables_for_intent(self, intent_type: str) -> Mapping[str, Mapping[str, Any]]:
+        """Variables of intent_type, in config order (empty for unknown intents)."""
+        return self.intent_variables.get(intent_type, MappingProxyType({}))
+
+def _load_variable_config() -> Dict[str, Any]:
+    """variable_config.yaml parsed ({} if missing or invalid)."""
+    try:
+        with open(VARIABLE_CONFIG_FILE, 'r', encoding='utf-8') as f:
+            return yaml.safe_load(f) or {}
+    except Exception as e:
+        logger.error(f"Failed to load variable config {VARIABLE_CONFIG_FILE}: {e}")
+        return {}
+
+def _load_prompt(path: Path) -> str:
+    """Stripped text of a prompt file (DEFAULT_PROMPT if unreadable)."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read().strip()
+    except Exception as e:
+        logger.error(f"Failed to load prompt {path}: {e}")
+        return DEFAULT_PROMPT
+
+def _freeze_variable_config(config: Dict[str, Any]) -> Mapping[str, Any]:
+    """Read-only view of config, its variables and each variable's definition."""
+    frozen = dict(config)
+    variables = config.get('variables')
+    if isinstance(variables, dict):
+        frozen['variables'] = MappingProxyType({
+            name: MappingProxyType(dict(var_config)) if isinstance(var_config, dict) else var_config
+            for name, var_config in variables.items()
+        })
+    return MappingProxyType(frozen)
+
+def index_intent_variables(variable_config: Mapping[str, Any]) -> Mapping[str, Mapping[str, Mapping[str, Any]]]:
+    """Group the variables of variable_config by their intent_type."""
+    index: Dict[str, Dict[str, Mapping[str, Any]]] = {}
+    for var_name, var_config in (variable_config.get('variables') or {}).items():
+        intent_type = var_config.get('intent_type') if hasattr(var_config, 'get') else None
+        if intent_type:
+            index.setdefault(intent_type, {})[var_name] = var_config
+    return MappingProxyType({intent: MappingProxyType(variables) for intent, variables in index.items()})
+
+def load_ai_config() -> AIConfig:
+    """Read and parse the AI configuration files."""
+    variable_config = _freeze_variable_config(_load_variable_config())
+    return AIConfig(
+        variable_config=variable_config,
+        system_prompt=_load_prompt(SYSTEM_PROMPT_FILE),
+        examples_prompt=_load_prompt(EXAMPLES_PROMPT_FILE),
+        intent_variables=index_intent_variables(variable_config),
+    )
+
+_config: Optional[AIConfig] = None
+
+def get_ai_config() -> AIConfig:
+    """The process-wide AI configuration, loaded on first use."""
+    global _config
+    if _config is None:
+        _config = load_ai_config()
+        logger.info(
+            f"Loaded AI config: {len(_config.variable_config.get('variables') or {})} variables "
+            f"over {len(_config.intent_variables)} intents"
+        )
+    return _config
+
+# ============================================================================
+# REGISTRY
+# ============================================================================
+@dataclass(frozen=True)
+class AIRegistry:
+    """The AI configuration and the services shared by every connection."""
+    config: AIConfig
+    llm_client: Any  # LLMClient
+    validation_engine: Any  # ValidationEngine
+    context_service: Any  # ContextService
+    context_connection_manager: Any  # ContextConnectionManager
+    prompt_preprocessing: Any  # AIPromptPreprocessing
+
+    def summary(self) -> Dict[str, Any]:
+        """What the registry holds (for health checks)."""
+        return {
+            "variables": len(self.config.variable_config.get('variables') or {}),
+            "intents": sorted(self.config.intent_variables),
+            "model": self.llm_client.model,
+            "active_contexts": len(self.context_connection_manager.contexts),
+        }
+
+_registry: Optional[AIRegistry] = None
+_orchestrator: Any = None
+
+def init_ai_registry() -> AIRegistry:
+    """Build the registry if it does not exist yet (called at application startup)."""
+    global _registry
+    if _registry is not None:
+        return _registry
+
+    # Imported here: these modules read the config through get_ai_config()
+    from ai_engine.models.llm_client import LLMClient
+    from services.validation_engine import ValidationEngine
+    from services.context_service import ContextService
+    from services.context_connection_manager import context_store
+    from services.ai_prompt_preprocessing import AIPromptPreprocessing
+
+    started = time.perf_counter()
+    config = get_ai_config()
+    _registry = AIRegistry(
+        config=config,
+        llm_client=LLMClient(),
+        validation_engine=ValidationEngine(config),
+        context_service=ContextService(config),
+        context_connection_manager=context_store,
+        prompt_preprocessing=AIPromptPreprocessing(config),
+    )
+    logger.info(f"Initialized AI registry in {(time.perf_counter() - started) * 1000:.1f}ms")
+    return _registry
+
+def get_ai_registry() -> AIRegistry:
+    """The process-wide AI registry (built on first use if startup did not)."""
+    return _registry if _registry is not None else init_ai_registry()
+
+def get_ai_orchestrator() -> Any:
+    """The AIOrchestrator shared by every connection."""
+    global _orchestrator
+    if _orchestrator is None:
+        from orchestrators.ai_orchestrator import AIOrchestrator
+        _orchestrator = AIOrchestrator(get_ai_registry())
+    return _orchestrator
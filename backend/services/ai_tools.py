@@ -11,6 +11,8 @@ from datetime import date, datetime
 from models.dashboard_widget_details import DashboardWidgetDetails
 from models.daily_widget import DailyWidget
 from services.dashboard_widget_service import DashboardWidgetService
+from services.widget_completion_service import WidgetCompletionService
+from services.data_version_service import DataVersionService
 
 logger = logging.getLogger(__name__)
 
@@ -178,6 +180,11 @@ class EditingTool:
                 widget.widget_config["progress"] = edit_data["progress"]
                 updated = True
         
+        if updated:
+            await DataVersionService(self.db_session).bump_widgets(widget.user_id, change={
+                "type": "widget_updated",
+                "widget_id": widget.id,
+            })
         return updated
     
     async def _update_daily_widget(self, widget: DashboardWidgetDetails, edit_data: Dict[str, Any], user_id: str) -> Optional[DailyWidget]:
@@ -211,7 +218,9 @@ class EditingTool:
             daily_widget.activity_data = {}
         
         # Update based on widget type
+        changed_keys = []
         if widget.widget_type == "todo":
+            changed_keys.append("todo_activity")
             daily_widget.activity_data["todo_activity"] = {
                 "status": edit_data.get("status", "pending"),
                 "progress": edit_data.get("progress", 0),
@@ -219,18 +228,29 @@ class EditingTool:
                 "started_at": datetime.now() if edit_data.get("status") == "in_progress" else None
             }
         elif widget.widget_type == "single_item_tracker":
+            changed_keys.append("tracker_activity")
             daily_widget.activity_data["tracker_activity"] = {
                 "value": str(edit_data.get("tracking_value", "0")),
                 "time_added": datetime.now(),
                 "notes": edit_data.get("notes", "")
             }
         elif widget.widget_type == "alarm" and edit_data.get("snooze"):
+            changed_keys.append("alarm_activity")
             daily_widget.activity_data["alarm_activity"] = {
                 "snoozed_at": datetime.now(),
                 "snooze_count": daily_widget.activity_data.get("alarm_activity", {}).get("snooze_count", 0) + 1
             }
         
         daily_widget.updated_at = datetime.now()
+        # Keep the completion ledger in the same transaction as the edit
+        await WidgetCompletionService(self.db_session).record_daily_widget(daily_widget)
+        await self.db_session.flush()
+        await DataVersionService(self.db_session).bump_dates(widget.user_id, [today], change={
+            "type": "activity_updated",
+            "daily_widget_id": daily_widget.id,
+            "widget_id": widget.id,
+            "changed_keys": changed_keys,
+        })
         return daily_widget
 
 class FetchingTool:
@@ -1,16 +1,23 @@
 """
 AI WebSocket Manager
 Manages WebSocket connections for AI chat functionality.
+
+Outgoing messages go through each connection's SendQueue (ws_send_queue.py):
+the send_* methods only queue, and a writer task per connection sends.
+Frames use the wire format the client negotiated as a subprotocol
+(ws_protocol.py). The default is the original JSON protocol.
 """
 
-import json
 import logging
 import uuid
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, List
 from fastapi import WebSocket
 
-
+from services.ai_registry import get_ai_registry
+from services.ws_send_queue import SendQueue, send_queue_stats
+from services.ws_protocol import WireCodec, negotiate_subprotocol
+from services.chat_turns import ChatTurns
 
 logger = logging.getLogger(__name__)
 
@@ -19,54 +26,58 @@ class AIWebSocketManager:
     
     def __init__(self):
         self.active_connections: Dict[str, WebSocket] = {}
-        self.connection_contexts: Dict[str, Any] = {}
+        self.send_queues: Dict[str, SendQueue] = {}
     
     async def connect(self, websocket: WebSocket, connection_id: str):
-        """Accept a new WebSocket connection."""
-        await websocket.accept()
+        """Accept a new WebSocket connection in the wire format the client asked for."""
+        subprotocol = negotiate_subprotocol(
+            websocket.scope.get("subprotocols", []),
+            websocket.headers.get("sec-websocket-extensions", "")
+        )
+        await websocket.accept(subprotocol=subprotocol)
         self.active_connections[connection_id] = websocket
+        send_queue = SendQueue(
+            websocket, connection_id,
+            on_close=lambda: self.disconnect(connection_id),
+            codec=WireCodec(subprotocol)
+        )
+        self.send_queues[connection_id] = send_queue
+        send_queue.start()
         
-        # Create default context directly using context connection manager
-        # We'll create a basic context here and let the orchestrator handle it properly
-        from services.context_connection_manager import ContextConnectionManager
-        context_manager = ContextConnectionManager()
-        context = context_manager.get_context(connection_id)
-        
-        # Set a default user ID for the context
-        context.user_id = "user_001"
-        
-        self.connection_contexts[connection_id] = context
+        # The connection's only state: its conversation context, kept in the
+        # process-wide (bounded) context store the orchestrator also uses
+        self.get_context(connection_id)
         
-        logger.info(f"AI WebSocket connected: {connection_id}")
+        logger.info(f"AI WebSocket connected: {connection_id} ({send_queue.codec.name})")
     
     def disconnect(self, connection_id: str):
         """Remove a WebSocket connection."""
+        send_queue = self.send_queues.pop(connection_id, None)
+        if send_queue is not None:
+            send_queue.close()
         if connection_id in self.active_connections:
             del self.active_connections[connection_id]
-        if connection_id in self.connection_contexts:
-            del self.connection_contexts[connection_id]
+            get_ai_registry().context_connection_manager.disconnect_connection(connection_id)
         logger.info(f"AI WebSocket disconnected: {connection_id}")
     
     async def send_message(self, connection_id: str, message: Dict[str, Any]):
-        """Send a message to a specific WebSocket connection."""
-        if connection_id in self.active_connections:
-            try:
-                websocket = self.active_connections[connection_id]
-                await websocket.send_text(json.dumps(message))
-            except Exception as e:
-                logger.error(f"Error sending message to {connection_id}: {e}")
-                self.disconnect(connection_id)
+        """Queue a message for a specific WebSocket connection."""
+        send_queue = self.send_queues.get(connection_id)
+        if send_queue is not None:
+            send_queue.put_message(message)
     
     async def send_thinking_step(self, connection_id: str, step: str, details: str):
-        """Send a thinking step update to the client."""
-        message = {
-            "type": "thinking",
-            "step": step,
-            "details": details,
-            "timestamp": datetime.utcnow().isoformat()
-        }
-        await self.send_message(connection_id, message)
+        """Queue a thinking step update (replacing one the client has not been sent yet)."""
+        send_queue = self.send_queues.get(connection_id)
+        if send_queue is not None:
+            send_queue.put_thinking(step, details)
     
+    async def send_delta(self, connection_id: str, field: str, content: str):
+        """Queue a chunk of a response field that is still being generated."""
+        send_queue = self.send_queues.get(connection_id)
+        if send_queue is not None:
+            send_queue.put_delta(field, content)
+
     async def send_response(self, connection_id: str, response: Dict[str, Any]):
         """Send the final AI response to the client."""
         message = {
@@ -85,35 +96,92 @@ class AIWebSocketManager:
         }
         await self.send_message(connection_id, message)
     
+    def send_stats(self) -> Dict[str, Any]:
+        """Outbound queue counters and current depths."""
+        return send_queue_stats(self.send_queues)
+
     def get_context(self, connection_id: str) -> Any:
-        """Get the context for a specific connection."""
-        return self.connection_contexts.get(connection_id)
+        """Get the context for a specific connection (a fresh one if the store evicted it)."""
+        store = get_ai_registry().context_connection_manager
+        context = store.get_stored_context(connection_id)
+        if context is None:
+            context = store.get_context(connection_id)
+            # Set a default user ID for the context
+            context.user_id = "user_001"
+        return context
     
     def update_context(self, connection_id: str, context: Any) -> None:
         """Update the context for a specific connection."""
-        self.connection_contexts[connection_id] = context
+        get_ai_registry().context_connection_manager.store_context(connection_id, context)
 
     async def handle_session(self, websocket: WebSocket, connection_id: str, orchestrator: Any):
         """
         Handle a complete WebSocket session for AI chat.
         Includes message loop, error handling, and orchestrator interaction.
+        Messages are read while a turn runs; a new one supersedes or waits
+        for the turn in flight (see chat_turns.py).
         """
+
+        async def run_turn(user_message: str, conversation_history: List[Dict[str, str]]):
+            """One chat turn; cancelled if a newer message supersedes it."""
+            try:
+                # Define callback here to capture connection_id
+                async def websocket_callback(step: str, details: str):
+                    try:
+                        await self.send_thinking_step(connection_id, step, details)
+                    except Exception as e:
+                        logger.error(f"Error in websocket callback: {e}")
+
+                async def delta_callback(content: str):
+                    await self.send_delta(connection_id, "ai_response", content)
+
+                existing_context = self.get_context(connection_id)
+
+                if not existing_context:
+                    await self.send_error(connection_id, "Connection context not found")
+                    return
+
+                # Use orchestrator
+                response = await orchestrator.process_user_message(
+                    user_message=user_message,
+                    conversation_history=conversation_history,
+                    websocket_callback=websocket_callback,
+                    connection_id=connection_id,
+                    existing_context=existing_context,
+                    delta_callback=delta_callback
+                )
+                await self.send_response(connection_id, response)
+            except Exception as e:
+                logger.error(f"Error handling AI message: {e}")
+                await self.send_error(connection_id, f"Internal server error: {str(e)}")
+
+        async def turn_cancelled(reason: str):
+            await self.send_message(connection_id, {
+                "type": "turn_cancelled",
+                "reason": reason,
+                "timestamp": datetime.utcnow().isoformat()
+            })
+
+        turns = ChatTurns(connection_id, run_turn, turn_cancelled)
         try:
             await self.connect(websocket, connection_id)
+            codec = self.send_queues[connection_id].codec
             
             await self.send_message(connection_id, {
                 "type": "connection",
                 "connection_id": connection_id,
+                "protocol": codec.name,
                 "message": "Connected to Brainboard AI Service",
                 "timestamp": datetime.utcnow().isoformat()
             })
             
             await self.send_thinking_step(connection_id, "welcome", "AI service ready! Send me a message to get started.")
 
-            # Use websocket.iter_text() for cleaner WebSocket handling
-            async for message in websocket.iter_text():
+            # msgpack clients send binary frames; everyone else sends JSON text
+            messages = websocket.iter_bytes() if codec.binary else websocket.iter_text()
+            async for message in messages:
                 try:
-                    message_data = json.loads(message)
+                    message_data = codec.decode(message)
 
                     user_message = message_data.get("message", "")
                     conversation_history = message_data.get("conversation_history", [])
@@ -122,38 +190,17 @@ class AIWebSocketManager:
                         await self.send_error(connection_id, "No message provided")
                         continue
 
-                    # Define callback here to capture connection_id
-                    async def websocket_callback(step: str, details: str):
-                        try:
-                            await self.send_thinking_step(connection_id, step, details)
-                        except Exception as e:
-                            logger.error(f"Error in websocket callback: {e}")
+                    if not await turns.submit(user_message, conversation_history):
+                        await self.send_error(connection_id, "Too many messages waiting; try again shortly")
 
-                    existing_context = self.get_context(connection_id)
-                    
-                    if not existing_context:
-                        await self.send_error(connection_id, "Connection context not found")
-                        continue
-
-                    # Use orchestrator
-                    response = await orchestrator.process_user_message(
-                        user_message=user_message,
-                        conversation_history=conversation_history,
-                        websocket_callback=websocket_callback,
-                        connection_id=connection_id,
-                        existing_context=existing_context
-                    )
-                    await self.send_response(connection_id, response)
-
-                except json.JSONDecodeError:
-                    await self.send_error(connection_id, "Invalid JSON format")
+                except ValueError:
+                    await self.send_error(connection_id, f"Invalid {codec.format_name} format")
                 except Exception as e:
                     logger.error(f"Error handling AI message: {e}")
-                    try:
-                        await self.send_error(connection_id, f"Internal server error: {str(e)}")
-                    except:
-                        break
+                    await self.send_error(connection_id, f"Internal server error: {str(e)}")
         except Exception as e:
             logger.error(f"Error in WebSocket session: {e}")
             raise  # Re-raise to let caller handle disconnect logic if needed (e.g. logging)
- 
\ No newline at end of file
+        finally:
+            # Nobody is left to read the turn in flight: stop paying for it
+            await turns.close()
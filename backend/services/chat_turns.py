@@ -0,0 +1,137 @@
+"""
+Chat Turns - The in-flight chat turn of one AI websocket connection.
+
+Each user message is processed as a task, so the connection keeps reading
+while a turn runs. What a new message does to a turn still in flight
+depends on AI_TURN_POLICY:
+- merge (default): the running turn is cancelled and the new message
+  starts a turn of its own. The cancelled turn's user message stays in the
+  conversation, so the new reply answers both. A turn cancelled before it
+  began has its text prepended to the new message instead.
+- queue: messages wait (up to AI_TURN_QUEUE_SIZE) and run in order.
+
+Cancellation goes through the whole turn. The LLM call (streamed or not)
+is interrupted and gives its concurrency slot back. The turn's unit of
+work rolls back and closes its open session, and its task lookups are
+cancelled. The client gets a turn_cancelled frame telling it to discard
+that turn's partial text. A turn is awaited until it has cleaned up before
+the next one starts, so two turns never change the same context at once.
+"""
+
+# ============================================================================
+# IMPORTS
+# ============================================================================
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+from config import settings
+
+# ============================================================================
+# CONSTANTS
+# ============================================================================
+logger = logging.getLogger(__name__)
+
+TURN_POLICY_MERGE = "merge"
+TURN_POLICY_QUEUE = "queue"
+
+turn_metrics: Dict[str, int] = {
+    "started": 0,
+    "completed": 0,
+    "superseded": 0,    # cancelled by a newer message (merge)
+    "queued": 0,        # waited for the turn before them (queue)
+    "rejected": 0,      # queue full
+    "abandoned": 0,     # cancelled because the client left
+}
+
+# ============================================================================
+# CHAT TURNS
+# ============================================================================
+class ChatTurns:
+    """Runs the turns of one connection: one at a time, newer messages per policy."""
+
+    def __init__(
+        self,
+        connection_id: str,
+        run_turn: Callable[[str, List[Dict[str, str]]], Awaitable[Any]],
+        on_cancelled: Callable[[str], Awaitable[None]],
+        policy: str = settings.AI_TURN_POLICY,
+        queue_size: int = settings.AI_TURN_QUEUE_SIZE,
+    ):
+        self.connection_id = connection_id
+        self.run_turn = run_turn
+        self.on_cancelled = on_cancelled
+        self.policy = policy if policy in (TURN_POLICY_MERGE, TURN_POLICY_QUEUE) else TURN_POLICY_MERGE
+        self.queue_size = queue_size
+        self._task: Optional[asyncio.Task] = None
+        self._message: Optional[str] = None
+        self._began = False  # whether the running turn's coroutine has started
+        self._waiting: Deque[Tuple[str, List[Dict[str, str]]]] = deque()
+
+    @property
+    def busy(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def submit(self, message: str, conversation_history: List[Dict[str, str]]) -> bool:
+        """Handle a new user message. Returns False if it was rejected (queue full)."""
+        if not self.busy:
+            self._start(message, conversation_history)
+            return True
+
+        if self.policy == TURN_POLICY_QUEUE:
+            if len(self._waiting) >= self.queue_size:
+                turn_metrics["rejected"] += 1
+                return False
+            self._waiting.append((message, conversation_history))
+            turn_metrics["queued"] += 1
+            return True
+
+        # merge: the newer message wins
+        stale, began = self._message, self._began
+        await self._cancel_running()
+        turn_metrics["superseded"] += 1
+        logger.info(f"Superseded in-flight turn on {self.connection_id}")
+        await self.on_cancelled("superseded")
+        if not began and stale:
+            message = f"{stale}\n{message}"  # it never reached the conversation
+        self._start(message, conversation_history)
+        return True
+
+    async def close(self) -> None:
+        """The client left: drop waiting messages and cancel the running turn."""
+        self._waiting.clear()
+        if self.busy:
+            turn_metrics["abandoned"] += 1
+            await self._cancel_running()
+
+    def _start(self, message: str, conversation_history: List[Dict[str, str]]) -> None:
+        self._message = message
+        self._began = False
+        turn_metrics["started"] += 1
+        self._task = asyncio.create_task(self._run(message, conversation_history), name=f"chat-turn:{self.connection_id}")
+
+    async def _run(self, message: str, conversation_history: List[Dict[str, str]]) -> None:
+        self._began = True
+        await self.run_turn(message, conversation_history)
+        turn_metrics["completed"] += 1
+        # queue: the next message starts once this turn is done
+        if self._waiting:
+            self._start(*self._waiting.popleft())
+
+    async def _cancel_running(self) -> None:
+        """Cancel the running turn and wait until it has released what it held."""
+        task = self._task
+        if task is None or task.done():
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.error(f"Cancelled turn on {self.connection_id} failed: {e}")
+
+def turn_stats() -> Dict[str, int]:
+    """Turn counters of every connection."""
+    return dict(turn_metrics)
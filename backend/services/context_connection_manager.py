@@ -1,14 +1,25 @@
 """
 Context Connection Manager
-Manages WebSocket connections and session IDs.
+Manages WebSocket connections and session IDs, and stores their conversation contexts.
+
+The store is bounded so a long-running server's memory stays flat:
+- contexts untouched for CONTEXT_IDLE_TTL_SECONDS are evicted by a reaper task
+- beyond CONTEXT_STORE_MAX_BYTES in total, the least recently used contexts are evicted
+Sizes are re-measured whenever a context is stored and on every reaper pass.
 """
 
-import logging
+import time
 import uuid
+import asyncio
+import logging
+from collections import OrderedDict
 from typing import Dict, Any, Optional
 from datetime import datetime
 from dataclasses import dataclass
 
+from config import settings
+from services.conversation_context import ConversationContext
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -20,139 +31,226 @@ class ConnectionInfo:
     last_activity: datetime
 
 class ContextConnectionManager:
-    """Manages WebSocket connections and session IDs."""
-    
-    def __init__(self):
+    """Manages WebSocket connections and session IDs, and holds their contexts (bounded)."""
+
+    def __init__(
+        self,
+        idle_ttl_seconds: int = settings.CONTEXT_IDLE_TTL_SECONDS,
+        max_bytes: int = settings.CONTEXT_STORE_MAX_BYTES,
+        reaper_interval_seconds: int = settings.CONTEXT_REAPER_INTERVAL_SECONDS,
+    ):
         """Initialize the connection manager."""
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.max_bytes = max_bytes
+        self.reaper_interval_seconds = reaper_interval_seconds
         self.connections: Dict[str, ConnectionInfo] = {}
-        # Store actual context objects for each connection
-        self.contexts: Dict[str, Any] = {}
-    
+        # Store actual context objects for each connection, least recently used first
+        self.contexts: "OrderedDict[str, Any]" = OrderedDict()
+        self._last_seen: Dict[str, float] = {}  # connection_id -> time.monotonic() of last use
+        self._sizes: Dict[str, int] = {}  # connection_id -> approximate bytes
+        self.total_bytes = 0
+        self._reaper: Optional[asyncio.Task] = None
+        self.metrics: Dict[str, int] = {
+            "created": 0,
+            "disconnected": 0,
+            "evicted_idle": 0,
+            "evicted_lru": 0,
+            "reaper_runs": 0,
+            "peak_contexts": 0,
+            "peak_bytes": 0,
+        }
+
     def create_connection(self, connection_id: str = None) -> ConnectionInfo:
         """Create a new connection with a unique session ID."""
         if not connection_id:
             connection_id = str(uuid.uuid4())
-        
+
         session_id = str(uuid.uuid4())
         now = datetime.now()
-        
+
         connection_info = ConnectionInfo(
             connection_id=connection_id,
             session_id=session_id,
             connected_at=now,
             last_activity=now
         )
-        
+
         # Store connection
         self.connections[connection_id] = connection_info
-        
+
         logger.info(f"Created connection: {connection_id} with session: {session_id}")
         return connection_info
-    
+
     def get_connection(self, connection_id: str) -> Optional[ConnectionInfo]:
         """Get connection information by connection ID."""
         return self.connections.get(connection_id)
-    
+
     def update_activity(self, connection_id: str) -> bool:
         """Update last activity timestamp for a connection."""
         if connection_id in self.connections:
             self.connections[connection_id].last_activity = datetime.now()
+            self._touch(connection_id)
             return True
         return False
-    
+
     def disconnect_connection(self, connection_id: str) -> bool:
         """Disconnect a connection and clean up resources."""
-        if connection_id not in self.connections:
+        if connection_id not in self.connections and connection_id not in self.contexts:
             return False
-        
+
         # Clean up both connection info and context
-        del self.connections[connection_id]
-        if connection_id in self.contexts:
-            del self.contexts[connection_id]
-        
+        self._remove(connection_id)
+        self.metrics["disconnected"] += 1
+
         logger.info(f"Disconnected connection: {connection_id}")
         return True
-    
+
     def get_context(self, connection_id: str, existing_context: Any = None) -> Any:
         """Get or create context for a connection."""
         connection_info = self.get_connection(connection_id)
         if not connection_info:
             # Create new connection if it doesn't exist
             connection_info = self.create_connection(connection_id)
-        
+
         # Update activity
         self.update_activity(connection_id)
-        
+
         # If existing context is provided, store it and return it
         if existing_context:
             logger.info(f"Storing provided existing context for connection: {connection_id}")
-            self.contexts[connection_id] = existing_context
+            self.store_context(connection_id, existing_context)
             return existing_context
-        
+
         # Check if we have a stored context for this connection
         if connection_id in self.contexts:
             stored_context = self.contexts[connection_id]
             logger.info(f"Retrieved existing context for connection: {connection_id} with {len(getattr(stored_context, 'user_chats', []))} messages")
             return stored_context
-        
+
         # Create basic context if none exists
         basic_context = self._create_basic_context(connection_id, connection_info.session_id)
-        self.contexts[connection_id] = basic_context
+        self.metrics["created"] += 1
+        self.store_context(connection_id, basic_context)
         logger.info(f"Created new basic context for connection: {connection_id}")
         return basic_context
-    
+
     def _create_basic_context(self, connection_id: str, session_id: str) -> Any:
         """Create a basic context object."""
-        class BasicContext:
-            def __init__(self):
-                self.connection_id = connection_id
-                self.session_id = session_id
-                self.user_chats = []  # Always a list
-                self.collected_variables = {}  # Always a dict
-                self.missing_variables = []  # Always a list
-                self.current_intent = 'unknown'
-                self.created_at = datetime.now().isoformat()
-                self.last_updated = datetime.now().isoformat()
-            
-            def to_dict(self):
-                """Convert context to dictionary for JSON serialization."""
-                return {
-                    'connection_id': self.connection_id,
-                    'session_id': self.session_id,
-                    'user_chats': self.user_chats,
-                    'collected_variables': self.collected_variables,
-                    'missing_variables': self.missing_variables,
-                    'current_intent': getattr(self, 'current_intent', 'unknown'),
-                    'created_at': self.created_at,
-                    'last_updated': self.last_updated
-                }
-            
-            def __setattr__(self, name, value):
-                """Override setattr to ensure data type consistency."""
-                if name == 'user_chats' and not isinstance(value, list):
-                    logger.warning(f"Attempted to set user_chats to non-list type: {type(value)}, converting to list")
-                    if isinstance(value, dict):
-                        value = [value]  # Convert dict to list with one item
-                    elif value is None:
-                        value = []
-                    else:
-                        value = [value]  # Convert other types to list
-                elif name == 'collected_variables' and not isinstance(value, dict):
-                    logger.warning(f"Attempted to set collected_variables to non-dict type: {type(value)}, converting to dict")
-                    value = {} if value is None else dict(value) if hasattr(value, 'items') else {}
-                elif name == 'missing_variables' and not isinstance(value, list):
-                    logger.warning(f"Attempted to set missing_variables to non-list type: {type(value)}, converting to list")
-                    value = [] if value is None else list(value) if hasattr(value, '__iter__') else [value]
-                
-                super().__setattr__(name, value)
-        
-        return BasicContext()
-    
+        return ConversationContext(connection_id, session_id)
+
     def store_context(self, connection_id: str, context: Any) -> None:
         """Store a context object for a connection."""
         self.contexts[connection_id] = context
+        self._touch(connection_id)
+        self._measure(connection_id)
+        self._enforce_memory_cap(keep=connection_id)
         logger.info(f"Stored context for connection: {connection_id} with {len(getattr(context, 'user_chats', []))} messages")
-    
+
     def get_stored_context(self, connection_id: str) -> Optional[Any]:
         """Get a stored context object for a connection."""
-        return self.contexts.get(connection_id) 
\ No newline at end of file
+        context = self.contexts.get(connection_id)
+        if context is not None:
+            self._touch(connection_id)
+        return context
+
+    # ------------------------------------------------------------------------
+    # Bounds
+    # ------------------------------------------------------------------------
+    def _touch(self, connection_id: str) -> None:
+        """Mark connection_id's context as just used."""
+        self._last_seen[connection_id] = time.monotonic()
+        if connection_id in self.contexts:
+            self.contexts.move_to_end(connection_id)
+
+    def _measure(self, connection_id: str) -> None:
+        """Re-measure one context and update the totals."""
+        context = self.contexts[connection_id]
+        size = context.approx_bytes() if hasattr(context, 'approx_bytes') else 0
+        self.total_bytes += size - self._sizes.get(connection_id, 0)
+        self._sizes[connection_id] = size
+        self.metrics["peak_contexts"] = max(self.metrics["peak_contexts"], len(self.contexts))
+        self.metrics["peak_bytes"] = max(self.metrics["peak_bytes"], self.total_bytes)
+
+    def _remove(self, connection_id: str) -> None:
+        """Forget a connection and its context."""
+        self.connections.pop(connection_id, None)
+        self.contexts.pop(connection_id, None)
+        self._last_seen.pop(connection_id, None)
+        self.total_bytes -= self._sizes.pop(connection_id, 0)
+
+    def _enforce_memory_cap(self, keep: Optional[str] = None) -> None:
+        """Evict least recently used contexts (never keep) until the store fits max_bytes."""
+        while self.total_bytes > self.max_bytes and len(self.contexts) > 1:
+            oldest = next(iter(self.contexts))
+            if oldest == keep:
+                break
+            logger.info(f"Evicting least recently used context: {oldest} ({self._sizes.get(oldest, 0)} bytes)")
+            self._remove(oldest)
+            self.metrics["evicted_lru"] += 1
+
+    def reap(self) -> int:
+        """Evict contexts idle for longer than the TTL and re-measure the rest. Returns evictions."""
+        deadline = time.monotonic() - self.idle_ttl_seconds
+        evicted = 0
+        # Least recently used first: stop at the first one still in use
+        while self.contexts:
+            oldest = next(iter(self.contexts))
+            if self._last_seen.get(oldest, 0) > deadline:
+                break
+            self._remove(oldest)
+            evicted += 1
+        # Connections that never got a context
+        for connection_id in [c for c in self.connections if c not in self.contexts and self._last_seen.get(c, 0) <= deadline]:
+            self._remove(connection_id)
+
+        # Contexts change between stores (e.g. summary refreshes); re-measure
+        self._sizes = {connection_id: context.approx_bytes() if hasattr(context, 'approx_bytes') else 0
+                       for connection_id, context in self.contexts.items()}
+        self.total_bytes = sum(self._sizes.values())
+        self._enforce_memory_cap()
+
+        self.metrics["evicted_idle"] += evicted
+        self.metrics["reaper_runs"] += 1
+        if evicted:
+            logger.info(f"Evicted {evicted} idle contexts; {len(self.contexts)} remain ({self.total_bytes} bytes)")
+        return evicted
+
+    async def start_reaper(self) -> None:
+        """Start the background reaper (no-op if already running)."""
+        if self._reaper is None or self._reaper.done():
+            self._reaper = asyncio.create_task(self._run_reaper(), name="context-reaper")
+
+    async def stop_reaper(self) -> None:
+        """Cancel the background reaper and wait for it to finish."""
+        if self._reaper is None:
+            return
+        self._reaper.cancel()
+        try:
+            await self._reaper
+        except asyncio.CancelledError:
+            pass
+        self._reaper = None
+
+    async def _run_reaper(self) -> None:
+        """Reap every reaper_interval_seconds."""
+        while True:
+            await asyncio.sleep(self.reaper_interval_seconds)
+            try:
+                self.reap()
+            except Exception as e:
+                logger.error(f"Context reaper failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Context count, approximate bytes and eviction counters."""
+        return {
+            "contexts": len(self.contexts),
+            "connections": len(self.connections),
+            "bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+            "idle_ttl_seconds": self.idle_ttl_seconds,
+            "reaper_running": self._reaper is not None and not self._reaper.done(),
+            **self.metrics,
+        }
+
+# Global context store shared by every connection
+context_store = ContextConnectionManager()
@@ -4,17 +4,29 @@ Manages context variables and updates context with AI responses.
 """
 
 import logging
-from typing import Dict, Any
+from collections.abc import MutableSequence
+from typing import Dict, Any, Optional
 from datetime import datetime
 
+from services.ai_registry import AIConfig, get_ai_config
+from utils.context_utils import ContextUtils
+
 logger = logging.getLogger(__name__)
 
 class ContextService:
     """Service for managing context variables and updates."""
     
-    def __init__(self):
+    def __init__(self, config: Optional[AIConfig] = None):
         """Initialize the context service."""
-        pass
+        config = config or get_ai_config()
+        # Intent lookups on the shared config use its precomputed index
+        self.context_utils = ContextUtils(config.variable_config, config.intent_variables)
+    
+    def _context_utils(self, variable_config: Dict[str, Any]) -> ContextUtils:
+        """ContextUtils for variable_config, reusing the indexed one for the shared config."""
+        if variable_config is self.context_utils.variable_config:
+            return self.context_utils
+        return ContextUtils(variable_config)
     
     async def update_context(self, ai_response: Dict[str, Any], context: Any, user_message: str) -> Any:
         """
@@ -74,10 +86,10 @@ class ContextService:
             "timestamp": datetime.now().isoformat()
         }
         
-        # Ensure user_chats is always a list
+        # Ensure user_chats is always a list (or the context's bounded deque)
         if not hasattr(context, 'user_chats'):
             context.user_chats = []
-        elif not isinstance(context.user_chats, list):
+        elif not isinstance(context.user_chats, MutableSequence):
             logger.warning(f"user_chats was not a list, resetting. Type: {type(context.user_chats)}, content: {context.user_chats}")
             context.user_chats = []
         
@@ -122,7 +134,7 @@ class ContextService:
             # Ensure user_chats is always a list
             if not hasattr(context, 'user_chats'):
                 context.user_chats = []
-            elif not isinstance(context.user_chats, list):
+            elif not isinstance(context.user_chats, MutableSequence):
                 logger.warning(f"user_chats was not a list in update_with_ai_response, resetting. Type: {type(context.user_chats)}, content: {context.user_chats}")
                 context.user_chats = []
             
@@ -142,9 +154,7 @@ class ContextService:
             
             if variable_config and hasattr(context, 'current_intent') and context.current_intent != 'unknown':
                 try:
-                    from utils.context_utils import ContextUtils
-                    
-                    context_utils = ContextUtils(variable_config)
+                    context_utils = self._context_utils(variable_config)
                     
                     # Get all variables for this intent
                     intent_variables = context_utils._get_variables_for_intent(context.current_intent)
@@ -225,6 +235,7 @@ class ContextService:
             "connection_id": getattr(context, 'connection_id', 'unknown'),
             "session_id": getattr(context, 'session_id', 'unknown'),
             "user_chats": getattr(context, 'user_chats', []),
+            "conversation_summary": getattr(context, 'conversation_summary', ''),
             "collected_variables": getattr(context, 'collected_variables', {}),
             "missing_variables": getattr(context, 'missing_variables', []),
             "current_intent": getattr(context, 'current_intent', 'unknown'),
@@ -238,6 +249,8 @@ class ContextService:
         # Clear conversation history
         if hasattr(context, 'user_chats'):
             context.user_chats = []
+        if hasattr(context, 'conversation_summary'):
+            context.conversation_summary = ''
         
         # Clear AI response
         if hasattr(context, 'ai_response'):
@@ -368,8 +381,7 @@ class ContextService:
             if not variable_config or not hasattr(context, 'current_intent') or context.current_intent == 'unknown':
                 return {}
             
-            from utils.context_utils import ContextUtils
-            context_utils = ContextUtils(variable_config)
+            context_utils = self._context_utils(variable_config)
             
             intent_variables = context_utils._get_variables_for_intent(context.current_intent)
             
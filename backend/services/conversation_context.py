@@ -0,0 +1,132 @@
+"""
+Conversation Context - The per-connection state of an AI chat.
+
+One ConversationContext is all a websocket connection keeps between turns
+(see ai_registry). It uses __slots__, so it has no per-instance __dict__.
+user_chats is a deque bounded by CONTEXT_MAX_CHATS: when it is full, the
+oldest messages are dropped. Normally the rolling summary
+(conversation_window) has already folded them. Only the three typed fields
+are coerced on assignment, by properties. Every other attribute write is
+a plain slot store.
+"""
+
+# ============================================================================
+# IMPORTS
+# ============================================================================
+import sys
+import logging
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from config import settings
+
+# ============================================================================
+# CONSTANTS
+# ============================================================================
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# CONVERSATION CONTEXT
+# ============================================================================
+class ConversationContext:
+    """Conversation state of one connection."""
+
+    __slots__ = (
+        'connection_id', 'session_id', 'user_id',
+        '_user_chats', 'conversation_summary',
+        '_collected_variables', '_missing_variables', 'current_intent',
+        'ai_response', 'user_tasks', 'todays_date', 'conversation_history',
+        'created_at', 'last_updated',
+    )
+
+    def __init__(self, connection_id: str, session_id: str, max_chats: int = settings.CONTEXT_MAX_CHATS):
+        now = datetime.now().isoformat()
+        self.connection_id = connection_id
+        self.session_id = session_id
+        self.user_id: Optional[str] = None
+        self._user_chats: deque = deque(maxlen=max_chats)
+        self.conversation_summary = ''  # Turns folded out of user_chats (see conversation_window)
+        self._collected_variables: Dict[str, Any] = {}
+        self._missing_variables: List[Dict[str, Any]] = []
+        self.current_intent = 'unknown'
+        self.ai_response: Dict[str, Any] = {}
+        self.user_tasks: Optional[List[str]] = None
+        self.todays_date: Optional[str] = None
+        self.conversation_history: Optional[List[Dict[str, str]]] = None
+        self.created_at = now
+        self.last_updated = now
+
+    # ------------------------------------------------------------------------
+    # Typed fields
+    # ------------------------------------------------------------------------
+    @property
+    def user_chats(self) -> deque:
+        """Messages of the conversation, oldest first (bounded)."""
+        return self._user_chats
+
+    @user_chats.setter
+    def user_chats(self, value: Any) -> None:
+        if value is None:
+            value = []
+        elif isinstance(value, dict):
+            logger.warning("Attempted to set user_chats to a dict, converting to list")
+            value = [value]
+        elif isinstance(value, (str, bytes)) or not hasattr(value, '__iter__'):
+            logger.warning(f"Attempted to set user_chats to non-list type: {type(value)}, converting to list")
+            value = [value]
+        self._user_chats = deque(value, maxlen=self._user_chats.maxlen)
+
+    @property
+    def collected_variables(self) -> Dict[str, Any]:
+        return self._collected_variables
+
+    @collected_variables.setter
+    def collected_variables(self, value: Any) -> None:
+        if not isinstance(value, dict):
+            logger.warning(f"Attempted to set collected_variables to non-dict type: {type(value)}, converting to dict")
+            value = {} if value is None else dict(value) if hasattr(value, 'items') else {}
+        self._collected_variables = value
+
+    @property
+    def missing_variables(self) -> List[Dict[str, Any]]:
+        return self._missing_variables
+
+    @missing_variables.setter
+    def missing_variables(self, value: Any) -> None:
+        if not isinstance(value, list):
+            logger.warning(f"Attempted to set missing_variables to non-list type: {type(value)}, converting to list")
+            value = [] if value is None else list(value) if hasattr(value, '__iter__') else [value]
+        self._missing_variables = value
+
+    # ------------------------------------------------------------------------
+    # Serialization / size
+    # ------------------------------------------------------------------------
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert context to dictionary for JSON serialization."""
+        return {
+            'connection_id': self.connection_id,
+            'session_id': self.session_id,
+            'user_chats': list(self.user_chats),
+            'conversation_summary': self.conversation_summary,
+            'collected_variables': self.collected_variables,
+            'missing_variables': self.missing_variables,
+            'current_intent': self.current_intent,
+            'created_at': self.created_at,
+            'last_updated': self.last_updated
+        }
+
+    def approx_bytes(self) -> int:
+        """Approximate memory held by the context and everything it references."""
+        return sys.getsizeof(self) + sum(
+            approx_size(getattr(self, name)) for name in self.__slots__
+        )
+
+def approx_size(value: Any) -> int:
+    """Approximate deep size of a JSON-like value (sys.getsizeof over containers)."""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(approx_size(k) + approx_size(v) for k, v in value.items())
+    elif isinstance(value, (list, tuple, deque, set)):
+        size += sum(approx_size(item) for item in value)
+    return size
@@ -0,0 +1,196 @@
+"""
+Conversation Window - Keeps the conversation part of the prompt under a token budget.
+
+The prompt carries the most recent messages word for word, newest first until
+PROMPT_HISTORY_TOKEN_BUDGET is used up, after a running summary of everything
+older. Once a turn has been answered, schedule_refresh folds the messages that
+slid out of the last CONVERSATION_VERBATIM_TURNS turns into that summary with a
+small LLM call in a background task and drops them from user_chats, so neither
+the prompt nor the stored history grows with the length of the session.
+
+The chat turn never waits for a summary: until a refresh lands, the older
+messages simply compete for the remaining budget like the recent ones.
+"""
+
+# ============================================================================
+# IMPORTS
+# ============================================================================
+import asyncio
+import logging
+from collections.abc import MutableSequence
+from itertools import islice
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import settings
+from ai_engine.models.llm_client import LLMClient
+from ai_engine.models.tokenizer import count_tokens, truncate_to_tokens
+
+# ============================================================================
+# CONSTANTS
+# ============================================================================
+logger = logging.getLogger(__name__)
+
+# Role label, quotes and newline around every rendered message
+MESSAGE_OVERHEAD_TOKENS = 4
+
+SUMMARY_SYSTEM_PROMPT = (
+    "You maintain a running summary of a conversation between a user and a task management assistant. "
+    "Merge the new messages into the existing summary. Keep what the assistant may need later: tasks and "
+    "habits discussed, names, dates, times, frequencies, preferences, decisions and open questions. "
+    "Drop greetings and small talk. Reply with the updated summary only, as plain text."
+)
+
+# ============================================================================
+# CONVERSATION WINDOW CLASS
+# ============================================================================
+class ConversationWindow:
+    """Selects the history that fits the prompt budget and maintains the rolling summary."""
+
+    def __init__(
+        self,
+        verbatim_turns: int = settings.CONVERSATION_VERBATIM_TURNS,
+        history_budget: int = settings.PROMPT_HISTORY_TOKEN_BUDGET,
+        summary_budget: int = settings.PROMPT_SUMMARY_TOKEN_BUDGET,
+        summarize: bool = settings.CONVERSATION_SUMMARY_ENABLED,
+    ):
+        self.verbatim_messages = max(1, verbatim_turns) * 2
+        self.history_budget = history_budget
+        self.summary_budget = min(summary_budget, history_budget // 2)
+        self.summarize = summarize
+        self._llm_client: Optional[LLMClient] = None
+        self._refreshing: Dict[int, asyncio.Task] = {}  # id(context) -> refresh task
+        self.metrics: Dict[str, int] = {
+            "refreshes": 0,
+            "refresh_failures": 0,
+            "folded_messages": 0,
+            "dropped_from_prompt": 0,
+        }
+
+    # ------------------------------------------------------------------------
+    # Prompt selection (hot path)
+    # ------------------------------------------------------------------------
+    def select(self, context: Any, history: List[Dict[str, str]]) -> Tuple[str, List[Dict[str, str]]]:
+        """
+        The summary and the newest messages of history that fit the history
+        budget, oldest first. The last message, the one being answered, is
+        always included (cut down if it alone exceeds the budget).
+        """
+        summary = truncate_to_tokens(getattr(context, 'conversation_summary', '') or '', self.summary_budget)
+        if not history:
+            return summary, []
+
+        remaining = self.history_budget - count_tokens(summary) - MESSAGE_OVERHEAD_TOKENS
+        latest = history[-1]
+        latest_tokens = count_tokens(latest.get('msg', '')) + MESSAGE_OVERHEAD_TOKENS
+        if latest_tokens > remaining:
+            latest = {**latest, 'msg': truncate_to_tokens(latest.get('msg', ''), remaining - MESSAGE_OVERHEAD_TOKENS)}
+            latest_tokens = remaining
+
+        selected = [latest]
+        used = latest_tokens
+        for entry in reversed(history[:-1]):
+            cost = count_tokens(entry.get('msg', '')) + MESSAGE_OVERHEAD_TOKENS
+            if used + cost > remaining:
+                break
+            selected.append(entry)
+            used += cost
+        selected.reverse()
+
+        dropped = len(history) - len(selected)
+        if dropped:
+            self.metrics["dropped_from_prompt"] += dropped
+            logger.info(f"Conversation window: {len(selected)} of {len(history)} messages fit {self.history_budget} tokens")
+        return summary, selected
+
+    # ------------------------------------------------------------------------
+    # Rolling summary (background)
+    # ------------------------------------------------------------------------
+    def schedule_refresh(self, context: Any) -> None:
+        """Fold messages older than the verbatim window into the summary, in the background."""
+        if not self.summarize:
+            return
+        chats = getattr(context, 'user_chats', None)
+        if not isinstance(chats, MutableSequence) or len(chats) <= self.verbatim_messages:
+            return
+        key = id(context)
+        if key in self._refreshing:
+            return  # the running refresh picks up the rest next turn
+        task = asyncio.create_task(self._refresh(context))
+        self._refreshing[key] = task
+        task.add_done_callback(lambda _: self._refreshing.pop(key, None))
+
+    async def _refresh(self, context: Any) -> None:
+        """Summarize the messages outside the window, then drop them from user_chats."""
+        chats = context.user_chats
+        folded = list(islice(chats, len(chats) - self.verbatim_messages))
+        try:
+            summary = await self._summarize(getattr(context, 'conversation_summary', '') or '', folded)
+        except Exception as e:
+            summary = None
+            logger.error(f"Conversation summary refresh failed: {e}")
+        if not summary:
+            self.metrics["refresh_failures"] += 1
+            return
+
+        # New turns are only ever appended, so the folded messages are still the
+        # head of the list unless the conversation was reset (or overflowed) meanwhile
+        current = getattr(context, 'user_chats', None)
+        if not isinstance(current, MutableSequence) or len(current) < len(folded) or any(
+            a is not b for a, b in zip(current, folded)
+        ):
+            logger.info("Conversation changed during summary refresh; discarding summary")
+            return
+        for _ in folded:
+            del current[0]
+        context.conversation_summary = truncate_to_tokens(summary.strip(), self.summary_budget)
+        self.metrics["refreshes"] += 1
+        self.metrics["folded_messages"] += len(folded)
+        logger.info(f"Folded {len(folded)} messages into the conversation summary ({count_tokens(context.conversation_summary)} tokens)")
+
+    async def _summarize(self, summary: str, messages: List[Dict[str, Any]]) -> Optional[str]:
+        """One LLM call merging messages into summary."""
+        lines = []
+        for message in messages:
+            if not isinstance(message, dict) or not message.get('msg'):
+                continue
+            role = 'USER' if message.get('role') == 'user' else 'AI'
+            lines.append(f"{role}: {truncate_to_tokens(str(message['msg']), self.history_budget)}")
+        if not lines:
+            return summary or None
+
+        if self._llm_client is None:
+            self._llm_client = LLMClient()
+        prompt = (
+            f"Existing summary:\n{summary or '(none)'}\n\n"
+            f"New messages:\n" + "\n".join(lines) + "\n\n"
+            f"Write the updated summary in at most {self.summary_budget} tokens."
+        )
+        return await self._llm_client.call_openai(
+            [
+                {"role": "system", "content": SUMMARY_SYSTEM_PROMPT},
+                {"role": "user", "content": prompt},
+            ],
+            temperature=0,
+            max_tokens=self.summary_budget,
+        )
+
+    async def close(self) -> None:
+        """Cancel refreshes still running (called on application shutdown)."""
+        tasks = list(self._refreshing.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._refreshing.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Budgets, refresh counters and refreshes in flight."""
+        return {
+            "verbatim_messages": self.verbatim_messages,
+            "history_budget": self.history_budget,
+            "summary_budget": self.summary_budget,
+            "refreshing": len(self._refreshing),
+            **self.metrics,
+        }
+
+# Global window shared by every connection's orchestrator
+conversation_window = ConversationWindow()
@@ -0,0 +1,118 @@
+"""
+Daily Plan Scheduler - Background task that materializes each day's plan.
+
+Started from the FastAPI lifespan. Shortly before midnight (in
+DAILY_PLAN_TIMEZONE) it creates tomorrow's DailyWidget rows for permanent
+widgets and daily habits via DailyWidgetService.materialize_daily_plan. On
+startup it first catches up on days missed while the server was down (at most
+DAILY_PLAN_CATCHUP_DAYS). Materialization is idempotent, so several workers
+running the scheduler at once only create each row once.
+"""
+
+# ============================================================================
+# IMPORTS
+# ============================================================================
+import asyncio
+import logging
+from datetime import date, datetime, time, timedelta
+from typing import Optional
+from zoneinfo import ZoneInfo
+
+from config import settings
+from db.session import AsyncSessionLocal
+from services.daily_widget_service import DailyWidgetService
+
+# ============================================================================
+# CONSTANTS
+# ============================================================================
+logger = logging.getLogger(__name__)
+RETRY_DELAY_SECONDS = 300  # wait after a failed run before trying again
+
+# ============================================================================
+# TIME HELPERS
+# ============================================================================
+def _now() -> datetime:
+    """Current time in the daily plan timezone (aware)."""
+    if settings.DAILY_PLAN_TIMEZONE:
+        return datetime.now(ZoneInfo(settings.DAILY_PLAN_TIMEZONE))
+    return datetime.now().astimezone()
+
+def _run_time_for(day: date, tz) -> datetime:
+    """When the plan for the day after `day` is materialized (lead time before midnight)."""
+    midnight = datetime.combine(day + timedelta(days=1), time.min, tzinfo=tz)
+    return midnight - timedelta(minutes=settings.DAILY_PLAN_LEAD_MINUTES)
+
+# ============================================================================
+# SCHEDULER CLASS
+# ============================================================================
+class DailyPlanScheduler:
+    """Owns the background materializer task."""
+
+    def __init__(self, session_factory=AsyncSessionLocal):
+        self.session_factory = session_factory
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """Start the background task (no-op if already running)."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="daily-plan-scheduler")
+            logger.info("Daily plan scheduler started")
+
+    async def stop(self) -> None:
+        """Cancel the background task and wait for it to finish."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        logger.info("Daily plan scheduler stopped")
+
+    async def catch_up(self, now: Optional[datetime] = None) -> int:
+        """
+        Materialize every day from the last materialized date up to today, plus
+        tomorrow once today's run time has passed. Returns rows created.
+        """
+        now = now or _now()
+        today = now.date()
+        last_due = today + timedelta(days=1) if now >= _run_time_for(today, now.tzinfo) else today
+
+        async with self.session_factory() as session:
+            last_done = await DailyWidgetService(session).get_last_materialized_date()
+
+        earliest = today - timedelta(days=settings.DAILY_PLAN_CATCHUP_DAYS)
+        first = max(last_done + timedelta(days=1), earliest) if last_done else today
+        if first < today and last_done:
+            logger.info(f"Catching up daily plans from {first} to {last_due}")
+
+        created = 0
+        day = first
+        while day <= last_due:
+            async with self.session_factory() as session:
+                try:
+                    created += await DailyWidgetService(session).materialize_daily_plan(day)
+                    await session.commit()
+                except Exception:
+                    await session.rollback()
+                    raise
+            day += timedelta(days=1)
+        return created
+
+    async def _run(self) -> None:
+        """Catch up, then sleep until the next run time; repeat."""
+        while True:
+            try:
+                await self.catch_up()
+                now = _now()
+                next_run = _run_time_for(now.date(), now.tzinfo)
+                if now >= next_run:
+                    next_run = _run_time_for(now.date() + timedelta(days=1), now.tzinfo)
+                delay = (next_run - now).total_seconds()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Daily plan materialization failed: {e}")
+                delay = RETRY_DELAY_SECONDS
+            await asyncio.sleep(max(delay, 1))
@@ -6,15 +6,22 @@ Daily Widget service for business logic.
 # IMPORTS
 # ============================================================================
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, and_, inspect, func
+from sqlalchemy import select, update, and_, inspect
 from sqlalchemy.orm import selectinload
 from sqlalchemy.orm.attributes import flag_modified
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from datetime import datetime, date, timezone
 from typing import Dict, Any, Optional, List
 import logging
+import uuid
 
+from db.engine import IS_POSTGRES
 from models.daily_widget import DailyWidget
+from models.daily_plan_materialization import DailyPlanMaterialization
 from models.dashboard_widget_details import DashboardWidgetDetails
+from services.widget_completion_service import WidgetCompletionService
+from services.data_version_service import DataVersionService
 
 # ============================================================================
 # CONSTANTS
@@ -22,6 +29,23 @@ from models.dashboard_widget_details import DashboardWidgetDetails
 logger = logging.getLogger(__name__)
 DEFAULT_USER_ID = "user_001"
 
+# Calendar type -> indexed generated column holding widget_config's calendar link
+CALENDAR_LINK_COLUMNS = {
+    'monthly': DashboardWidgetDetails.selected_calendar,
+    'yearly': DashboardWidgetDetails.selected_yearly_calendar,
+    'habitTracker': DashboardWidgetDetails.selected_habit_calendar,
+}
+
+# Daily plan materialization
+MATERIALIZER_CREATED_BY = "daily_plan_materializer"
+MATERIALIZE_BATCH_SIZE = 500  # rows per multi-row INSERT (stays under bind limits)
+
+def _to_date(value: Any) -> date:
+    """Coerce a 'YYYY-MM-DD' string to a date (asyncpg rejects strings for DATE params)."""
+    if isinstance(value, str):
+        return datetime.strptime(value[:10], '%Y-%m-%d').date()
+    return value
+
 # ============================================================================
 # SERVICE CLASS
 # ============================================================================
@@ -43,7 +67,7 @@ class DailyWidgetService:
         Note: This method only reads data and does not modify the session.
         """
         print("getting today's widget list", target_date)
-        todaysdate = target_date # in sqlaclchemy Date
+        todaysdate = _to_date(target_date) # in sqlaclchemy Date
         try:
             # Join DailyWidget with DashboardWidgetDetails to get widget information
             stmt = select(
@@ -133,7 +157,12 @@ class DailyWidgetService:
             if existing_daily_widget:
                 if not existing_daily_widget.is_active:
                     existing_daily_widget.is_active = True
-                    existing_daily_widget.updated_at = target_date
+                    existing_daily_widget.updated_at = datetime.utcnow()
+                    await DataVersionService(self.db).bump_dates(DEFAULT_USER_ID, [target_date], change={
+                        "type": "daily_widget_added",
+                        "daily_widget_id": existing_daily_widget.id,
+                        "widget_id": existing_daily_widget.widget_id,
+                    })
                     # Note: No commit here - calling layer handles it
                     return {
                         "success": True,
@@ -156,7 +185,13 @@ class DailyWidgetService:
                 created_by=DEFAULT_USER_ID
             )
             self.db.add(daily_widget)
+            await WidgetCompletionService(self.db).record_daily_widget(daily_widget)
             await self.db.flush()
+            await DataVersionService(self.db).bump_dates(DEFAULT_USER_ID, [target_date], change={
+                "type": "daily_widget_added",
+                "daily_widget_id": daily_widget.id,
+                "widget_id": daily_widget.widget_id,
+            })
             
             return {
                 "success": True,
@@ -210,6 +245,90 @@ class DailyWidgetService:
         else:
             return {}
 
+    @staticmethod
+    def _is_due_daily(widget: DashboardWidgetDetails) -> bool:
+        """True if a widget belongs on every daily plan (permanent or a daily habit)."""
+        if widget.is_permanent:
+            return True
+        details = widget.frequency_details
+        if not isinstance(details, dict):
+            return False
+        return details.get("isDailyHabit") is True or str(details.get("frequencyPeriod") or "").upper() == "DAILY"
+
+    async def materialize_daily_plan(self, target_date: date) -> int:
+        """
+        Pre-create DailyWidget rows for target_date for every permanent widget and
+        daily habit, so the day's list exists before anyone opens the dashboard.
+
+        One SELECT for the candidate widgets and one multi-row INSERT ... ON CONFLICT
+        DO NOTHING on (widget_id, date): rows that already exist, including ones the
+        user removed (is_active = False), are left untouched, so re-running is safe.
+        Returns the number of rows created. The day is recorded as materialized
+        even when it needed no rows, so it is not recomputed.
+
+        Note: This method does NOT commit the transaction.
+        """
+        stmt = select(DashboardWidgetDetails).where(
+            DashboardWidgetDetails.delete_flag == False
+        )
+        result = await self.db.execute(stmt)
+        due_widgets = [w for w in result.scalars().all() if self._is_due_daily(w)]
+        if not due_widgets:
+            await self._record_materialization(target_date, 0)
+            return 0
+
+        now = datetime.utcnow()
+        rows = [
+            {
+                "id": str(uuid.uuid4()),
+                "widget_id": widget.id,
+                "priority": "HIGH",
+                "reasoning": f"Automatically added {widget.title} to the daily plan",
+                "date": target_date,
+                "is_active": True,
+                "activity_data": self._get_initial_activity_data(widget.widget_type),
+                "created_at": now,
+                "created_by": MATERIALIZER_CREATED_BY,
+                "updated_at": now,
+                "delete_flag": False,
+            }
+            for widget in due_widgets
+        ]
+
+        dialect_insert = postgresql_insert if IS_POSTGRES else sqlite_insert
+        created = 0
+        for start in range(0, len(rows), MATERIALIZE_BATCH_SIZE):
+            insert_stmt = dialect_insert(DailyWidget).values(
+                rows[start:start + MATERIALIZE_BATCH_SIZE]
+            ).on_conflict_do_nothing(index_elements=["widget_id", "date"])
+            insert_result = await self.db.execute(insert_stmt)
+            created += max(insert_result.rowcount or 0, 0)
+        if created:
+            version_service = DataVersionService(self.db)
+            for user_id in {widget.user_id for widget in due_widgets}:
+                await version_service.bump_dates(user_id, [target_date], change={"type": "daily_plan_materialized"})
+        await self._record_materialization(target_date, created)
+        logger.info(f"Materialized {created} daily widgets for {target_date}")
+        return created
+
+    async def _record_materialization(self, target_date: date, rows_created: int) -> None:
+        """Upsert the daily_plan_materializations row for target_date."""
+        dialect_insert = postgresql_insert if IS_POSTGRES else sqlite_insert
+        stmt = dialect_insert(DailyPlanMaterialization).values(
+            date=target_date, rows_created=rows_created, materialized_at=datetime.utcnow()
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["date"],
+            set_={"rows_created": stmt.excluded.rows_created, "materialized_at": stmt.excluded.materialized_at},
+        )
+        await self.db.execute(stmt)
+
+    async def get_last_materialized_date(self) -> Optional[date]:
+        """Latest date the daily plan was materialized for (None if never)."""
+        stmt = select(DailyPlanMaterialization.date).order_by(DailyPlanMaterialization.date.desc()).limit(1)
+        result = await self.db.execute(stmt)
+        return result.scalar()
+
     async def remove_widget_from_today(self, daily_widget_id: str, target_date: str) -> Dict[str, Any]:
         """
         Remove a widget from today's list.
@@ -231,7 +350,12 @@ class DailyWidgetService:
                 raise ValueError("DailyWidget not found")
             
             daily_widget.is_active = False
-            daily_widget.updated_at = date.today()
+            daily_widget.updated_at = datetime.utcnow()
+            await DataVersionService(self.db).bump_dates(DEFAULT_USER_ID, [daily_widget.date], change={
+                "type": "daily_widget_removed",
+                "daily_widget_id": daily_widget.id,
+                "widget_id": daily_widget.widget_id,
+            })
             # Note: No commit here - calling layer handles it
             
             return {
@@ -273,7 +397,15 @@ class DailyWidgetService:
             flag_modified(daily_widget, 'activity_data')
             # Update activity data
             print(f"Updated activity data: {daily_widget}")
-            daily_widget.updated_at = date.today()
+            daily_widget.updated_at = datetime.utcnow()
+            # Keep the completion ledger in the same transaction
+            await WidgetCompletionService(self.db).record_daily_widget(daily_widget)
+            await DataVersionService(self.db).bump_dates(DEFAULT_USER_ID, [daily_widget.date], change={
+                "type": "activity_updated",
+                "daily_widget_id": daily_widget.id,
+                "widget_id": daily_widget.widget_id,
+                "changed_keys": list(activity_data.keys()),
+            })
             
             # Flush the changes to the database
             await self.db.flush()
@@ -294,7 +426,7 @@ class DailyWidgetService:
             stmt = select(DailyWidget).where(
                 and_(
                     DailyWidget.widget_id == widget_id,
-                    DailyWidget.date == target_date,
+                    DailyWidget.date == _to_date(target_date),
                     DailyWidget.delete_flag == False
                 )
             )
@@ -315,7 +447,15 @@ class DailyWidgetService:
             flag_modified(daily_widget, 'activity_data')
             # Update activity data
             print(f"Updated activity data: {daily_widget}")
-            daily_widget.updated_at = date.today()
+            daily_widget.updated_at = datetime.utcnow()
+            # Keep the completion ledger in the same transaction
+            await WidgetCompletionService(self.db).record_daily_widget(daily_widget)
+            await DataVersionService(self.db).bump_dates(DEFAULT_USER_ID, [daily_widget.date], change={
+                "type": "activity_updated",
+                "daily_widget_id": daily_widget.id,
+                "widget_id": daily_widget.widget_id,
+                "changed_keys": list(activity_data.keys()),
+            })
             await self.db.flush()
             return {
                 "success": True,
@@ -328,42 +468,13 @@ class DailyWidgetService:
             raise
 
 
-    async def get_daily_widgets_in_date_range(
-        self,
-        widget_id: str,
-        start_date: date,
-        end_date: date,
-    ) -> List[Dict[str, Any]]:
-        """
-        Get all daily widget rows for a widget in a date range (inclusive).
-        Used for priority service to count completed days in 2d / 7d / 15d / 30d / 60d windows.
-        """
-        try:
-            stmt = select(DailyWidget).where(
-                and_(
-                    DailyWidget.widget_id == widget_id,
-                    DailyWidget.date >= start_date,
-                    DailyWidget.date <= end_date,
-                    DailyWidget.delete_flag == False,
-                )
-            ).order_by(DailyWidget.date.asc())
-            result = await self.db.execute(stmt)
-            rows = result.scalars().all()
-            return [
-                {"date": dw.date, "activity_data": dw.activity_data or {}}
-                for dw in rows
-            ]
-        except Exception as e:
-            logger.error(f"Error getting daily widgets in date range for {widget_id}: {e}")
-            raise
-
     async def get_today_widget_by_widget_id(self, widget_id: str, target_date: str) -> Dict[str, Any]:
         """Get activity data for a daily widget by widget_id."""
         try:
             stmt = select(DailyWidget).where(
                 and_(
                     DailyWidget.widget_id == widget_id,
-                    DailyWidget.date == target_date,
+                    DailyWidget.date == _to_date(target_date),
                     DailyWidget.delete_flag == False
                 )
             )
@@ -439,7 +550,9 @@ class DailyWidgetService:
         - DailyWidget.date between start_date and end_date
         - DailyWidget.is_active == True
         - Both records not deleted
-        - DashboardWidgetDetails.widget_config.selected_calendar == calendar_widget_id
+        - The calendar link column for calendar_type (generated from
+          widget_config.selected_calendar / selected_yearly_calendar /
+          selected_habit_calendar) == calendar_widget_id
         """
 
         if calendar_type == 'pillarsGraph':
@@ -459,13 +572,9 @@ class DailyWidgetService:
                 )
             ).order_by(DailyWidget.date.asc(), DailyWidget.priority.desc())
         else:
-
-            if calendar_type == 'monthly':
-                type = 'selected_calendar'
-            elif calendar_type == 'yearly':
-                type = 'selected_yearly_calendar'
-            elif calendar_type == 'habitTracker':
-                type = 'selected_habit_calendar'
+            link_column = CALENDAR_LINK_COLUMNS.get(calendar_type)
+            if link_column is None:
+                raise ValueError(f"Unsupported calendar type: {calendar_type}")
 
             stmt = select(
                 DailyWidget,
@@ -480,8 +589,8 @@ class DailyWidgetService:
                     DailyWidget.is_active == True,
                     DailyWidget.delete_flag == False,
                     DashboardWidgetDetails.delete_flag == False,
-                    # Filter on JSON widget_config.selected_calendar using SQLite JSON_EXTRACT
-                    func.json_extract(DashboardWidgetDetails.widget_config, f'$.{type}') == calendar_widget_id
+                    # Generated column over widget_config.<link>; index seek, no JSON parse
+                    link_column == calendar_widget_id
                 )
             ).order_by(DailyWidget.date.asc(), DailyWidget.priority.desc())
 
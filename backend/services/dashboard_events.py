@@ -0,0 +1,106 @@
+"""
+Dashboard Events - In-process pub/sub for dashboard change notifications.
+
+Writes stage a compact change event on their session (see stage_event); the
+events are published only once that session commits, and dropped if it rolls
+back, so subscribers never hear about data they cannot read yet. Every open
+/api/v1/dashboard/ws connection subscribes for its user, so one DB write
+reaches all of that user's tabs without any of them polling.
+
+The bus lives in this process only: with several uvicorn workers, a tab only
+hears about writes served by the worker it is connected to.
+"""
+
+# ============================================================================
+# IMPORTS
+# ============================================================================
+import asyncio
+import logging
+from typing import Any, Dict, List, Set
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from config import settings
+
+# ============================================================================
+# CONSTANTS
+# ============================================================================
+logger = logging.getLogger(__name__)
+
+# Session.info key holding (user_id, event) pairs waiting for commit
+PENDING_EVENTS_KEY = "dashboard_events"
+
+# Sent instead of the dropped events when a subscriber falls behind
+RESYNC_EVENT = {"type": "resync"}
+
+# ============================================================================
+# EVENT BUS
+# ============================================================================
+class DashboardEventBus:
+    """Fans events out to every subscriber queue of a user."""
+
+    def __init__(self, queue_size: int = settings.DASHBOARD_EVENT_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+
+    def subscribe(self, user_id: str) -> asyncio.Queue:
+        """Register a new subscriber queue for user_id."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.setdefault(user_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, user_id: str, queue: asyncio.Queue) -> None:
+        """Remove a subscriber queue (no-op if already gone)."""
+        queues = self._subscribers.get(user_id)
+        if not queues:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._subscribers[user_id]
+
+    def publish(self, user_id: str, payload: Dict[str, Any]) -> None:
+        """
+        Deliver payload to every subscriber of user_id without blocking.
+        A full queue is replaced by a single resync event: that client has
+        missed changes and refetches instead of replaying a backlog.
+        """
+        for queue in list(self._subscribers.get(user_id, ())):
+            if queue.full():
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(RESYNC_EVENT)
+                logger.warning(f"Dashboard event subscriber for {user_id} fell behind; sent resync")
+            else:
+                queue.put_nowait(payload)
+
+    def subscriber_count(self, user_id: str = None) -> int:
+        """Open subscriptions for one user, or for everyone."""
+        if user_id is not None:
+            return len(self._subscribers.get(user_id, ()))
+        return sum(len(queues) for queues in self._subscribers.values())
+
+# Global bus shared by the services and the websocket route
+dashboard_event_bus = DashboardEventBus()
+
+# ============================================================================
+# TRANSACTION HOOKS
+# ============================================================================
+def stage_event(db, user_id: str, payload: Dict[str, Any]) -> None:
+    """Queue payload for user_id; it is published when db commits."""
+    pending: List = db.info.setdefault(PENDING_EVENTS_KEY, [])
+    pending.append((user_id, payload))
+
+@event.listens_for(Session, "after_commit")
+def _publish_pending_events(session: Session) -> None:
+    """Publish the events staged by the transaction that just committed."""
+    for user_id, payload in session.info.pop(PENDING_EVENTS_KEY, ()):
+        try:
+            dashboard_event_bus.publish(user_id, payload)
+        except Exception as e:
+            logger.error(f"Failed to publish dashboard event {payload.get('type')}: {e}")
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_events(session: Session) -> None:
+    """Rolled-back writes never happened; forget their events."""
+    session.info.pop(PENDING_EVENTS_KEY, None)
@@ -7,6 +7,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from sqlalchemy.orm.attributes import flag_modified
 from models.dashboard_widget_details import DashboardWidgetDetails
+from services.data_version_service import DataVersionService
 from schemas.dashboard_widget import DashboardWidgetCreate, DashboardWidgetUpdate
 from config import settings
 
@@ -37,6 +38,10 @@ class DashboardWidgetService:
         
         self.db.add(widget)
         await self.db.flush()
+        await DataVersionService(self.db).bump_widgets(widget.user_id, change={
+            "type": "widget_created",
+            "widget_id": widget.id,
+        })
         await self.db.refresh(widget)
         return widget
     
@@ -49,6 +54,17 @@ class DashboardWidgetService:
         result = await self.db.execute(stmt)
         return result.scalars().first()
     
+    async def get_widgets_by_ids(self, widget_ids: List[str]) -> List[DashboardWidgetDetails]:
+        """Get several widgets by ID in one query (missing or deleted IDs are skipped)."""
+        if not widget_ids:
+            return []
+        stmt = select(DashboardWidgetDetails).where(
+            DashboardWidgetDetails.id.in_(widget_ids),
+            DashboardWidgetDetails.delete_flag == False
+        )
+        result = await self.db.execute(stmt)
+        return result.scalars().all()
+    
     async def get_user_widgets(self) -> List[DashboardWidgetDetails]:
         """Get all widgets for a specific user."""
         stmt = select(DashboardWidgetDetails).where(
@@ -85,6 +101,11 @@ class DashboardWidgetService:
                     flag_modified(widget, 'widget_config')
         
         logger.info(f"Updating widget: {widget.id}")
+        await DataVersionService(self.db).bump_widgets(widget.user_id, change={
+            "type": "widget_updated",
+            "widget_id": widget.id,
+            "changed_keys": [field for field in updateable_fields if field in update_dict],
+        })
         await self.db.flush()
         await self.db.refresh(widget)
         return widget
@@ -96,6 +117,10 @@ class DashboardWidgetService:
             return False
         
         widget.delete_flag = True
+        await DataVersionService(self.db).bump_widgets(widget.user_id, change={
+            "type": "widget_deleted",
+            "widget_id": widget.id,
+        })
         await self.db.flush()
         return True
     
@@ -0,0 +1,118 @@
+"""
+Data Version service - Per-user, per-date change counters for HTTP caching.
+
+Writes bump the counter for the scope they change ("widgets" for widget
+definitions, the ISO date for a day's daily widgets) in the same transaction
+as the write. Reads turn the counters they depend on into a strong ETag, so
+an unchanged dashboard answers 304 after one primary-key lookup instead of
+rebuilding every widget dict. A bump can also carry a change event, which is
+published to the user's dashboard subscribers with the new version once the
+write commits. Every bump also invalidates the matching parts of the AI
+reference data read model on commit.
+"""
+
+# ============================================================================
+# IMPORTS
+# ============================================================================
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, and_, or_
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from datetime import date
+from typing import Any, Dict, Iterable, Optional, Union
+import logging
+
+from db.engine import IS_POSTGRES
+from models.data_version import DataVersion
+from services.dashboard_events import stage_event
+from services.ai_reference_data import stage_invalidation
+
+# ============================================================================
+# CONSTANTS
+# ============================================================================
+logger = logging.getLogger(__name__)
+WIDGETS_SCOPE = "widgets"
+
+def _date_scope(day: Union[date, str]) -> str:
+    """Scope key for one day (ISO date)."""
+    return day.isoformat() if isinstance(day, date) else str(day)[:10]
+
+# ============================================================================
+# SERVICE CLASS
+# ============================================================================
+class DataVersionService:
+    """Service for bumping and reading data versions.
+
+    Note: This service does NOT commit; bumps commit with the caller's write.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def _bump(self, user_id: str, scopes: Iterable[str]) -> Dict[str, int]:
+        """Increment (or create at 1) the version of each scope; returns the new versions."""
+        rows = [{"user_id": user_id, "scope": scope, "version": 1} for scope in dict.fromkeys(scopes)]
+        if not rows:
+            return {}
+        dialect_insert = postgresql_insert if IS_POSTGRES else sqlite_insert
+        stmt = dialect_insert(DataVersion).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["user_id", "scope"],
+            set_={"version": DataVersion.version + 1},
+        ).returning(DataVersion.scope, DataVersion.version)
+        result = await self.db.execute(stmt)
+        versions = {scope: version for scope, version in result.all()}
+        stage_invalidation(self.db, user_id, versions.keys())
+        return versions
+
+    async def bump_widgets(self, user_id: str, change: Optional[Dict[str, Any]] = None) -> int:
+        """
+        Widget definitions changed (affects every read that joins widget details).
+        change, if given, is published to the user's dashboard subscribers on commit.
+        """
+        version = (await self._bump(user_id, [WIDGETS_SCOPE]))[WIDGETS_SCOPE]
+        if change is not None:
+            stage_event(self.db, user_id, {**change, "version": version})
+        return version
+
+    async def bump_dates(
+        self,
+        user_id: str,
+        days: Iterable[Union[date, str]],
+        change: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, int]:
+        """
+        Daily widgets or activity changed on these days.
+        change, if given, is published once per day (with that day's date and
+        version) to the user's dashboard subscribers on commit.
+        """
+        versions = await self._bump(user_id, [_date_scope(day) for day in days])
+        if change is not None:
+            for scope, version in versions.items():
+                stage_event(self.db, user_id, {**change, "date": scope, "version": version})
+        return versions
+
+    async def get_versions(
+        self,
+        user_id: str,
+        start_date: Union[date, str, None] = None,
+        end_date: Union[date, str, None] = None,
+    ) -> Dict[str, int]:
+        """
+        Versions of the widgets scope and of every bumped date in [start_date, end_date].
+        Scopes never bumped are simply absent (version 0).
+        """
+        scope_filter = DataVersion.scope == WIDGETS_SCOPE
+        if start_date is not None:
+            scope_filter = or_(
+                scope_filter,
+                and_(
+                    DataVersion.scope >= _date_scope(start_date),
+                    DataVersion.scope <= _date_scope(end_date if end_date is not None else start_date),
+                ),
+            )
+        stmt = select(DataVersion.scope, DataVersion.version).where(
+            and_(DataVersion.user_id == user_id, scope_filter)
+        ).order_by(DataVersion.scope)
+        result = await self.db.execute(stmt)
+        return {scope: version for scope, version in result.all()}
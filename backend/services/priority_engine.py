@@ -0,0 +1,80 @@
+"""
+Priority Engine - Day-indexed completion bitmaps with prefix sums.
+
+Each widget's completion history is stored as one byte per day (1 = completed)
+over a fixed date span, plus a running prefix sum. "Completed days in
+[d - n, d]" is then two array lookups, so priorities for every widget over a
+whole date range (e.g. a 365-day history chart) cost O(widgets x days) instead
+of rescanning the history rows for every window of every day.
+"""
+
+# ============================================================================
+# IMPORTS
+# ============================================================================
+from array import array
+from datetime import date, timedelta
+from operator import sub
+from typing import Iterable, List, Union
+
+# ============================================================================
+# COMPLETION BITMAP
+# ============================================================================
+class CompletionBitmap:
+    """Completed/not-completed flag per day for one widget over [start, end]."""
+
+    __slots__ = ("start", "days", "bits", "prefix")
+
+    def __init__(self, start: date, end: date):
+        self.start = start
+        self.days = max(0, (end - start).days + 1)
+        self.bits = bytearray(self.days)
+        # prefix[i] = completed days in [start, start + i - 1]
+        self.prefix = array("l", bytes(array("l").itemsize * (self.days + 1)))
+
+    def mark(self, day: Union[date, str]) -> None:
+        """Mark a day as completed (days outside the span are ignored)."""
+        if isinstance(day, str):
+            day = date.fromisoformat(day[:10])
+        index = (day - self.start).days
+        if 0 <= index < self.days:
+            self.bits[index] = 1
+
+    def build(self) -> "CompletionBitmap":
+        """Recompute the prefix sums; call once after all mark() calls."""
+        prefix = self.prefix
+        running = 0
+        for i, bit in enumerate(self.bits):
+            running += bit
+            prefix[i + 1] = running
+        return self
+
+    def index_of(self, day: date) -> int:
+        """Day offset from the start of the bitmap."""
+        return (day - self.start).days
+
+    def completed_in_last(self, index: int, n_days: int) -> int:
+        """Completed days in [index - n_days, index] (clamped to the bitmap span)."""
+        hi = min(index, self.days - 1) + 1
+        lo = max(0, index - n_days)
+        if hi <= lo:
+            return 0
+        return self.prefix[hi] - self.prefix[lo]
+
+    def window_counts(self, first_index: int, length: int, n_days: int) -> List[int]:
+        """
+        completed_in_last(i, n_days) for every i in [first_index, first_index + length),
+        computed as one subtraction of two prefix-sum slices.
+        """
+        if first_index < n_days or first_index + length > self.days:
+            return [self.completed_in_last(first_index + i, n_days) for i in range(length)]
+        hi = self.prefix[first_index + 1:first_index + length + 1]
+        lo = self.prefix[first_index - n_days:first_index - n_days + length]
+        return list(map(sub, hi, lo))
+
+# ============================================================================
+# HELPERS
+# ============================================================================
+def date_range(start: date, end: date) -> Iterable[date]:
+    """Yield every date in [start, end]."""
+    for offset in range((end - start).days + 1):
+        yield start + timedelta(days=offset)
@@ -0,0 +1,266 @@
+"""
+Response Schema - The JSON shape of the AI's answer, built from variable_config.yaml.
+
+Two things are built once per process from the variables of every intent:
+- build_response_schema(): a JSON schema that LLMClient sends as the
+  structured-output constraint, so the provider can only return one JSON
+  object with intent, ai_response and each variable (null when not known).
+  Properties are all required and closed, as strict structured outputs need.
+- compile_response_validators(): one ResponseValidator per intent. Each one
+  holds a precompiled check per variable, chosen from the variable's
+  forEngine_structure / forEngine_validation. A reply is then checked in one
+  pass over that intent's fields, with no rule lookups.
+
+A field that fails its check is dropped, so it is reported as missing and
+asked for again. The rest of the reply is kept. Fields that must name one of
+the user's tasks are matched against the database by ToolPrefetch.
+"""
+
+# ============================================================================
+# IMPORTS
+# ============================================================================
+import re
+import logging
+from typing import Any, Callable, Dict, List, Mapping, Tuple
+
+from .ai_registry import AIConfig
+
+# ============================================================================
+# CONSTANTS
+# ============================================================================
+logger = logging.getLogger(__name__)
+
+INTENT_FIELD = "intent"
+RESPONSE_FIELD = "ai_response"
+
+# Validation rule of fields that name one of the user's tasks. They are
+# generated before ai_response, so the task lookup can start while the text
+# is still streaming (see tool_prefetch)
+TASK_TITLE_VALIDATION = "exists_in_user_tasks"
+
+# A check returns (True, value to keep) or (False, reason)
+FieldCheck = Callable[[Any], Tuple[bool, Any]]
+
+_TIME_PATTERN = re.compile(r"^([01]?\d|2[0-3]):[0-5]\d$")
+
+_NULLABLE_STRING = {"type": ["string", "null"]}
+_NULLABLE_STRING_LIST = {"type": ["array", "null"], "items": {"type": "string"}}
+
+# forEngine_structure -> JSON schema of the value
+_STRUCTURE_SCHEMAS: Dict[str, Dict[str, Any]] = {
+    "string": _NULLABLE_STRING,
+    "date": _NULLABLE_STRING,
+    "enum": _NULLABLE_STRING,  # values come from the prompt (user's categories...) unless forEngine_enum lists them
+    "integer": {"type": ["integer", "null"]},
+    "dynamic": {"type": ["string", "number", "boolean", "null"]},
+    "list": _NULLABLE_STRING_LIST,
+    "list_of_times": _NULLABLE_STRING_LIST,
+    "list_of_milestones": {
+        "type": ["array", "null"],
+        "items": {
+            "type": "object",
+            "properties": {"text": {"type": "string"}, "due_date": {"type": ["string", "null"]}},
+            "required": ["text", "due_date"],
+            "additionalProperties": False,
+        },
+    },
+}
+
+# ============================================================================
+# SCHEMA
+# ============================================================================
+def _field_schema(var_config: Mapping[str, Any]) -> Dict[str, Any]:
+    """JSON schema of one variable's value (always nullable)."""
+    values = var_config.get("forEngine_enum")
+    if values:
+        return {"type": ["string", "null"], "enum": [*values, None]}
+    return _STRUCTURE_SCHEMAS.get(var_config.get("forEngine_structure"), _NULLABLE_STRING)
+
+def task_title_fields(config: AIConfig) -> Dict[str, str]:
+    """intent -> its variable that must name one of the user's tasks."""
+    fields: Dict[str, str] = {}
+    for intent, variables in config.intent_variables.items():
+        for var_name, var_config in variables.items():
+            if var_config.get("forEngine_validation") == TASK_TITLE_VALIDATION:
+                fields.setdefault(intent, var_name)
+    return fields
+
+def build_response_schema(config: AIConfig) -> Dict[str, Any]:
+    """
+    Schema of one AI reply. Fields are generated in this order: intent, the
+    task title fields, ai_response (streamed), then the other variables.
+    """
+    variables = {
+        var_name: var_config
+        for intent_variables in config.intent_variables.values()
+        for var_name, var_config in intent_variables.items()
+    }
+    properties: Dict[str, Any] = {INTENT_FIELD: {"type": "string", "enum": [*config.intent_variables, ""]}}
+    for var_name in task_title_fields(config).values():
+        if var_name in variables:
+            properties[var_name] = _field_schema(variables[var_name])
+    properties[RESPONSE_FIELD] = {"type": "string"}
+    for var_name, var_config in variables.items():
+        properties.setdefault(var_name, _field_schema(var_config))
+    return {
+        "type": "object",
+        "properties": properties,
+        "required": list(properties),
+        "additionalProperties": False,
+    }
+
+# ============================================================================
+# FIELD CHECKS
+# ============================================================================
+def _check_string(value: Any) -> Tuple[bool, Any]:
+    if isinstance(value, str):
+        return True, value
+    return False, f"expected string, got {type(value).__name__}"
+
+def _check_non_empty_string(value: Any) -> Tuple[bool, Any]:
+    if isinstance(value, str) and value.strip():
+        return True, value
+    return False, "expected a non-empty string"
+
+def _check_integer(value: Any) -> Tuple[bool, Any]:
+    if isinstance(value, bool):
+        return False, "expected integer, got bool"
+    if isinstance(value, int):
+        return True, value
+    if isinstance(value, float) and value.is_integer():
+        return True, int(value)
+    if isinstance(value, str):
+        try:
+            return True, int(value.strip())
+        except ValueError:
+            pass
+    return False, f"expected integer, got {value!r}"
+
+def _check_integer_0_to_100(value: Any) -> Tuple[bool, Any]:
+    ok, number = _check_integer(value)
+    if not ok:
+        return ok, number
+    if not 0 <= number <= 100:
+        return False, f"{number} not between 0 and 100"
+    return True, number
+
+def _check_scalar(value: Any) -> Tuple[bool, Any]:
+    if isinstance(value, (str, int, float, bool)):
+        return True, value
+    return False, f"expected a single value, got {type(value).__name__}"
+
+def _check_string_list(value: Any) -> Tuple[bool, Any]:
+    if isinstance(value, str):
+        return True, [value]
+    if isinstance(value, list) and all(isinstance(item, str) for item in value):
+        return True, value
+    return False, "expected a list of strings"
+
+def _check_time_list(value: Any) -> Tuple[bool, Any]:
+    ok, times = _check_string_list(value)
+    if not ok:
+        return ok, times
+    invalid = [t for t in times if not _TIME_PATTERN.match(t.strip())]
+    if invalid:
+        return False, f"not HH:MM times: {invalid}"
+    return True, [t.strip() for t in times]
+
+def _check_milestone_list(value: Any) -> Tuple[bool, Any]:
+    if not isinstance(value, list):
+        return False, f"expected a list of milestones, got {type(value).__name__}"
+    for i, item in enumerate(value):
+        if not isinstance(item, dict) or not isinstance(item.get("text"), str):
+            return False, f"milestone {i} has no text"
+    return True, value
+
+def _keep_as_is(value: Any) -> Tuple[bool, Any]:
+    """Variables without a known structure are kept as they are."""
+    return True, value
+
+def _enum_check(values: List[Any]) -> FieldCheck:
+    allowed = frozenset(values)
+
+    def check(value: Any) -> Tuple[bool, Any]:
+        if value in allowed:
+            return True, value
+        return False, f"{value!r} not in {sorted(allowed)}"
+    return check
+
+_STRUCTURE_CHECKS: Dict[str, FieldCheck] = {
+    "string": _check_string,
+    "date": _check_string,
+    "enum": _check_string,
+    "integer": _check_integer,
+    "dynamic": _check_scalar,
+    "list": _check_string_list,
+    "list_of_times": _check_time_list,
+    "list_of_milestones": _check_milestone_list,
+}
+
+# forEngine_validation rules that are stricter than the structure check
+_VALIDATION_CHECKS: Dict[str, FieldCheck] = {
+    "non_empty_string": _check_non_empty_string,
+    TASK_TITLE_VALIDATION: _check_non_empty_string,  # then matched against the user's tasks (tool_prefetch)
+    "integer_0_to_100": _check_integer_0_to_100,
+    "time_list": _check_time_list,
+    "milestone_list": _check_milestone_list,
+}
+
+def compile_field_check(var_config: Mapping[str, Any]) -> FieldCheck:
+    """The check of one variable: forEngine_enum, else its validation rule, else its structure."""
+    values = var_config.get("forEngine_enum")
+    if values:
+        return _enum_check(values)
+    return (
+        _VALIDATION_CHECKS.get(var_config.get("forEngine_validation"))
+        or _STRUCTURE_CHECKS.get(var_config.get("forEngine_structure"))
+        or _keep_as_is
+    )
+
+# ============================================================================
+# VALIDATORS
+# ============================================================================
+class ResponseValidator:
+    """Precompiled checks of the fields of one intent."""
+
+    __slots__ = ("intent", "checks")
+
+    def __init__(self, intent: str, checks: Tuple[Tuple[str, FieldCheck], ...]):
+        self.intent = intent
+        self.checks = checks
+
+    def validate(self, response: Dict[str, Any]) -> Tuple[Dict[str, Any], List[str]]:
+        """
+        Keep the non-empty fields of response, with this intent's variables
+        checked (and normalized). Returns (validated, rejected-field errors).
+        """
+        validated = {
+            key: value for key, value in response.items()
+            if value is not None and value != "" and value != []
+        }
+        errors: List[str] = []
+        for field, check in self.checks:
+            if field in validated:
+                ok, result = check(validated[field])
+                if ok:
+                    validated[field] = result
+                else:
+                    del validated[field]
+                    errors.append(f"{field}: {result}")
+        return validated, errors
+
+_BASE_CHECKS: Tuple[Tuple[str, FieldCheck], ...] = (
+    (INTENT_FIELD, _check_string),
+    (RESPONSE_FIELD, _check_string),
+)
+
+def compile_response_validators(config: AIConfig) -> Tuple[Dict[str, ResponseValidator], ResponseValidator]:
+    """One validator per intent, plus the one used for replies without a known intent."""
+    validators = {
+        intent: ResponseValidator(
+            intent,
+            _BASE_CHECKS + tuple((var_name, compile_field_check(var_config)) for var_name, var_config in variables.items()),
+        )
+        for intent, variables in config.intent_variables.items()
+    }
+    return validators, ResponseValidator("", _BASE_CHECKS)
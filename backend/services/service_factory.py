@@ -6,6 +6,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from .dashboard_widget_service import DashboardWidgetService
 from .daily_widget_service import DailyWidgetService
 from .widget_priority_service import WidgetPriorityService
+from .widget_completion_service import WidgetCompletionService
 
 class ServiceFactory:
     """
@@ -21,6 +22,7 @@ class ServiceFactory:
         self._dashboard_widget_service = None
         self._daily_widget_service = None
         self._widget_priority_service = None
+        self._widget_completion_service = None
     
     @property
     def dashboard_widget_service(self) -> DashboardWidgetService:
@@ -42,3 +44,10 @@ class ServiceFactory:
         if self._widget_priority_service is None:
             self._widget_priority_service = WidgetPriorityService(self.db)
         return self._widget_priority_service
+
+    @property
+    def widget_completion_service(self) -> WidgetCompletionService:
+        """Get widget completion ledger service instance"""
+        if self._widget_completion_service is None:
+            self._widget_completion_service = WidgetCompletionService(self.db)
+        return self._widget_completion_service
@@ -0,0 +1,140 @@
+"""
+Tool Prefetch - Look up the task an editing reply names while the reply streams.
+
+Editing replies name the widget the user is talking about in a title field
+(picked_title, old_title: the variables validated as exists_in_user_tasks).
+The response schema puts intent and that field before ai_response, so both
+are complete long before the text is. ToolPrefetch is told about each
+top-level field as the streaming parser completes it. Once it has an intent
+and its title, it starts the lookup of the user's live widget with that
+title in the turn's unit of work, so the query overlaps generation.
+
+When the reply has been validated, resolve() uses the lookup for the
+validated title and cancels the rest (if none was started, it looks up now).
+A title that names none of the user's tasks is dropped from the reply, so it
+is reported as missing and asked for again.
+"""
+
+# ============================================================================
+# IMPORTS
+# ============================================================================
+import time
+import asyncio
+import logging
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from sqlalchemy import select, and_
+
+from db.unit_of_work import UnitOfWork
+from models.dashboard_widget_details import DashboardWidgetDetails
+from services.response_schema import INTENT_FIELD
+
+# ============================================================================
+# CONSTANTS
+# ============================================================================
+logger = logging.getLogger(__name__)
+
+prefetch_metrics: Dict[str, Any] = {
+    "started": 0,          # lookups started during generation
+    "used": 0,             # ... for the validated title
+    "cancelled": 0,        # ... still running when the reply named another title (or none)
+    "discarded": 0,        # ... already finished, but for another title
+    "fetched_after": 0,    # lookups that had to start after the reply (no matching prefetch)
+    "titles_rejected": 0,  # validated titles that named none of the user's tasks
+    "overlapped_ms": 0.0,  # lookup time hidden behind generation
+}
+
+# ============================================================================
+# PREFETCH
+# ============================================================================
+class ToolPrefetch:
+    """Speculative task lookups of one chat turn."""
+
+    def __init__(self, uow: UnitOfWork, user_id: str, title_fields: Mapping[str, str]):
+        self.uow = uow
+        self.user_id = user_id
+        self.title_fields = title_fields  # intent -> field naming one of the user's tasks
+        self._fields: Dict[str, Any] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}  # title -> lookup
+
+    def observe(self, field: str, value: Any) -> None:
+        """A top-level field of the streamed reply is complete."""
+        self._fields[field] = value
+        target = self._target(self._fields)
+        if target and target[1] not in self._tasks:
+            prefetch_metrics["started"] += 1
+            self._tasks[target[1]] = asyncio.create_task(self._lookup(target[1]), name=f"prefetch:{target[0]}")
+
+    async def resolve(self, response: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        The validated response with its task title checked against the
+        user's live tasks; other lookups are cancelled.
+        """
+        target = self._target(response)
+        task = self._tasks.pop(target[1], None) if target else None
+        await self.cancel()
+        if target is None:
+            return response
+        field, title = target
+        resolved_at = time.perf_counter()
+        try:
+            if task is None:
+                prefetch_metrics["fetched_after"] += 1
+                widget_id, _, _ = await self._lookup(title)
+            else:
+                widget_id, started, finished = await task
+                prefetch_metrics["used"] += 1
+                # The part of the lookup that ran before the reply was validated cost the turn nothing
+                prefetch_metrics["overlapped_ms"] += (min(finished, resolved_at) - started) * 1000
+        except Exception as e:
+            logger.error(f"Failed to look up task '{title}': {e}")
+            return response
+        if widget_id is not None:
+            return response
+        prefetch_metrics["titles_rejected"] += 1
+        logger.warning(f"Dropped {field} from AI response: '{title}' is not one of the user's tasks")
+        return {key: value for key, value in response.items() if key != field}
+
+    async def cancel(self) -> None:
+        """Cancel the lookups still held and wait for their sessions to close."""
+        tasks, self._tasks = list(self._tasks.values()), {}
+        for task in tasks:
+            if task.done():
+                prefetch_metrics["discarded"] += 1
+            else:
+                task.cancel()
+                prefetch_metrics["cancelled"] += 1
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _target(self, fields: Mapping[str, Any]) -> Optional[Tuple[str, str]]:
+        """(title field, title) when fields name a task for their intent."""
+        intent = fields.get(INTENT_FIELD)
+        field = self.title_fields.get(intent) if isinstance(intent, str) else None
+        title = fields.get(field) if field else None
+        if isinstance(title, str) and title.strip():
+            return field, title
+        return None
+
+    async def _lookup(self, title: str) -> Tuple[Optional[str], float, float]:
+        """Id of the user's live widget titled title (None if none), with the lookup's start and end times."""
+        started = time.perf_counter()
+        async with self.uow.session(read_only=True) as db:
+            stmt = select(DashboardWidgetDetails.id).where(
+                and_(
+                    DashboardWidgetDetails.user_id == self.user_id,
+                    DashboardWidgetDetails.title == title,
+                    DashboardWidgetDetails.delete_flag == False
+                )
+            ).limit(1)
+            widget_id = (await db.execute(stmt)).scalar()
+        return widget_id, started, time.perf_counter()
+
+def prefetch_stats() -> Dict[str, Any]:
+    """Speculative lookup counters."""
+    started = prefetch_metrics["started"]
+    return {
+        **prefetch_metrics,
+        "overlapped_ms": round(prefetch_metrics["overlapped_ms"], 2),
+        "hit_rate": round(prefetch_metrics["used"] / started, 4) if started else 0.0,
+    }
@@ -1,204 +1,143 @@
 """
 Validation Engine for AI Service
 Applies validation rules from the configuration file
+
+The response schema and one validator per intent are compiled from the
+configuration when the engine is created (see response_schema.py). LLMClient
+sends the schema as the structured-output constraint, so replies normally
+parse on the first try. Text that does not parse (older models, JSON mode
+off) goes through the fence / trailing-comma clean-up as before.
 """
 
 import re
-from typing import Dict, Any, List, Optional, Tuple
-from .config_loader import AIConfigLoader
+import json
+import time
+import logging
+from typing import Dict, Any, Optional
+
+from .ai_registry import AIConfig, get_ai_config
+from .response_schema import (
+    INTENT_FIELD,
+    build_response_schema,
+    compile_response_validators,
+    task_title_fields,
+)
+
+logger = logging.getLogger(__name__)
 
 class ValidationEngine:
     """Validates data according to configuration rules."""
-    
-    def __init__(self):
-        """Initialize validation engine with configuration."""
-        self.config = AIConfigLoader("variable_config.yaml")
-    
-    def _validate_string(self, value: Any, rule: Dict[str, Any]) -> Tuple[bool, Optional[str]]:
-        """Validate string values."""
-        if not isinstance(value, str):
-            return False, f"Expected string, got {type(value).__name__}"
-        
-        min_length = rule.get('min_length', 0)
-        max_length = rule.get('max_length', float('inf'))
-        
-        if len(value) < min_length:
-            return False, f"String too short (min: {min_length})"
-        
-        if len(value) > max_length:
-            return False, f"String too long (max: {max_length})"
-        
-        return True, None
-    
-    def _validate_enum(self, value: Any, rule: Dict[str, Any]) -> Tuple[bool, Optional[str]]:
-        """Validate enum values."""
-        allowed_values = rule.get('values', [])
-        
-        if value not in allowed_values:
-            return False, f"Value '{value}' not in allowed values: {allowed_values}"
-        
-        return True, None
-    
-    def _validate_integer(self, value: Any, rule: Dict[str, Any]) -> Tuple[bool, Optional[str]]:
-        """Validate integer values."""
-        try:
-            int_value = int(value)
-        except (ValueError, TypeError):
-            return False, f"Expected integer, got {type(value).__name__}"
-        
-        min_val = rule.get('min')
-        max_val = rule.get('max')
-        
-        if min_val is not None and int_value < min_val:
-            return False, f"Value too small (min: {min_val})"
-        
-        if max_val is not None and int_value > max_val:
-            return False, f"Value too large (max: {max_val})"
-        
-        return True, None
-    
-    def _validate_float(self, value: Any, rule: Dict[str, Any]) -> Tuple[bool, Optional[str]]:
-        """Validate float values."""
-        try:
-            float_value = float(value)
-        except (ValueError, TypeError):
-            return False, f"Expected float, got {type(value).__name__}"
-        
-        min_val = rule.get('min')
-        max_val = rule.get('max')
-        
-        if min_val is not None and float_value < min_val:
-            return False, f"Value too small (min: {min_val})"
-        
-        if max_val is not None and float_value > max_val:
-            return False, f"Value too large (max: {max_val})"
-        
-        return True, None
-    
-    def _validate_boolean(self, value: Any, rule: Dict[str, Any]) -> Tuple[bool, Optional[str]]:
-        """Validate boolean values."""
-        if isinstance(value, bool):
-            return True, None
-        
-        # Allow string representations
-        if isinstance(value, str):
-            if value.lower() in ['true', 'false', '1', '0', 'yes', 'no']:
-                return True, None
-        
-        return False, f"Expected boolean, got {type(value).__name__}"
-    
-    def _validate_array(self, value: Any, rule: Dict[str, Any]) -> Tuple[bool, Optional[str]]:
-        """Validate array values."""
-        if not isinstance(value, list):
-            return False, f"Expected array, got {type(value).__name__}"
-        
-        items_rule = rule.get('items')
-        if items_rule:
-            for i, item in enumerate(value):
-                if items_rule.get('type') == 'string':
-                    if not isinstance(item, str):
-                        return False, f"Array item {i} should be string, got {type(item).__name__}"
-                
-                # Check enum constraints for array items
-                if 'enum' in items_rule:
-                    if item not in items_rule['enum']:
-                        return False, f"Array item {i} '{item}' not in allowed values: {items_rule['enum']}"
-        
-        return True, None
-    
-    def _validate_custom_function(self, value: Any, rule: Dict[str, Any]) -> Tuple[bool, Optional[str]]:
-        """Validate using custom validation functions."""
-        function_name = rule.get('function')
-        error_message = rule.get('error_message', 'Custom validation failed')
-        
-        # For now, we'll implement basic custom validations
-        if function_name == 'check_exists_in_user_tasks':
-            # This would typically check against a database
-            # For now, we'll assume it's valid if it's a non-empty string
-            if isinstance(value, str) and value.strip():
-                return True, None
-            else:
-                return False, error_message
-        
-        return False, f"Unknown custom validation function: {function_name}"
-    
+
+    def __init__(self, config: Optional[AIConfig] = None):
+        """Initialize validation engine with the process-wide configuration."""
+        config = config or get_ai_config()
+        self.config = config.variable_config
+        # Built once; sent with every LLM call and checked against every reply
+        self.response_schema = build_response_schema(config)
+        self.task_title_fields = task_title_fields(config)  # checked against the database by ToolPrefetch
+        self._validators, self._fallback_validator = compile_response_validators(config)
+        self.metrics: Dict[str, Any] = {
+            "responses": 0,
+            "parsed": 0,       # valid JSON as received
+            "repaired": 0,     # valid JSON after clean-up
+            "malformed": 0,    # no JSON object could be read
+            "fields_rejected": 0,
+            "validate_ms": 0.0,
+        }
+
     async def validate_ai_response(self, ai_response: Any) -> Dict[str, Any]:
         """Validate AI response using the validation engine."""
-        # If already a dict, validate it directly
-        if isinstance(ai_response, dict):
-            return self._validate_dict_response(ai_response)
-        
-        # If string, clean and parse
-        if isinstance(ai_response, str):
-            return self._validate_string_response(ai_response)
-        return {}
-    
-    def _validate_dict_response(self, response: Dict[str, Any]) -> Dict[str, Any]:
-        """Validate dictionary response."""
-        if not isinstance(response, dict):
+        started = time.perf_counter()
+        self.metrics["responses"] += 1
+        try:
+            # If already a dict, validate it directly
+            if isinstance(ai_response, dict):
+                self.metrics["parsed"] += 1
+                return self._validate_dict_response(ai_response)
+
+            # If string, parse (cleaning it only if needed)
+            if isinstance(ai_response, str):
+                return self._validate_string_response(ai_response)
+            self.metrics["malformed"] += 1
             return {}
-        
-        # Basic validation - ensure required fields exist
-        validated = {}
-        
-        # Copy all fields
-        for key, value in response.items():
-            if value is not None and value != "" and value != []:
-                validated[key] = value
-        
+        finally:
+            self.metrics["validate_ms"] += (time.perf_counter() - started) * 1000
+
+    def _validate_dict_response(self, response: Dict[str, Any]) -> Dict[str, Any]:
+        """Validate dictionary response against the validator of its intent."""
+        intent = response.get(INTENT_FIELD)
+        validator = self._validators.get(intent) if isinstance(intent, str) else None
+        validated, errors = (validator or self._fallback_validator).validate(response)
+        if errors:
+            self.metrics["fields_rejected"] += len(errors)
+            logger.warning(f"Dropped invalid fields from AI response ({intent}): {'; '.join(errors)}")
         return validated
-    
+
     def _validate_string_response(self, response: str) -> Dict[str, Any]:
-        """Validate and clean string response."""
+        """Parse a string response, falling back to cleaning it up."""
         if not response or not response.strip():
+            self.metrics["malformed"] += 1
             return {}
-        
-        # Clean the response string
-        cleaned_response = self._clean_response_string(response)
-        
-        # Try to parse as JSON
+
         try:
-            import json
-            parsed = json.loads(cleaned_response)
-            if isinstance(parsed, dict):
-                return self._validate_dict_response(parsed)
-            else:
+            parsed = json.loads(response)
+            self.metrics["parsed"] += 1
+        except json.JSONDecodeError:
+            try:
+                parsed = json.loads(self._clean_response_string(response))
+                self.metrics["repaired"] += 1
+            except json.JSONDecodeError as e:
+                self.metrics["malformed"] += 1
+                logger.error(f"AI response is not valid JSON ({e}): {response[:200]!r}")
                 return {}
-        except json.JSONDecodeError as e:
-            return {}
-    
+
+        if isinstance(parsed, dict):
+            return self._validate_dict_response(parsed)
+        self.metrics["malformed"] += 1
+        logger.error(f"AI response is not a JSON object: {response[:200]!r}")
+        return {}
+
     def _clean_response_string(self, response: str) -> str:
         """Clean response string to handle common formatting issues."""
-        import re
-        
         response = response.strip()
-        
+
         # Remove markdown code blocks
         if response.startswith("```json"):
             response = response[7:]
         elif response.startswith("```"):
             response = response[3:]
-        
+
         if response.endswith("```"):
             response = response[:-3]
-        
+
         # Find JSON object boundaries
         start_idx = response.find("{")
         end_idx = response.rfind("}")
-        
+
         if start_idx != -1 and end_idx != -1 and end_idx > start_idx:
             response = response[start_idx:end_idx + 1]
-        
+
         # Clean common JSON issues
         response = response.strip()
-        
+
         # Remove trailing commas before closing braces/brackets
         response = re.sub(r',(\s*[}\]])', r'\1', response)
-        
+
         # Remove trailing commas at the end of lines
         response = re.sub(r',(\s*\n\s*[}\]])', r'\1', response)
-        
+
         # Remove trailing commas at the end
         response = re.sub(r',\s*$', '', response)
-        
-        return response 
\ No newline at end of file
+
+        return response
+
+    def stats(self) -> Dict[str, Any]:
+        """Parse outcomes, rejected fields and validation time per response."""
+        responses = self.metrics["responses"]
+        return {
+            **self.metrics,
+            "intents": sorted(self._validators),
+            "schema_fields": len(self.response_schema["properties"]),
+            "validate_ms": round(self.metrics["validate_ms"], 3),
+            "avg_validate_ms": round(self.metrics["validate_ms"] / responses, 4) if responses else 0.0,
+        }
@@ -0,0 +1,170 @@
+"""
+Widget Completion service - Maintains the widget_completion ledger.
+
+Completion used to be inferred at read time by digging through
+DailyWidget.activity_data. Every activity write now records the derived
+(completed, progress, value) for that widget and day in the same transaction,
+so priority and analysis queries read plain columns.
+"""
+
+# ============================================================================
+# IMPORTS
+# ============================================================================
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, and_, or_
+from datetime import date, datetime
+from typing import Dict, Any, Optional, List, Tuple
+import logging
+
+from models.daily_widget import DailyWidget
+from models.widget_completion import WidgetCompletion
+
+# ============================================================================
+# CONSTANTS
+# ============================================================================
+logger = logging.getLogger(__name__)
+
+# Per-type activity sections inside DailyWidget.activity_data
+ACTIVITY_KEYS = ("todo_activity", "tracker_activity", "alarm_activity", "websearch_activity")
+
+# ============================================================================
+# DERIVATION
+# ============================================================================
+def _as_float(value: Any) -> Optional[float]:
+    """Parse a numeric activity value ('3', 2.5); None if not numeric."""
+    if isinstance(value, bool) or value is None:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+def derive_completion(activity_data: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Derive the ledger columns from a daily widget's activity_data.
+    completed: status == 'completed' at the top level or in any activity section.
+    progress / value: first numeric 'progress' / 'value' found (top level first).
+    """
+    result = {"completed": False, "progress": None, "value": None}
+    if not activity_data or not isinstance(activity_data, dict):
+        return result
+
+    sections = [activity_data] + [
+        activity_data[key] for key in ACTIVITY_KEYS if isinstance(activity_data.get(key), dict)
+    ]
+    for section in sections:
+        if section.get("status") == "completed":
+            result["completed"] = True
+        if result["progress"] is None:
+            result["progress"] = _as_float(section.get("progress"))
+        if result["value"] is None:
+            result["value"] = _as_float(section.get("value"))
+    return result
+
+# ============================================================================
+# SERVICE CLASS
+# ============================================================================
+class WidgetCompletionService:
+    """Service for reading and writing the widget_completion ledger.
+
+    Note: like the other services, this never commits; the caller owns the
+    transaction so the ledger row commits together with the activity write.
+    The one exception is backfill(), a maintenance job that commits per batch.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def record(self, widget_id: str, day: date, activity_data: Optional[Dict[str, Any]]) -> WidgetCompletion:
+        """Upsert the ledger row for (widget_id, day) from activity_data."""
+        entry = await self.db.get(WidgetCompletion, (widget_id, day))
+        return self._apply(entry, widget_id, day, activity_data)
+
+    def _apply(
+        self,
+        entry: Optional[WidgetCompletion],
+        widget_id: str,
+        day: date,
+        activity_data: Optional[Dict[str, Any]],
+    ) -> WidgetCompletion:
+        """Write derived columns onto an existing ledger row, or add a new one."""
+        derived = derive_completion(activity_data)
+        if entry is None:
+            entry = WidgetCompletion(widget_id=widget_id, date=day)
+            self.db.add(entry)
+        entry.completed = derived["completed"]
+        entry.progress = derived["progress"]
+        entry.value = derived["value"]
+        entry.updated_at = datetime.utcnow()
+        return entry
+
+    async def record_daily_widget(self, daily_widget: DailyWidget) -> WidgetCompletion:
+        """Upsert the ledger row for a DailyWidget's current activity_data."""
+        return await self.record(daily_widget.widget_id, daily_widget.date, daily_widget.activity_data)
+
+    async def get_completed_dates(
+        self,
+        widget_ids: List[str],
+        start_date: date,
+        end_date: date,
+    ) -> List[Tuple[str, date]]:
+        """(widget_id, date) for every completed day of the widgets in [start_date, end_date]."""
+        if not widget_ids:
+            return []
+        stmt = select(WidgetCompletion.widget_id, WidgetCompletion.date).where(
+            and_(
+                WidgetCompletion.widget_id.in_(widget_ids),
+                WidgetCompletion.date >= start_date,
+                WidgetCompletion.date <= end_date,
+                WidgetCompletion.completed == True,
+            )
+        )
+        result = await self.db.execute(stmt)
+        return [(widget_id, day) for widget_id, day in result.all()]
+
+    async def backfill(self, batch_size: int = 500) -> int:
+        """
+        Rebuild ledger rows from every live DailyWidget. Idempotent. Unlike the
+        other writes it commits, once per batch, and then empties the session,
+        so memory stays at one batch whatever the size of daily_widgets.
+        Returns the number of daily widgets processed.
+        """
+        processed = 0
+        last_key: Optional[Tuple[str, date]] = None
+        while True:
+            # Keyset pagination in (widget_id, date) order keeps each batch to a
+            # few widgets, so the existing-ledger lookup below stays narrow.
+            conditions = [DailyWidget.delete_flag == False]
+            if last_key is not None:
+                conditions.append(or_(
+                    DailyWidget.widget_id > last_key[0],
+                    and_(DailyWidget.widget_id == last_key[0], DailyWidget.date > last_key[1]),
+                ))
+            stmt = select(DailyWidget).where(and_(*conditions)).order_by(
+                DailyWidget.widget_id, DailyWidget.date
+            ).limit(batch_size)
+            result = await self.db.execute(stmt)
+            batch = result.scalars().all()
+            if not batch:
+                break
+            # One lookup for the batch's existing ledger rows instead of one per row
+            existing_stmt = select(WidgetCompletion).where(
+                and_(
+                    WidgetCompletion.widget_id.in_({dw.widget_id for dw in batch}),
+                    WidgetCompletion.date >= min(dw.date for dw in batch),
+                    WidgetCompletion.date <= max(dw.date for dw in batch),
+                )
+            )
+            existing = {
+                (entry.widget_id, entry.date): entry
+                for entry in (await self.db.execute(existing_stmt)).scalars().all()
+            }
+            for daily_widget in batch:
+                key = (daily_widget.widget_id, daily_widget.date)
+                existing[key] = self._apply(existing.get(key), *key, daily_widget.activity_data)
+            processed += len(batch)
+            last_key = (batch[-1].widget_id, batch[-1].date)
+            await self.db.commit()
+            self.db.expunge_all()
+            logger.info(f"Backfilled widget_completion for {processed} daily widgets")
+        return processed
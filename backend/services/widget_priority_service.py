@@ -2,18 +2,24 @@
 Widget Priority Service - Returns priority and reason for a dashboard widget on a given date.
 
 Uses same logic as Kotlin PlanningList: RED (critical) / YELLOW (medium) / GREEN (low)
-based on completion in 2d, 7d, 15d, 30d, 60d windows. Completion = daily_widget.activity_data.status == 'completed'.
+based on completion in 2d, 7d, 15d, 30d, 60d windows. Completion is read from the widget_completion
+ledger (see widget_completion_service.derive_completion).
 """
 from typing import Dict, Any, List, Optional
 from datetime import date, timedelta
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from services.priority_engine import CompletionBitmap, date_range
+
 
 # Valid priority levels
 PRIORITY_CRITICAL = "critical"
 PRIORITY_MEDIUM = "medium"
 PRIORITY_LOW = "low"
 
+# Completion windows in days (window N covers [date - N, date])
+WINDOW_DAYS = (2, 7, 15, 30, 60)
+
 # Reason messages per condition (same idea as Kotlin wittyComments)
 REASON_MESSAGES = {
     "DAILY_MISSED": [
@@ -40,37 +46,6 @@ REASON_MESSAGES = {
 }
 
 
-def _is_completed(activity_data: Optional[Dict[str, Any]]) -> bool:
-    """True if this daily widget row is considered completed (status == 'completed')."""
-    if not activity_data or not isinstance(activity_data, dict):
-        return False
-    if activity_data.get("status") == "completed":
-        return True
-    for key in ("todo_activity", "tracker_activity", "alarm_activity", "websearch_activity"):
-        sub = activity_data.get(key)
-        if isinstance(sub, dict) and sub.get("status") == "completed":
-            return True
-    return False
-
-
-def _count_completed_in_window(
-    daily_rows: List[Dict[str, Any]],
-    window_start: date,
-    window_end: date,
-) -> int:
-    """Count how many days in [window_start, window_end] have a completed row."""
-    count = 0
-    for row in daily_rows:
-        d = row.get("date")
-        if d is None:
-            continue
-        if isinstance(d, str):
-            d = date.fromisoformat(d[:10])
-        if window_start <= d <= window_end and _is_completed(row.get("activity_data")):
-            count += 1
-    return count
-
-
 def _get_required_and_period(frequency_details: Optional[Dict[str, Any]]) -> tuple:
     """
     Return (required_count, period) from widget frequency_details.
@@ -92,6 +67,46 @@ def _get_required_and_period(frequency_details: Optional[Dict[str, Any]]) -> tup
     return req, period
 
 
+def _pick_reason(key: str) -> str:
+    msgs = REASON_MESSAGES.get(key, [""])
+    return msgs[0] if msgs else key
+
+
+def _priority_rules(frequency_details: Optional[Dict[str, Any]]) -> List[tuple]:
+    """
+    Return the ordered (window_days, required, priority, reason_key) checks for a widget.
+    The first check whose window has fewer completed days than required wins;
+    if none fails the widget is on track (GREEN).
+
+    Kotlin logic - RED: 2d (daily), 15d (weekly), 60d (monthly).
+    YELLOW: 7d (weekly), 30d (monthly).
+    """
+    required, period = _get_required_and_period(frequency_details)
+    if period == "DAILY":
+        return [(2, required, PRIORITY_CRITICAL, "DAILY_MISSED")]
+    if period == "WEEKLY":
+        return [
+            (15, required * 2, PRIORITY_CRITICAL, "BIWEEKLY_QUOTA_MISSED"),
+            (7, required, PRIORITY_MEDIUM, "WEEKLY_QUOTA_MISSED"),
+        ]
+    # MONTHLY
+    return [
+        (60, required * 2, PRIORITY_CRITICAL, "BIMONTHLY_QUOTA_MISSED"),
+        (30, required, PRIORITY_MEDIUM, "MONTHLY_QUOTA_MISSED"),
+    ]
+
+
+def _priority_from_counts(counts: Dict[int, int], frequency_details: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Apply the RED / YELLOW / GREEN rules to completed-day counts.
+    counts maps each window in WINDOW_DAYS to the completed days in [date - N, date].
+    """
+    for window_days, required, priority, reason_key in _priority_rules(frequency_details):
+        if counts[window_days] < required:
+            return {"priority": priority, "reason": _pick_reason(reason_key)}
+    return {"priority": PRIORITY_LOW, "reason": _pick_reason("ON_TRACK")}
+
+
 class WidgetPriorityService:
     """Service that returns priority and reason for a widget on a given date."""
 
@@ -103,87 +118,79 @@ class WidgetPriorityService:
         Return priority (critical | medium | low) and reason for the given dashboard widget
         on the given date. Uses Kotlin-style windows: 2d, 7d, 15d, 30d, 60d.
         """
+        results = await self.get_priorities_for_date([widget_id], target_date)
+        return results[widget_id]
+
+    async def get_priorities_for_date(self, widget_ids: List[str], target_date: date) -> Dict[str, Dict[str, Any]]:
+        """
+        Batch version of get_priority_for_date for a whole dashboard.
+        Returns {widget_id: {"priority", "reason"}} with the same rules as the
+        per-widget call.
+        """
+        history = await self.get_priority_history(widget_ids, target_date, target_date)
+        return {
+            widget_id: {"priority": days[0]["priority"], "reason": days[0]["reason"]}
+            for widget_id, days in history.items()
+        }
+
+    async def get_priority_history(
+        self,
+        widget_ids: List[str],
+        start_date: date,
+        end_date: date,
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Priority and reason for each widget on every date in [start_date, end_date].
+
+        Loads the widgets and their completed days (from start_date - 60) from the
+        widget_completion ledger in two queries, builds one CompletionBitmap per
+        widget, and answers every window of every day from its prefix sums.
+        Returns {widget_id: [{"date", "priority", "reason"}, ...]} in date order.
+        """
         from services.service_factory import ServiceFactory
         factory = ServiceFactory(self.db)
-        widget_service = factory.dashboard_widget_service
-        daily_service = factory.daily_widget_service
-
-        widget = await widget_service.get_widget(widget_id)
-        if not widget:
-            return {
-                "priority": PRIORITY_MEDIUM,
-                "reason": "Widget not found.",
-            }
-
-        frequency_details = getattr(widget, "frequency_details", None) or {}
-        required, period = _get_required_and_period(frequency_details)
-
-        # Load all daily rows from (target_date - 60) to target_date (inclusive)
-        start = target_date - timedelta(days=60)
-        daily_rows = await daily_service.get_daily_widgets_in_date_range(
-            widget_id, start, target_date
+        widget_ids = list(dict.fromkeys(widget_ids))
+        if not widget_ids or end_date < start_date:
+            return {}
+
+        widgets = await factory.dashboard_widget_service.get_widgets_by_ids(widget_ids)
+        frequency_by_id = {w.id: (w.frequency_details or {}) for w in widgets}
+
+        span_start = start_date - timedelta(days=max(WINDOW_DAYS))
+        completed = await factory.widget_completion_service.get_completed_dates(
+            list(frequency_by_id), span_start, end_date
         )
 
-        # Normalize date in rows to date object for comparison
-        for row in daily_rows:
-            d = row.get("date")
-            if hasattr(d, "isoformat"):
-                pass
-            elif isinstance(d, str):
-                row["date"] = date.fromisoformat(d[:10])
-
-        # Windows (end = target_date; start = target_date - N days)
-        def completed_in_last(n_days: int) -> int:
-            w_start = target_date - timedelta(days=n_days)
-            return _count_completed_in_window(daily_rows, w_start, target_date)
-
-        two_days = completed_in_last(2)
-        seven_days = completed_in_last(7)
-        fifteen_days = completed_in_last(15)
-        thirty_days = completed_in_last(30)
-        sixty_days = completed_in_last(60)
-
-        # Required counts per window (Kotlin logic)
-        # RED: 2d (daily), 15d (weekly), 60d (monthly). YELLOW: 7d (weekly), 30d (monthly).
-        if period == "DAILY":
-            required_2d = required
-            required_7d = required * 7
-            required_15d = required * 15
-            required_30d = required * 30
-            required_60d = required * 60
-        elif period == "WEEKLY":
-            required_2d = 0
-            required_7d = required
-            required_15d = required * 2
-            required_30d = required * 4
-            required_60d = required * 8
-        else:
-            # MONTHLY
-            required_2d = 0
-            required_7d = 0
-            required_15d = 0
-            required_30d = required
-            required_60d = required * 2
-
-        def pick_reason(key: str) -> str:
-            msgs = REASON_MESSAGES.get(key, [""])
-            return msgs[0] if msgs else key
-
-        # RED (critical): long windows missed
-        if period == "DAILY" and two_days < required_2d:
-            return {"priority": PRIORITY_CRITICAL, "reason": pick_reason("DAILY_MISSED")}
-        if period == "WEEKLY" and fifteen_days < required_15d:
-            return {"priority": PRIORITY_CRITICAL, "reason": pick_reason("BIWEEKLY_QUOTA_MISSED")}
-        if period == "MONTHLY" and sixty_days < required_60d:
-            return {"priority": PRIORITY_CRITICAL, "reason": pick_reason("BIMONTHLY_QUOTA_MISSED")}
-
-        # YELLOW (medium): shorter windows missed
-        if period == "DAILY" and two_days < required_2d:
-            return {"priority": PRIORITY_MEDIUM, "reason": pick_reason("DAILY_MISSED")}
-        if period == "WEEKLY" and seven_days < required_7d:
-            return {"priority": PRIORITY_MEDIUM, "reason": pick_reason("WEEKLY_QUOTA_MISSED")}
-        if period == "MONTHLY" and thirty_days < required_30d:
-            return {"priority": PRIORITY_MEDIUM, "reason": pick_reason("MONTHLY_QUOTA_MISSED")}
-
-        # GREEN (low): on track
-        return {"priority": PRIORITY_LOW, "reason": pick_reason("ON_TRACK")}
+        bitmaps = {wid: CompletionBitmap(span_start, end_date) for wid in frequency_by_id}
+        for widget_id, day in completed:
+            bitmaps[widget_id].mark(day)
+
+        dates = list(date_range(start_date, end_date))
+        first_index = (start_date - span_start).days
+        on_track = {"priority": PRIORITY_LOW, "reason": _pick_reason("ON_TRACK")}
+        results: Dict[str, List[Dict[str, Any]]] = {}
+        for widget_id in widget_ids:
+            if widget_id not in frequency_by_id:
+                results[widget_id] = [
+                    {"date": d, "priority": PRIORITY_MEDIUM, "reason": "Widget not found."}
+                    for d in dates
+                ]
+                continue
+            bitmap = bitmaps[widget_id].build()
+            # One count series per rule window for the whole range, then the
+            # first failing rule per day.
+            checks = [
+                (bitmap.window_counts(first_index, len(dates), window_days), required,
+                 {"priority": priority, "reason": _pick_reason(reason_key)})
+                for window_days, required, priority, reason_key in _priority_rules(frequency_by_id[widget_id])
+            ]
+            days = []
+            for offset, d in enumerate(dates):
+                result = on_track
+                for series, required, failed in checks:
+                    if series[offset] < required:
+                        result = failed
+                        break
+                days.append({"date": d, **result})
+            results[widget_id] = days
+        return results
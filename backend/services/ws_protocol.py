@@ -0,0 +1,212 @@
+"""
+WebSocket Protocol - Wire formats of the AI chat websocket.
+
+A client picks the format with the WebSocket subprotocol handshake
+(Sec-WebSocket-Protocol). The first one it lists that the server supports
+is used:
+- brainboard.msgpack.v1: binary msgpack frames, both ways (offered only
+  if msgpack is installed)
+- brainboard.json.v1: JSON text frames
+- none requested: the original protocol. It uses JSON text, and every
+  response carries the full context summary. The frontend uses this one.
+
+On both subprotocols, the context of response frames is sent as a delta
+against what the connection was last sent (ContextDeltas). Only new chat
+messages, changed variables and changed fields are sent, so a frame's size
+depends on the turn, not on the length of the conversation.
+
+Compression is separate from the subprotocol. The server (uvicorn,
+AI_WS_PER_MESSAGE_DEFLATE) accepts permessage-deflate whenever the client
+offers it, and browsers always do.
+"""
+
+# ============================================================================
+# IMPORTS
+# ============================================================================
+import json
+import logging
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+# ============================================================================
+# CONSTANTS
+# ============================================================================
+logger = logging.getLogger(__name__)
+
+SUBPROTOCOL_MSGPACK = "brainboard.msgpack.v1"
+SUBPROTOCOL_JSON = "brainboard.json.v1"
+
+CHATS_FIELD = "user_chats"
+VARIABLES_FIELD = "collected_variables"
+
+protocol_metrics: Dict[str, Any] = {
+    "connections": {"json": 0, SUBPROTOCOL_JSON: 0, SUBPROTOCOL_MSGPACK: 0},
+    "deflate_offered": 0,   # connections whose client offered permessage-deflate
+    "context_full": 0,      # contexts sent whole (first response, or after a reset)
+    "context_deltas": 0,    # contexts sent as a delta
+}
+
+_msgpack: Any = None
+_msgpack_loaded = False
+
+def _get_msgpack() -> Optional[Any]:
+    """The msgpack module, or None if it is not installed."""
+    global _msgpack, _msgpack_loaded
+    if not _msgpack_loaded:
+        _msgpack_loaded = True
+        try:
+            import msgpack
+            _msgpack = msgpack
+        except ImportError:
+            logger.info(f"msgpack not installed; {SUBPROTOCOL_MSGPACK} is not offered")
+    return _msgpack
+
+# ============================================================================
+# NEGOTIATION
+# ============================================================================
+def supported_subprotocols() -> List[str]:
+    """Subprotocols this server can speak."""
+    if _get_msgpack() is not None:
+        return [SUBPROTOCOL_MSGPACK, SUBPROTOCOL_JSON]
+    return [SUBPROTOCOL_JSON]
+
+def negotiate_subprotocol(requested: Sequence[str], extensions: str = "") -> Optional[str]:
+    """The first requested subprotocol we support (None: the original protocol)."""
+    supported = supported_subprotocols()
+    subprotocol = next((name for name in requested if name in supported), None)
+    protocol_metrics["connections"][subprotocol or "json"] += 1
+    if "permessage-deflate" in extensions:
+        protocol_metrics["deflate_offered"] += 1
+    return subprotocol
+
+# ============================================================================
+# CONTEXT DELTAS
+# ============================================================================
+class ContextDeltas:
+    """
+    The context summary one connection was last sent, and the delta to the
+    next one:
+        {"seq": n, "full": false,
+         "user_chats": {"added": [...], "total": n},
+         "collected_variables": {"set": {...}, "removed": [...]},
+         "set": {field: value}}       # other fields that changed
+    Keys with nothing to report are left out. user_chats.total is the
+    number of messages the context now holds; the client drops older ones
+    from the front (the context folds and bounds its history).
+    A full context is sent first, and again if the chat history no longer
+    continues what was sent (the context was reset or evicted). It is sent
+    as {"seq": n, "full": true, "set": summary}.
+    """
+
+    __slots__ = ("seq", "_fields", "_variables", "_last_chat", "_chats_total")
+
+    def __init__(self):
+        self.seq = 0
+        self._fields: Dict[str, Any] = {}
+        self._variables: Dict[str, Any] = {}
+        self._last_chat: Optional[Dict[str, Any]] = None
+        self._chats_total = 0
+
+    def diff(self, summary: Dict[str, Any]) -> Dict[str, Any]:
+        """The delta from the last summary sent to this one (which becomes the last sent)."""
+        self.seq += 1
+        chats = list(summary.get(CHATS_FIELD) or ())
+        added = self._chats_added(chats) if self.seq > 1 else None
+        if added is None:
+            return self._full(summary, chats)
+
+        delta: Dict[str, Any] = {"seq": self.seq, "full": False}
+        if added or len(chats) != self._chats_total:
+            delta[CHATS_FIELD] = {"added": added, "total": len(chats)}
+        variables = summary.get(VARIABLES_FIELD) or {}
+        changed = {key: value for key, value in variables.items() if key not in self._variables or self._variables[key] != value}
+        removed = [key for key in self._variables if key not in variables]
+        if changed or removed:
+            delta[VARIABLES_FIELD] = {"set": changed, "removed": removed}
+        fields = {
+            key: value for key, value in summary.items()
+            if key not in (CHATS_FIELD, VARIABLES_FIELD)
+            and (key not in self._fields or self._fields[key] != value)
+        }
+        if fields:
+            delta["set"] = fields
+        self._remember(summary, chats, variables)
+        protocol_metrics["context_deltas"] += 1
+        return delta
+
+    def _full(self, summary: Dict[str, Any], chats: List[Dict[str, Any]]) -> Dict[str, Any]:
+        self._remember(summary, chats, summary.get(VARIABLES_FIELD) or {})
+        protocol_metrics["context_full"] += 1
+        return {"seq": self.seq, "full": True, "set": summary}
+
+    def _chats_added(self, chats: List[Dict[str, Any]]) -> Optional[List[Dict[str, Any]]]:
+        """Messages after the last one sent; None if it is no longer in the history."""
+        if self._last_chat is None:
+            return chats
+        for i in range(len(chats) - 1, -1, -1):
+            if chats[i] == self._last_chat:
+                return chats[i + 1:]
+        return None
+
+    def _remember(self, summary: Dict[str, Any], chats: List[Dict[str, Any]], variables: Dict[str, Any]) -> None:
+        # Copies: the context changes these containers in place between turns
+        self._fields = {
+            key: list(value) if isinstance(value, list) else dict(value) if isinstance(value, dict) else value
+            for key, value in summary.items() if key not in (CHATS_FIELD, VARIABLES_FIELD)
+        }
+        self._variables = dict(variables)
+        self._last_chat = dict(chats[-1]) if chats else None
+        self._chats_total = len(chats)
+
+# ============================================================================
+# CODEC
+# ============================================================================
+class WireCodec:
+    """Encodes and decodes the frames of one connection in its subprotocol."""
+
+    __slots__ = ("subprotocol", "binary", "_deltas")
+
+    def __init__(self, subprotocol: Optional[str] = None):
+        self.subprotocol = subprotocol
+        self.binary = subprotocol == SUBPROTOCOL_MSGPACK
+        self._deltas = ContextDeltas() if subprotocol else None
+
+    @property
+    def name(self) -> str:
+        return self.subprotocol or "json"
+
+    @property
+    def format_name(self) -> str:
+        return "msgpack" if self.binary else "JSON"
+
+    def encode(self, message: Dict[str, Any]) -> Union[str, bytes]:
+        """One outgoing frame: bytes for msgpack, text otherwise."""
+        if self._deltas is not None:
+            message = self._with_context_delta(message)
+        if self.binary:
+            return _get_msgpack().packb(message, use_bin_type=True)
+        return json.dumps(message)
+
+    def decode(self, data: Union[str, bytes]) -> Any:
+        """One incoming frame; ValueError if it cannot be read."""
+        if not self.binary:
+            return json.loads(data)
+        try:
+            return _get_msgpack().unpackb(data, raw=False)
+        except Exception as e:
+            raise ValueError(f"invalid msgpack frame: {e}") from e
+
+    def _with_context_delta(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        """message with the context of its payload replaced by a delta (the original is not changed)."""
+        for key in ("content", "details"):  # response frame / "response" thinking step
+            payload = message.get(key)
+            if isinstance(payload, dict) and isinstance(payload.get("context"), dict):
+                return {**message, key: {**payload, "context": self._deltas.diff(payload["context"])}}
+        return message
+
+def protocol_stats() -> Dict[str, Any]:
+    """Connections per wire format and how their contexts were sent."""
+    return {
+        **protocol_metrics,
+        "connections": dict(protocol_metrics["connections"]),
+        "supported": supported_subprotocols(),
+    }
@@ -0,0 +1,245 @@
+"""
+WebSocket Send Queue - Bounded outbound frames of one AI chat connection.
+
+The orchestrator reports progress (thinking steps, ai_response deltas, the
+final response) through callbacks. Those callbacks only append to this
+queue; a writer task per connection does the sending. A slow client
+therefore delays its own frames, never the turn that produces them.
+
+While frames wait to be sent:
+- a progress step replaces the previous one still queued, since only the
+  latest step is worth showing
+- consecutive deltas of the same field are merged into one frame
+- frames are encoded when queued, in the connection's wire format
+  (WireCodec, ws_protocol.py); the fixed part of each JSON step frame is
+  serialized once per process
+
+A client that falls behind is disconnected. This happens when one send
+blocks for longer than AI_WS_SEND_TIMEOUT_SECONDS, or when
+AI_WS_SEND_QUEUE_SIZE frames that cannot be merged or dropped are waiting.
+It reconnects and gets a fresh conversation state, instead of the server
+buffering without bound for it.
+"""
+
+# ============================================================================
+# IMPORTS
+# ============================================================================
+import json
+import time
+import asyncio
+import logging
+from collections import deque
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Callable, Deque, Dict, List, Optional, Union
+
+from config import settings
+from services.ws_protocol import WireCodec
+
+# ============================================================================
+# CONSTANTS
+# ============================================================================
+logger = logging.getLogger(__name__)
+
+# Close code sent to clients that fell behind ("try again later")
+SLOW_CLIENT_CLOSE_CODE = 1013
+
+send_queue_metrics: Dict[str, Any] = {
+    "frames_queued": 0,
+    "frames_sent": 0,
+    "steps_coalesced": 0,
+    "deltas_coalesced": 0,
+    "slow_disconnects": 0,
+    "send_errors": 0,
+    "bytes_sent": 0,  # frame payloads (characters for text frames)
+    "max_depth": 0,
+    "send_ms": 0.0,
+}
+
+@lru_cache(maxsize=256)
+def _step_prefix(step: str, details: str) -> str:
+    """Serialized thinking frame up to its timestamp value."""
+    return json.dumps({"type": "thinking", "step": step, "details": details, "timestamp": ""})[:-3]
+
+# ============================================================================
+# FRAMES
+# ============================================================================
+class _Frame:
+    """One queued message: an encoded frame, or delta parts merged until sent."""
+
+    __slots__ = ("data", "field", "parts", "timestamp")
+
+    def __init__(self, data: Union[str, bytes, None] = None, field: Optional[str] = None,
+                 parts: Optional[List[str]] = None, timestamp: Optional[str] = None):
+        self.data = data
+        self.field = field
+        self.parts = parts
+        self.timestamp = timestamp
+
+    def render(self, codec: WireCodec) -> Union[str, bytes]:
+        if self.parts is None:
+            return self.data
+        return codec.encode({
+            "type": "delta",
+            "field": self.field,
+            "content": "".join(self.parts),
+            "timestamp": self.timestamp
+        })
+
+# ============================================================================
+# SEND QUEUE
+# ============================================================================
+class SendQueue:
+    """Outbound frames of one websocket, sent in order by a writer task."""
+
+    def __init__(
+        self,
+        websocket: Any,
+        connection_id: str,
+        max_frames: int = settings.AI_WS_SEND_QUEUE_SIZE,
+        send_timeout: float = settings.AI_WS_SEND_TIMEOUT_SECONDS,
+        on_close: Optional[Callable[[], None]] = None,
+        codec: Optional[WireCodec] = None,
+    ):
+        self.websocket = websocket
+        self.connection_id = connection_id
+        self.codec = codec or WireCodec()
+        self.max_frames = max_frames
+        self.send_timeout = send_timeout
+        self.on_close = on_close
+        self.closed = False
+        self._frames: Deque[_Frame] = deque()
+        self._pending = 0                     # queued frames not superseded
+        self._step: Optional[_Frame] = None   # queued progress step a newer one replaces
+        self._wakeup = asyncio.Event()
+        self._writer: Optional[asyncio.Task] = None
+        self._closer: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Start the writer task."""
+        if self._writer is None:
+            self._writer = asyncio.create_task(self._run(), name=f"ws-send:{self.connection_id}")
+
+    # ------------------------------------------------------------------------
+    # Queueing (never blocks)
+    # ------------------------------------------------------------------------
+    def put_message(self, message: Dict[str, Any]) -> None:
+        """Queue a message that is always sent."""
+        self._append(_Frame(data=self.codec.encode(message)))
+
+    def put_thinking(self, step: str, details: Any) -> None:
+        """Queue a thinking frame; plain progress steps replace the one still queued."""
+        timestamp = datetime.utcnow().isoformat()
+        if not isinstance(details, str):
+            # Steps carrying data (response, error) are always sent
+            self.put_message({"type": "thinking", "step": step, "details": details, "timestamp": timestamp})
+            return
+        if self._step is not None and self._step.data is not None:
+            self._step.data = None
+            self._pending -= 1
+            send_queue_metrics["steps_coalesced"] += 1
+        if self.codec.binary:
+            data = self.codec.encode({"type": "thinking", "step": step, "details": details, "timestamp": timestamp})
+        else:
+            data = f'{_step_prefix(step, details)}"{timestamp}"}}'
+        self._step = _Frame(data=data)
+        self._append(self._step)
+
+    def put_delta(self, field: str, content: str) -> None:
+        """Queue a chunk of a streamed field, merged into the last frame if it is still queued."""
+        last = self._frames[-1] if self._frames else None
+        if last is not None and last.parts is not None and last.field == field:
+            last.parts.append(content)
+            send_queue_metrics["deltas_coalesced"] += 1
+            return
+        self._append(_Frame(field=field, parts=[content], timestamp=datetime.utcnow().isoformat()))
+
+    def _append(self, frame: _Frame) -> None:
+        if self.closed:
+            return
+        if self._pending >= self.max_frames:
+            logger.warning(f"Client {self.connection_id} fell behind ({self._pending} frames queued); disconnecting")
+            send_queue_metrics["slow_disconnects"] += 1
+            self._fail(slow=True)
+            return
+        self._frames.append(frame)
+        self._pending += 1
+        send_queue_metrics["frames_queued"] += 1
+        send_queue_metrics["max_depth"] = max(send_queue_metrics["max_depth"], self._pending)
+        self._wakeup.set()
+
+    # ------------------------------------------------------------------------
+    # Writer
+    # ------------------------------------------------------------------------
+    async def _run(self) -> None:
+        """Send queued frames in order until closed."""
+        while not self.closed:
+            if not self._frames:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            frame = self._frames.popleft()
+            if frame.data is None and frame.parts is None:
+                continue  # superseded step
+            self._pending -= 1
+            if frame is self._step:
+                self._step = None
+            data = frame.render(self.codec)
+            send = self.websocket.send_bytes if isinstance(data, bytes) else self.websocket.send_text
+            started = time.perf_counter()
+            try:
+                await asyncio.wait_for(send(data), self.send_timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"Send to {self.connection_id} blocked for {self.send_timeout}s; disconnecting")
+                send_queue_metrics["slow_disconnects"] += 1
+                self._fail(slow=True)
+                return
+            except Exception as e:
+                logger.error(f"Error sending message to {self.connection_id}: {e}")
+                send_queue_metrics["send_errors"] += 1
+                self._fail()
+                return
+            send_queue_metrics["frames_sent"] += 1
+            send_queue_metrics["bytes_sent"] += len(data)
+            send_queue_metrics["send_ms"] += (time.perf_counter() - started) * 1000
+
+    def _fail(self, slow: bool = False) -> None:
+        """Stop sending; close the socket of a slow client and notify the owner."""
+        if self.closed:
+            return
+        self.close()
+        if slow:
+            self._closer = asyncio.create_task(self._close_socket())
+        if self.on_close is not None:
+            self.on_close()
+
+    async def _close_socket(self) -> None:
+        try:
+            await asyncio.wait_for(self.websocket.close(code=SLOW_CLIENT_CLOSE_CODE), self.send_timeout)
+        except Exception as e:
+            logger.info(f"Could not close slow client {self.connection_id}: {e}")
+
+    def close(self) -> None:
+        """Drop queued frames and stop the writer."""
+        self.closed = True
+        self._frames.clear()
+        self._pending = 0
+        self._step = None
+        if self._writer is not None and self._writer is not asyncio.current_task():
+            self._writer.cancel()
+
+    @property
+    def depth(self) -> int:
+        """Frames waiting to be sent."""
+        return self._pending
+
+def send_queue_stats(queues: Dict[str, SendQueue]) -> Dict[str, Any]:
+    """Send counters, plus the current depth of the given connections' queues."""
+    sent = send_queue_metrics["frames_sent"]
+    return {
+        **send_queue_metrics,
+        "send_ms": round(send_queue_metrics["send_ms"], 2),
+        "avg_send_ms": round(send_queue_metrics["send_ms"] / sent, 3) if sent else 0.0,
+        "queued_now": sum(queue.depth for queue in queues.values()),
+        "deepest_now": max((queue.depth for queue in queues.values()), default=0),
+    }
@@ -13,6 +13,14 @@ OPENAI_MODEL=gpt-3.5-turbo
 OPENAI_TEMPERATURE=0.7
 OPENAI_MAX_TOKENS=150
 OPENAI_RETRY_ATTEMPTS=3
+OPENAI_TIMEOUT=60
+OPENAI_MAX_CONCURRENCY=16
+OPENAI_STREAM=true
+
+# LLM response cache (on | off | record | replay)
+LLM_CACHE_MODE=on
+LLM_CACHE_PATH=llm_cache.db
+LLM_CACHE_TTL_SECONDS=86400
 
 # Session Configuration
 SESSION_TIMEOUT_MINUTES=30
@@ -0,0 +1,45 @@
+"""
+Shared pytest setup: the backend modules import each other from the backend
+directory (``from config import settings``), so it goes on sys.path.
+"""
+import asyncio
+import os
+import sys
+from typing import Any, Awaitable, Callable
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine  # noqa: E402
+
+import models  # noqa: E402,F401  (registers all tables on Base.metadata)
+from models.base import Base  # noqa: E402
+
+@pytest.fixture
+def run_db(tmp_path) -> Callable[[Callable[[AsyncSession], Awaitable[Any]]], Any]:
+    """
+    A temporary SQLite database with every table created. Returns run(fn),
+    which awaits fn(session) in a fresh session and returns its result.
+    """
+    url = f"sqlite+aiosqlite:///{tmp_path / 'brainboard.db'}"
+
+    async def create_tables() -> None:
+        engine = create_async_engine(url)
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        await engine.dispose()
+
+    asyncio.run(create_tables())
+
+    def run(fn: Callable[[AsyncSession], Awaitable[Any]]) -> Any:
+        async def in_session() -> Any:
+            engine = create_async_engine(url)
+            try:
+                async with AsyncSession(engine, expire_on_commit=False) as session:
+                    return await fn(session)
+            finally:
+                await engine.dispose()
+        return asyncio.run(in_session())
+
+    return run
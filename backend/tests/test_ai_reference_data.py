@@ -0,0 +1,67 @@
+"""
+AI reference data read model: loads made for a chat turn run in the turn's
+unit of work, as read-only steps, and are then served from memory.
+"""
+
+# ============================================================================
+# IMPORTS
+# ============================================================================
+from contextlib import asynccontextmanager
+from datetime import date
+
+from models.daily_widget import DailyWidget
+from models.dashboard_widget_details import DashboardWidgetDetails
+from services.ai_reference_data import AIReferenceDataCache
+
+# ============================================================================
+# HELPERS
+# ============================================================================
+class RecordingUnitOfWork:
+    """Stands in for UnitOfWork: hands out the test session and records each step."""
+
+    def __init__(self, db):
+        self.db = db
+        self.steps = []
+
+    @asynccontextmanager
+    async def session(self, read_only: bool = False):
+        self.steps.append("read" if read_only else "write")
+        yield self.db
+
+def add_widget(db, widget_id: str, title: str, widget_type: str = "todo-task"):
+    db.add(DashboardWidgetDetails(
+        id=widget_id, user_id="user-1", widget_type=widget_type, frequency="daily",
+        frequency_details={}, importance=0.5, title=title, category="Health", widget_config={},
+    ))
+
+# ============================================================================
+# TESTS
+# ============================================================================
+def test_loads_run_as_read_only_steps_of_the_unit_of_work(run_db):
+    async def load(db):
+        add_widget(db, "widget-1", "Run")
+        add_widget(db, "widget-2", "Clock", widget_type="simpleClock")
+        db.add(DailyWidget(id="daily-1", widget_id="widget-1", priority="HIGH", date=date.today(), activity_data={}))
+        await db.commit()
+
+        cache, uow = AIReferenceDataCache(), RecordingUnitOfWork(db)
+        titles = await cache.task_titles("user-1", uow)
+        today = await cache.today_list("user-1", uow)
+        # Served from memory: no further steps
+        await cache.all_task_list("user-1", uow)
+        await cache.task_activity("user-1", "Run", 7, uow)
+        return titles, [row["widget_title"] for row in today], uow.steps
+
+    assert run_db(load) == (["Run"], ["Run"], ["read", "read"])
+
+def test_uncached_query_uses_the_unit_of_work(run_db):
+    async def load(db):
+        add_widget(db, "widget-1", "Run")
+        db.add(DailyWidget(id="daily-1", widget_id="widget-1", priority="HIGH", date=date(2025, 1, 10), activity_data={}))
+        await db.commit()
+
+        uow = RecordingUnitOfWork(db)
+        rows = await AIReferenceDataCache().query_activity("user-1", date(2025, 1, 1), date(2025, 1, 31), uow)
+        return [row["date"] for row in rows], uow.steps
+
+    assert run_db(load) == (["2025-01-10"], ["read"])
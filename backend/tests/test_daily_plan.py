@@ -0,0 +1,44 @@
+"""
+Daily plan materializer: the last materialized day lives in
+daily_plan_materializations, including days that needed no rows.
+"""
+
+# ============================================================================
+# IMPORTS
+# ============================================================================
+from datetime import date
+
+from models.dashboard_widget_details import DashboardWidgetDetails
+from models.daily_plan_materialization import DailyPlanMaterialization
+from services.daily_widget_service import DailyWidgetService
+
+# ============================================================================
+# TESTS
+# ============================================================================
+def test_empty_day_is_recorded(run_db):
+    async def materialize(db):
+        service = DailyWidgetService(db)
+        created = await service.materialize_daily_plan(date(2026, 10, 16))
+        await db.commit()
+        return created, await service.get_last_materialized_date()
+
+    assert run_db(materialize) == (0, date(2026, 10, 16))
+
+def test_last_day_is_the_latest_and_rerun_is_idempotent(run_db):
+    async def materialize(db):
+        db.add(DashboardWidgetDetails(
+            id="widget-1", user_id="user-1", widget_type="todo-task", frequency="daily",
+            frequency_details={"frequencyPeriod": "DAILY", "frequency": 1}, importance=0.5,
+            title="Task", widget_config={},
+        ))
+        await db.commit()
+        service = DailyWidgetService(db)
+        assert await service.get_last_materialized_date() is None
+        first = await service.materialize_daily_plan(date(2026, 10, 17))
+        await service.materialize_daily_plan(date(2026, 10, 15))
+        again = await service.materialize_daily_plan(date(2026, 10, 17))
+        await db.commit()
+        record = await db.get(DailyPlanMaterialization, date(2026, 10, 17))
+        return first, again, record.rows_created, await service.get_last_materialized_date()
+
+    assert run_db(materialize) == (1, 0, 0, date(2026, 10, 17))
@@ -0,0 +1,64 @@
+"""
+Prompt fetch plan: each distinct fetch runs once, and what it returns is
+rendered into the prompt once, under the variables it serves.
+"""
+
+# ============================================================================
+# IMPORTS
+# ============================================================================
+import asyncio
+from types import SimpleNamespace
+
+from utils.data_fetch_utils import DataFetchUtils
+
+# ============================================================================
+# HELPERS
+# ============================================================================
+VARIABLE_CONFIG = {
+    "variables": {
+        "old_title": {"forDB_fetch_data_key": "all_task_list"},
+        "analyse_title_list": {"forDB_fetch_data_key": "all_task_list"},
+        "picked_title": {"forDB_fetch_data_key": "today_list"},
+        "new_title": {},
+    }
+}
+
+class FakeDatabaseService:
+    def __init__(self):
+        self.fetches = []
+
+    async def fetch_data_by_key(self, fetch_key, fetch_payload, uow=None):
+        self.fetches.append(fetch_key)
+        if fetch_key == "all_task_list":
+            return [{"title": "Run", "category": "Health"}]
+        return []
+
+def fetch(context):
+    utils = DataFetchUtils()
+    utils.ai_db_service = FakeDatabaseService()
+    data = asyncio.run(utils.get_fetch_data(context, VARIABLE_CONFIG))
+    return utils, data
+
+# ============================================================================
+# TESTS
+# ============================================================================
+def test_fetched_data_is_rendered_once_per_fetch():
+    context = SimpleNamespace(
+        current_intent="editing_config",
+        missing_variables=[{"name": "old_title"}, {"name": "picked_title"}, {"name": "new_title"}],
+        collected_variables={"analyse_title_list": ["Run"]},
+    )
+    utils, data = fetch(context)
+    assert sorted(utils.ai_db_service.fetches) == ["all_task_list", "today_list"]
+
+    formatted = utils.format_fetched_data(data["intent_specific_data"], data["variable_specific_data"])
+    assert formatted == "\n".join([
+        "DATA:",
+        "all_task_list (old_title, analyse_title_list):",
+        '- {"title":"Run","category":"Health"}',
+    ])
+
+def test_nothing_fetched_renders_nothing():
+    context = SimpleNamespace(current_intent="adding", missing_variables=[{"name": "new_title"}], collected_variables={})
+    utils, data = fetch(context)
+    assert utils.format_fetched_data(data["intent_specific_data"], data["variable_specific_data"]) is None
@@ -0,0 +1,86 @@
+"""
+LLMClient retry loop: a rejected response_format is downgraded and retried
+at once, without using one of the caller's attempts.
+"""
+
+# ============================================================================
+# IMPORTS
+# ============================================================================
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from openai import BadRequestError
+
+from ai_engine.models.llm_client import (
+    RESPONSE_FORMAT_JSON_OBJECT,
+    RESPONSE_FORMAT_JSON_SCHEMA,
+    LLMClient,
+)
+
+# ============================================================================
+# HELPERS
+# ============================================================================
+SCHEMA = {"type": "object", "properties": {}, "required": [], "additionalProperties": False}
+
+def rejected_format() -> BadRequestError:
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+    return BadRequestError(
+        "Invalid parameter: 'response_format' of type 'json_schema' is not supported with this model.",
+        response=httpx.Response(400, request=request),
+        body=None,
+    )
+
+class FakeStream:
+    def __init__(self, text: str):
+        self.text = text
+        self.response = SimpleNamespace(aclose=self._aclose)
+
+    async def _aclose(self):
+        pass
+
+    async def __aiter__(self):
+        yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=self.text))])
+
+class FakeCompletions:
+    """Rejects json_schema, answers anything else."""
+
+    def __init__(self):
+        self.formats = []
+
+    async def create(self, stream=False, response_format=None, **kwargs):
+        self.formats.append(response_format["type"])
+        if response_format["type"] == RESPONSE_FORMAT_JSON_SCHEMA:
+            raise rejected_format()
+        if stream:
+            return FakeStream("{}")
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="{}"))])
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("OPENAI_RESPONSE_FORMAT", RESPONSE_FORMAT_JSON_SCHEMA)
+    llm = LLMClient()
+    completions = FakeCompletions()
+    llm.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    return llm, completions
+
+# ============================================================================
+# TESTS
+# ============================================================================
+def test_downgrade_does_not_use_an_attempt(client):
+    llm, completions = client
+    content = asyncio.run(llm._request_completion([], 0.0, 10, 1, httpx.Timeout(1.0), SCHEMA))
+    assert content == "{}"
+    assert completions.formats == [RESPONSE_FORMAT_JSON_SCHEMA, RESPONSE_FORMAT_JSON_OBJECT]
+    assert llm.response_format == RESPONSE_FORMAT_JSON_OBJECT
+
+def test_streamed_downgrade_does_not_use_an_attempt(client):
+    llm, completions = client
+
+    async def collect():
+        return [delta async for delta in llm._request_stream([], 0.0, 10, 1, httpx.Timeout(1.0), SCHEMA)]
+
+    assert asyncio.run(collect()) == ["{}"]
+    assert completions.formats == [RESPONSE_FORMAT_JSON_SCHEMA, RESPONSE_FORMAT_JSON_OBJECT]
@@ -0,0 +1,151 @@
+"""
+Priority engine tests: the prefix-sum bitmap path against the original logic.
+
+The reference below is the pre-bitmap WidgetPriorityService rule set, which
+counted completed days in each inclusive [d - n, d] window by scanning the
+history rows. Every case seeds the widget_completion ledger, asks the
+service for a whole date range, and expects the reference's answer on every
+day of it.
+"""
+
+# ============================================================================
+# IMPORTS
+# ============================================================================
+import asyncio
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, Optional, Set
+
+import pytest
+from fastapi import HTTPException
+
+from models.dashboard_widget_details import DashboardWidgetDetails
+from models.widget_completion import WidgetCompletion
+from routes.dashboard_widgets import get_widget_priority_history
+from services.priority_engine import CompletionBitmap
+from services.widget_priority_service import (
+    PRIORITY_CRITICAL,
+    PRIORITY_LOW,
+    PRIORITY_MEDIUM,
+    WidgetPriorityService,
+    _get_required_and_period,
+)
+
+# ============================================================================
+# CONSTANTS
+# ============================================================================
+TARGET = date(2026, 10, 16)
+
+DAILY = {"frequencyPeriod": "DAILY", "frequency": 1}
+DAILY_HABIT = {"frequencyPeriod": "WEEKLY", "frequency": 1, "isDailyHabit": True}
+WEEKLY_2 = {"frequencyPeriod": "WEEKLY", "frequency": 2}
+MONTHLY_3 = {"frequencyPeriod": "MONTHLY", "frequency": 3}
+
+# ============================================================================
+# REFERENCE (original per-day logic)
+# ============================================================================
+def reference_priority(completed: Set[date], frequency_details: Optional[Dict[str, Any]], target: date) -> str:
+    """Priority of the original service: window N counts completed days in [target - N, target]."""
+    required, period = _get_required_and_period(frequency_details or {})
+
+    def completed_in_last(n_days: int) -> int:
+        start = target - timedelta(days=n_days)
+        return sum(1 for d in completed if start <= d <= target)
+
+    if period == "DAILY" and completed_in_last(2) < required:
+        return PRIORITY_CRITICAL
+    if period == "WEEKLY" and completed_in_last(15) < required * 2:
+        return PRIORITY_CRITICAL
+    if period == "MONTHLY" and completed_in_last(60) < required * 2:
+        return PRIORITY_CRITICAL
+    if period == "WEEKLY" and completed_in_last(7) < required:
+        return PRIORITY_MEDIUM
+    if period == "MONTHLY" and completed_in_last(30) < required:
+        return PRIORITY_MEDIUM
+    return PRIORITY_LOW
+
+def days_ago(*offsets: int) -> Set[date]:
+    return {TARGET - timedelta(days=offset) for offset in offsets}
+
+# ============================================================================
+# HELPERS
+# ============================================================================
+def priority_history(run_db, frequency_details, completed: Iterable[date], start: date, end: date):
+    """Seed one widget and its completed days, then ask the service for [start, end]."""
+    async def query(db):
+        db.add(DashboardWidgetDetails(
+            id="widget-1", user_id="user-1", widget_type="todo-task", frequency="daily",
+            frequency_details=frequency_details, importance=0.5, title="Task", widget_config={},
+        ))
+        for day in completed:
+            db.add(WidgetCompletion(widget_id="widget-1", date=day, completed=True))
+        # A not-completed ledger row never counts
+        db.add(WidgetCompletion(widget_id="widget-1", date=TARGET + timedelta(days=400), completed=False))
+        await db.commit()
+        return await WidgetPriorityService(db).get_priority_history(["widget-1"], start, end)
+
+    return run_db(query)["widget-1"]
+
+# ============================================================================
+# TESTS
+# ============================================================================
+CASES = [
+    # (label, frequency_details, completed days as offsets from TARGET)
+    ("daily, no history", DAILY, ()),
+    ("daily, done today", DAILY, (0,)),
+    ("daily, done on d-2 (window edge)", DAILY, (2,)),
+    ("daily, done on d-3 (just outside)", DAILY, (3,)),
+    ("daily habit flag, done on d-2", DAILY_HABIT, (2,)),
+    ("daily, missing frequency details", None, (1,)),
+    ("weekly, no history", WEEKLY_2, ()),
+    ("weekly, 2 in 7 days, 2 more up to the d-15 edge", WEEKLY_2, (1, 7, 14, 15)),
+    ("weekly, quota met only up to d-7", WEEKLY_2, (0, 7, 8, 12)),
+    ("weekly, 4 done but one at d-16", WEEKLY_2, (0, 3, 10, 16)),
+    ("weekly, on track", WEEKLY_2, (0, 2, 8, 10)),
+    ("monthly, no history", MONTHLY_3, ()),
+    ("monthly, 3 in 30 days, 3 more by d-60 edge", MONTHLY_3, (1, 10, 30, 31, 45, 60)),
+    ("monthly, one of six at d-61", MONTHLY_3, (1, 10, 30, 31, 45, 61)),
+    ("monthly, 6 done but only 2 in 30 days", MONTHLY_3, (1, 10, 31, 40, 50, 59)),
+]
+
+@pytest.mark.parametrize("label, frequency_details, offsets", CASES, ids=[case[0] for case in CASES])
+def test_priority_matches_reference_on_target_date(run_db, label, frequency_details, offsets):
+    completed = days_ago(*offsets)
+    [day] = priority_history(run_db, frequency_details, completed, TARGET, TARGET)
+    assert day["date"] == TARGET
+    assert day["priority"] == reference_priority(completed, frequency_details, TARGET)
+
+@pytest.mark.parametrize("frequency_details", [DAILY, WEEKLY_2, MONTHLY_3], ids=["daily", "weekly", "monthly"])
+def test_priority_history_matches_reference_every_day(run_db, frequency_details):
+    # An irregular history, and a range long enough for the prefix-slice fast path
+    completed = days_ago(0, 1, 4, 5, 9, 16, 17, 18, 30, 44, 61, 62, 75, 90, 91, 100, 120)
+    start, end = TARGET - timedelta(days=60), TARGET
+    history = priority_history(run_db, frequency_details, completed, start, end)
+    assert [day["date"] for day in history] == [start + timedelta(days=i) for i in range(61)]
+    for day in history:
+        assert day["priority"] == reference_priority(completed, frequency_details, day["date"]), day["date"]
+
+def test_unknown_widget_is_medium(run_db):
+    result = run_db(lambda db: WidgetPriorityService(db).get_priority_for_date("missing", TARGET))
+    assert result == {"priority": PRIORITY_MEDIUM, "reason": "Widget not found."}
+
+def test_bitmap_window_is_inclusive_and_clamped():
+    bitmap = CompletionBitmap(TARGET - timedelta(days=10), TARGET)
+    for day in days_ago(0, 2, 3, 10, 11):  # d-11 is outside the span and ignored
+        bitmap.mark(day)
+    bitmap.build()
+    today = bitmap.index_of(TARGET)
+    assert bitmap.completed_in_last(today, 0) == 1
+    assert bitmap.completed_in_last(today, 2) == 2   # [d-2, d]
+    assert bitmap.completed_in_last(today, 3) == 3   # [d-3, d]
+    assert bitmap.completed_in_last(today, 60) == 4  # clamped to the span start
+    assert bitmap.window_counts(today - 1, 2, 2) == [
+        bitmap.completed_in_last(today - 1, 2),
+        bitmap.completed_in_last(today, 2),
+    ]
+
+def test_history_range_is_limited():
+    with pytest.raises(HTTPException) as raised:
+        asyncio.run(get_widget_priority_history(
+            start_date="2026-01-01", end_date="2026-12-31", ids=["widget-1"], db=None,
+        ))
+    assert raised.value.status_code == 400
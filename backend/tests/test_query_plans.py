@@ -0,0 +1,137 @@
+"""
+EXPLAIN QUERY PLAN regression test for the hot query paths.
+
+Migrates a temporary SQLite file to head, runs the real service methods
+against it while recording the SQL they send, and checks that SQLite answers
+every recorded SELECT with index seeks. A query change that stops matching
+an index (for example the partial indexes on live rows) turns one of them
+into a full table scan and fails here.
+"""
+
+# ============================================================================
+# IMPORTS
+# ============================================================================
+import asyncio
+import os
+import sqlite3
+from datetime import date
+from typing import Awaitable, Callable, List, Tuple
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from services.ai_tool_preprocessing import EditingPreprocessing
+from services.daily_widget_service import DailyWidgetService
+from services.dashboard_widget_service import DashboardWidgetService
+from services.widget_completion_service import WidgetCompletionService
+
+# ============================================================================
+# CONSTANTS
+# ============================================================================
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TARGET_DATE = date(2026, 10, 16)
+
+# ============================================================================
+# FIXTURES
+# ============================================================================
+@pytest.fixture(scope="module")
+def database_path(tmp_path_factory) -> str:
+    """A SQLite file migrated to head."""
+    path = str(tmp_path_factory.mktemp("query_plans") / "brainboard.db")
+    config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "migrations"))
+    config.set_main_option("sqlalchemy.url", f"sqlite+aiosqlite:///{path}")
+    command.upgrade(config, "head")
+    return path
+
+# ============================================================================
+# HELPERS
+# ============================================================================
+def _recorded_selects(database_path: str, query: Callable[[AsyncSession], Awaitable]) -> List[Tuple[str, tuple]]:
+    """Run query in a session and return every SELECT it sent, with its parameters."""
+    statements: List[Tuple[str, tuple]] = []
+
+    async def run() -> None:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{database_path}")
+
+        @event.listens_for(engine.sync_engine, "before_cursor_execute")
+        def record(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith("SELECT"):
+                statements.append((statement, tuple(parameters or ())))
+
+        try:
+            async with AsyncSession(engine) as session:
+                await query(session)
+        finally:
+            await engine.dispose()
+
+    asyncio.run(run())
+    return statements
+
+def _query_plan(database_path: str, statement: str, parameters: tuple) -> List[str]:
+    """EXPLAIN QUERY PLAN detail lines of a statement."""
+    conn = sqlite3.connect(database_path)
+    try:
+        rows = conn.execute(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+    finally:
+        conn.close()
+    return [row[-1] for row in rows]
+
+def assert_index_seeks(database_path: str, query: Callable[[AsyncSession], Awaitable]) -> None:
+    """Every table the query's SELECTs read is searched through an index, never scanned."""
+    statements = _recorded_selects(database_path, query)
+    assert statements, "the query sent no SELECT"
+    for statement, parameters in statements:
+        plan = _query_plan(database_path, statement, parameters)
+        scans = [line for line in plan if line.startswith("SCAN ")]
+        assert not scans, f"full scan in plan {plan} of:\n{statement}"
+        assert any(line.startswith("SEARCH ") and "INDEX" in line for line in plan), (
+            f"no index seek in plan {plan} of:\n{statement}"
+        )
+
+# ============================================================================
+# TESTS
+# ============================================================================
+def test_today_list_uses_index(database_path):
+    assert_index_seeks(
+        database_path,
+        lambda db: DailyWidgetService(db).get_today_widget_list(TARGET_DATE.isoformat()),
+    )
+
+def test_widget_date_lookup_uses_index(database_path):
+    assert_index_seeks(
+        database_path,
+        lambda db: DailyWidgetService(db).get_today_widget_by_widget_id("widget-1", TARGET_DATE.isoformat()),
+    )
+
+def test_priority_range_uses_index(database_path):
+    assert_index_seeks(
+        database_path,
+        lambda db: WidgetCompletionService(db).get_completed_dates(
+            ["widget-1", "widget-2"], date(2026, 8, 17), TARGET_DATE
+        ),
+    )
+
+@pytest.mark.parametrize("calendar_type", ["pillarsGraph", "monthly", "yearly", "habitTracker"])
+def test_calendar_range_uses_index(database_path, calendar_type):
+    assert_index_seeks(
+        database_path,
+        lambda db: DailyWidgetService(db).get_widgets_for_calendar_period(
+            "calendar-1", date(2026, 10, 1), date(2026, 10, 31), calendar_type
+        ),
+    )
+
+def test_widgets_by_type_uses_index(database_path):
+    assert_index_seeks(
+        database_path,
+        lambda db: DashboardWidgetService(db).get_widgets_by_type("todo-task"),
+    )
+
+def test_widget_by_title_uses_index(database_path):
+    assert_index_seeks(
+        database_path,
+        lambda db: EditingPreprocessing(db).fetch_editing_context("Morning run", "user-1"),
+    )
@@ -0,0 +1,115 @@
+"""
+Tool prefetch: the task an editing reply names is looked up as soon as the
+streaming parser completes its title field, and the validated reply keeps
+the title only if the user has such a task.
+"""
+
+# ============================================================================
+# IMPORTS
+# ============================================================================
+import json
+from contextlib import asynccontextmanager
+
+from models.dashboard_widget_details import DashboardWidgetDetails
+from services.ai_registry import get_ai_config
+from services.response_schema import build_response_schema, task_title_fields
+from services.tool_prefetch import ToolPrefetch, prefetch_metrics
+from utils.streaming_json import IncrementalJSONParser
+
+# ============================================================================
+# HELPERS
+# ============================================================================
+TITLE_FIELDS = {"editing_config": "old_title", "editing_day_activity": "picked_title"}
+
+class RecordingUnitOfWork:
+    """Stands in for UnitOfWork: hands out the test session and records each step."""
+
+    def __init__(self, db):
+        self.db = db
+        self.steps = []
+
+    @asynccontextmanager
+    async def session(self, read_only: bool = False):
+        self.steps.append("read" if read_only else "write")
+        yield self.db
+
+def add_widget(db, title: str):
+    db.add(DashboardWidgetDetails(
+        id=f"widget-{title}", user_id="user-1", widget_type="todo-task", frequency="daily",
+        frequency_details={}, importance=0.5, title=title, widget_config={},
+    ))
+
+def stream(reply: dict, chunk_size: int = 7):
+    text = json.dumps(reply)
+    return [text[i:i + chunk_size] for i in range(0, len(text), chunk_size)]
+
+# ============================================================================
+# TESTS
+# ============================================================================
+def test_title_fields_come_before_the_streamed_text():
+    config = get_ai_config()
+    assert task_title_fields(config) == TITLE_FIELDS
+    properties = list(build_response_schema(config)["properties"])
+    assert properties[:4] == ["intent", "old_title", "picked_title", "ai_response"]
+
+def test_lookup_starts_before_the_text_is_complete(run_db):
+    reply = {"intent": "editing_config", "old_title": "Run", "ai_response": "Sure, what should change about Run?"}
+
+    async def turn(db):
+        add_widget(db, "Run")
+        await db.commit()
+        uow = RecordingUnitOfWork(db)
+        prefetch, parser = ToolPrefetch(uow, "user-1", TITLE_FIELDS), IncrementalJSONParser()
+        started_with_text = None
+        for chunk in stream(reply):
+            parser.feed(chunk)
+            for field, value in parser.pop_completed():
+                prefetch.observe(field, value)
+            if started_with_text is None and prefetch._tasks:
+                started_with_text = parser.partial("ai_response") or ""
+        used = prefetch_metrics["used"]
+        resolved = await prefetch.resolve(dict(reply))
+        return started_with_text, resolved, prefetch_metrics["used"] - used, uow.steps
+
+    started_with_text, resolved, used, steps = run_db(turn)
+    assert len(started_with_text) < len(reply["ai_response"])
+    assert resolved == reply
+    assert used == 1 and steps == ["read"]
+
+def test_unknown_title_is_dropped(run_db):
+    async def turn(db):
+        add_widget(db, "Run")
+        await db.commit()
+        prefetch = ToolPrefetch(RecordingUnitOfWork(db), "user-1", TITLE_FIELDS)
+        prefetch.observe("intent", "editing_day_activity")
+        prefetch.observe("picked_title", "Swim")
+        return await prefetch.resolve({"intent": "editing_day_activity", "picked_title": "Swim", "ai_response": "Ok"})
+
+    assert run_db(turn) == {"intent": "editing_day_activity", "ai_response": "Ok"}
+
+def test_lookup_for_another_title_is_not_used(run_db):
+    async def turn(db):
+        add_widget(db, "Run")
+        await db.commit()
+        uow = RecordingUnitOfWork(db)
+        prefetch = ToolPrefetch(uow, "user-1", TITLE_FIELDS)
+        prefetch.observe("intent", "editing_config")
+        prefetch.observe("old_title", "Swim")
+        fetched_after = prefetch_metrics["fetched_after"]
+        # The validated reply names another task: that one is looked up instead
+        resolved = await prefetch.resolve({"intent": "editing_config", "old_title": "Run"})
+        return resolved, prefetch_metrics["fetched_after"] - fetched_after, prefetch._tasks
+
+    resolved, fetched_after, pending = run_db(turn)
+    assert resolved == {"intent": "editing_config", "old_title": "Run"}
+    assert fetched_after == 1 and pending == {}
+
+def test_replies_without_a_task_title_are_left_alone(run_db):
+    async def turn(db):
+        uow = RecordingUnitOfWork(db)
+        prefetch = ToolPrefetch(uow, "user-1", TITLE_FIELDS)
+        prefetch.observe("intent", "adding")
+        prefetch.observe("title", "Run")
+        return await prefetch.resolve({"intent": "adding", "title": "Run"}), uow.steps
+
+    assert run_db(turn) == ({"intent": "adding", "title": "Run"}, [])
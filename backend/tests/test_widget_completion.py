@@ -0,0 +1,82 @@
+"""
+widget_completion ledger tests: backfill rebuilds exactly what derive_completion
+says for every live daily widget.
+"""
+
+# ============================================================================
+# IMPORTS
+# ============================================================================
+from datetime import date, timedelta
+
+from sqlalchemy import select
+
+from models.daily_widget import DailyWidget
+from models.widget_completion import WidgetCompletion
+from services.widget_completion_service import WidgetCompletionService, derive_completion
+
+# ============================================================================
+# CONSTANTS
+# ============================================================================
+START = date(2026, 9, 1)
+
+ACTIVITIES = [
+    {},
+    {"status": "completed"},
+    {"todo_activity": {"status": "completed", "progress": 100}},
+    {"todo_activity": {"status": "in_progress", "progress": "40"}},
+    {"tracker_activity": {"value": "2.5", "notes": None}},
+    {"alarm_activity": {"started_at": None}, "status": "pending"},
+]
+
+# ============================================================================
+# TESTS
+# ============================================================================
+def test_backfill_matches_derive_completion(run_db):
+    async def seed(db):
+        for w in range(3):
+            for d in range(20):
+                db.add(DailyWidget(
+                    widget_id=f"widget-{w}", date=START + timedelta(days=d), priority="HIGH",
+                    activity_data=ACTIVITIES[(w + d) % len(ACTIVITIES)],
+                ))
+        # Deleted rows get no ledger entry; a stale entry is corrected
+        db.add(DailyWidget(widget_id="widget-9", date=START, priority="HIGH",
+                           activity_data={"status": "completed"}, delete_flag=True))
+        db.add(WidgetCompletion(widget_id="widget-0", date=START + timedelta(days=1), completed=False))
+        await db.commit()
+
+    async def backfill(db):
+        # Small batches, so pagination crosses widget boundaries
+        return await WidgetCompletionService(db).backfill(batch_size=7)
+
+    async def compare(db):
+        daily = (await db.execute(select(DailyWidget).where(DailyWidget.delete_flag == False))).scalars().all()
+        ledger = {
+            (row.widget_id, row.date): row
+            for row in (await db.execute(select(WidgetCompletion))).scalars().all()
+        }
+        assert set(ledger) == {(dw.widget_id, dw.date) for dw in daily}
+        for dw in daily:
+            row = ledger[(dw.widget_id, dw.date)]
+            assert {"completed": row.completed, "progress": row.progress, "value": row.value} == derive_completion(dw.activity_data)
+        return len(daily)
+
+    run_db(seed)
+    assert run_db(backfill) == 60
+    assert run_db(compare) == 60
+    # Idempotent
+    assert run_db(backfill) == 60
+    assert run_db(compare) == 60
+
+def test_backfill_keeps_session_to_one_batch(run_db):
+    async def seed(db):
+        for d in range(25):
+            db.add(DailyWidget(widget_id="widget-1", date=START + timedelta(days=d), priority="HIGH", activity_data={}))
+        await db.commit()
+
+    async def backfill(db):
+        await WidgetCompletionService(db).backfill(batch_size=10)
+        return len(db.identity_map)
+
+    run_db(seed)
+    assert run_db(backfill) == 0
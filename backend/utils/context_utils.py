@@ -4,20 +4,25 @@ Handles context expectations functionality and variable management.
 """
 
 import logging
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Mapping, Optional
 
 logger = logging.getLogger(__name__)
 
 class ContextUtils:
     """Utility class for handling context expectations and variable management."""
     
-    def __init__(self, variable_config: Dict[str, Any]):
+    def __init__(self, variable_config: Dict[str, Any], intent_variables: Optional[Mapping[str, Any]] = None):
         self.variable_config = variable_config
+        # intent -> {var_name: var_config}; pass the precomputed index to skip the scan
+        self.intent_variables = intent_variables
     
     
     def _get_variables_for_intent(self, intent_type: str) -> Dict[str, Dict[str, Any]]:
         """Get all variables for a specific intent type."""
         try:
+            if self.intent_variables is not None:
+                return dict(self.intent_variables.get(intent_type, {}))
+            
             variables = self.variable_config.get('variables', {})
             intent_variables = {}
             
@@ -4,6 +4,7 @@ Handles conversation history functionality.
 """
 
 import logging
+from collections.abc import MutableSequence
 from typing import List, Dict, Any, Optional
 
 logger = logging.getLogger(__name__)
@@ -19,7 +20,7 @@ class ConversationUtils:
                 formatted_history = []
                 
                 # Handle different data types gracefully
-                if isinstance(context.user_chats, list):
+                if isinstance(context.user_chats, MutableSequence):
                     for chat in context.user_chats:
                         if isinstance(chat, dict):
                             # Ensure we have both role and msg
@@ -63,15 +64,17 @@ class ConversationUtils:
                 logger.error(f"user_chats content: {context.user_chats}")
             return []
     
-    def format_conversation_history(self, history: List[Dict[str, str]]) -> Optional[str]:
-        """Format conversation history for prompt."""
+    def format_conversation_history(self, history: List[Dict[str, str]], summary: Optional[str] = None) -> Optional[str]:
+        """Format conversation history for prompt, after the summary of older turns if there is one."""
         
         if not history:
             return ""
         
         formatted = ["* With respect to this conversation: * "]
+        if summary:
+            formatted.append(f"EARLIER IN THIS CONVERSATION (summary): {summary}\n")
         
-        for i, entry in enumerate(history.slice(0, -1)):
+        for i, entry in enumerate(history[:-1]):
             if isinstance(entry, dict):
                 role = entry.get('role', 'unknown')
                 role = 'user' if role == 'user' else 'ai_response'
@@ -79,7 +82,7 @@ class ConversationUtils:
                 formatted.append(f"{role.upper()}: \"{msg}\"")
         # Simple repetition warning
         formatted.append(f"\n** REPLY TO THE MESSAGE: **\n\n")
-        for i, entry in enumerate(history.slice(-1)):
+        for i, entry in enumerate(history[-1:]):
             if isinstance(entry, dict):
                 msg = entry.get('msg', '')
                 formatted.append(f"USER: \"{msg}\"\n\n")
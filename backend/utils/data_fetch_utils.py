@@ -3,8 +3,12 @@ Data Fetch Utilities
 Handles intent and variable specific data fetching functionality.
 """
 
+import json
+import time
+import asyncio
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
+from db.unit_of_work import UnitOfWork
 from services.ai_db_service import AIDatabaseService
 logger = logging.getLogger(__name__)
 
@@ -14,140 +18,139 @@ class DataFetchUtils:
     def __init__(self):
         self.ai_db_service = AIDatabaseService()
     
-    async def get_intent_specific_data(self, context: Any, variable_config: Dict[str, Any]) -> Dict[str, Any]:
-        """Get intent-specific data from database based on missing variables."""
-        missing_vars = getattr(context, 'missing_variables', [])
+    async def get_fetch_data(
+        self, context: Any, variable_config: Dict[str, Any], uow: Optional[UnitOfWork] = None
+    ) -> Dict[str, Any]:
+        """
+        Intent-specific data (for missing variables) and variable-specific data
+        (for collected variables) in one fetch plan. Each distinct
+        (fetch_key, payload) is fetched once, all of them concurrently, so the
+        plan takes as long as its slowest fetch. Database reads run as
+        read-only steps of uow when it is given.
+
+        Returns {"intent_specific_data", "variable_specific_data", "fetch_trace"};
+        fetch_trace has one entry per fetch with its duration and the
+        variables it served.
+        """
         intent_type = getattr(context, 'current_intent', 'unknown')
+        missing_names = self._missing_variable_names(context)
+        collected_names = self._collected_variable_names(context)
+        
+        # Plan: one fetch per distinct (fetch_key, payload)
+        plan: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        
+        def plan_fetch(var_name: str, var_config: Dict[str, Any]) -> Optional[Tuple[str, str]]:
+            fetch_key = var_config.get('forDB_fetch_data_key')
+            if not fetch_key:
+                return None
+            fetch_payload = var_config.get('forDB_fetch_data_payload', {})
+            key = (fetch_key, json.dumps(fetch_payload, sort_keys=True, default=str))
+            entry = plan.setdefault(key, {"fetch_key": fetch_key, "fetch_payload": fetch_payload, "variables": []})
+            entry["variables"].append(var_name)
+            return key
+        
+        missing_plan = {}
+        for var_name in missing_names:
+            var_config = self._find_variable_config(var_name, variable_config)
+            if var_config and var_config.get('forDB_fetch_data_key'):
+                missing_plan[var_name] = (var_config, plan_fetch(var_name, var_config))
+        
+        collected_plan = {}
+        for var_name in collected_names:
+            var_config = self._find_variable_config(var_name, variable_config)
+            if var_config:
+                collected_plan[var_name] = (var_config, plan_fetch(var_name, var_config))
+        
+        # Run the plan
+        keys = list(plan)
+        outcomes = await asyncio.gather(*(self._timed_fetch(plan[key]["fetch_key"], plan[key]["fetch_payload"], uow) for key in keys))
+        results = {}
+        fetch_trace = []
+        for key, (db_data, elapsed_ms) in zip(keys, outcomes):
+            results[key] = db_data
+            fetch_trace.append({
+                "fetch_key": plan[key]["fetch_key"],
+                "fetch_payload": plan[key]["fetch_payload"],
+                "variables": plan[key]["variables"],
+                "ms": round(elapsed_ms, 2),
+            })
+        
+        def variable_data(var_name: str, var_config: Dict[str, Any], key: Optional[Tuple[str, str]]) -> Dict[str, Any]:
+            return {
+                "intent_type": intent_type,
+                "variable": var_name,
+                "fetch_key": var_config.get('forDB_fetch_data_key'),
+                "fetch_payload": var_config.get('forDB_fetch_data_payload', {}),
+                "data": results.get(key) if key else None
+            }
         
-        data = {}
+        return {
+            "intent_specific_data": {name: variable_data(name, *planned) for name, planned in missing_plan.items()},
+            "variable_specific_data": {name: variable_data(name, *planned) for name, planned in collected_plan.items()},
+            "fetch_trace": fetch_trace,
+        }
+    
+    def _missing_variable_names(self, context: Any) -> List[str]:
+        """Names of the missing variables in context."""
+        missing_vars = getattr(context, 'missing_variables', [])
         
         # Handle both list and dict formats for missing_vars
         if isinstance(missing_vars, list):
             # Expected format: list of dictionaries with 'name' key
-            var_names = [var.get('name') for var in missing_vars if isinstance(var, dict) and var.get('name')]
+            return [var.get('name') for var in missing_vars if isinstance(var, dict) and var.get('name')]
         elif isinstance(missing_vars, dict):
             # Fallback: if it's a dict, use the keys
-            var_names = list(missing_vars.keys())
-        else:
-            logger.warning(f"Unexpected missing_vars format: {type(missing_vars)}")
-            return {}
-        
-        for var_name in var_names:
-            if var_name:
-                var_config = self._find_variable_config(var_name, variable_config)
-                if var_config and var_config.get('forDB_fetch_data_key'):
-                    db_data = await self._fetch_intent_specific_data(intent_type, var_name, var_config)
-                    if db_data:
-                        data[var_name] = db_data
-        
-        return data
-        
-    async def get_variable_specific_data(self, context: Any, variable_config: Dict[str, Any]) -> Dict[str, Any]:
-        """Get variable-specific data from database based on present variables."""
-
+            return [name for name in missing_vars.keys() if name]
+        logger.warning(f"Unexpected missing_vars format: {type(missing_vars)}")
+        return []
+    
+    def _collected_variable_names(self, context: Any) -> List[str]:
+        """Names of the collected variables in context."""
         collected_vars = getattr(context, 'collected_variables', {})
-        intent_type = getattr(context, 'current_intent', 'unknown')
         
         # Handle both dictionary and list formats for backward compatibility
         if isinstance(collected_vars, dict):
             # New format: collected_vars is a dict with var_name as key
-            var_names = list(collected_vars.keys())
+            return [name for name in collected_vars.keys() if name]
         elif isinstance(collected_vars, list):
             # Old format: collected_vars is a list of dicts with 'name' key
-            var_names = [var.get('name') for var in collected_vars if isinstance(var, dict) and var.get('name')]
-        else:
-            logger.warning(f"Unexpected collected_vars format: {type(collected_vars)}")
-            return {}
-        
-        data = {}
-        for var_name in var_names:
-            if var_name:
-                var_config = self._find_variable_config(var_name, variable_config)
-                if var_config:
-                    db_data = await self._fetch_variable_specific_data(intent_type, var_name, var_config)
-                    if db_data:
-                        data[var_name] = db_data
-        
-        return data
-        
+            return [var.get('name') for var in collected_vars if isinstance(var, dict) and var.get('name')]
+        logger.warning(f"Unexpected collected_vars format: {type(collected_vars)}")
+        return []
     
     def _find_variable_config(self, var_name: str, variable_config: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Find variable configuration in variable config file."""
         variables = variable_config.get('variables', {})
         return variables.get(var_name)
     
-    async def _fetch_intent_specific_data(self, intent_type: str, var_name: str, var_config: Dict[str, Any]) -> Optional[Any]:
-        """Fetch intent-specific data from database based on variable config."""
-        fetch_key = var_config.get('forDB_fetch_data_key')
-        fetch_payload = var_config.get('forDB_fetch_data_payload', {})
-        
-        # Fetch data based on the specified key and payload
-        db_data = await self.ai_db_service.fetch_data_by_key(fetch_key, fetch_payload)
-        
-        return {
-            "intent_type": intent_type,
-            "variable": var_name,
-            "fetch_key": fetch_key,
-            "fetch_payload": fetch_payload,
-            "data": db_data
-        }
-    
-    async def _fetch_variable_specific_data(self, intent_type: str, var_name: str, var_config: Dict[str, Any]) -> Optional[Any]:
-        """Fetch variable-specific data from database based on variable config."""
-        fetch_key = var_config.get('forDB_fetch_data_key')
-        fetch_payload = var_config.get('forDB_fetch_data_payload', {})
-        
-        # Fetch data based on the specified key and payload
-        db_data = await self.ai_db_service.fetch_data_by_key(fetch_key, fetch_payload)
-        
-        return {
-            "intent_type": intent_type,
-            "variable": var_name,
-            "fetch_key": fetch_key,
-            "fetch_payload": fetch_payload,
-            "data": db_data
-        }
+    async def _timed_fetch(
+        self, fetch_key: str, fetch_payload: Dict[str, Any], uow: Optional[UnitOfWork] = None
+    ) -> Tuple[Any, float]:
+        """One fetch and how long it took (ms)."""
+        started = time.perf_counter()
+        db_data = await self.ai_db_service.fetch_data_by_key(fetch_key, fetch_payload, uow)
+        return db_data, (time.perf_counter() - started) * 1000
     
-    def format_intent_specific_data(self, data: Dict[str, Any]) -> Optional[str]:
-        """Format intent-specific data for prompt."""
-        if not data:
+    def format_fetched_data(self, intent_specific_data: Dict[str, Any], variable_specific_data: Dict[str, Any]) -> Optional[str]:
+        """
+        Format the fetch plan's results for the prompt: one block per distinct
+        fetch, naming the variables it serves, with one compact JSON line per
+        row. Fetches that returned nothing are left out.
+        """
+        blocks: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        for entries in (intent_specific_data or {}, variable_specific_data or {}):
+            for var_name, entry in entries.items():
+                if not entry.get("data"):
+                    continue
+                key = (entry["fetch_key"], json.dumps(entry.get("fetch_payload", {}), sort_keys=True, default=str))
+                block = blocks.setdefault(key, {"fetch_key": entry["fetch_key"], "data": entry["data"], "variables": []})
+                block["variables"].append(var_name)
+        if not blocks:
             return None
         
-        formatted = ["=== Intent-Specific Data ==="]
-        for key, value in data.items():
-            if isinstance(value, dict):
-                formatted.append(f"{key}:")
-                for sub_key, sub_value in value.items():
-                    if sub_key == 'data' and isinstance(sub_value, (list, dict)):
-                        formatted.append(f"  {sub_key}: {type(sub_value).__name__} with {len(sub_value) if isinstance(sub_value, list) else len(sub_value.keys())} items")
-                    else:
-                        formatted.append(f"  {sub_key}: {sub_value}")
-            else:
-                formatted.append(f"{key}: {value}")
-        
+        formatted = ["DATA:"]
+        for block in blocks.values():
+            formatted.append(f"{block['fetch_key']} ({', '.join(block['variables'])}):")
+            rows = block["data"] if isinstance(block["data"], list) else [block["data"]]
+            formatted.extend(f"- {json.dumps(row, separators=(',', ':'), ensure_ascii=False, default=str)}" for row in rows)
         return "\n".join(formatted)
-    
-    def format_variable_specific_data(self, data: Dict[str, Any]) -> Optional[str]:
-        """Format variable-specific data for prompt."""
-        if not data:
-            return None
-        
-        # Only include variables that have a fetch_key
-        variables_with_fetch_key = {}
-        for key, value in data.items():
-            if isinstance(value, dict) and value.get('fetch_key') is not None:
-                variables_with_fetch_key[key] = value
-        
-        if not variables_with_fetch_key:
-            return None
-        
-        formatted = ["=== Variable-Specific Data ==="]
-        for key, value in variables_with_fetch_key.items():
-            formatted.append(f"{key}:")
-            for sub_key, sub_value in value.items():
-                if sub_key == 'data' and isinstance(sub_value, (list, dict)):
-                    formatted.append(f"  {sub_key}: {type(sub_value).__name__} with {len(sub_value) if isinstance(sub_value, list) else len(sub_value.keys())} items")
-                else:
-                    formatted.append(f"  {sub_key}: {sub_value}")
-        
-        return "\n".join(formatted) 
\ No newline at end of file
@@ -0,0 +1,59 @@
+"""
+HTTP caching helpers: strong ETags from data versions and conditional GETs.
+"""
+
+# ============================================================================
+# IMPORTS
+# ============================================================================
+import hashlib
+import json
+from datetime import date
+from typing import Any, Optional
+
+from fastapi import Request, Response, status
+
+from config import settings
+
+# ============================================================================
+# CONSTANTS
+# ============================================================================
+# Current data: cache, but revalidate with If-None-Match every time
+CACHE_CONTROL_REVALIDATE = "private, no-cache"
+
+# ============================================================================
+# ETAG FUNCTIONS
+# ============================================================================
+def make_etag(*parts: Any) -> str:
+    """Strong ETag over the endpoint, its parameters and the data versions it reads."""
+    payload = json.dumps(parts, sort_keys=True, default=str, separators=(",", ":"))
+    return '"' + hashlib.sha1(payload.encode("utf-8")).hexdigest() + '"'
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """True if the request's If-None-Match lists this ETag (weak comparison, per RFC 9110)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [tag.strip() for tag in header.split(",")]
+    return "*" in candidates or etag in (tag[2:] if tag.startswith("W/") else tag for tag in candidates)
+
+def cache_control_for_range(end_date: date) -> str:
+    """Long-lived caching for ranges entirely in the past; revalidate otherwise."""
+    if end_date < date.today():
+        return f"private, max-age={settings.PAST_RANGE_CACHE_MAX_AGE}"
+    return CACHE_CONTROL_REVALIDATE
+
+def not_modified_or_tag(
+    request: Request,
+    response: Response,
+    etag: str,
+    cache_control: str = CACHE_CONTROL_REVALIDATE,
+) -> Optional[Response]:
+    """
+    Return a 304 response if the client already has this version; otherwise set
+    the caching headers on `response` and return None so the route builds the body.
+    """
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if etag_matches(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return None
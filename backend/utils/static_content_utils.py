@@ -4,53 +4,24 @@ Handles static content like system_prompt, examples_prompt, and reference_data.
 """
 
 import logging
-import yaml
 from typing import Dict, Any, Optional
-from pathlib import Path
+from db.unit_of_work import UnitOfWork
 from services.ai_db_service import AIDatabaseService
+from services.ai_registry import AIConfig, get_ai_config
 
 logger = logging.getLogger(__name__)
 
 class StaticContentUtils:
     """Utility class for handling static content."""
     
-    def __init__(self, config_path: str = "variable_config.yaml"):
-        self.config_path = config_path
-        self.config = self._load_config()
-        self.system_prompt = self._load_system_prompt()
-        self.examples_prompt = self._load_examples_prompt()
+    def __init__(self, config: Optional[AIConfig] = None):
+        # Prompt files and config are read once per process (see ai_registry)
+        config = config or get_ai_config()
+        self.config = config.variable_config
+        self.system_prompt = config.system_prompt
+        self.examples_prompt = config.examples_prompt
         self.ai_db_service = AIDatabaseService()
     
-    def _load_config(self) -> Dict[str, Any]:
-        """Load configuration from YAML file."""
-        try:
-            config_file = Path(__file__).parent.parent / self.config_path
-            with open(config_file, 'r') as f:
-                return yaml.safe_load(f)
-        except Exception as e:
-            logger.error(f"Failed to load config: {e}")
-            return {}
-    
-    def _load_examples_prompt(self) -> str:
-        """Load examples prompt from file."""
-        try:
-            prompt_file = Path(__file__).parent.parent / "examples_prompt.txt"
-            with open(prompt_file, 'r') as f:
-                return f.read().strip()
-        except Exception as e:
-            logger.error(f"Failed to load example prompt: {e}")
-            return "You are an AI assistant that helps with task management and productivity."
-    
-    def _load_system_prompt(self) -> str:
-        """Load system prompt from file."""
-        try:
-            prompt_file = Path(__file__).parent.parent / "system_prompt.txt"
-            with open(prompt_file, 'r') as f:
-                return f.read().strip()
-        except Exception as e:
-            logger.error(f"Failed to load system prompt: {e}")
-            return "You are an AI assistant that helps with task management and productivity."
-    
     def get_system_prompt(self) -> str:
         """Get system prompt content."""
         return self.system_prompt
@@ -59,8 +30,8 @@ class StaticContentUtils:
         """Get examples prompt content."""
         return self.examples_prompt
     
-    async def get_reference_data(self, context: Any) -> Dict[str, Any]:
-        """Get general reference data from database and static config."""
+    async def get_reference_data(self, context: Any, uow: Optional[UnitOfWork] = None) -> Dict[str, Any]:
+        """Get general reference data from database (read through uow when given) and static config."""
         try:
             # Get static categories and formats from config
             static_data = {
@@ -70,7 +41,7 @@ class StaticContentUtils:
             }
             
             # Get user-specific data from database
-            db_data = await self.ai_db_service.fetch_user_reference_data('user_001')
+            db_data = await self.ai_db_service.fetch_user_reference_data('user_001', uow)
             
             # Add today's date
             from datetime import datetime
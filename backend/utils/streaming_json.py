@@ -0,0 +1,260 @@
+"""
+Incremental parser for a JSON object that arrives in chunks.
+
+The LLM answers with one JSON object ({"intent": ..., "ai_response": "..."}),
+streamed a few characters at a time. IncrementalJSONParser is fed those chunks
+and reports, as soon as they are decodable, the new characters of every
+top-level string value, plus each top-level value once it is complete
+(pop_completed()), so callers can act on a field such as intent before the
+model has finished writing the rest. Nothing is re-parsed: every character
+is looked at once, so the cost of a whole response stays linear in its
+length.
+
+Leading prose or a ```json fence before the opening brace is skipped, like
+ValidationEngine._clean_response_string does for complete responses.
+"""
+
+# ============================================================================
+# IMPORTS
+# ============================================================================
+import json
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+# ============================================================================
+# CONSTANTS
+# ============================================================================
+# Parser states
+_BEFORE_OBJECT = 0
+_EXPECT_KEY = 1
+_IN_KEY = 2
+_EXPECT_COLON = 3
+_EXPECT_VALUE = 4
+_IN_STRING = 5
+_IN_RAW = 6
+_DONE = 7
+
+_SIMPLE_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+# Runs of characters that need no per-character handling
+_PLAIN_STRING_RUN = re.compile(r'[^"\\]+')
+_PLAIN_RAW_RUN = re.compile(r'[^"\\{}\[\],]+')
+
+# ============================================================================
+# PARSER
+# ============================================================================
+class IncrementalJSONParser:
+    """Streaming reader for the top-level fields of one JSON object."""
+
+    def __init__(self):
+        self.fields: Dict[str, Any] = {}  # completed top-level values
+        self.done = False
+        self._completed: List[Tuple[str, Any]] = []  # completed since the last pop_completed()
+        self._state = _BEFORE_OBJECT
+        self._key: Optional[str] = None
+        self._buffer: List[str] = []      # current key / string value / raw value text
+        self._escape: Optional[str] = None  # pending escape sequence ("\\", "\\u00")
+        self._high_surrogate: Optional[str] = None
+        self._depth = 0                   # nesting inside a raw (non-string) value
+        self._raw_in_string = False
+        self._raw_escape = False
+
+    @property
+    def current_key(self) -> Optional[str]:
+        """Top-level key whose value is being read (None between values)."""
+        return self._key if self._state in (_EXPECT_VALUE, _IN_STRING, _IN_RAW) else None
+
+    def partial(self, key: str) -> Optional[str]:
+        """Decoded text so far of a top-level string value still being streamed."""
+        if self._state == _IN_STRING and self._key == key:
+            return "".join(self._buffer)
+        value = self.fields.get(key)
+        return value if isinstance(value, str) else None
+
+    def pop_completed(self) -> List[Tuple[str, Any]]:
+        """(key, value) of the top-level values completed since the last call, in order."""
+        completed, self._completed = self._completed, []
+        return completed
+
+    def feed(self, chunk: str) -> List[Tuple[str, str]]:
+        """
+        Consume the next chunk of text. Returns (key, text) pairs of newly
+        decoded characters of top-level string values, in order.
+        """
+        deltas: List[Tuple[str, str]] = []
+        i, n = 0, len(chunk)
+        while i < n and self._state != _DONE:
+            state = self._state
+            ch = chunk[i]
+
+            if state == _BEFORE_OBJECT:
+                brace = chunk.find("{", i)
+                if brace == -1:
+                    return deltas
+                self._state = _EXPECT_KEY
+                i = brace + 1
+
+            elif state == _EXPECT_KEY:
+                if ch == '"':
+                    self._state = _IN_KEY
+                    self._buffer = []
+                elif ch == "}":
+                    self._finish()
+                i += 1
+
+            elif state == _IN_KEY:
+                i, closed, _ = self._read_string(chunk, i)
+                if closed:
+                    self._key = "".join(self._buffer)
+                    self._state = _EXPECT_COLON
+
+            elif state == _EXPECT_COLON:
+                if ch == ":":
+                    self._state = _EXPECT_VALUE
+                i += 1
+
+            elif state == _EXPECT_VALUE:
+                if ch == '"':
+                    self._state = _IN_STRING
+                    self._buffer = []
+                    i += 1
+                elif ch.isspace():
+                    i += 1
+                else:
+                    self._state = _IN_RAW
+                    self._buffer = []
+                    self._depth = 0
+                    self._raw_in_string = False
+                    self._raw_escape = False
+
+            elif state == _IN_STRING:
+                i, closed, decoded = self._read_string(chunk, i)
+                if decoded:
+                    deltas.append((self._key, decoded))
+                if closed:
+                    self._complete("".join(self._buffer))
+                    self._state = _EXPECT_KEY
+
+            elif state == _IN_RAW:
+                i = self._read_raw(chunk, i)
+
+        return deltas
+
+    # ------------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------------
+    def _read_string(self, chunk: str, i: int) -> Tuple[int, bool, str]:
+        """
+        Decode string characters into self._buffer until the closing quote or
+        the end of the chunk. Returns (next index, closed, newly decoded text).
+        """
+        out: List[str] = []
+        n = len(chunk)
+        while i < n:
+            if self._escape is not None:
+                self._escape += chunk[i]
+                i += 1
+                decoded = self._decode_escape()
+                if decoded is not None:
+                    out.append(decoded)
+                continue
+            match = _PLAIN_STRING_RUN.match(chunk, i)
+            if match:
+                out.append(match.group())
+                i = match.end()
+                continue
+            ch = chunk[i]
+            i += 1
+            if ch == '"':
+                text = self._flush_surrogate(out)
+                return i, True, text
+            self._escape = "\\"
+        text = self._flush_surrogate(out, closing=False)
+        return i, False, text
+
+    def _decode_escape(self) -> Optional[str]:
+        """Decoded text of the pending escape once complete (None while incomplete)."""
+        escape = self._escape
+        if len(escape) == 2 and escape[1] != "u":
+            self._escape = None
+            return _SIMPLE_ESCAPES.get(escape[1], escape[1])
+        if len(escape) < 6:
+            return None
+        self._escape = None
+        try:
+            char = chr(int(escape[2:], 16))
+        except ValueError:
+            return ""
+        if 0xD800 <= ord(char) <= 0xDBFF:
+            self._high_surrogate = char
+            return ""
+        if 0xDC00 <= ord(char) <= 0xDFFF and self._high_surrogate:
+            pair = self._high_surrogate + char
+            self._high_surrogate = None
+            return pair.encode("utf-16", "surrogatepass").decode("utf-16")
+        return char
+
+    def _flush_surrogate(self, out: List[str], closing: bool = True) -> str:
+        """Join decoded text into the buffer; a lone high surrogate is dropped at the end."""
+        if closing:
+            self._high_surrogate = None
+        text = "".join(out)
+        if text:
+            self._buffer.append(text)
+        return text
+
+    def _read_raw(self, chunk: str, i: int) -> int:
+        """Collect a number / literal / array / object value until it ends."""
+        n = len(chunk)
+        buffer = self._buffer
+        while i < n:
+            if self._raw_in_string:
+                ch = chunk[i]
+                buffer.append(ch)
+                i += 1
+                if self._raw_escape:
+                    self._raw_escape = False
+                elif ch == "\\":
+                    self._raw_escape = True
+                elif ch == '"':
+                    self._raw_in_string = False
+                continue
+            match = _PLAIN_RAW_RUN.match(chunk, i)
+            if match:
+                buffer.append(match.group())
+                i = match.end()
+                continue
+            ch = chunk[i]
+            if self._depth == 0 and ch in ",}":
+                self._complete_raw()
+                if ch == "}":
+                    self._finish()
+                else:
+                    self._state = _EXPECT_KEY
+                return i + 1
+            buffer.append(ch)
+            i += 1
+            if ch == '"':
+                self._raw_in_string = True
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+        return i
+
+    def _complete_raw(self) -> None:
+        """Store a finished raw value (left as text if it is not valid JSON)."""
+        raw = "".join(self._buffer).strip()
+        try:
+            value = json.loads(raw)
+        except ValueError:
+            value = raw
+        self._complete(value)
+
+    def _complete(self, value: Any) -> None:
+        self.fields[self._key] = value
+        self._completed.append((self._key, value))
+
+    def _finish(self) -> None:
+        self._state = _DONE
+        self.done = True
@@ -7,7 +7,7 @@ import WeatherWidget from './widgets/WeatherWidget';
 import NotesWidget from './widgets/NotesWidget';
 import AddWidgetButton from './AddWidgetButton'
 import { DailyWidget, DashboardWidget } from '../services/api';
-import { useDashboardData } from '../hooks/useDashboardData'
+import { useDashboardData, useDashboardEvents } from '../hooks/useDashboardData'
 import { useAddWidgetToToday, useRemoveWidgetFromToday, useDashboardStore } from '../stores/dashboardStore'
 import { getWidgetConfig, getAllWidgets } from '../config/widgets'
 import { dashboardService } from '../services/dashboard'
@@ -106,6 +106,7 @@ const NewDashboard = () => {
         isLoading,
         error
     } = useDashboardData(currentDate)
+    useDashboardEvents(currentDate)
 
 
 
@@ -54,7 +54,7 @@ const PlanToday = ({ date, onClose }: PlanTodayProps) => {
         });
     }, [allWidgets]);
 
-    // Fetch priority for each mission only (backend uses completion history + frequency)
+    // Fetch priority for all missions in one batch call (backend uses completion history + frequency)
     const dateForApi = currentDate && currentDate.length >= 10 ? currentDate.slice(0, 10) : currentDate;
     const missionIdsStr = useMemo(() => missionWidgets.map((w: DashboardWidget) => w.id).join(','), [missionWidgets]);
 
@@ -62,26 +62,34 @@ const PlanToday = ({ date, onClose }: PlanTodayProps) => {
         if (!dateForApi || missionIdsStr === '') return;
         const missionIds = missionIdsStr.split(',');
         const abort = { current: false };
-        missionIds.forEach((widgetId: string) => {
-            setPriorityLoading(prev => ({ ...prev, [widgetId]: true }));
-            apiService
-                .getWidgetPriorityForDate(widgetId, dateForApi)
-                .then((res) => {
-                    if (!abort.current) {
-                        setWidgetPriorities(prev => ({ ...prev, [widgetId]: { priority: res.priority, reason: res.reason } }));
-                    }
-                })
-                .catch(() => {
-                    if (!abort.current) {
-                        setWidgetPriorities(prev => ({ ...prev, [widgetId]: { priority: 'medium', reason: 'Could not load past performance.' } }));
-                    }
-                })
-                .finally(() => {
-                    if (!abort.current) {
-                        setPriorityLoading(prev => ({ ...prev, [widgetId]: false }));
-                    }
-                });
-        });
+        const allLoading = Object.fromEntries(missionIds.map((id: string) => [id, true]));
+        setPriorityLoading(prev => ({ ...prev, ...allLoading }));
+        apiService
+            .getWidgetPrioritiesForDate(missionIds, dateForApi)
+            .then((res) => {
+                if (!abort.current) {
+                    const next: Record<string, WidgetPriorityInfo> = {};
+                    missionIds.forEach((id: string) => {
+                        const p = res[id];
+                        next[id] = p
+                            ? { priority: p.priority, reason: p.reason }
+                            : { priority: 'medium', reason: 'Could not load past performance.' };
+                    });
+                    setWidgetPriorities(prev => ({ ...prev, ...next }));
+                }
+            })
+            .catch(() => {
+                if (!abort.current) {
+                    const fallback = Object.fromEntries(missionIds.map((id: string) => [id, { priority: 'medium' as WidgetPriority, reason: 'Could not load past performance.' }]));
+                    setWidgetPriorities(prev => ({ ...prev, ...fallback }));
+                }
+            })
+            .finally(() => {
+                if (!abort.current) {
+                    const doneLoading = Object.fromEntries(missionIds.map((id: string) => [id, false]));
+                    setPriorityLoading(prev => ({ ...prev, ...doneLoading }));
+                }
+            });
         return () => { abort.current = true; };
     }, [dateForApi, missionIdsStr]);
 
@@ -29,6 +29,24 @@ const AiChatWidget: React.FC<AiChatWidgetProps> = ({ onRemove, hideTitle }) => {
   const [websocket, setWebsocket] = useState<WebSocket | null>(null);
   const messagesEndRef = useRef<HTMLDivElement>(null);
   const inputRef = useRef<HTMLTextAreaElement>(null);
+  // Id of the response message currently being filled by streamed delta frames
+  const streamingMessageIdRef = useRef<string | null>(null);
+  // Messages sent whose turn has not ended yet (response, error or turn_cancelled)
+  const pendingTurnsRef = useRef(0);
+
+  const endTurn = () => {
+    pendingTurnsRef.current = Math.max(0, pendingTurnsRef.current - 1);
+    setIsProcessing(pendingTurnsRef.current > 0);
+  };
+
+  // Drop the streamed preview of the turn in flight
+  const clearStreamingPreview = () => {
+    const streamingId = streamingMessageIdRef.current;
+    if (streamingId) {
+      streamingMessageIdRef.current = null;
+      setMessages(prev => prev.filter(m => m.id !== streamingId));
+    }
+  };
 
   // Connect to WebSocket on mount
   useEffect(() => {
@@ -59,9 +77,33 @@ const AiChatWidget: React.FC<AiChatWidgetProps> = ({ onRemove, hideTitle }) => {
             return;
           }
 
+          // Append streamed text to the in-progress response message
+          if (messageData.type === 'delta') {
+            const chunk = (messageData.content as string) || '';
+            const streamingId = streamingMessageIdRef.current;
+            if (streamingId) {
+              setMessages(prev => prev.map(m => m.id === streamingId ? { ...m, content: (m.content || '') + chunk } : m));
+            } else {
+              const id = 'stream-' + Date.now();
+              streamingMessageIdRef.current = id;
+              setMessages(prev => [...prev, { id, type: 'response', content: chunk, timestamp: new Date() }]);
+            }
+            return;
+          }
+
+          // A newer message superseded the turn in flight: discard its partial text.
+          // Its user message stays; the next reply answers both
+          if (messageData.type === 'turn_cancelled') {
+            clearStreamingPreview();
+            endTurn();
+            return;
+          }
+
           // Stop processing indicator for response or error
           if (messageData.type === 'response' || messageData.type === 'error') {
-            setIsProcessing(false);
+            endTurn();
+            // The final frame replaces the streamed preview
+            clearStreamingPreview();
           }
 
           // For any socket ping that comes in, we will show it
@@ -94,6 +136,10 @@ const AiChatWidget: React.FC<AiChatWidgetProps> = ({ onRemove, hideTitle }) => {
         // onClose handler
         () => {
           setIsConnected(false);
+          // Turns in flight end with the connection
+          pendingTurnsRef.current = 0;
+          setIsProcessing(false);
+          clearStreamingPreview();
         }
       );
 
@@ -110,8 +156,9 @@ const AiChatWidget: React.FC<AiChatWidgetProps> = ({ onRemove, hideTitle }) => {
   }, []);
 
 
+  // Sending while a turn is in flight is allowed: the backend supersedes or queues it (AI_TURN_POLICY)
   const handleSendMessage = async () => {
-    if (!inputValue.trim() || isProcessing || !isConnected) {
+    if (!inputValue.trim() || !isConnected) {
       return;
     }
 
@@ -124,6 +171,7 @@ const AiChatWidget: React.FC<AiChatWidgetProps> = ({ onRemove, hideTitle }) => {
 
     setMessages(prev => [...prev, userMessage]);
     setInputValue('');
+    pendingTurnsRef.current += 1;
     setIsProcessing(true);
 
     try {
@@ -141,7 +189,7 @@ const AiChatWidget: React.FC<AiChatWidgetProps> = ({ onRemove, hideTitle }) => {
       }
     } catch (error) {
       console.error('Error sending message:', error);
-      setIsProcessing(false);
+      endTurn();
 
       const errorMessage: Message = {
         id: Date.now().toString(),
@@ -326,7 +374,7 @@ const AiChatWidget: React.FC<AiChatWidgetProps> = ({ onRemove, hideTitle }) => {
             </div>
             <button
               onClick={handleSendMessage}
-              disabled={!inputValue.trim() || isProcessing || !isConnected}
+              disabled={!inputValue.trim() || !isConnected}
               className="px-2 py-1  bg-primary text-primary-foreground rounded-lg text-xs font-medium hover:bg-primary/90 disabled:opacity-50 disabled:cursor-not-allowed transition-colors"
             >
               {isProcessing ? (
@@ -11,6 +11,7 @@ export const API_CONFIG = {
     deleteWidget: '/api/v1/dashboard-widgets/{widget_id}/delete', // DELETE - Delete widget
     getWidgetsByType: '/api/v1/dashboard-widgets/alloftype/{widget_type}', // GET - Get widgets by type
     getWidgetPriorityForDate: '/api/v1/dashboard-widgets/{widget_id}/priority', // GET - Priority + reason for widget on date
+    getWidgetPrioritiesForDate: '/api/v1/dashboard-widgets/priorities', // GET - Priority + reason for many widgets on date
   },
 
   // AI Service endpoints (/api/v1/ai/)
@@ -33,6 +34,11 @@ export const API_CONFIG = {
     aiService: '/api/v1/ai/ws', // WebSocket - Real-time AI processing updates
   },
 
+  // Dashboard WebSocket endpoint
+  dashboardWebSocket: {
+    events: '/api/v1/dashboard/ws', // WebSocket - Pushed dashboard change events
+  },
+
   // Dashboard endpoints (/api/v1/dashboard/)
   dashboard: {
     getTodayWidgetList: '/api/v1/dashboard/getTodayWidgetList', // GET - Get today's widget list
@@ -183,4 +189,40 @@ export const aiWebSocket = {
       throw new Error('WebSocket is not open');
     }
   }
-}; 
\ No newline at end of file
+}; 
+
+// Dashboard change event pushed by the backend after each committed write
+export interface DashboardChangeEvent {
+  type: string; // activity_updated, daily_widget_added, widget_updated, resync, ...
+  daily_widget_id?: string;
+  widget_id?: string;
+  changed_keys?: string[];
+  date?: string;
+  version?: number;
+}
+
+// WebSocket helper for dashboard change events
+export const dashboardWebSocket = {
+  // Open the change-event stream; messages the client cannot parse are dropped
+  connect: (onEvent: (event: DashboardChangeEvent) => void, onClose?: () => void) => {
+    const wsUrl = `${API_CONFIG.baseUrl.replace('http', 'ws')}${API_CONFIG.dashboardWebSocket.events}`;
+
+    const ws = new WebSocket(wsUrl);
+
+    ws.onmessage = (event) => {
+      try {
+        onEvent(JSON.parse(event.data));
+      } catch (error) {
+        console.error('🔴 API: Error parsing dashboard event:', error);
+      }
+    };
+
+    if (onClose) {
+      ws.onclose = () => {
+        onClose();
+      };
+    }
+
+    return ws;
+  }
+};
@@ -1,5 +1,10 @@
 import { useEffect, useMemo } from 'react'
 import { useDashboardStore } from '../stores/dashboardStore'
+import { dashboardWebSocket, DashboardChangeEvent } from '../config/api'
+
+// Bursts of events (e.g. the nightly daily-plan materializer) collapse into one refetch
+const EVENT_DEBOUNCE_MS = 250
+const MAX_RECONNECT_DELAY_MS = 30000
 
 /**
  * Simple hook to load dashboard data with proper memoization
@@ -26,6 +31,68 @@ export const useDashboardData = (targetDate: string) => {
   }), [allWidgets, todayWidgets, isLoading, error])
 }
 
+/**
+ * Keep the store in sync with writes made elsewhere (other tabs, the AI
+ * assistant) by listening on the dashboard push channel instead of polling
+ */
+export const useDashboardEvents = (targetDate: string) => {
+  const reloadData = useDashboardStore(state => state.reloadData)
+
+  useEffect(() => {
+    if (!targetDate) return
+
+    let ws: WebSocket | null = null
+    let closed = false
+    let connectedOnce = false
+    let reconnectDelay = 1000
+    let reconnectTimer: ReturnType<typeof setTimeout> | undefined
+    let debounceTimer: ReturnType<typeof setTimeout> | undefined
+    let pendingScope: 'all' | 'widgets' | 'today' | null = null
+
+    const scheduleReload = (scope: 'all' | 'widgets' | 'today') => {
+      pendingScope = pendingScope && pendingScope !== scope ? 'all' : scope
+      clearTimeout(debounceTimer)
+      debounceTimer = setTimeout(() => {
+        const reloadScope = pendingScope
+        pendingScope = null
+        if (reloadScope) reloadData(targetDate, reloadScope)
+      }, EVENT_DEBOUNCE_MS)
+    }
+
+    const handleEvent = (event: DashboardChangeEvent) => {
+      if (event.type === 'connection') {
+        reconnectDelay = 1000
+        // Events sent while disconnected were missed; catch up once
+        if (connectedOnce) scheduleReload('all')
+        connectedOnce = true
+      } else if (event.type === 'resync') {
+        scheduleReload('all')
+      } else if (event.type.startsWith('widget_')) {
+        // Widget definitions are joined into today's list as well
+        scheduleReload('all')
+      } else if (event.date === targetDate) {
+        scheduleReload('today')
+      }
+    }
+
+    const connect = () => {
+      ws = dashboardWebSocket.connect(handleEvent, () => {
+        if (closed) return
+        reconnectTimer = setTimeout(connect, reconnectDelay)
+        reconnectDelay = Math.min(reconnectDelay * 2, MAX_RECONNECT_DELAY_MS)
+      })
+    }
+    connect()
+
+    return () => {
+      closed = true
+      clearTimeout(reconnectTimer)
+      clearTimeout(debounceTimer)
+      ws?.close()
+    }
+  }, [targetDate, reloadData])
+}
+
 /**
  * Hook for accessing only today's widgets data
  */
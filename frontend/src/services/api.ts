@@ -179,6 +179,12 @@ class ApiService {
     return this.request<{ priority: 'critical' | 'medium' | 'low'; reason: string }>(url);
   }
 
+  // GET /api/v1/dashboard-widgets/priorities?date=YYYY-MM-DD&ids=id1,id2
+  async getWidgetPrioritiesForDate(widgetIds: string[], date: string): Promise<Record<string, { priority: 'critical' | 'medium' | 'low'; reason: string }>> {
+    const url = buildApiUrlWithParams(API_CONFIG.dashboardWidgets.getWidgetPrioritiesForDate, {}, { date, ids: widgetIds.join(',') });
+    return this.request<Record<string, { priority: 'critical' | 'medium' | 'low'; reason: string }>>(url);
+  }
+
   // ============================================================================
   // CHAT ENDPOINTS (/api/v1/chat/)
   // ============================================================================
@@ -14,6 +14,7 @@ interface DashboardState {
 
   // Actions
   loadData: (targetDate: string) => Promise<void>
+  reloadData: (targetDate: string, scope: 'all' | 'widgets' | 'today') => Promise<void>
   addWidgetToToday: (widgetId: string, targetDate: string) => Promise<{
     success: boolean;
     message: string;
@@ -64,6 +65,19 @@ export const useDashboardStore = create<DashboardState>((set, get) => ({
   },
 
 
+  // Refetch after a pushed change event, bypassing the same-date short-circuit
+  reloadData: async (targetDate: string, scope: 'all' | 'widgets' | 'today') => {
+    try {
+      const [allWidgets, todayWidgets] = await Promise.all([
+        scope === 'today' ? get().allWidgets : dashboardService.getAllWidgets(),
+        scope === 'widgets' ? get().todayWidgets : dashboardService.getTodayWidgets(targetDate)
+      ])
+      set({ allWidgets, todayWidgets, lastLoadedDate: targetDate })
+    } catch (error) {
+      console.error('Failed to reload dashboard data:', error)
+    }
+  },
+
   // Add widget to today
   addWidgetToToday: async (widgetId: string, targetDate: string) => {
     const result = await dashboardService.addWidgetToToday(widgetId, targetDate)
@@ -122,6 +136,7 @@ export const useError = () => useDashboardStore(state => state.error)
 
 // Individual action selectors to prevent unnecessary re-renders
 export const useLoadData = () => useDashboardStore(state => state.loadData)
+export const useReloadData = () => useDashboardStore(state => state.reloadData)
 export const useAddWidgetToToday = () => useDashboardStore(state => state.addWidgetToToday)
 export const useRemoveWidgetFromToday = () => useDashboardStore(state => state.removeWidgetFromToday)
 export const useUpdateWidgetActivity = () => useDashboardStore(state => state.updateWidgetActivity)
@@ -132,6 +147,7 @@ export const useDashboardActions = () => {
   const store = useDashboardStore()
   return {
     loadData: store.loadData,
+    reloadData: store.reloadData,
     addWidgetToToday: store.addWidgetToToday,
     removeWidgetFromToday: store.removeWidgetFromToday,
     updateWidgetActivity: store.updateWidgetActivity,